@@ -20,6 +20,12 @@ from .compiler import compile_dict
 from .compiler import compile_string
 from .compiler import compile_files
 from .compiler import pre_process_dict
+from .serialization import dump_compiled
+from .serialization import dumps_compiled
+from .serialization import load_compiled
+from .serialization import loads_compiled
+from .stream import StreamDecoder
+from .codecs import Encoded
 from .parser import parse_string
 from .parser import parse_files
 from .parser import ParseError
@@ -99,8 +105,9 @@ def _compile_files(specs, input_codec, output_codec):
 
         module = _import_module(specs[0])
         parsed = module.SPECIFICATION
-        input_spec = compile_dict(parsed, input_codec)
-        output_spec = compile_dict(parsed, output_codec)
+        compiled = compile_dict(parsed, codecs=[input_codec, output_codec])
+        input_spec = compiled[input_codec]
+        output_spec = compiled[output_codec]
     elif pkl_count > 0:
         if pkl_count != 2:
             raise Exception('Expected two .pkl-files, but got {}.'.format(pkl_count))
@@ -112,8 +119,9 @@ def _compile_files(specs, input_codec, output_codec):
             output_spec = pickle.load(fin)
     else:
         parsed = parse_files(specs)
-        input_spec = compile_dict(parsed, input_codec)
-        output_spec = compile_dict(parsed, output_codec)
+        compiled = compile_dict(parsed, codecs=[input_codec, output_codec])
+        input_spec = compiled[input_codec]
+        output_spec = compiled[output_codec]
 
     return input_spec, output_spec
 
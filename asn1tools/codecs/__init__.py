@@ -103,6 +103,58 @@ class OutOfDataError(DecodeError):
                 *divmod(offset, 8)))
 
 
+class Encoded(object):
+    """An already encoded value `data`, given in place of the value of a
+    member, element or chosen alternative when encoding. It is
+    inserted as is into the encoding, without being checked.
+
+    With the BER and DER codecs `data` is the complete encoding,
+    including tag and length. With the PER, UPER and OER codecs
+    `data` is the encoding as it would appear at that position, and
+    `number_of_bits` the number of bits in it, by default all bits in
+    `data`. Alignment is not added, so with the PER codec `data` as
+    encoded on its own is only valid where the encoding is octet
+    aligned.
+
+    >>> certificate = Encoded(rfc5280.encode('Certificate', decoded))
+    >>> rfc5280.encode('Certificates', [certificate])
+
+    """
+
+    def __init__(self, data, number_of_bits=None):
+        if number_of_bits is None:
+            number_of_bits = 8 * len(data)
+
+        self.data = data
+        self.number_of_bits = number_of_bits
+
+    def __eq__(self, other):
+        if not isinstance(other, Encoded):
+            return NotImplemented
+
+        return (self.data, self.number_of_bits) == (other.data,
+                                                    other.number_of_bits)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Encoded({!r}, {})'.format(self.data, self.number_of_bits)
+
+
+def check_not_encoded(data, codec_name):
+    """Raise an EncodeError if given data is an :class:`Encoded` object,
+    as only the BER, DER, PER, UPER and OER codecs insert already
+    encoded data.
+
+    """
+
+    if isinstance(data, Encoded):
+        raise EncodeError(
+            'Already encoded data cannot be inserted into {}.'.format(
+                codec_name))
+
+
 def _generalized_time_to_datetime(string):
     length = len(string)
 
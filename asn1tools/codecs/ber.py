@@ -2,17 +2,21 @@
 
 """
 
+import sys
 import math
 import binascii
 from copy import copy
 from operator import attrgetter
 
 from ..errors import Error
+from .. import compat
+from ..compat import Mapping
 from ..parser import EXTENSION_MARKER
 from . import EncodeError
 from . import DecodeError
 from . import DecodeTagError
 from . import DecodeContentsLengthError
+from . import Encoded
 from . import format_or
 from . import compiler
 from . import utc_time_to_datetime
@@ -67,6 +71,11 @@ class Tag(object):
     BMP_STRING        = 0x1e
 
 
+# Lengths of contents of at least this many bytes are inserted when
+# the encoding is complete instead of moving the contents.
+DEFERRED_LENGTH_MINIMUM = 4096
+
+
 class DecodeChoiceError(Error):
     pass
 
@@ -125,6 +134,126 @@ def decode_length_constructed(encoded, offset):
         return decode_length_definite(encoded, offset)
 
 
+def is_end_of_contents(encoded, offset):
+    return encoded[offset:offset + 2] == b'\x00\x00'
+
+
+def is_end_of_members(encoded, offset, end_offset):
+    """Returns True if there are no more members or elements at given
+    offset, that is, at given end offset, or at an end-of-contents tag
+    if the end offset is None for indefinite length.
+
+    """
+
+    if end_offset is None:
+        return is_end_of_contents(encoded, offset)
+    else:
+        return offset >= end_offset
+
+
+def decode_end_of_contents(encoded, offset):
+    if not is_end_of_contents(encoded, offset):
+        raise DecodeError(
+            "Expected end-of-contents tag at offset {}, but got '{}'.".format(
+                offset,
+                binascii.hexlify(encoded[offset:offset + 2]).decode('ascii')))
+
+    return offset + 2
+
+
+class Encoder(bytearray):
+    """Encodes all types into a single buffer.
+
+    A one byte length placeholder is appended after the tag of a
+    constructed encoding, and is replaced by the length when all its
+    contents has been encoded. Lengths of large contents are instead
+    inserted by :meth:`as_bytearray()`, so that large contents are
+    copied a constant number of times, independent of nesting depth.
+
+    """
+
+    # Created when the first length is deferred.
+    lengths = None
+
+    def append_length(self, offset):
+        """Set the length of the contents encoded since given offset, which
+        is the offset after the length placeholder.
+
+        """
+
+        length = len(self) - offset
+
+        if length < 128:
+            self[offset - 1] = length
+        elif length < DEFERRED_LENGTH_MINIMUM:
+            # Lengths within the contents are not deferred, as they
+            # are shorter.
+            self[offset - 1:offset] = encode_length_definite(length)
+        else:
+            self.defer_length(offset - 1, length)
+
+    def defer_length(self, offset, length):
+        if self.lengths is None:
+            self.lengths = []
+
+        lengths = self.lengths
+
+        # The lengths deferred within the contents were deferred after
+        # the start of the contents. Each entry has the number of
+        # additional length bytes in its contents, including its own,
+        # and the index of its first entry, so only the outermost
+        # entries have to be visited.
+        index = len(lengths)
+        number_of_length_bytes = 0
+
+        while index > 0:
+            length_offset, _, first_index, number_of_bytes = lengths[index - 1]
+
+            if length_offset < offset:
+                break
+
+            number_of_length_bytes += number_of_bytes
+            index = first_index
+
+        encoded_length = encode_length_definite(length + number_of_length_bytes)
+        number_of_length_bytes += len(encoded_length) - 1
+        lengths.append((offset, encoded_length, index, number_of_length_bytes))
+
+    def state(self):
+        if self.lengths is None:
+            self.lengths = []
+
+        return (len(self), len(self.lengths))
+
+    def restore(self, state):
+        """Remove everything encoded since given state was saved.
+
+        """
+
+        offset, number_of_lengths = state
+        del self[offset:]
+        del self.lengths[number_of_lengths:]
+
+    def as_bytearray(self):
+        if not self.lengths:
+            return bytearray(self)
+
+        # Lengths are deferred after their contents, but offsets are
+        # unique, so sorting gives them in encoding order.
+        self.lengths.sort()
+        parts = []
+        offset = 0
+
+        for length_offset, encoded_length, _, _ in self.lengths:
+            parts.append(self[offset:length_offset])
+            parts.append(encoded_length)
+            offset = length_offset + 1
+
+        parts.append(self[offset:])
+
+        return bytearray().join(parts)
+
+
 def encode_signed_integer(data):
     encoded = bytearray()
 
@@ -188,6 +317,40 @@ def encode_tag(number, flags):
     return tag
 
 
+def tag_as_integer(tag):
+    """Returns given encoded tag as an integer, which is compared to tags
+    read by :func:`read_tag_integer()`.
+
+    """
+
+    value = 0
+
+    for byte in bytearray(tag):
+        value <<= 8
+        value |= byte
+
+    return value
+
+
+def decode_bytes(contents):
+    """Returns given contents as bytes, or as is if a memoryview, which
+    it only is when decoding without copying.
+
+    """
+
+    if isinstance(contents, memoryview):
+        return contents
+
+    return bytes(contents)
+
+
+def decode_text(contents, encoding):
+    if isinstance(contents, memoryview):
+        contents = contents.tobytes()
+
+    return contents.decode(encoding)
+
+
 def skip_tag(data, offset):
     byte = data[offset]
     offset += 1
@@ -201,10 +364,49 @@ def skip_tag(data, offset):
     return offset
 
 
+def skip_value(data, offset):
+    """Returns the offset after the encoding starting at given offset,
+    which may have indefinite length.
+
+    """
+
+    offset = skip_tag(data, offset)
+    length, offset = decode_length_constructed(data, offset)
+
+    if length is None:
+        while not is_end_of_contents(data, offset):
+            offset = skip_value(data, offset)
+
+        return offset + 2
+    else:
+        return offset + length
+
+
 def read_tag(data, offset):
     return data[offset:skip_tag(data, offset)]
 
 
+def read_tag_integer(data, offset):
+    """Returns the tag at given offset as an integer, without slicing the
+    data.
+
+    """
+
+    tag = data[offset]
+
+    if tag & 0x1f == 0x1f:
+        offset += 1
+        byte = data[offset]
+        tag = (tag << 8) | byte
+
+        while byte & 0x80:
+            offset += 1
+            byte = data[offset]
+            tag = (tag << 8) | byte
+
+    return tag
+
+
 def encode_real(data):
     if data == float('inf'):
         data = b'\x40'
@@ -285,7 +487,7 @@ def decode_real_special(control):
 
 
 def decode_real_decimal(data):
-    return float(data[1:])
+    return float(bytes(data[1:]))
 
 
 def decode_real(data):
@@ -355,6 +557,18 @@ def decode_object_identifier_subidentifier(data, offset):
     return decoded, offset + 1
 
 
+def decode_selected(type_, data, offset, selection):
+    """Decode given selection of given type at given offset, or all of it
+    if the selection is None.
+
+    """
+
+    if selection is None:
+        return type_.decode(data, offset)
+    else:
+        return type_.decode_selected(data, offset, selection)
+
+
 class Type(object):
 
     def __init__(self, name, type_name, number, flags=0):
@@ -363,8 +577,10 @@ class Type(object):
 
         if number is None:
             self.tag = None
+            self.tag_integer = None
         else:
             self.tag = encode_tag(number, flags)
+            self.tag_integer = tag_as_integer(self.tag)
 
         self.optional = False
         self.default = None
@@ -374,11 +590,20 @@ class Type(object):
             flags |= Class.CONTEXT_SPECIFIC
 
         self.tag = encode_tag(number, flags)
+        self.tag_integer = tag_as_integer(self.tag)
 
     def set_size_range(self, minimum, maximum, has_extension_marker):
         pass
 
     def decode_tag(self, data, offset):
+        # Single byte tags are compared as integers, without slicing
+        # the data.
+        try:
+            if data[offset] == self.tag_integer:
+                return offset + 1
+        except IndexError:
+            pass
+
         end_offset = offset + len(self.tag)
 
         if data[offset:end_offset] != self.tag:
@@ -389,6 +614,12 @@ class Type(object):
 
         return end_offset
 
+    def decode_lazy(self, data, offset):
+        return self.decode(data, offset)[0]
+
+    def decode_selected(self, data, offset, _selection):
+        return self.decode(data, offset)
+
     def is_default(self, value):
         return value == self.default
 
@@ -401,18 +632,28 @@ class PrimitiveOrConstructedType(Type):
                                                          number,
                                                          flags)
         self.segment = segment
-        self.constructed_tag = copy(self.tag)
-        self.constructed_tag[0] |= Encoding.CONSTRUCTED
+        self.set_constructed_tag()
 
     def set_tag(self, number, flags):
-        if not Class.APPLICATION & flags:
-            flags |= Class.CONTEXT_SPECIFIC
+        super(PrimitiveOrConstructedType, self).set_tag(number, flags)
+        self.set_constructed_tag()
 
-        self.tag = encode_tag(number, flags)
+    def set_constructed_tag(self):
         self.constructed_tag = copy(self.tag)
         self.constructed_tag[0] |= Encoding.CONSTRUCTED
+        self.constructed_tag_integer = tag_as_integer(self.constructed_tag)
 
     def decode_tag(self, data, offset):
+        try:
+            tag = data[offset]
+
+            if tag == self.tag_integer:
+                return True, offset + 1
+            elif tag == self.constructed_tag_integer:
+                return False, offset + 1
+        except IndexError:
+            pass
+
         end_offset = offset + len(self.tag)
         tag = data[offset:end_offset]
 
@@ -478,7 +719,7 @@ class StringType(PrimitiveOrConstructedType):
         encoded.extend(data)
 
     def decode_primitive_contents(self, data, offset, length):
-        return data[offset:offset + length].decode(self.ENCODING)
+        return decode_text(data[offset:offset + length], self.ENCODING)
 
     def decode_constructed_segments(self, segments):
         return bytearray().join(segments).decode(self.ENCODING)
@@ -498,51 +739,89 @@ class MembersType(Type):
         self.root_members = root_members
         self.additions = additions
 
+        # Member name to the set of tags the member may have, or None if
+        # it may have any tag. Created on first use, as inner types of
+        # recursive members are not known when compiling.
+        self.member_tags = None
+
     def set_tag(self, number, flags):
         super(MembersType, self).set_tag(number,
                                          flags | Encoding.CONSTRUCTED)
 
+    def get_member_tags(self):
+        if self.member_tags is None:
+            members = list(self.root_members)
+
+            for addition in self.additions or []:
+                if isinstance(addition, list):
+                    members += addition
+                else:
+                    members.append(addition)
+
+            member_tags = {}
+
+            for member in members:
+                tags = get_tags(member)
+
+                if tags is not None:
+                    tags = frozenset(tags)
+
+                member_tags[member.name] = tags
+
+            self.member_tags = member_tags
+
+        return self.member_tags
+
+    def is_member_tag(self, member, data, offset):
+        """Returns True if the tag at given offset is a tag of given member,
+        that is, if the member is present.
+
+        """
+
+        tags = self.get_member_tags()[member.name]
+
+        return tags is None or read_tag_integer(data, offset) in tags
+
     def encode(self, data, encoded):
-        encoded_members = bytearray()
+        encoded.extend(self.tag)
+        encoded.append(0)
+        offset = len(encoded)
 
         for member in self.root_members:
-            self.encode_member(member, data, encoded_members)
+            self.encode_member(member, data, encoded)
 
         if self.additions:
-            self.encode_additions(data, encoded_members)
+            self.encode_additions(data, encoded)
 
-        encoded.extend(self.tag)
-        encoded.extend(encode_length_definite(len(encoded_members)))
-        encoded.extend(encoded_members)
+        encoded.append_length(offset)
 
-    def encode_additions(self, data, encoded_members):
+    def encode_additions(self, data, encoded):
         try:
             for addition in self.additions:
-                encoded_addition = bytearray()
+                state = encoded.state()
 
                 if isinstance(addition, list):
                     for member in addition:
-                        self.encode_member(member, data, encoded_addition)
+                        self.encode_member(member, data, encoded)
                 else:
-                    self.encode_member(addition,
-                                       data,
-                                       encoded_addition)
-
-                encoded_members.extend(encoded_addition)
+                    self.encode_member(addition, data, encoded)
         except EncodeError:
-            pass
+            # Discard the partially encoded addition.
+            encoded.restore(state)
 
-    def encode_member(self, member, data, encoded_members):
+    def encode_member(self, member, data, encoded):
         name = member.name
 
         if name in data:
             value = data[name]
 
             try:
-                if isinstance(member, AnyDefinedBy):
-                    member.encode(value, encoded_members, data)
+                if isinstance(value, Encoded):
+                    encoded.extend(value.data)
+                elif isinstance(member, AnyDefinedBy):
+                    member.encode(value, encoded, data)
                 elif not member.is_default(value):
-                    member.encode(value, encoded_members)
+                    member.encode(value, encoded)
             except EncodeError as e:
                 e.location.append(member.name)
                 raise
@@ -556,14 +835,15 @@ class MembersType(Type):
 
     def decode(self, data, offset):
         offset = self.decode_tag(data, offset)
+        length, offset = decode_length_constructed(data, offset)
 
-        if data[offset] == 0x80:
-            raise NotImplementedError(
-                'Decode until an end-of-contents tag is not yet implemented.')
+        if length is None:
+            # Indefinite length, with the members followed by an
+            # end-of-contents tag.
+            end_offset = None
         else:
-            length, offset = decode_length_definite(data, offset)
+            end_offset = offset + length
 
-        end_offset = offset + length
         values = {}
 
         for member in self.root_members:
@@ -574,59 +854,127 @@ class MembersType(Type):
                                         end_offset)
 
         if self.additions:
-            self.decode_additions(data,
-                                  values,
-                                  offset,
-                                  end_offset)
+            offset = self.decode_additions(data,
+                                           values,
+                                           offset,
+                                           end_offset)
+
+        if end_offset is None:
+            # Skip unknown extension additions.
+            try:
+                while not is_end_of_contents(data, offset):
+                    offset = skip_value(data, offset)
+            except IndexError:
+                raise DecodeError('out of data at offset {}'.format(offset))
+
+            end_offset = offset + 2
 
         return values, end_offset
 
+    def decode_lazy(self, data, offset):
+        return LazyMembers(self, data, offset)
+
+    def decode_selected(self, data, offset, selection):
+        lazy = LazyMembers(self, data, offset)
+        values = {}
+
+        for name, (member, member_offset) in lazy.get_members().items():
+            if name not in selection:
+                continue
+
+            if member is None:
+                # The default value.
+                values[name] = member_offset
+
+                continue
+
+            try:
+                if isinstance(member, AnyDefinedBy):
+                    value = member.decode(data, member_offset, lazy)[0]
+                else:
+                    value = decode_selected(member,
+                                            data,
+                                            member_offset,
+                                            selection[name])[0]
+            except (DecodeError, IndexError) as e:
+                if isinstance(e, IndexError):
+                    e = DecodeError(
+                        'out of data at offset {}'.format(member_offset))
+
+                e.location.append(name)
+                raise e
+
+            values[name] = value
+
+        return values, skip_value(data, offset)
+
     def decode_additions(self, data, values, offset, end_offset):
         try:
             for addition in self.additions:
                 addition_values = {}
+                addition_offset = offset
 
                 if isinstance(addition, list):
-                    for member in addition:
-                        offset = self.decode_member(member,
-                                                    data,
-                                                    addition_values,
-                                                    offset,
-                                                    end_offset)
+                    members = addition
                 else:
-                    offset = self.decode_member(addition,
-                                                data,
-                                                addition_values,
-                                                offset,
-                                                end_offset)
+                    members = [addition]
+
+                for member in members:
+                    if not (member.optional or member.default is not None):
+                        # This and all following additions are absent
+                        # if a mandatory member is missing.
+                        if is_end_of_members(data, addition_offset, end_offset):
+                            return offset
+
+                        if not self.is_member_tag(member, data, addition_offset):
+                            return offset
+
+                    addition_offset = self.decode_member(member,
+                                                         data,
+                                                         addition_values,
+                                                         addition_offset,
+                                                         end_offset)
 
                 values.update(addition_values)
+                offset = addition_offset
         except DecodeError:
             pass
 
+        return offset
+
     def decode_member(self, member, data, values, offset, end_offset):
+        is_mandatory = not (member.optional or member.default is not None)
+
         try:
-            if offset < end_offset:
+            if end_offset is None:
+                is_end = is_end_of_contents(data, offset)
+            else:
+                is_end = (offset >= end_offset)
+
+            if is_end:
+                if is_mandatory:
+                    raise IndexError
+            elif is_mandatory or self.is_member_tag(member, data, offset):
+                # A mandatory member with another tag is decoded to
+                # raise the tag error.
                 if isinstance(member, AnyDefinedBy):
                     value, offset = member.decode(data, offset, values)
                 else:
                     value, offset = member.decode(data, offset)
-            else:
-                raise IndexError
-        except (DecodeError, IndexError) as e:
-            if member.optional:
-                return offset
 
-            if member.default is None:
-                if isinstance(e, IndexError):
-                    e = DecodeError('out of data at offset {}'.format(offset))
-
-                e.location.append(member.name)
-                raise e
+                values[member.name] = value
 
-            value = member.default
+                return offset
+        except IndexError:
+            e = DecodeError('out of data at offset {}'.format(offset))
+            e.location.append(member.name)
+            raise e
+        except DecodeError as e:
+            e.location.append(member.name)
+            raise
 
-        values[member.name] = value
+        if member.default is not None:
+            values[member.name] = member.default
 
         return offset
 
@@ -651,33 +999,49 @@ class ArrayType(Type):
                                        flags | Encoding.CONSTRUCTED)
 
     def encode(self, data, encoded):
-        encoded_elements = bytearray()
+        encoded.extend(self.tag)
+        encoded.append(0)
+        offset = len(encoded)
 
         for entry in data:
-            self.element_type.encode(entry, encoded_elements)
+            if isinstance(entry, Encoded):
+                encoded.extend(entry.data)
+            else:
+                self.element_type.encode(entry, encoded)
 
-        encoded.extend(self.tag)
-        encoded.extend(encode_length_definite(len(encoded_elements)))
-        encoded.extend(encoded_elements)
+        encoded.append_length(offset)
 
     def decode(self, data, offset):
         offset = self.decode_tag(data, offset)
+        length, offset = decode_length_constructed(data, offset)
+        decoded = []
 
-        if data[offset] == 0x80:
-            raise NotImplementedError(
-                'Decode until an end-of-contents tag is not yet implemented.')
-        else:
-            length, offset = decode_length_definite(data, offset)
+        if length is None:
+            while not is_end_of_contents(data, offset):
+                decoded_element, offset = self.element_type.decode(data, offset)
+                decoded.append(decoded_element)
 
-        decoded = []
-        start_offset = offset
+            offset += 2
+        else:
+            end_offset = offset + length
 
-        while (offset - start_offset) < length:
-            decoded_element, offset = self.element_type.decode(data, offset)
-            decoded.append(decoded_element)
+            while offset < end_offset:
+                decoded_element, offset = self.element_type.decode(data, offset)
+                decoded.append(decoded_element)
 
         return decoded, offset
 
+    def decode_lazy(self, data, offset):
+        return LazyArray(self, data, offset)
+
+    def decode_selected(self, data, offset, selection):
+        decoded = [
+            self.element_type.decode_selected(data, element_offset, selection)[0]
+            for element_offset in LazyArray(self, data, offset).get_offsets()
+        ]
+
+        return decoded, skip_value(data, offset)
+
     def __repr__(self):
         return '{}({}, {})'.format(self.__class__.__name__,
                                    self.name,
@@ -852,7 +1216,7 @@ class OctetString(PrimitiveOrConstructedType):
         encoded.extend(data)
 
     def decode_primitive_contents(self, data, offset, length):
-        return bytes(data[offset:offset + length])
+        return decode_bytes(data[offset:offset + length])
 
     def decode_constructed_segments(self, segments):
         return bytes().join(segments)
@@ -1000,10 +1364,10 @@ class Choice(Type):
         if isinstance(member, Choice):
             tags = self.get_choice_tags(member)
         else:
-            tags.append(bytes(member.tag))
+            tags.append(member.tag_integer)
 
-            if hasattr(member, 'constructed_tag'):
-                tags.append(bytes(member.constructed_tag))
+            if hasattr(member, 'constructed_tag_integer'):
+                tags.append(member.constructed_tag_integer)
 
         return tags
 
@@ -1016,7 +1380,12 @@ class Choice(Type):
         return tags
 
     def format_tag(self, tag):
-        return binascii.hexlify(tag).decode('ascii')
+        tag = '{:x}'.format(tag)
+
+        if len(tag) % 2 == 1:
+            tag = '0' + tag
+
+        return tag
 
     def format_tags(self):
         return format_or(sorted([self.format_tag(tag)
@@ -1034,27 +1403,52 @@ class Choice(Type):
                     self.format_names(),
                     data[0]))
 
+        value = data[1]
+
         try:
-            member.encode(data[1], encoded)
+            if isinstance(value, Encoded):
+                encoded.extend(value.data)
+            else:
+                member.encode(value, encoded)
         except EncodeError as e:
             e.location.append(member.name)
             raise
 
-    def decode(self, data, offset):
-        tag = bytes(read_tag(data, offset))
+    def decode_member_tag(self, data, offset):
+        tag = read_tag_integer(data, offset)
 
         try:
-            member = self.tag_to_member[tag]
+            return self.tag_to_member[tag]
         except KeyError:
             raise DecodeError(
                 "Expected choice member tag {}, but got '{}'.".format(
                     self.format_tags(),
                     self.format_tag(tag)))
 
+    def decode(self, data, offset):
+        member = self.decode_member_tag(data, offset)
         decoded, offset = member.decode(data, offset)
 
         return (member.name, decoded), offset
 
+    def decode_lazy(self, data, offset):
+        member = self.decode_member_tag(data, offset)
+
+        return (member.name, member.decode_lazy(data, offset))
+
+    def decode_selected(self, data, offset, selection):
+        member = self.decode_member_tag(data, offset)
+
+        if member.name not in selection:
+            return (member.name, None), skip_value(data, offset)
+
+        decoded, offset = decode_selected(member,
+                                          data,
+                                          offset,
+                                          selection[member.name])
+
+        return (member.name, decoded), offset
+
     def __repr__(self):
         return 'Choice({}, [{}])'.format(
             self.name,
@@ -1138,7 +1532,7 @@ class UTCTime(Type):
         offset = self.decode_tag(data, offset)
         length, offset = decode_length_definite(data, offset)
         end_offset = offset + length
-        decoded = data[offset:end_offset].decode('ascii')
+        decoded = decode_text(data[offset:end_offset], 'ascii')
 
         return utc_time_to_datetime(decoded), end_offset
 
@@ -1163,7 +1557,7 @@ class GeneralizedTime(Type):
         offset = self.decode_tag(data, offset)
         length, offset = decode_length_definite(data, offset)
         end_offset = offset + length
-        decoded = data[offset:end_offset].decode('ascii')
+        decoded = decode_text(data[offset:end_offset], 'ascii')
 
         return generalized_time_to_datetime(decoded), end_offset
 
@@ -1180,12 +1574,9 @@ class Any(Type):
         encoded.extend(data)
 
     def decode(self, data, offset):
-        start = offset
-        offset = skip_tag(data, offset)
-        length, offset = decode_length_definite(data, offset)
-        end_offset = offset + length
+        end_offset = skip_value(data, offset)
 
-        return data[start:end_offset], end_offset
+        return data[offset:end_offset], end_offset
 
     def __repr__(self):
         return 'Any({})'.format(self.name)
@@ -1220,12 +1611,9 @@ class AnyDefinedBy(Type):
                 raise DecodeError('Bad AnyDefinedBy choice {}.'.format(
                     values[self.type_member]))
         else:
-            start = offset
-            offset = skip_tag(data, offset)
-            length, offset = decode_length_definite(data, offset)
-            end_offset = offset + length
+            end_offset = skip_value(data, offset)
 
-            return data[start:end_offset], end_offset
+            return data[offset:end_offset], end_offset
 
     def __repr__(self):
         return 'AnyDefinedBy({})'.format(self.name)
@@ -1242,16 +1630,34 @@ class ExplicitTag(Type):
                                          flags | Encoding.CONSTRUCTED)
 
     def encode(self, data, encoded):
-        encoded_inner = bytearray()
-        self.inner.encode(data, encoded_inner)
         encoded.extend(self.tag)
-        encoded.extend(encode_length_definite(len(encoded_inner)))
-        encoded.extend(encoded_inner)
+        encoded.append(0)
+        offset = len(encoded)
+        self.inner.encode(data, encoded)
+        encoded.append_length(offset)
 
     def decode(self, data, offset):
         offset = self.decode_tag(data, offset)
-        _, offset = decode_length_definite(data, offset)
-        return self.inner.decode(data, offset)
+        length, offset = decode_length_constructed(data, offset)
+        decoded, offset = self.inner.decode(data, offset)
+
+        if length is None:
+            offset = decode_end_of_contents(data, offset)
+
+        return decoded, offset
+
+    def decode_lazy(self, data, offset):
+        offset = self.decode_tag(data, offset)
+        _, offset = decode_length_constructed(data, offset)
+
+        return self.inner.decode_lazy(data, offset)
+
+    def decode_selected(self, data, offset, selection):
+        end_offset = skip_value(data, offset)
+        offset = self.decode_tag(data, offset)
+        _, offset = decode_length_constructed(data, offset)
+
+        return self.inner.decode_selected(data, offset, selection)[0], end_offset
 
     def __repr__(self):
         return 'ExplicitTag()'
@@ -1283,10 +1689,350 @@ class Recursive(Type, compiler.Recursive):
     def decode(self, data, offset):
         return self.inner.decode(data, offset)
 
+    def decode_lazy(self, data, offset):
+        return self.inner.decode_lazy(data, offset)
+
+    def decode_selected(self, data, offset, selection):
+        return self.inner.decode_selected(data, offset, selection)
+
     def __repr__(self):
         return 'Recursive({})'.format(self.type_name)
 
 
+def get_tags(type_):
+    """Returns a list of all tags of given type, or None if it may have
+    any tag.
+
+    """
+
+    if isinstance(type_, Recursive):
+        type_ = type_.inner
+
+    if isinstance(type_, Choice):
+        return list(type_.tag_to_member)
+    elif type_.tag is None:
+        return None
+
+    tags = [type_.tag_integer]
+
+    if hasattr(type_, 'constructed_tag_integer'):
+        tags.append(type_.constructed_tag_integer)
+
+    return tags
+
+
+class LazyMembers(Mapping):
+    """A read-only dictionary of the members of a decoded SEQUENCE or SET,
+    where each member is decoded on first access.
+
+    The offsets of all members are found on first access by only
+    decoding the tag and length of each member.
+
+    """
+
+    def __init__(self, type_, data, offset):
+        offset = type_.decode_tag(data, offset)
+        length, offset = decode_length_constructed(data, offset)
+        self._type = type_
+        self._data = data
+        self._offset = offset
+
+        if length is None:
+            self._end_offset = None
+        else:
+            self._end_offset = offset + length
+
+        # Member name to member and offset, or None and the default
+        # value. Found on first access.
+        self._members = None
+        self._values = {}
+
+    def get_members(self):
+        if self._members is None:
+            members = {}
+            offset = self._offset
+
+            for member in self._type.root_members:
+                offset = self.find_member(member, members, offset)
+
+            if self._type.additions:
+                self.find_additions(members, offset)
+
+            self._members = members
+
+        return self._members
+
+    def find_additions(self, members, offset):
+        try:
+            for addition in self._type.additions:
+                addition_members = {}
+
+                if isinstance(addition, list):
+                    for member in addition:
+                        offset = self.find_member(member,
+                                                  addition_members,
+                                                  offset)
+                else:
+                    offset = self.find_member(addition,
+                                              addition_members,
+                                              offset)
+
+                members.update(addition_members)
+        except DecodeError:
+            pass
+
+    def find_member(self, member, members, offset):
+        """Find given member at given offset, and return the offset after
+        it. Errors are the same as when decoding.
+
+        """
+
+        data = self._data
+
+        try:
+            if not is_end_of_members(data, offset, self._end_offset):
+                if self._type.is_member_tag(member, data, offset):
+                    members[member.name] = (member, offset)
+
+                    return skip_value(data, offset)
+            elif not (member.optional or member.default is not None):
+                raise IndexError
+        except IndexError:
+            e = DecodeError('out of data at offset {}'.format(offset))
+            e.location.append(member.name)
+            raise e
+        except DecodeError as e:
+            e.location.append(member.name)
+            raise
+
+        if member.optional:
+            pass
+        elif member.default is not None:
+            members[member.name] = (None, member.default)
+        else:
+            # Decode to raise the decode error.
+            try:
+                _, end_offset = member.decode(data, offset)
+            except DecodeError as e:
+                e.location.append(member.name)
+                raise
+
+            members[member.name] = (member, offset)
+            offset = end_offset
+
+        return offset
+
+    def __getitem__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+
+        member, offset = self.get_members()[name]
+
+        if member is None:
+            # The default value.
+            value = offset
+        else:
+            try:
+                if isinstance(member, AnyDefinedBy):
+                    value = member.decode(self._data, offset, self)[0]
+                else:
+                    value = member.decode_lazy(self._data, offset)
+            except (DecodeError, IndexError) as e:
+                if isinstance(e, IndexError):
+                    e = DecodeError('out of data at offset {}'.format(offset))
+
+                e.location.append(member.name)
+                raise e
+
+        self._values[name] = value
+
+        return value
+
+    def __iter__(self):
+        return iter(self.get_members())
+
+    def __len__(self):
+        return len(self.get_members())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class LazyArray(compat.Sequence):
+    """A read-only list of the elements of a decoded SEQUENCE OF or SET
+    OF, where each element is decoded on first access.
+
+    """
+
+    def __init__(self, type_, data, offset):
+        offset = type_.decode_tag(data, offset)
+        length, offset = decode_length_constructed(data, offset)
+        self._element_type = type_.element_type
+        self._data = data
+        self._offset = offset
+
+        if length is None:
+            self._end_offset = None
+        else:
+            self._end_offset = offset + length
+
+        self._offsets = None
+        self._values = {}
+
+    def get_offsets(self):
+        if self._offsets is None:
+            data = self._data
+            end_offset = self._end_offset
+            offset = self._offset
+            offsets = []
+
+            try:
+                if end_offset is None:
+                    while not is_end_of_contents(data, offset):
+                        offsets.append(offset)
+                        offset = skip_value(data, offset)
+                else:
+                    while offset < end_offset:
+                        offsets.append(offset)
+                        offset = skip_value(data, offset)
+            except IndexError:
+                raise DecodeError('out of data at offset {}'.format(offset))
+
+            self._offsets = offsets
+
+        return self._offsets
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        offsets = self.get_offsets()
+
+        if index < 0:
+            index += len(offsets)
+
+        try:
+            return self._values[index]
+        except KeyError:
+            pass
+
+        if not 0 <= index < len(offsets):
+            raise IndexError('list index out of range')
+
+        value = self._element_type.decode_lazy(self._data, offsets[index])
+        self._values[index] = value
+
+        return value
+
+    def __len__(self):
+        return len(self.get_offsets())
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, LazyArray)):
+            return NotImplemented
+
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def replace_member(members, member, replacement):
+    return [
+        replacement if item is member else item
+        for item in members
+    ]
+
+
+def record_spans(type_, names, spans):
+    """Returns a copy of given type, where the type at given member names
+    appends the offset and length of its encoding to given list of
+    spans when decoded. Only types along the path are copied. Raises
+    KeyError if a member is not found.
+
+    """
+
+    if not names:
+        recorder = copy(type_)
+        decode = type_.decode
+        decode_lazy = type_.decode_lazy
+
+        def decode_and_record(data, offset, *args):
+            decoded, end_offset = decode(data, offset, *args)
+            spans.append((offset, end_offset - offset))
+
+            return decoded, end_offset
+
+        def decode_lazy_and_record(data, offset):
+            spans.append((offset, skip_value(data, offset) - offset))
+
+            return decode_lazy(data, offset)
+
+        recorder.decode = decode_and_record
+        recorder.decode_lazy = decode_lazy_and_record
+
+        return recorder
+
+    type_ = copy(type_)
+
+    if hasattr(type_, 'element_type'):
+        # Spans are recorded for all elements.
+        type_.element_type = record_spans(type_.element_type, names, spans)
+    elif hasattr(type_, 'inner'):
+        type_.inner = record_spans(type_.inner, names, spans)
+    elif hasattr(type_, 'root_members'):
+        for member in type_.root_members + (type_.additions or []):
+            if isinstance(member, list):
+                group = member
+
+                for member in group:
+                    if member.name == names[0]:
+                        break
+                else:
+                    continue
+
+                replacement = record_spans(member, names[1:], spans)
+                type_.additions = replace_member(
+                    type_.additions,
+                    group,
+                    replace_member(group, member, replacement))
+                break
+            elif member.name == names[0]:
+                replacement = record_spans(member, names[1:], spans)
+                type_.root_members = replace_member(type_.root_members,
+                                                    member,
+                                                    replacement)
+
+                if type_.additions:
+                    type_.additions = replace_member(type_.additions,
+                                                     member,
+                                                     replacement)
+
+                break
+        else:
+            raise KeyError(names[0])
+    elif hasattr(type_, 'name_to_member'):
+        member = type_.name_to_member[names[0]]
+
+        replacement = record_spans(member, names[1:], spans)
+        type_.members = replace_member(type_.members, member, replacement)
+        type_.name_to_member = dict(type_.name_to_member)
+        type_.name_to_member[member.name] = replacement
+        type_.tag_to_member = {
+            tag: replacement if item is member else item
+            for tag, item in type_.tag_to_member.items()
+        }
+    else:
+        raise KeyError(names[0])
+
+    return type_
+
+
 class CompiledType(compiler.CompiledType):
 
     def __init__(self, type_):
@@ -1298,13 +2044,62 @@ class CompiledType(compiler.CompiledType):
         return self._type
 
     def encode(self, data):
-        encoded = bytearray()
+        encoded = Encoder()
         self._type.encode(data, encoded)
 
-        return encoded
+        return encoded.as_bytearray()
 
-    def decode(self, data):
-        return self._type.decode(bytearray(data), 0)[0]
+    def decode_length(self, data):
+        return decode_length(data)
+
+    def decode(self,
+               data,
+               zero_copy=False,
+               lazy=False,
+               spans=None,
+               select=None):
+        if zero_copy and sys.version_info[0] > 2:
+            data = memoryview(data)
+
+            if data.format != 'B':
+                data = data.cast('B')
+        else:
+            data = bytearray(data)
+
+        if spans is None:
+            type_ = self._type
+        else:
+            type_, spans = self.record_spans(spans)
+
+        if select is not None:
+            decoded = type_.decode_selected(data,
+                                            0,
+                                            self.selection_tree(select))[0]
+        elif lazy:
+            decoded = type_.decode_lazy(data, 0)
+        else:
+            decoded = type_.decode(data, 0)[0]
+
+        if spans is None:
+            return decoded
+        else:
+            return decoded, spans
+
+    def record_spans(self, paths):
+        type_ = self._type
+        spans = {path: [] for path in paths}
+
+        # Deeper paths first, as recording wraps the decode method of
+        # the type at the end of the path.
+        for path in sorted(spans, key=lambda path: -path.count('.')):
+            try:
+                type_ = record_spans(type_, path.split('.'), spans[path])
+            except KeyError as e:
+                raise DecodeError("Member '{}' of path '{}' not found.".format(
+                    e.args[0],
+                    path))
+
+        return type_, spans
 
     def __repr__(self):
         return repr(self._type)
@@ -1313,9 +2108,9 @@ class CompiledType(compiler.CompiledType):
 class Compiler(compiler.Compiler):
 
     def process_type(self, type_name, type_descriptor, module_name):
-        compiled_type = self.compile_type(type_name,
-                                          type_descriptor,
-                                          module_name)
+        compiled_type = self.compile_user_type(type_name,
+                                               type_name,
+                                               module_name)
 
         return CompiledType(compiled_type)
 
@@ -1496,6 +2291,14 @@ def decode_length(data):
         data = bytearray(data)
         offset = skip_tag(data, 0)
 
+        if data[offset] == 0x80:
+            # The length is known when the end-of-contents tag of the
+            # outermost encoding has been found.
+            try:
+                return skip_value(data, 0)
+            except DecodeContentsLengthError:
+                return None
+
         return sum(decode_length_definite(data, offset))
     except DecodeContentsLengthError as e:
         return (e.length + e.offset)
@@ -5,10 +5,19 @@
 from operator import attrgetter
 import bitstruct
 
-from copy import copy
 from copy import deepcopy
 from ..errors import CompileError
 from ..parser import EXTENSION_MARKER
+from . import DecodeError
+
+
+OBJECT_IDENTIFIER_ROOT_ARCS = {
+    'itu-t': 0,
+    'ccitt': 0,
+    'iso': 1,
+    'joint-iso-itu-t': 2,
+    'joint-iso-ccitt': 2
+}
 
 
 def flatten(dlist):
@@ -72,6 +81,87 @@ def clean_bit_string_value(value, has_named_bits):
         return (data, number_of_bits)
 
 
+def find_selected_member(type_, name):
+    """Returns the member with given name of given type checker type, or
+    None if not found. Elements of lists are implicit.
+
+    """
+
+    while True:
+        if hasattr(type_, 'inner'):
+            type_ = type_.inner
+        elif hasattr(type_, 'element_type'):
+            type_ = type_.element_type
+        else:
+            break
+
+    for member in getattr(type_, 'members', []):
+        if member.name == name:
+            return member
+
+    return None
+
+
+def selection_tree(type_, paths):
+    """Returns given member paths as nested dictionaries of member names,
+    where a member name maps to None if its whole value is selected.
+
+    Each path is member names separated by dots, checked against given
+    type checker type. Raises DecodeError if a member is not found.
+
+    """
+
+    tree = {}
+
+    for path in paths:
+        node = tree
+        member = type_
+        names = path.split('.')
+
+        for i, name in enumerate(names):
+            member = find_selected_member(member, name)
+
+            if member is None:
+                raise DecodeError("Member '{}' of path '{}' not found.".format(
+                    name,
+                    path))
+
+            if i == len(names) - 1:
+                node[name] = None
+            elif name in node and node[name] is None:
+                # The whole member is already selected.
+                break
+            else:
+                node = node.setdefault(name, {})
+
+    return tree
+
+
+def select_decoded(decoded, selection):
+    """Returns given selection of given decoded value, for codecs that
+    cannot skip unselected members when decoding.
+
+    """
+
+    if selection is None:
+        return decoded
+    elif isinstance(decoded, list):
+        return [select_decoded(element, selection) for element in decoded]
+    elif isinstance(decoded, tuple):
+        name, value = decoded
+
+        if name in selection:
+            return (name, select_decoded(value, selection[name]))
+        else:
+            return (name, None)
+    else:
+        return {
+            name: select_decoded(decoded[name], member_selection)
+            for name, member_selection in selection.items()
+            if name in decoded
+        }
+
+
 class CompiledType(object):
 
     def __init__(self):
@@ -84,6 +174,12 @@ class CompiledType(object):
     def check_constraints(self, data):
         return self.constraints_checker.encode(data)
 
+    def decode_length(self, data):
+        raise DecodeError('Decode length is not supported for this codec.')
+
+    def selection_tree(self, paths):
+        return selection_tree(self.type_checker.type, paths)
+
 
 class Recursive(object):
     pass
@@ -96,6 +192,9 @@ class Compiler(object):
         self._types_backtrace = []
         self.recursive_types = []
         self.compiled = {}
+        self.lazy_compiled = {}
+        self.compiled_instances = {}
+        self.objects = {}
 
     def types_backtrace_push(self, type_name):
         self._types_backtrace.append(type_name)
@@ -110,6 +209,14 @@ class Compiler(object):
     def process(self):
         self.pre_process()
 
+        return self.process_types()
+
+    def process_types(self):
+        """Compile all types. The specification must already be
+        pre-processed.
+
+        """
+
         compiled = {}
 
         for module_name in self._specification:
@@ -134,6 +241,42 @@ class Compiler(object):
 
         return compiled
 
+    def process_lazy(self, module_name, type_name):
+        """Compile given type only, and any types it depends on. The
+        specification must already be pre-processed.
+
+        """
+
+        if module_name not in self.lazy_compiled:
+            self.lazy_compiled[module_name] = {}
+
+        compiled_module = self.lazy_compiled[module_name]
+
+        if type_name in compiled_module:
+            return compiled_module[type_name]
+
+        type_descriptor = self._specification[module_name]['types'][type_name]
+        self.types_backtrace_push(type_name)
+
+        # Types left in the backtrace by a failed compilation would be
+        # taken as recursive when compiling other types later.
+        try:
+            compiled_type = self.process_type(type_name,
+                                              type_descriptor,
+                                              module_name)
+        finally:
+            del self._types_backtrace[:]
+
+        compiled_module[type_name] = compiled_type
+
+        while self.recursive_types:
+            recursive_type = self.recursive_types.pop()
+            inner_type = self.process_lazy(recursive_type.module_name,
+                                           recursive_type.type_name).type
+            recursive_type.set_inner_type(inner_type)
+
+        return compiled_type
+
     def pre_process(self):
         for module_name in self._specification:
             module = self._specification[module_name]
@@ -433,25 +576,107 @@ class Compiler(object):
         return NotImplementedError('To be implemented by subclasses.')
 
     def compile_user_type(self, name, type_name, module_name):
-        compiled = self.get_compiled_type(name,
-                                          type_name,
-                                          module_name)
+        compiled = self.get_compiled_type(type_name, module_name)
+
+        if compiled is None or isinstance(compiled, Recursive):
+            type_descriptor, type_module_name = self.lookup_type_descriptor(
+                type_name,
+                module_name)
+
+            # Parameters of a parameterized type referenced without
+            # actual parameters are unconstrained.
+            if 'parameters' in type_descriptor:
+                type_descriptor = deepcopy(type_descriptor)
+                substitute_parameters(
+                    type_descriptor,
+                    dict.fromkeys(type_descriptor['parameters']))
 
-        if compiled is None:
             self.types_backtrace_push(type_name)
-            compiled = self.compile_type(
-                name,
-                *self.lookup_type_descriptor(
-                    type_name,
-                    module_name))
+            compiled = self.compile_type(name,
+                                         type_descriptor,
+                                         type_module_name)
             self.types_backtrace_pop()
-            self.set_compiled_type(name,
-                                   type_name,
+            self.set_compiled_type(type_name,
                                    module_name,
                                    compiled)
+        else:
+            compiled = self.rename(compiled, name)
 
         return compiled
 
+    def compile_parameterized_type(self, name, type_descriptor, module_name):
+        """Compile the parameterized type referenced by given type
+        descriptor, with its formal parameters replaced by the actual
+        parameters of the reference. Compiled instances are shared by
+        all references with the same actual parameters.
+
+        """
+
+        type_name = type_descriptor['type']
+        parameterized_type_descriptor, parameterized_module_name = (
+            self.lookup_type_descriptor(type_name, module_name))
+        parameters = parameterized_type_descriptor.get('parameters', [])
+        actual_parameters = [
+            self.resolve_actual_parameter(parameter, module_name)
+            for parameter in type_descriptor['actual-parameters']
+        ]
+
+        if len(parameters) != len(actual_parameters):
+            return self.compile_user_type(name, type_name, module_name)
+
+        key = (parameterized_module_name, type_name, repr(actual_parameters))
+
+        try:
+            return self.rename(self.compiled_instances[key], name)
+        except KeyError:
+            pass
+
+        # Recursive instances are compiled as the parameterized type
+        # itself.
+        if key in self.types_backtrace:
+            return self.compile_user_type(name, type_name, module_name)
+
+        instance_type_descriptor = deepcopy(parameterized_type_descriptor)
+        substitute_parameters(instance_type_descriptor,
+                              dict(zip(parameters, actual_parameters)))
+        self.types_backtrace_push(key)
+        compiled = self.compile_type(name,
+                                     instance_type_descriptor,
+                                     parameterized_module_name)
+        self.types_backtrace_pop()
+        self.compiled_instances[key] = compiled
+
+        return compiled
+
+    def resolve_actual_parameter(self, parameter, module_name):
+        """Returns given actual parameter in a form that is independent of
+        given module it is referenced in. Object sets are returned as
+        a tuple of the object set name and its module name, and
+        values as their value. Types are returned as is.
+
+        """
+
+        if not isinstance(parameter, str):
+            return parameter
+
+        try:
+            _, object_set_module_name = self.lookup_in_modules('object-sets',
+                                                               'object set',
+                                                               parameter,
+                                                               module_name)
+
+            return (parameter, object_set_module_name)
+        except CompileError:
+            pass
+
+        if not is_type_name(parameter):
+            try:
+                return self.lookup_value(parameter, module_name)[0]['value']
+            except CompileError:
+                pass
+
+        return parameter
+
     def compile_members(self,
                         members,
                         module_name,
@@ -493,16 +718,16 @@ class Compiler(object):
                                                 member,
                                                 module_name)
 
-        if 'optional' in member:
+        if 'optional' in member or 'default' in member or 'size' in member:
             compiled_member = self.copy(compiled_member)
+
+        if 'optional' in member:
             compiled_member.optional = member['optional']
 
         if 'default' in member:
-            compiled_member = self.copy(compiled_member)
             compiled_member.default = member['default']
 
         if 'size' in member:
-            compiled_member = self.copy(compiled_member)
             compiled_member.set_size_range(*self.get_size_range(member,
                                                                 module_name))
 
@@ -645,20 +870,23 @@ class Compiler(object):
             if member['name'] == member_name:
                 return member['type'], module_name
 
-    def get_compiled_type(self, name, type_name, module_name):
+    def get_compiled_type(self, type_name, module_name):
+        """Returns the already compiled type with given name in given
+        module, or ``None`` if not yet compiled. Compiled types are
+        shared by all members of the type, as only the name differs.
+
+        """
+
         try:
-            return self.compiled[module_name][type_name][name]
+            return self.compiled[module_name][type_name]
         except KeyError:
             return None
 
-    def set_compiled_type(self, name, type_name, module_name, compiled):
+    def set_compiled_type(self, type_name, module_name, compiled):
         if module_name not in self.compiled:
             self.compiled[module_name] = {}
 
-        if type_name not in self.compiled[module_name]:
-            self.compiled[module_name][type_name] = {}
-
-        self.compiled[module_name][type_name][name] = compiled
+        self.compiled[module_name][type_name] = compiled
 
     def convert_object_class_type_descriptor(self, type_descriptor, module_name):
         type_name, module_name = self.lookup_object_class_type_name(
@@ -671,7 +899,19 @@ class Compiler(object):
 
     def copy(self, compiled_type):
         if not isinstance(compiled_type, Recursive):
-            compiled_type = copy(compiled_type)
+            compiled_type = shallow_copy(compiled_type)
+
+        return compiled_type
+
+    def rename(self, compiled_type, name):
+        """Returns a shallow copy of given compiled type with given
+        name. The copy shares everything but the name with the
+        original.
+
+        """
+
+        compiled_type = shallow_copy(compiled_type)
+        compiled_type.name = name
 
         return compiled_type
 
@@ -686,22 +926,324 @@ class Compiler(object):
     def create_open_types(self,
                           members,
                           module_name):
+        """Returns the open type members of given members constrained by an
+        information object set, as a list of tuples of the member
+        name, the name of the member it is constrained by, and a
+        dictionary of values of that member to compiled types.
+
+        Open types constrained by several members or by a member of an
+        outer type are not resolved, and neither are open types
+        constrained by a parameter unless compiled as an instance of
+        a parameterized type.
+
+        """
+
+        members = [
+            member
+            for member in flatten(members)
+            if member != EXTENSION_MARKER
+        ]
+        name_to_member = {member['name']: member for member in members}
         open_types = []
 
         for member in members:
-            if member == EXTENSION_MARKER:
+            table = member.get('table')
+
+            if not isinstance(table, list) or len(table[1]) != 1:
+                continue
+
+            object_set_name = table[0]
+            key_name = table[1][0].lstrip('.')
+
+            if key_name not in name_to_member:
+                continue
+
+            key_type_name = name_to_member[key_name]['type']
+
+            if not is_object_class_type_name(key_type_name):
+                continue
+
+            try:
+                if self.resolve_type_name(member['type'],
+                                          module_name) != 'OpenType':
+                    continue
+
+                objects = self.get_objects(object_set_name, module_name)
+            except CompileError:
+                # For example an object set given by a parameter.
                 continue
 
-            if not isinstance(member, list):
-                member = [member]
+            types = self.compile_open_type_table(member['name'],
+                                                 objects,
+                                                 key_type_name.split('.')[1],
+                                                 member['type'].split('.')[1])
 
-            for m in member:
-                if 'table' in m:
-                    if isinstance(m['table'], list):
-                        open_types.append(([m['name']], m['table'][1]))
+            if types:
+                open_types.append((member['name'], key_name, types))
 
         return open_types
 
+    def compile_open_type_table(self,
+                                name,
+                                objects,
+                                key_field_name,
+                                type_field_name):
+        """Returns a dictionary of the value of given key field to the
+        compiled type of given type field of given objects, as
+        returned by :meth:`get_objects()`.
+
+        """
+
+        types = {}
+
+        for object_, object_module_name in objects:
+            if key_field_name not in object_ or type_field_name not in object_:
+                continue
+
+            key = object_[key_field_name]
+
+            if isinstance(key, str):
+                try:
+                    key = self.resolve_value(key, object_module_name)
+                except CompileError:
+                    pass
+
+            # Keys that cannot be compared to decoded values are
+            # skipped.
+            if isinstance(key, (list, dict)):
+                continue
+
+            types[key] = self.compile_type(name,
+                                           object_[type_field_name],
+                                           object_module_name)
+
+        return types
+
+    def resolve_value(self, value_name, module_name):
+        """Returns the value of given value reference as it is decoded, that
+        is with OBJECT IDENTIFIER values as dotted strings.
+
+        """
+
+        value, module_name = self.lookup_value(value_name, module_name)
+
+        if value['type'] == 'OBJECT IDENTIFIER':
+            return '.'.join(
+                self.get_object_identifier_components(value['value'],
+                                                      module_name))
+
+        return value['value']
+
+    def get_object_identifier_components(self, value, module_name):
+        """Returns the components of given OBJECT IDENTIFIER value as a list
+        of strings, with references to other values expanded.
+
+        """
+
+        components = []
+
+        for component in value:
+            if isinstance(component, tuple):
+                components.append(str(component[1]))
+            elif isinstance(component, int):
+                components.append(str(component))
+            elif component in OBJECT_IDENTIFIER_ROOT_ARCS:
+                components.append(str(OBJECT_IDENTIFIER_ROOT_ARCS[component]))
+            else:
+                value, value_module_name = self.lookup_value(component,
+                                                             module_name)
+                components += self.get_object_identifier_components(
+                    value['value'],
+                    value_module_name)
+
+        return components
+
+    def get_objects(self, object_set_name, module_name):
+        """Returns all objects in given object set as a list of tuples of
+        the object fields and module name. Object sets and objects
+        referenced by name are expanded, except objects without
+        parsed fields. Object sets are given by name, or as a tuple of
+        name and module name, and are only expanded once.
+
+        """
+
+        if isinstance(object_set_name, tuple):
+            object_set_name, module_name = object_set_name
+
+        key = (module_name, object_set_name)
+
+        try:
+            return self.objects[key]
+        except KeyError:
+            pass
+
+        object_set, module_name = self.lookup_in_modules('object-sets',
+                                                         'object set',
+                                                         object_set_name,
+                                                         module_name)
+        objects = []
+
+        for member in object_set['members']:
+            if isinstance(member, (dict, list)):
+                object_ = self.convert_object(member,
+                                              object_set['class'],
+                                              module_name)
+
+                if object_ is not None:
+                    objects.append((object_, module_name))
+
+                continue
+
+            try:
+                objects += self.get_objects(member, module_name)
+            except CompileError:
+                try:
+                    value, value_module_name = self.lookup_value(member,
+                                                                 module_name)
+                except CompileError:
+                    continue
+
+                object_ = self.convert_object(value['value'],
+                                              value['type'],
+                                              value_module_name)
+
+                if object_ is not None:
+                    objects.append((object_, value_module_name))
+
+        self.objects[key] = objects
+
+        return objects
+
+    def convert_object(self, object_, object_class_name, module_name):
+        """Returns the fields of given object as a dictionary. Objects in a
+        defined syntax are given as a list of words, and are matched
+        against the syntax of given object class. Returns ``None`` if
+        the object has no parsed fields or does not match the syntax.
+
+        """
+
+        if isinstance(object_, dict):
+            return object_
+        elif not isinstance(object_, list):
+            return None
+
+        object_class_descriptor, _ = self.lookup_object_class_descriptor(
+            object_class_name,
+            module_name)
+
+        try:
+            syntax = object_class_descriptor['with-syntax']
+        except KeyError:
+            return None
+
+        fields = {}
+        length = match_syntax(object_,
+                              syntax,
+                              set(flatten_syntax_literals(syntax)),
+                              fields)
+
+        if length != len(object_):
+            return None
+
+        return fields
+
+
+def substitute_parameters(type_descriptor, parameters):
+    """Replace formal parameters in given type descriptor and its inner
+    type descriptors with given actual parameters, in place.
+
+    """
+
+    def substitute(value):
+        if isinstance(value, tuple):
+            return tuple([substitute(item) for item in value])
+        elif isinstance(value, str):
+            return parameters.get(value, value)
+        else:
+            return value
+
+    if isinstance(parameters.get(type_descriptor['type']), str):
+        type_descriptor['type'] = parameters[type_descriptor['type']]
+
+    table = type_descriptor.get('table')
+
+    if isinstance(table, list):
+        table[0] = substitute(table[0])
+    elif table is not None:
+        type_descriptor['table'] = substitute(table)
+
+    for key in ['size', 'restricted-to', 'actual-parameters']:
+        if key in type_descriptor:
+            type_descriptor[key] = [
+                substitute(item) for item in type_descriptor[key]
+            ]
+
+    for member in flatten(type_descriptor.get('members', [])):
+        if member != EXTENSION_MARKER:
+            substitute_parameters(member, parameters)
+
+    if 'element' in type_descriptor:
+        substitute_parameters(type_descriptor['element'], parameters)
+
+
+def flatten_syntax_literals(syntax):
+    for token in syntax:
+        if isinstance(token, list):
+            for literal in flatten_syntax_literals(token):
+                yield literal
+        elif not token.startswith('&'):
+            yield token
+
+
+def match_syntax(words, syntax, literals, fields):
+    """Match given words of an object against given defined syntax of
+    its object class, and add the field settings to given
+    dictionary. A setting is all words up to the next literal of the
+    syntax. Returns the number of matched words, or ``None`` if the
+    words do not match the syntax.
+
+    """
+
+    position = 0
+
+    for token in syntax:
+        if isinstance(token, list):
+            group_fields = {}
+            length = match_syntax(words[position:],
+                                  token,
+                                  literals,
+                                  group_fields)
+
+            if length is not None:
+                fields.update(group_fields)
+                position += length
+        elif token.startswith('&'):
+            end = position
+
+            while end < len(words) and words[end] not in literals:
+                end += 1
+
+            if end == position:
+                return None
+
+            setting = ' '.join(words[position:end])
+
+            if token[1].isupper():
+                fields[token] = {'type': setting}
+            else:
+                try:
+                    fields[token] = int(setting)
+                except ValueError:
+                    fields[token] = setting
+
+            position = end
+        elif position < len(words) and words[position] == token:
+            position += 1
+        else:
+            return None
+
+    return position
+
 
 def enum_values_as_dict(values):
     return {
@@ -711,6 +1253,19 @@ def enum_values_as_dict(values):
     }
 
 
+def shallow_copy(compiled_type):
+    """Returns a shallow copy of given compiled type. Compiled types are
+    plain objects, so copying the instance dictionary is enough, and
+    much faster than copy.copy().
+
+    """
+
+    copied = compiled_type.__class__.__new__(compiled_type.__class__)
+    copied.__dict__.update(compiled_type.__dict__)
+
+    return copied
+
+
 def enum_values_split(values):
     if EXTENSION_MARKER in values:
         index = values.index(EXTENSION_MARKER)
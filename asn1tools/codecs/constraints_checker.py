@@ -6,6 +6,7 @@ import string
 from copy import copy
 
 from . import ConstraintsError
+from . import Encoded
 from . import compiler
 from .permitted_alphabet import NUMERIC_STRING
 from .permitted_alphabet import PRINTABLE_STRING
@@ -179,7 +180,7 @@ class Dict(Type):
         for member in self.members:
             name = member.name
 
-            if name in data:
+            if name in data and not isinstance(data[name], Encoded):
                 try:
                     member.encode(data[name])
                 except ConstraintsError as e:
@@ -207,7 +208,8 @@ class List(Type):
                         length))
 
         for entry in data:
-            self.element_type.encode(entry)
+            if not isinstance(entry, Encoded):
+                self.element_type.encode(entry)
 
 
 class Choice(Type):
@@ -220,6 +222,10 @@ class Choice(Type):
     def encode(self, data):
         member = self.name_to_member[data[0]]
 
+        # None is also an alternative left out by selective decoding.
+        if data[1] is None or isinstance(data[1], Encoded):
+            return
+
         try:
             member.encode(data[1])
         except ConstraintsError as e:
@@ -291,9 +297,9 @@ class CompiledType(compiler.CompiledType):
 class Compiler(compiler.Compiler):
 
     def process_type(self, type_name, type_descriptor, module_name):
-        compiled_type = self.compile_type(type_name,
-                                          type_descriptor,
-                                          module_name)
+        compiled_type = self.compile_user_type(type_name,
+                                               type_name,
+                                               module_name)
 
         return CompiledType(compiled_type)
 
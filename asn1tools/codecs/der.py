@@ -3,6 +3,7 @@
 """
 
 from . import DecodeTagError
+from . import Encoded
 from . import ber
 from . import restricted_utc_time_to_datetime
 from . import restricted_utc_time_from_datetime
@@ -12,8 +13,11 @@ from .compiler import clean_bit_string_value
 from .ber import Class
 from .ber import Encoding
 from .ber import Tag
+from .ber import tag_as_integer
 from .ber import encode_length_definite
 from .ber import decode_length_definite
+from .ber import decode_bytes
+from .ber import decode_text
 from .ber import encode_signed_integer
 from .ber import decode_signed_integer
 from .ber import encode_tag
@@ -28,6 +32,8 @@ from .ber import Choice
 from .ber import Any
 from .ber import AnyDefinedBy
 from .ber import Recursive
+from .ber import LazyArray
+from .ber import skip_value
 from .ber import decode_length
 from .ber import encode_real
 from .ber import decode_real
@@ -41,8 +47,10 @@ class Type(object):
 
         if number is None:
             self.tag = None
+            self.tag_integer = None
         else:
             self.tag = encode_tag(number, flags)
+            self.tag_integer = tag_as_integer(self.tag)
 
         self.optional = False
         self.default = None
@@ -52,11 +60,20 @@ class Type(object):
             flags |= Class.CONTEXT_SPECIFIC
 
         self.tag = encode_tag(number, flags)
+        self.tag_integer = tag_as_integer(self.tag)
 
     def set_size_range(self, minimum, maximum, has_extension_marker):
         pass
 
     def decode_tag(self, data, offset):
+        # Single byte tags are compared as integers, without slicing
+        # the data.
+        try:
+            if data[offset] == self.tag_integer:
+                return offset + 1
+        except IndexError:
+            pass
+
         end_offset = offset + len(self.tag)
 
         if data[offset:end_offset] != self.tag:
@@ -67,6 +84,12 @@ class Type(object):
 
         return end_offset
 
+    def decode_lazy(self, data, offset):
+        return self.decode(data, offset)[0]
+
+    def decode_selected(self, data, offset, _selection):
+        return self.decode(data, offset)
+
     def is_default(self, value):
         return value == self.default
 
@@ -92,7 +115,7 @@ class StringType(Type):
         length, offset = decode_length_definite(data, offset)
         end_offset = offset + length
 
-        return data[offset:end_offset].decode(self.ENCODING), end_offset
+        return decode_text(data[offset:end_offset], self.ENCODING), end_offset
 
     def __repr__(self):
         return '{}({})'.format(self.__class__.__name__,
@@ -113,14 +136,17 @@ class ArrayType(Type):
                                        flags | Encoding.CONSTRUCTED)
 
     def encode(self, data, encoded):
-        encoded_elements = bytearray()
+        encoded.extend(self.tag)
+        encoded.append(0)
+        offset = len(encoded)
 
         for entry in data:
-            self.element_type.encode(entry, encoded_elements)
+            if isinstance(entry, Encoded):
+                encoded.extend(entry.data)
+            else:
+                self.element_type.encode(entry, encoded)
 
-        encoded.extend(self.tag)
-        encoded.extend(encode_length_definite(len(encoded_elements)))
-        encoded.extend(encoded_elements)
+        encoded.append_length(offset)
 
     def decode(self, data, offset):
         offset = self.decode_tag(data, offset)
@@ -134,6 +160,17 @@ class ArrayType(Type):
 
         return decoded, offset
 
+    def decode_lazy(self, data, offset):
+        return LazyArray(self, data, offset)
+
+    def decode_selected(self, data, offset, selection):
+        decoded = [
+            self.element_type.decode_selected(data, element_offset, selection)[0]
+            for element_offset in LazyArray(self, data, offset).get_offsets()
+        ]
+
+        return decoded, skip_value(data, offset)
+
     def __repr__(self):
         return '{}({}, {})'.format(self.__class__.__name__,
                                    self.name,
@@ -207,7 +244,7 @@ class BitString(Type):
         number_of_bits = 8 * (length - 1) - data[offset]
         offset += 1
 
-        return (bytes(data[offset:end_offset]), number_of_bits), end_offset
+        return (decode_bytes(data[offset:end_offset]), number_of_bits), end_offset
 
     def __repr__(self):
         return 'BitString({})'.format(self.name)
@@ -230,7 +267,7 @@ class OctetString(Type):
         length, offset = decode_length_definite(data, offset)
         end_offset = offset + length
 
-        return bytes(data[offset:end_offset]), end_offset
+        return decode_bytes(data[offset:end_offset]), end_offset
 
     def __repr__(self):
         return 'OctetString({})'.format(self.name)
@@ -331,7 +368,7 @@ class UTCTime(Type):
         offset = self.decode_tag(data, offset)
         length, offset = decode_length_definite(data, offset)
         end_offset = offset + length
-        decoded = data[offset:end_offset].decode('ascii')
+        decoded = decode_text(data[offset:end_offset], 'ascii')
 
         return restricted_utc_time_to_datetime(decoded), end_offset
 
@@ -356,7 +393,7 @@ class GeneralizedTime(Type):
         offset = self.decode_tag(data, offset)
         length, offset = decode_length_definite(data, offset)
         end_offset = offset + length
-        decoded = data[offset:end_offset].decode('ascii')
+        decoded = decode_text(data[offset:end_offset], 'ascii')
 
         return restricted_generalized_time_to_datetime(decoded), end_offset
 
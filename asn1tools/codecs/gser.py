@@ -7,6 +7,7 @@ import math
 from copy import copy
 
 from . import EncodeError
+from . import check_not_encoded
 from . import DecodeError
 from . import compiler
 from . import format_or
@@ -42,6 +43,7 @@ class MembersType(Type):
 
             if name in data:
                 try:
+                    check_not_encoded(data[name], 'GSER')
                     encoded_member = member.encode(data[name],
                                                    member_separator,
                                                    indent)
@@ -84,6 +86,7 @@ class ArrayType(Type):
         element_separator = separator + ' ' * indent
 
         for entry in data:
+            check_not_encoded(entry, 'GSER')
             encoded_element = self.element_type.encode(entry,
                                                        element_separator,
                                                        indent)
@@ -260,6 +263,7 @@ class Choice(Type):
                     data[0]))
 
         try:
+            check_not_encoded(data[1], 'GSER')
             encoded = member.encode(data[1], separator, indent)
         except EncodeError as e:
             e.location.append(member.name)
@@ -483,9 +487,9 @@ class CompiledType(compiler.CompiledType):
 class Compiler(compiler.Compiler):
 
     def process_type(self, type_name, type_descriptor, module_name):
-        compiled_type = self.compile_type(type_name,
-                                          type_descriptor,
-                                          module_name)
+        compiled_type = self.compile_user_type(type_name,
+                                               type_name,
+                                               module_name)
 
         return CompiledType(type_name, compiled_type)
 
@@ -2,11 +2,13 @@
 
 """
 
+import re
 import json
 import binascii
 import math
 
 from . import EncodeError
+from . import check_not_encoded
 from . import DecodeError
 from . import compiler
 from . import format_or
@@ -17,6 +19,18 @@ from . import generalized_time_from_datetime
 from .compiler import enum_values_as_dict
 
 
+# Whitespace before the first value.
+JSON_VALUE_START_RE = re.compile(br'\s*(?=\S)')
+
+# A complete string, a lone double quote starting an unterminated
+# string, or a bracket.
+JSON_STRING_OR_BRACKET_RE = re.compile(br'"(?:[^"\\]|\\.)*"|"|[\[\]{}]')
+JSON_STRING_RE = re.compile(br'"(?:[^"\\]|\\.)*"')
+
+# A number, true, false or null.
+JSON_LITERAL_RE = re.compile(br'[^\s,"\[\]{}]*')
+
+
 class Type(object):
 
     def __init__(self, name, type_name):
@@ -63,6 +77,7 @@ class MembersType(Type):
 
             if name in data:
                 try:
+                    check_not_encoded(data[name], 'JER')
                     value = member.encode(data[name])
                 except EncodeError as e:
                     e.location.append(member.name)
@@ -286,6 +301,7 @@ class SequenceOf(Type):
         values = []
 
         for entry in data:
+            check_not_encoded(entry, 'JER')
             value = self.element_type.encode(entry)
             values.append(value)
 
@@ -321,6 +337,7 @@ class SetOf(Type):
         values = []
 
         for entry in data:
+            check_not_encoded(entry, 'JER')
             value = self.element_type.encode(entry)
             values.append(value)
 
@@ -360,6 +377,7 @@ class Choice(Type):
                     data[0]))
 
         try:
+            check_not_encoded(data[1], 'JER')
             return {member.name: member.encode(data[1])}
         except EncodeError as e:
             e.location.append(member.name)
@@ -498,8 +516,17 @@ class CompiledType(compiler.CompiledType):
 
         return string.encode('utf-8')
 
-    def decode(self, data):
-        return self._type.decode(json.loads(data.decode('utf-8')))
+    def decode(self, data, select=None):
+        decoded = self._type.decode(json.loads(data.decode('utf-8')))
+
+        if select is not None:
+            decoded = compiler.select_decoded(decoded,
+                                              self.selection_tree(select))
+
+        return decoded
+
+    def decode_length(self, data):
+        return decode_length(data)
 
     def __repr__(self):
         return repr(self._type)
@@ -508,9 +535,9 @@ class CompiledType(compiler.CompiledType):
 class Compiler(compiler.Compiler):
 
     def process_type(self, type_name, type_descriptor, module_name):
-        compiled_type = self.compile_type(type_name,
-                                          type_descriptor,
-                                          module_name)
+        compiled_type = self.compile_user_type(type_name,
+                                               type_name,
+                                               module_name)
 
         return CompiledType(compiled_type)
 
@@ -606,5 +633,54 @@ def compile_dict(specification):
     return Compiler(specification).process()
 
 
-def decode_length(_data):
-    raise DecodeError('Decode length is not supported for this codec.')
+def decode_length(data):
+    """Returns the length of the first complete JSON value in given data,
+    including any preceding whitespace, or None if the value is not
+    complete.
+
+    Numbers, true, false and null are not delimited, and their length
+    is only known when followed by another character.
+
+    """
+
+    data = bytes(data)
+    match = JSON_VALUE_START_RE.match(data)
+
+    if match is None:
+        return None
+
+    offset = match.end()
+    first = data[offset:offset + 1]
+
+    if first in b'{[':
+        depth = 0
+
+        for match in JSON_STRING_OR_BRACKET_RE.finditer(data, offset):
+            token = match.group()
+
+            if token in (b'{', b'['):
+                depth += 1
+            elif token in (b'}', b']'):
+                depth -= 1
+
+                if depth == 0:
+                    return match.end()
+            elif token == b'"':
+                # Unterminated string.
+                return None
+
+        return None
+    elif first == b'"':
+        match = JSON_STRING_RE.match(data, offset)
+
+        if match is None:
+            return None
+
+        return match.end()
+    else:
+        match = JSON_LITERAL_RE.match(data, offset)
+
+        if match.end() == len(data):
+            return None
+
+        return match.end()
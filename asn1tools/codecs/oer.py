@@ -2,6 +2,7 @@
 
 """
 
+import sys
 import binascii
 from copy import copy
 import struct
@@ -11,6 +12,7 @@ from ..parser import EXTENSION_MARKER
 from . import EncodeError
 from . import DecodeError
 from . import OutOfDataError
+from . import Encoded
 from . import format_or
 from . import compiler
 from . import utc_time_to_datetime
@@ -20,6 +22,7 @@ from . import generalized_time_from_datetime
 from .compiler import enum_values_as_dict
 from .ber import Class
 from .ber import Tag
+from .ber import tag_as_integer
 from .ber import encode_object_identifier
 from .ber import decode_object_identifier
 from . import der
@@ -43,239 +46,262 @@ def encode_tag(number, flags):
     return bytes(tag)
 
 
+if sys.version_info[0] > 2:
+    def encode_unsigned_integer(value, number_of_bytes):
+        """Returns given non-negative integer as given number of bytes in
+        big endian byte order.
+
+        """
+
+        return value.to_bytes(number_of_bytes, 'big')
+
+    def decode_unsigned_integer(data):
+        """Returns given bytes in big endian byte order as a non-negative
+        integer.
+
+        """
+
+        return int.from_bytes(data, 'big')
+else:
+    def encode_unsigned_integer(value, number_of_bytes):
+        if number_of_bytes == 1:
+            return bytearray([value])
+        else:
+            return binascii.unhexlify('{:0{}x}'.format(value,
+                                                       2 * number_of_bytes))
+
+    def decode_unsigned_integer(data):
+        if len(data) == 0:
+            return 0
+        else:
+            return int(binascii.hexlify(data), 16)
+
+
+def decode_selected(type_, decoder, selection):
+    """Decode given selection of given type, or all of it if the selection
+    is None.
+
+    """
+
+    if selection is None:
+        return type_.decode(decoder)
+    else:
+        return type_.decode_selected(decoder, selection)
+
+
+def read_extension_presence_bits(decoder):
+    """Read the extension presence bit field of a SEQUENCE or SET. Returns
+    its number of bits and the bits.
+
+    """
+
+    number_of_bytes = decoder.read_length_determinant() - 1
+    number_of_unused_bits = decoder.read_byte()
+    presence_bits = decoder.read_unsigned_integer(number_of_bytes)
+    presence_bits >>= number_of_unused_bits
+
+    return 8 * number_of_bytes - number_of_unused_bits, presence_bits
+
+
+def format_tag(tag):
+    """Returns given tag, read as an integer by the decoder, as a
+    hexadecimal string.
+
+    """
+
+    tag = '{:x}'.format(tag)
+
+    if len(tag) % 2 == 1:
+        tag = '0' + tag
+
+    return tag
+
+
 class Encoder(object):
+    """OER is octet aligned, so all values are appended to a byte buffer
+    as whole bytes.
+
+    """
 
     def __init__(self):
-        self.number_of_bits = 0
-        self.value = 0
+        self.buf = bytearray()
 
     def __iadd__(self, other):
-        self.append_non_negative_binary_integer(other.value,
-                                                other.number_of_bits)
+        self.buf.extend(other.buf)
 
         return self
 
     def number_of_bytes(self):
-        return (self.number_of_bits + 7) // 8
+        return len(self.buf)
 
     def set_bit(self, offset):
-        self.value |= (1 << (self.number_of_bits - offset - 1))
-
-    def align(self):
-        width = (8 * self.number_of_bytes() - self.number_of_bits)
-        self.number_of_bits += width
-        self.value <<= width
-
-    def append_bit(self, bit):
-        """Append given bit.
+        """Set the bit at given bit offset, which must have been appended
+        earlier.
 
         """
 
-        self.number_of_bits += 1
-        self.value <<= 1
-        self.value |= bit
+        self.buf[offset >> 3] |= (0x80 >> (offset & 0x7))
 
     def append_bits(self, data, number_of_bits):
-        """Append given bits.
+        """Append given bits, padded to whole bytes.
 
         """
 
-        if number_of_bits == 0:
-            return
-
-        value = int(binascii.hexlify(data), 16)
-        value >>= (8 * len(data) - number_of_bits)
-
-        self.append_non_negative_binary_integer(value, number_of_bits)
+        self.buf.extend(data[:(number_of_bits + 7) // 8])
 
     def append_u8(self, value):
-        return self.append_non_negative_binary_integer(value, 8)
+        self.buf.append(value)
+
+    def append_unsigned_integer(self, value, number_of_bytes):
+        self.buf.extend(encode_unsigned_integer(value, number_of_bytes))
 
     def append_bytes(self, data):
         """Append given data.
 
         """
 
-        self.append_bits(data, 8 * len(data))
+        self.buf.extend(data)
 
     def as_bytearray(self):
-        """Return the bits as a bytearray.
+        """Return the encoded data as a bytearray.
 
         """
 
-        if self.number_of_bits == 0:
-            return bytearray()
-
-        data = self.value
-        data |= (0x80 << self.number_of_bits)
-        data = hex(data)[4:].rstrip('L')
-
-        return bytearray(binascii.unhexlify(data))
+        return self.buf
 
     def append_length_determinant(self, value):
         if value < 128:
-            self.append_non_negative_binary_integer(value, 8)
+            self.buf.append(value)
         else:
-            encoded = bytearray()
-
-            while value > 0:
-                encoded.append(value & 0xff)
-                value >>= 8
-
-            length = len(encoded)
+            number_of_bytes = (value.bit_length() + 7) // 8
 
-            if length > 127:
+            if number_of_bytes > 127:
                 raise EncodeError('Length determinant {} is too big.'.format(value))
 
-            self.append_u8(0x80 | length)
-            self.append_bytes(encoded[::-1])
-
-    def append_non_negative_binary_integer(self, value, number_of_bits):
-        """Append given integer value.
-
-        """
-
-        self.number_of_bits += number_of_bits
-        self.value <<= number_of_bits
-        self.value |= value
+            self.buf.append(0x80 | number_of_bytes)
+            self.append_unsigned_integer(value, number_of_bytes)
 
     def append_integer(self, value):
-        number_of_bits = value.bit_length()
-
         if value < 0:
-            number_of_bytes = ((number_of_bits + 7) // 8)
-            value = ((1 << (8 * number_of_bytes)) + value)
-
-            if (value & (1 << (8 * number_of_bytes - 1))) == 0:
-                value |= (0xff << (8 * number_of_bytes))
-                number_of_bytes += 1
-        elif value > 0:
-            number_of_bytes = ((number_of_bits + 7) // 8)
-
-            if number_of_bits == (8 * number_of_bytes):
-                number_of_bytes += 1
+            number_of_bytes = ((~value).bit_length() + 8) // 8
+            value += (1 << (8 * number_of_bytes))
         else:
-            number_of_bytes = 1
+            number_of_bytes = (value.bit_length() + 8) // 8
 
         self.append_length_determinant(number_of_bytes)
-        self.append_non_negative_binary_integer(value, 8 * number_of_bytes)
+        self.append_unsigned_integer(value, number_of_bytes)
 
     def __repr__(self):
         return binascii.hexlify(self.as_bytearray()).decode('ascii')
 
 
 class Decoder(object):
+    """Reads whole bytes at an offset in the encoded data, which is never
+    copied.
 
-    def __init__(self, encoded):
-        self.number_of_bits = (8 * len(encoded))
-        self.total_number_of_bits = self.number_of_bits
-
-        if len(encoded) > 0:
-            self.value = int(binascii.hexlify(encoded), 16)
-        else:
-            self.value = 0
+    """
 
-    def align(self):
-        width = (self.number_of_bits & 0x7)
-        self.number_of_bits -= width
+    def __init__(self, encoded):
+        self.encoded = encoded
+        self.offset = 0
 
     def number_of_read_bits(self):
-        return self.total_number_of_bits - self.number_of_bits
+        return 8 * self.offset
+
+    def skip_bytes(self, number_of_bytes):
+        offset = self.offset + number_of_bytes
 
-    def skip_bits(self, number_of_bits):
-        if number_of_bits > self.number_of_bits:
+        if offset > len(self.encoded):
             raise OutOfDataError(self.number_of_read_bits())
 
-        self.number_of_bits -= number_of_bits
+        self.offset = offset
 
-    def peek_bit(self):
-        return ((self.value >> (self.number_of_bits - 1)) & 1)
+    def read_byte(self):
+        try:
+            value = self.encoded[self.offset]
+        except IndexError:
+            raise OutOfDataError(self.number_of_read_bits())
 
-    def clear_bit(self):
-        self.value &= (1 << (self.number_of_bits - 1)) - 1
+        self.offset += 1
 
-    def read_bit(self):
-        """Read a bit.
+        return value
 
-        """
+    def read_bytes(self, number_of_bytes):
+        offset = self.offset
+        end_offset = offset + number_of_bytes
 
-        if self.number_of_bits == 0:
+        if end_offset > len(self.encoded):
             raise OutOfDataError(self.number_of_read_bits())
 
-        self.number_of_bits -= 1
+        self.offset = end_offset
 
-        return ((self.value >> self.number_of_bits) & 1)
+        return bytes(self.encoded[offset:end_offset])
 
-    def read_bits(self, number_of_bits):
-        """Read given number of bits.
+    def read_struct(self, fmt, number_of_bytes):
+        """Read a value of given struct format of given size, without
+        slicing the encoded data.
 
         """
 
-        if number_of_bits > self.number_of_bits:
+        offset = self.offset
+
+        if offset + number_of_bytes > len(self.encoded):
             raise OutOfDataError(self.number_of_read_bits())
 
-        self.number_of_bits -= number_of_bits
-        mask = ((1 << number_of_bits) - 1)
-        value = ((self.value >> self.number_of_bits) & mask)
-        value &= mask
-        value |= (0x80 << number_of_bits)
+        self.offset = offset + number_of_bytes
 
-        return binascii.unhexlify(hex(value)[4:].rstrip('L'))
+        return struct.unpack_from(fmt, self.encoded, offset)[0]
 
-    def read_byte(self):
-        return self.read_non_negative_binary_integer(8)
+    def read_unsigned_integer(self, number_of_bytes):
+        if number_of_bytes == 1:
+            return self.read_byte()
+        else:
+            return decode_unsigned_integer(self.read_bytes(number_of_bytes))
 
-    def read_bytes(self, number_of_bytes):
-        return self.read_bits(8 * number_of_bytes)
+    def read_length_determinant(self):
+        value = self.read_byte()
 
-    def read_non_negative_binary_integer(self, number_of_bits):
-        """Read an integer value of given number of bits.
+        if value & 0x80:
+            value = self.read_unsigned_integer(value & 0x7f)
 
-        """
+        return value
 
-        if number_of_bits > self.number_of_bits:
-            raise OutOfDataError(self.number_of_read_bits())
+    def skip_length_prefixed(self):
+        """Skip a length determinant and the bytes it counts.
 
-        self.number_of_bits -= number_of_bits
-        mask = ((1 << number_of_bits) - 1)
+        """
 
-        return ((self.value >> self.number_of_bits) & mask)
+        self.skip_bytes(self.read_length_determinant())
 
-    def read_length_determinant(self):
-        value = self.read_byte()
+    def read_signed_integer(self, number_of_bytes):
+        value = self.read_unsigned_integer(number_of_bytes)
 
-        if value & 0x80:
-            length = (value & 0x7f)
-            value = self.read_non_negative_binary_integer(8 * length)
-        else:
-            value &= 0x7f
+        if number_of_bytes > 0 and value & (1 << (8 * number_of_bytes - 1)):
+            value -= (1 << (8 * number_of_bytes))
 
         return value
 
     def read_integer(self):
-        number_of_bytes = self.read_length_determinant()
-        number_of_bits = 8 * number_of_bytes
-        value = self.read_non_negative_binary_integer(number_of_bits)
+        return self.read_signed_integer(self.read_length_determinant())
 
-        if value & (1 << (number_of_bits - 1)):
-            value -= (1 << number_of_bits) - 1
-            value -= 1
+    def read_tag(self):
+        """Read a tag as an integer.
 
-        return value
+        """
 
-    def read_tag(self):
         byte = self.read_byte()
-        tag = bytearray([byte])
+        tag = byte
 
         if byte & 0x3f == 0x3f:
             while True:
                 byte = self.read_byte()
-                tag.append(byte)
+                tag <<= 8
+                tag |= byte
 
                 if byte & 0x80 == 0:
                     break
 
-        return bytes(tag)
+        return tag
 
 
 class Type(object):
@@ -307,6 +333,17 @@ class Type(object):
     def is_default(self, value):
         return value == self.default
 
+    def skip(self, decoder):
+        """Advance given decoder past an encoding of this type, without
+        building its value if possible.
+
+        """
+
+        self.decode(decoder)
+
+    def decode_selected(self, decoder, _selection):
+        return self.decode(decoder)
+
 
 class KnownMultiplierStringType(Type):
 
@@ -345,6 +382,12 @@ class KnownMultiplierStringType(Type):
 
         return decoder.read_bytes(number_of_bytes).decode(self.ENCODING)
 
+    def skip(self, decoder):
+        if self.number_of_bytes is None:
+            decoder.skip_length_prefixed()
+        else:
+            decoder.skip_bytes(self.number_of_bytes)
+
     def __repr__(self):
         return '{}({})'.format(self.__class__.__name__,
                                self.name)
@@ -364,49 +407,79 @@ class MembersType(Type):
             if member.optional or member.default is not None
         ]
 
+        # The preamble with the extension bit, if any, followed by the
+        # presence bits of optional members, padded to whole bytes.
+        number_of_bits = len(self.optionals)
+
+        if additions is not None:
+            number_of_bits += 1
+
+        self.preamble_number_of_bytes = (number_of_bits + 7) // 8
+        self.preamble_number_of_unused_bits = (-number_of_bits & 0x7)
+
+        # Mask of the presence bit of each root member in the preamble,
+        # or zero if always present.
+        bit = (1 << (8 * self.preamble_number_of_bytes)) >> 1
+        self.extension_bit_mask = 0
+
+        if additions is not None:
+            self.extension_bit_mask = bit
+            bit >>= 1
+
+        self.root_members_with_masks = []
+
+        for member in root_members:
+            if member.optional or member.default is not None:
+                self.root_members_with_masks.append((member, bit))
+                bit >>= 1
+            else:
+                self.root_members_with_masks.append((member, 0))
+
     def encode(self, data, encoder):
-        if self.additions is not None:
-            offset = encoder.number_of_bits
-            encoder.append_bit(0)
-            self.encode_root(data, encoder)
-
-            if len(self.additions) > 0:
-                if self.encode_additions(data, encoder):
-                    encoder.set_bit(offset)
-        else:
-            self.encode_root(data, encoder)
+        offset = encoder.number_of_bytes()
+        self.encode_root(data, encoder)
+
+        if self.additions:
+            if self.encode_additions(data, encoder):
+                encoder.set_bit(8 * offset)
 
     def encode_root(self, data, encoder):
-        for optional in self.optionals:
-            if optional.optional:
-                encoder.append_bit(optional.name in data)
-            elif optional.name in data:
-                encoder.append_bit(not optional.is_default(data[optional.name]))
-            else:
-                encoder.append_bit(0)
+        if self.preamble_number_of_bytes > 0:
+            presence_bits = 0
+
+            for optional in self.optionals:
+                presence_bits <<= 1
+
+                if optional.optional:
+                    presence_bits |= (optional.name in data)
+                elif optional.name in data:
+                    presence_bits |= (
+                        not optional.is_default(data[optional.name]))
 
-        encoder.align()
+            presence_bits <<= self.preamble_number_of_unused_bits
+            encoder.append_unsigned_integer(presence_bits,
+                                            self.preamble_number_of_bytes)
 
         for member in self.root_members:
             self.encode_member(member, data, encoder)
 
     def encode_additions(self, data, encoder):
         # Encode extension additions.
+        number_of_additions = len(self.additions)
         presence_bits = 0
         addition_encoders = []
 
         try:
-            for addition in self.additions:
-                presence_bits <<= 1
+            for i, addition in enumerate(self.additions):
                 addition_encoder = Encoder()
                 self.encode_member(addition,
                                    data,
                                    addition_encoder,
                                    encode_default=True)
 
-                if addition_encoder.number_of_bits > 0:
+                if addition_encoder.number_of_bytes() > 0:
                     addition_encoders.append(addition_encoder)
-                    presence_bits |= 1
+                    presence_bits |= (1 << (number_of_additions - i - 1))
         except EncodeError:
             pass
 
@@ -414,14 +487,14 @@ class MembersType(Type):
         if not addition_encoders:
             return False
 
-        # Presence bit field.
-        number_of_additions = len(self.additions)
-        number_of_unused_bits = (8 - (number_of_additions % 8))
-        encoder.append_length_determinant(number_of_additions + 1)
-        encoder.append_non_negative_binary_integer(number_of_unused_bits, 8)
-        encoder.append_non_negative_binary_integer(presence_bits,
-                                                   number_of_additions)
-        encoder.align()
+        # Presence bit field, as a bit string with the number of unused
+        # bits followed by the bits.
+        number_of_bytes = (number_of_additions + 7) // 8
+        number_of_unused_bits = (8 * number_of_bytes - number_of_additions)
+        encoder.append_length_determinant(number_of_bytes + 1)
+        encoder.append_u8(number_of_unused_bits)
+        encoder.append_unsigned_integer(presence_bits << number_of_unused_bits,
+                                        number_of_bytes)
 
         for addition_encoder in addition_encoders:
             encoder.append_length_determinant(addition_encoder.number_of_bytes())
@@ -433,11 +506,15 @@ class MembersType(Type):
         name = member.name
 
         if name in data:
+            value = data[name]
+
             try:
-                if member.default is None:
-                    member.encode(data[name], encoder)
-                elif not member.is_default(data[name]) or encode_default:
-                    member.encode(data[name], encoder)
+                if isinstance(value, Encoded):
+                    encoder.append_bits(value.data, value.number_of_bits)
+                elif member.default is None:
+                    member.encode(value, encoder)
+                elif not member.is_default(value) or encode_default:
+                    member.encode(value, encoder)
             except EncodeError as e:
                 e.location.append(member.name)
                 raise
@@ -451,31 +528,25 @@ class MembersType(Type):
                     data))
 
     def decode(self, decoder):
-        if self.additions is not None:
-            if decoder.read_bit():
-                decoded = self.decode_root(decoder)
-                decoded.update(self.decode_additions(decoder))
-
-                return decoded
-            else:
-                return self.decode_root(decoder)
+        if self.preamble_number_of_bytes > 0:
+            preamble = decoder.read_unsigned_integer(self.preamble_number_of_bytes)
         else:
-            return self.decode_root(decoder)
+            preamble = 0
 
-    def decode_root(self, decoder):
-        values = {}
-        optionals = {
-            optional: decoder.read_bit()
-            for optional in self.optionals
-        }
+        decoded = self.decode_root(decoder, preamble)
 
-        decoder.align()
+        if preamble & self.extension_bit_mask:
+            decoded.update(self.decode_additions(decoder))
 
-        for member in self.root_members:
+        return decoded
+
+    def decode_root(self, decoder, preamble):
+        values = {}
+
+        for member, mask in self.root_members_with_masks:
             try:
-                if optionals.get(member, True):
-                    value = member.decode(decoder)
-                    values[member.name] = value
+                if not mask or preamble & mask:
+                    values[member.name] = member.decode(decoder)
                 elif member.default is not None:
                     values[member.name] = member.default
             except DecodeError as e:
@@ -485,15 +556,11 @@ class MembersType(Type):
         return values
 
     def decode_additions(self, decoder):
-        # Presence bit field.
-        length = decoder.read_length_determinant()
-        decoder.read_byte()
-        presence_bits = decoder.read_non_negative_binary_integer(length)
-        decoder.align()
+        number_of_bits, presence_bits = read_extension_presence_bits(decoder)
         decoded = {}
 
-        for i in range(length):
-            if presence_bits & (1 << (length - i - 1)):
+        for i in range(number_of_bits):
+            if presence_bits & (1 << (number_of_bits - i - 1)):
                 member_length = decoder.read_length_determinant()
 
                 if i < len(self.additions):
@@ -505,10 +572,84 @@ class MembersType(Type):
                         e.location.append(addition.name)
                         raise
                 else:
-                    decoder.skip_bits(8 * member_length)
+                    decoder.skip_bytes(member_length)
 
         return decoded
 
+    def decode_selected(self, decoder, selection):
+        if self.preamble_number_of_bytes > 0:
+            preamble = decoder.read_unsigned_integer(self.preamble_number_of_bytes)
+        else:
+            preamble = 0
+
+        values = {}
+
+        for member, mask in self.root_members_with_masks:
+            name = member.name
+
+            try:
+                if not mask or preamble & mask:
+                    if name in selection:
+                        values[name] = decode_selected(member,
+                                                       decoder,
+                                                       selection[name])
+                    else:
+                        member.skip(decoder)
+                elif member.default is not None and name in selection:
+                    values[name] = member.default
+            except DecodeError as e:
+                e.location.append(name)
+                raise
+
+        if preamble & self.extension_bit_mask:
+            values.update(self.decode_additions_selected(decoder, selection))
+
+        return values
+
+    def decode_additions_selected(self, decoder, selection):
+        number_of_bits, presence_bits = read_extension_presence_bits(decoder)
+        decoded = {}
+
+        for i in range(number_of_bits):
+            if presence_bits & (1 << (number_of_bits - i - 1)):
+                member_length = decoder.read_length_determinant()
+
+                if i < len(self.additions) and self.additions[i].name in selection:
+                    addition = self.additions[i]
+
+                    try:
+                        decoded[addition.name] = decode_selected(
+                            addition,
+                            decoder,
+                            selection[addition.name])
+                    except DecodeError as e:
+                        e.location.append(addition.name)
+                        raise
+                else:
+                    decoder.skip_bytes(member_length)
+
+        return decoded
+
+    def skip(self, decoder):
+        if self.preamble_number_of_bytes > 0:
+            preamble = decoder.read_unsigned_integer(self.preamble_number_of_bytes)
+        else:
+            preamble = 0
+
+        for member, mask in self.root_members_with_masks:
+            if not mask or preamble & mask:
+                member.skip(decoder)
+
+        if preamble & self.extension_bit_mask:
+            # Every present addition is prefixed by its length.
+            _, presence_bits = read_extension_presence_bits(decoder)
+
+            while presence_bits:
+                if presence_bits & 1:
+                    decoder.skip_length_prefixed()
+
+                presence_bits >>= 1
+
     def __repr__(self):
         return '{}({}, [{}])'.format(
             self.__class__.__name__,
@@ -528,7 +669,10 @@ class ArrayType(Type):
         encoder.append_integer(len(data))
 
         for entry in data:
-            self.element_type.encode(entry, encoder)
+            if isinstance(entry, Encoded):
+                encoder.append_bits(entry.data, entry.number_of_bits)
+            else:
+                self.element_type.encode(entry, encoder)
 
     def decode(self, decoder):
         length = decoder.read_integer()
@@ -540,6 +684,16 @@ class ArrayType(Type):
 
         return decoded
 
+    def decode_selected(self, decoder, selection):
+        return [
+            self.element_type.decode_selected(decoder, selection)
+            for _ in range(decoder.read_integer())
+        ]
+
+    def skip(self, decoder):
+        for _ in range(decoder.read_integer()):
+            self.element_type.skip(decoder)
+
     def __repr__(self):
         return '{}({}, {})'.format(self.__class__.__name__,
                                    self.name,
@@ -554,11 +708,14 @@ class Boolean(Type):
                                       Tag.BOOLEAN)
 
     def encode(self, data, encoder):
-        encoder.append_non_negative_binary_integer(0xff * data, 8)
+        encoder.append_u8(0xff * data)
 
     def decode(self, decoder):
         return bool(decoder.read_byte())
 
+    def skip(self, decoder):
+        decoder.skip_bytes(1)
+
     def __repr__(self):
         return 'Boolean({})'.format(self.name)
 
@@ -613,10 +770,16 @@ class Integer(Type):
 
     def decode(self, decoder):
         if self.fmt:
-            return struct.unpack(self.fmt, decoder.read_bytes(self.length))[0]
+            return decoder.read_struct(self.fmt, self.length)
         else:
             return decoder.read_integer()
 
+    def skip(self, decoder):
+        if self.fmt:
+            decoder.skip_bytes(self.length)
+        else:
+            decoder.skip_length_prefixed()
+
     def __repr__(self):
         return 'Integer({})'.format(self.name)
 
@@ -690,7 +853,13 @@ class Real(Type):
 
             return der.decode_real(bytearray(decoder.read_bytes(length)))
         else:
-            return struct.unpack(self.fmt, decoder.read_bytes(self.length))[0]
+            return decoder.read_struct(self.fmt, self.length)
+
+    def skip(self, decoder):
+        if self.fmt is None:
+            decoder.skip_length_prefixed()
+        else:
+            decoder.skip_bytes(self.length)
 
     def __repr__(self):
         return 'Real({})'.format(self.name)
@@ -741,8 +910,7 @@ class BitString(Type):
 
         if self.number_of_bits is None:
             encoder.append_length_determinant(number_of_bytes + 1)
-            encoder.append_non_negative_binary_integer(number_of_unused_bits,
-                                                       8)
+            encoder.append_u8(number_of_unused_bits)
             encoder.append_bytes(data)
         else:
             encoder.append_bytes(data)
@@ -759,6 +927,12 @@ class BitString(Type):
 
         return (decoder.read_bytes(number_of_bytes), number_of_bits)
 
+    def skip(self, decoder):
+        if self.number_of_bits is None:
+            decoder.skip_length_prefixed()
+        else:
+            decoder.skip_bytes((self.number_of_bits + 7) // 8)
+
     def __repr__(self):
         return 'BitString({})'.format(self.name)
 
@@ -791,6 +965,12 @@ class OctetString(Type):
 
         return decoder.read_bytes(number_of_bytes)
 
+    def skip(self, decoder):
+        if self.number_of_bytes is None:
+            decoder.skip_length_prefixed()
+        else:
+            decoder.skip_bytes(self.number_of_bytes)
+
     def __repr__(self):
         return 'OctetString({})'.format(self.name)
 
@@ -813,6 +993,9 @@ class ObjectIdentifier(Type):
 
         return decode_object_identifier(bytearray(data), 0, len(data))
 
+    def skip(self, decoder):
+        decoder.skip_length_prefixed()
+
     def __repr__(self):
         return 'ObjectIdentifier({})'.format(self.name)
 
@@ -842,18 +1025,18 @@ class Enumerated(Type):
                     data))
 
         if 0 <= value <= 127:
-            encoder.append_non_negative_binary_integer(value, 8)
+            encoder.append_u8(value)
         else:
-            offset = encoder.number_of_bits
+            # The long form, with the length bit set.
+            offset = encoder.number_of_bytes()
             encoder.append_integer(value)
-            encoder.set_bit(offset)
+            encoder.set_bit(8 * offset)
 
     def decode(self, decoder):
-        if decoder.peek_bit():
-            decoder.clear_bit()
-            value = decoder.read_integer()
-        else:
-            value = decoder.read_byte()
+        value = decoder.read_byte()
+
+        if value & 0x80:
+            value = decoder.read_signed_integer(value & 0x7f)
 
         try:
             return self.value_to_name[value]
@@ -863,6 +1046,12 @@ class Enumerated(Type):
                     self.format_values(),
                     value))
 
+    def skip(self, decoder):
+        value = decoder.read_byte()
+
+        if value & 0x80:
+            decoder.skip_bytes(value & 0x7f)
+
     def __repr__(self):
         return 'Enumerated({})'.format(self.name)
 
@@ -933,14 +1122,15 @@ class Choice(Type):
 
     def add_tags(self, tag_to_member, members):
         for member in members:
-            tag_to_member[member.tag] = member
-
-    def format_tag(self, tag):
-        return binascii.hexlify(tag).decode('ascii')
+            # Untagged CHOICE members have no tag of their own.
+            if member.tag is not None:
+                tag_to_member[tag_as_integer(member.tag)] = member
 
     def format_tags(self):
         return format_or(
-            sorted([self.format_tag(member.tag) for member in self.members]))
+            sorted([format_tag(tag_as_integer(member.tag))
+                    for member in self.members
+                    if member.tag is not None]))
 
     def format_names(self):
         return format_or(sorted([member.name for member in self.members]))
@@ -967,7 +1157,10 @@ class Choice(Type):
 
     def encode_member(self, member, data, encoder):
         try:
-            member.encode(data, encoder)
+            if isinstance(data, Encoded):
+                encoder.append_bits(data.data, data.number_of_bits)
+            else:
+                member.encode(data, encoder)
         except EncodeError as e:
             e.location.append(member.name)
             raise
@@ -983,13 +1176,55 @@ class Choice(Type):
             decoder.read_length_determinant()
             decoded = member.decode(decoder)
         else:
-            raise DecodeError(
-                "Expected choice member tag {}, but got '{}'.".format(
-                    self.format_tags(),
-                    self.format_tag(tag)))
+            self.raise_unknown_tag(tag)
 
         return (member.name, decoded)
 
+    def decode_selected(self, decoder, selection):
+        tag = decoder.read_tag()
+
+        if tag in self.tag_to_root_member:
+            member = self.tag_to_root_member[tag]
+
+            if member.name in selection:
+                decoded = decode_selected(member,
+                                          decoder,
+                                          selection[member.name])
+            else:
+                member.skip(decoder)
+                decoded = None
+        elif tag in self.tag_to_addition:
+            member = self.tag_to_addition[tag]
+            length = decoder.read_length_determinant()
+
+            if member.name in selection:
+                decoded = decode_selected(member,
+                                          decoder,
+                                          selection[member.name])
+            else:
+                decoder.skip_bytes(length)
+                decoded = None
+        else:
+            self.raise_unknown_tag(tag)
+
+        return (member.name, decoded)
+
+    def skip(self, decoder):
+        tag = decoder.read_tag()
+
+        if tag in self.tag_to_root_member:
+            self.tag_to_root_member[tag].skip(decoder)
+        elif tag in self.tag_to_addition:
+            decoder.skip_length_prefixed()
+        else:
+            self.raise_unknown_tag(tag)
+
+    def raise_unknown_tag(self, tag):
+        raise DecodeError(
+            "Expected choice member tag {}, but got '{}'.".format(
+                self.format_tags(),
+                format_tag(tag)))
+
     def __repr__(self):
         return 'Choice({}, [{}])'.format(
             self.name,
@@ -1143,6 +1378,12 @@ class Recursive(Type, compiler.Recursive):
     def decode(self, decoder):
         return self.inner.decode(decoder)
 
+    def decode_selected(self, decoder, selection):
+        return self.inner.decode_selected(decoder, selection)
+
+    def skip(self, decoder):
+        self.inner.skip(decoder)
+
     def __repr__(self):
         return 'Recursive({})'.format(self.type_name)
 
@@ -1163,10 +1404,35 @@ class CompiledType(compiler.CompiledType):
 
         return encoder.as_bytearray()
 
-    def decode(self, data):
-        decoder = Decoder(bytearray(data))
+    def create_decoder(self, data):
+        if sys.version_info[0] > 2:
+            data = memoryview(data)
+
+            if data.format != 'B':
+                data = data.cast('B')
+        else:
+            data = bytearray(data)
+
+        return Decoder(data)
+
+    def decode(self, data, select=None):
+        decoder = self.create_decoder(data)
+
+        if select is None:
+            return self._type.decode(decoder)
+        else:
+            return self._type.decode_selected(decoder,
+                                              self.selection_tree(select))
+
+    def decode_length(self, data):
+        decoder = self.create_decoder(data)
+
+        try:
+            self._type.skip(decoder)
+        except OutOfDataError:
+            return None
 
-        return self._type.decode(decoder)
+        return decoder.offset
 
     def __repr__(self):
         return repr(self._type)
@@ -1175,9 +1441,9 @@ class CompiledType(compiler.CompiledType):
 class Compiler(compiler.Compiler):
 
     def process_type(self, type_name, type_descriptor, module_name):
-        compiled_type = self.compile_type(type_name,
-                                          type_descriptor,
-                                          module_name)
+        compiled_type = self.compile_user_type(type_name,
+                                               type_name,
+                                               module_name)
 
         return CompiledType(compiled_type)
 
@@ -1355,4 +1621,6 @@ def compile_dict(specification):
 
 
 def decode_length(_data):
-    raise DecodeError('Decode length is not supported for this codec.')
+    raise DecodeError(
+        'Decode length requires a type name for this codec, as the length '
+        'is not part of the encoding.')
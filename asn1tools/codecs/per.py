@@ -11,6 +11,7 @@ from ..parser import EXTENSION_MARKER
 from . import EncodeError
 from . import DecodeError
 from . import OutOfDataError
+from . import Encoded
 from . import compiler
 from . import format_or
 from . import restricted_utc_time_to_datetime
@@ -90,6 +91,67 @@ CLASS_PRIO = {
 }
 
 
+def decode_selected(type_, decoder, selection):
+    """Decode given selection of given type, or all of it if the selection
+    is None.
+
+    """
+
+    if selection is None:
+        return type_.decode(decoder)
+    else:
+        return type_.decode_selected(decoder, selection)
+
+
+def decode_open_type(type_, data, decoder_class, lazy):
+    """Decode given open type contents as given type.
+
+    """
+
+    try:
+        return type_.decode(decoder_class(bytearray(data), lazy))
+    except DecodeError as e:
+        e.location.append(type_.name)
+        raise
+
+
+class LazyOpenType(object):
+    """An open type value decoded on first access of :attr:`value`. It
+    is encoded as its contents `data`, without being encoded again.
+
+    """
+
+    def __init__(self, type_, data, decoder_class):
+        self.data = data
+        self._type = type_
+        self._decoder_class = decoder_class
+        self._decoded = False
+        self._value = None
+
+    @property
+    def value(self):
+        if not self._decoded:
+            self._value = decode_open_type(self._type,
+                                           self.data,
+                                           self._decoder_class,
+                                           True)
+            self._decoded = True
+
+        return self._value
+
+    def __eq__(self, other):
+        if isinstance(other, LazyOpenType):
+            other = other.value
+
+        return self.value == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'LazyOpenType({})'.format(repr(self.value))
+
+
 class PermittedAlphabet(object):
 
     def __init__(self, encode_map, decode_map):
@@ -119,54 +181,64 @@ class PermittedAlphabet(object):
                     value))
 
 
+# Complete bytes are moved from the bit accumulator integer to the
+# output buffer when it holds about this many bits, keeping the
+# integer shifts cheap.
+FLUSH_NUMBER_OF_BITS = 256
+
+
 class Encoder(object):
 
     def __init__(self):
+        self.buf = bytearray()
         self.number_of_bits = 0
         self.value = 0
-        self.chunks_number_of_bits = 0
-        self.chunks = []
+        self.flush_offset = FLUSH_NUMBER_OF_BITS
 
     def __iadd__(self, other):
-        for value, number_of_bits in other.chunks:
-            self.append_non_negative_binary_integer(value, number_of_bits)
-
+        other.flush()
+        self.append_bits(other.buf, 8 * len(other.buf))
         self.append_non_negative_binary_integer(other.value,
-                                                other.number_of_bits)
+                                                other.number_of_value_bits())
 
         return self
 
     def reset(self):
+        self.buf = bytearray()
         self.number_of_bits = 0
         self.value = 0
-        self.chunks_number_of_bits = 0
-        self.chunks = []
+        self.flush_offset = FLUSH_NUMBER_OF_BITS
 
     def are_all_bits_zero(self):
-        return not (any([value for value, _ in self.chunks]) or self.value)
+        return not (any(self.buf) or self.value)
 
     def number_of_bytes(self):
-        return (self.chunks_number_of_bits + self.number_of_bits + 7) // 8
+        return (self.number_of_bits + 7) // 8
 
     def offset(self):
-        return (len(self.chunks), self.number_of_bits)
+        return self.number_of_bits
+
+    def number_of_value_bits(self):
+        return self.number_of_bits - 8 * len(self.buf)
 
     def set_bit(self, offset):
-        chunk_offset, bit_offset = offset
+        """Set the bit at given offset, which must have been appended
+        earlier.
+
+        """
+
+        byte_offset = (offset >> 3)
 
-        if len(self.chunks) == chunk_offset:
-            self.value |= (1 << (self.number_of_bits - bit_offset - 1))
+        if byte_offset < len(self.buf):
+            self.buf[byte_offset] |= (0x80 >> (offset & 0x7))
         else:
-            chunk = self.chunks[chunk_offset]
-            chunk[0] |= (1 << (chunk[1] - bit_offset - 1))
+            self.value |= (1 << (self.number_of_bits - offset - 1))
 
     def align(self):
         self.align_always()
 
     def align_always(self):
-        width = 8 * self.number_of_bytes()
-        width -= self.chunks_number_of_bits
-        width -= self.number_of_bits
+        width = (-self.number_of_bits & 0x7)
         self.number_of_bits += width
         self.value <<= width
 
@@ -179,6 +251,9 @@ class Encoder(object):
         self.value <<= 1
         self.value |= bit
 
+        if self.number_of_bits >= self.flush_offset:
+            self.flush()
+
     def append_bits(self, data, number_of_bits):
         """Append given bits.
 
@@ -187,26 +262,36 @@ class Encoder(object):
         if number_of_bits == 0:
             return
 
-        value = int(binascii.hexlify(data), 16)
-        value >>= (8 * len(data) - number_of_bits)
+        if self.number_of_bits & 0x7 == 0:
+            self.flush()
+            number_of_bytes, number_of_rest_bits = divmod(number_of_bits, 8)
+            self.buf.extend(data[:number_of_bytes])
+            self.number_of_bits += 8 * number_of_bytes
+            self.flush_offset += 8 * number_of_bytes
+
+            if number_of_rest_bits > 0:
+                self.append_non_negative_binary_integer(
+                    bytearray(data[number_of_bytes:number_of_bytes + 1])[0]
+                    >> (8 - number_of_rest_bits),
+                    number_of_rest_bits)
+        else:
+            value = int(binascii.hexlify(data), 16)
+            value >>= (8 * len(data) - number_of_bits)
 
-        self.append_non_negative_binary_integer(value, number_of_bits)
+            self.append_non_negative_binary_integer(value, number_of_bits)
 
     def append_non_negative_binary_integer(self, value, number_of_bits):
         """Append given integer value.
 
         """
 
-        if self.number_of_bits > 4096:
-            self.chunks.append([self.value, self.number_of_bits])
-            self.chunks_number_of_bits += self.number_of_bits
-            self.number_of_bits = 0
-            self.value = 0
-
         self.number_of_bits += number_of_bits
         self.value <<= number_of_bits
         self.value |= value
 
+        if self.number_of_bits >= self.flush_offset:
+            self.flush()
+
     def append_bytes(self, data):
         """Append given data.
 
@@ -214,36 +299,37 @@ class Encoder(object):
 
         self.append_bits(data, 8 * len(data))
 
-    def as_bytearray(self):
-        """Return the bits as a bytearray.
+    def flush(self):
+        """Move all complete bytes in the bit accumulator to the buffer.
 
         """
 
-        value = 0
-        number_of_bits = 0
+        number_of_value_bits = self.number_of_value_bits()
+        number_of_bytes = (number_of_value_bits >> 3)
 
-        for chunk_value, chunk_number_of_bits in self.chunks:
-            value <<= chunk_number_of_bits
-            value |= chunk_value
-            number_of_bits += chunk_number_of_bits
+        if number_of_bytes > 0:
+            number_of_rest_bits = (number_of_value_bits & 0x7)
+            value = (self.value >> number_of_rest_bits)
+            value |= (0x80 << (8 * number_of_bytes))
+            self.buf.extend(binascii.unhexlify(hex(value)[4:].rstrip('L')))
+            self.value &= ((1 << number_of_rest_bits) - 1)
 
-        value <<= self.number_of_bits
-        value |= self.value
-        number_of_bits += self.number_of_bits
+        self.flush_offset = (8 * len(self.buf) + FLUSH_NUMBER_OF_BITS)
 
-        if number_of_bits == 0:
-            return bytearray()
+    def as_bytearray(self):
+        """Return the bits as a bytearray.
+
+        """
 
-        number_of_alignment_bits = (8 - (number_of_bits % 8))
+        self.flush()
+        number_of_value_bits = self.number_of_value_bits()
 
-        if number_of_alignment_bits != 8:
-            value <<= number_of_alignment_bits
-            number_of_bits += number_of_alignment_bits
+        if number_of_value_bits == 0:
+            return bytearray(self.buf)
 
-        value |= (0x80 << number_of_bits)
-        value = hex(value)[4:].rstrip('L')
+        width = (8 - number_of_value_bits)
 
-        return bytearray(binascii.unhexlify(value))
+        return self.buf + bytearray([(self.value << width) & 0xff])
 
     def append_length_determinant(self, length):
         if length < 128:
@@ -350,16 +436,11 @@ class Encoder(object):
 
 class Decoder(object):
 
-    def __init__(self, encoded):
+    def __init__(self, encoded, lazy=False):
+        self.encoded = encoded
         self.number_of_bits = (8 * len(encoded))
         self.total_number_of_bits = self.number_of_bits
-
-        if len(encoded) > 0:
-            value = int(binascii.hexlify(encoded), 16)
-            value |= (0x80 << self.number_of_bits)
-            self.value = bin(value)[10:]
-        else:
-            self.value = ''
+        self.lazy = lazy
 
     def align(self):
         self.align_always()
@@ -385,10 +466,10 @@ class Decoder(object):
         if self.number_of_bits == 0:
             raise OutOfDataError(self.number_of_read_bits())
 
-        bit = int(self.value[self.number_of_read_bits()])
+        offset = self.total_number_of_bits - self.number_of_bits
         self.number_of_bits -= 1
 
-        return bit
+        return (self.encoded[offset >> 3] >> (7 - (offset & 0x7))) & 1
 
     def read_bits(self, number_of_bits):
         """Read given number of bits.
@@ -398,16 +479,28 @@ class Decoder(object):
         if number_of_bits > self.number_of_bits:
             raise OutOfDataError(self.number_of_read_bits())
 
-        offset = self.number_of_read_bits()
-        value = self.value[offset:offset + number_of_bits]
+        offset = self.total_number_of_bits - self.number_of_bits
         self.number_of_bits -= number_of_bits
-        value = '10000000' + value
-        number_of_alignment_bits = (8 - (number_of_bits % 8))
+        byte_offset = (offset >> 3)
+        number_of_bytes = ((number_of_bits + 7) >> 3)
+        number_of_rest_bits = (number_of_bits & 0x7)
+
+        if offset & 0x7 == 0:
+            value = self.encoded[byte_offset:byte_offset + number_of_bytes]
+
+            if number_of_rest_bits != 0:
+                value[-1] &= ((0xff00 >> number_of_rest_bits) & 0xff)
+
+            return bytes(value)
 
-        if number_of_alignment_bits != 8:
-            value += '0' * number_of_alignment_bits
+        value = self.get_non_negative_binary_integer(offset, number_of_bits)
 
-        return binascii.unhexlify(hex(int(value, 2))[4:].rstrip('L'))
+        if number_of_rest_bits != 0:
+            value <<= (8 - number_of_rest_bits)
+
+        value |= (0x80 << (8 * number_of_bytes))
+
+        return binascii.unhexlify(hex(value)[4:].rstrip('L'))
 
     def read_bytes(self, number_of_bytes):
         return self.read_bits(8 * number_of_bytes)
@@ -421,6 +514,29 @@ class Decoder(object):
 
         return bytearray(self.read_bytes(number_of_bytes))
 
+    def get_non_negative_binary_integer(self, offset, number_of_bits):
+        """Returns the integer value of given number of bits at given bit
+        offset, without moving the read position.
+
+        """
+
+        byte_offset = (offset >> 3)
+        end_byte_offset = ((offset + number_of_bits + 7) >> 3)
+        number_of_bytes = (end_byte_offset - byte_offset)
+        encoded = self.encoded
+
+        if number_of_bytes == 1:
+            value = encoded[byte_offset]
+        elif number_of_bytes == 2:
+            value = ((encoded[byte_offset] << 8) | encoded[byte_offset + 1])
+        else:
+            value = int(binascii.hexlify(encoded[byte_offset:end_byte_offset]),
+                        16)
+
+        value >>= (8 * end_byte_offset - offset - number_of_bits)
+
+        return value & ((1 << number_of_bits) - 1)
+
     def read_non_negative_binary_integer(self, number_of_bits):
         """Read an integer value of given number of bits.
 
@@ -432,11 +548,10 @@ class Decoder(object):
         if number_of_bits == 0:
             return 0
 
-        offset = self.number_of_read_bits()
-        value = self.value[offset:offset + number_of_bits]
+        offset = self.total_number_of_bits - self.number_of_bits
         self.number_of_bits -= number_of_bits
 
-        return int(value, 2)
+        return self.get_non_negative_binary_integer(offset, number_of_bits)
 
     def read_length_determinant(self):
         value = self.read_non_negative_binary_integer(8)
@@ -468,6 +583,13 @@ class Decoder(object):
             if length < 16384:
                 break
 
+    def skip_length_prefixed(self):
+        """Skip a length determinant and the bytes it counts.
+
+        """
+
+        self.skip_bits(8 * self.read_length_determinant())
+
     def read_normally_small_non_negative_whole_number(self):
         if not self.read_bit():
             decoded = self.read_non_negative_binary_integer(6)
@@ -537,6 +659,17 @@ class Type(object):
     def is_default(self, value):
         return value == self.default
 
+    def skip(self, decoder):
+        """Advance given decoder past an encoding of this type, reading only
+        what is needed to find its end.
+
+        """
+
+        self.decode(decoder)
+
+    def decode_selected(self, decoder, _selection):
+        return self.decode(decoder)
+
 
 class KnownMultiplierStringType(Type):
 
@@ -654,6 +787,35 @@ class KnownMultiplierStringType(Type):
 
         return bytearray(decoded).decode('ascii')
 
+    def skip(self, decoder):
+        if self.has_extension_marker:
+            if decoder.read_bit():
+                raise NotImplementedError(
+                    'String size extension is not yet implemented.')
+
+        if self.number_of_bits is None:
+            decoder.align()
+
+            for length in decoder.read_length_determinant_chunks():
+                decoder.skip_bits(length * self.bits_per_character)
+
+            return
+
+        if self.minimum != self.maximum:
+            length = decoder.read_constrained_whole_number(self.minimum,
+                                                           self.maximum,
+                                                           self.number_of_bits)
+
+            if self.maximum > 1:
+                decoder.align()
+        else:
+            length = self.minimum
+
+            if self.maximum * self.bits_per_character > 16:
+                decoder.align()
+
+        decoder.skip_bits(length * self.bits_per_character)
+
     def __repr__(self):
         return '{}({})'.format(self.__class__.__name__,
                                self.name)
@@ -685,6 +847,12 @@ class StringType(Type):
 
         return b''.join(encoded).decode(self.ENCODING)
 
+    def skip(self, decoder):
+        decoder.align()
+
+        for length in decoder.read_length_determinant_chunks():
+            decoder.skip_bits(8 * self.LENGTH_MULTIPLIER * length)
+
     def __repr__(self):
         return '{}({})'.format(self.__class__.__name__,
                                self.name)
@@ -708,9 +876,21 @@ class MembersType(Type):
         ]
         self._open_types = open_types
 
+        # Mask of the presence bit of each root member, or zero if
+        # always present.
+        bit = (1 << len(self.optionals))
+        self.root_members_with_masks = []
+
+        for member in root_members:
+            if member.optional or member.default is not None:
+                bit >>= 1
+                self.root_members_with_masks.append((member, bit))
+            else:
+                self.root_members_with_masks.append((member, 0))
+
     def encode(self, data, encoder):
         if self._open_types:
-            self.encode_open_types(data)
+            data = self.encode_open_types(data, encoder)
 
         if self.additions is not None:
             offset = encoder.offset()
@@ -794,11 +974,15 @@ class MembersType(Type):
         name = member.name
 
         if name in data:
+            value = data[name]
+
             try:
-                if member.default is None:
-                    member.encode(data[name], encoder)
-                elif not member.is_default(data[name]) or encode_default:
-                    member.encode(data[name], encoder)
+                if isinstance(value, Encoded):
+                    encoder.append_bits(value.data, value.number_of_bits)
+                elif member.default is None:
+                    member.encode(value, encoder)
+                elif not member.is_default(value) or encode_default:
+                    member.encode(value, encoder)
             except EncodeError as e:
                 e.location.append(member.name)
                 raise
@@ -811,15 +995,48 @@ class MembersType(Type):
                     name,
                     data))
 
-    def encode_open_types(self, data):
-        return
-        print('xxx encode', data)
+    def encode_open_types(self, data, encoder):
+        """Returns a copy of given data, with open type values of known
+        objects in the information object set encoded as their
+        type. Other open type values must already be encoded.
+
+        """
+
+        data = dict(data)
 
-        for value_location, key_location in self._open_types:
-            print(value_location, key_location)
-            continue
-            if open_type.type_name in data:
-                data[open_type.name] = open_type.encode(data[open_type.name])
+        for name, key_name, types in self._open_types:
+            if name not in data:
+                continue
+
+            value = data[name]
+
+            if isinstance(value, LazyOpenType):
+                data[name] = value.data
+
+                continue
+            elif isinstance(value, Encoded):
+                continue
+
+            try:
+                type_ = types[data[key_name]]
+            except (KeyError, TypeError):
+                continue
+
+            open_type_encoder = encoder.__class__()
+
+            try:
+                type_.encode(value, open_type_encoder)
+            except EncodeError as e:
+                e.location.append(name)
+                raise
+
+            # An empty encoding is replaced by a zero octet.
+            if open_type_encoder.number_of_bits == 0:
+                open_type_encoder.append_non_negative_binary_integer(0, 8)
+
+            data[name] = open_type_encoder.as_bytearray()
+
+        return data
 
     def decode(self, decoder):
         if self.additions is not None:
@@ -832,7 +1049,7 @@ class MembersType(Type):
             decoded = self.decode_root(decoder)
 
         if self._open_types:
-            decoded = self.decode_open_types(decoded)
+            self.decode_open_types(decoded, decoder)
 
         return decoded
 
@@ -890,18 +1107,163 @@ class MembersType(Type):
 
         return decoded
 
-    def decode_open_types(self, decoded):
-        return decoded
-        print('xxx decode', decoded)
-        return decoded
+    def decode_selected(self, decoder, selection):
+        if self._open_types:
+            selection, key_names = self.select_open_type_keys(selection)
+
+        if self.additions is not None:
+            extended = decoder.read_bit()
+        else:
+            extended = 0
+
+        presence_bits = decoder.read_non_negative_binary_integer(
+            len(self.optionals))
+        values = {}
+
+        for member, mask in self.root_members_with_masks:
+            name = member.name
+
+            try:
+                if not mask or presence_bits & mask:
+                    if name in selection:
+                        values[name] = decode_selected(member,
+                                                       decoder,
+                                                       selection[name])
+                    else:
+                        member.skip(decoder)
+                elif member.default is not None and name in selection:
+                    values[name] = member.default
+            except DecodeError as e:
+                e.location.append(name)
+                raise
+
+        if extended:
+            values.update(self.decode_additions_selected(decoder, selection))
+
+        if self._open_types:
+            self.decode_open_types(values, decoder)
+
+            for key_name in key_names:
+                values.pop(key_name, None)
+
+        return values
+
+    def select_open_type_keys(self, selection):
+        """Returns given selection with the members constraining selected
+        open types added, as they are needed to decode the open
+        types, and the names of the added members.
+
+        """
+
+        key_names = [
+            key_name
+            for name, key_name, _ in self._open_types
+            if name in selection and key_name not in selection
+        ]
+
+        if key_names:
+            selection = dict(selection)
+            selection.update(dict.fromkeys(key_names))
+
+        return selection, key_names
 
-        for open_type in self._open_types:
-            if open_type.type_name in decoded:
-                decoded[open_type.name] = open_type.decode(
-                    decoded[open_type.name])
+    def decode_additions_selected(self, decoder, selection):
+        length = decoder.read_normally_small_length()
+        presence_bits = decoder.read_non_negative_binary_integer(length)
+        decoder.align()
+        decoded = {}
+
+        for i in range(length):
+            if presence_bits & (1 << (length - i - 1)):
+                open_type_length = decoder.read_length_determinant()
+
+                if i < len(self.additions):
+                    addition = self.additions[i]
+
+                    if isinstance(addition, AdditionGroup):
+                        is_selected = any(member.name in selection
+                                          for member in addition.root_members)
+                    else:
+                        is_selected = (addition.name in selection)
+                else:
+                    is_selected = False
+
+                if not is_selected:
+                    decoder.skip_bits(8 * open_type_length)
+
+                    continue
+
+                offset = decoder.number_of_bits
+
+                if isinstance(addition, AdditionGroup):
+                    decoded.update(addition.decode_selected(decoder, selection))
+                else:
+                    try:
+                        decoded[addition.name] = decode_selected(
+                            addition,
+                            decoder,
+                            selection[addition.name])
+                    except DecodeError as e:
+                        e.location.append(addition.name)
+                        raise
+
+                alignment_bits = (offset - decoder.number_of_bits) % 8
+
+                if alignment_bits != 0:
+                    decoder.skip_bits(8 - alignment_bits)
 
         return decoded
 
+    def skip(self, decoder):
+        if self.additions is not None:
+            extended = decoder.read_bit()
+        else:
+            extended = 0
+
+        presence_bits = decoder.read_non_negative_binary_integer(
+            len(self.optionals))
+
+        for member, mask in self.root_members_with_masks:
+            if not mask or presence_bits & mask:
+                member.skip(decoder)
+
+        if extended:
+            length = decoder.read_normally_small_length()
+            presence_bits = decoder.read_non_negative_binary_integer(length)
+            decoder.align()
+
+            # Every present addition is an open type.
+            while presence_bits:
+                if presence_bits & 1:
+                    decoder.skip_length_prefixed()
+
+                presence_bits >>= 1
+
+    def decode_open_types(self, decoded, decoder):
+        """Decode open type values of known objects in the information
+        object set as their type, or on access if lazy.
+
+        """
+
+        for name, key_name, types in self._open_types:
+            if name not in decoded or key_name not in decoded:
+                continue
+
+            try:
+                type_ = types[decoded[key_name]]
+            except (KeyError, TypeError):
+                continue
+
+            if decoder.lazy:
+                decoded[name] = LazyOpenType(type_,
+                                             decoded[name],
+                                             decoder.__class__)
+            else:
+                decoded[name] = decode_open_type(type_,
+                                                 decoded[name],
+                                                 decoder.__class__,
+                                                 False)
+
     def __repr__(self):
         return '{}({}, [{}])'.format(
             self.__class__.__name__,
@@ -944,14 +1306,20 @@ class ArrayType(Type):
                                                        self.number_of_bits)
 
         for entry in data:
-            self.element_type.encode(entry, encoder)
+            if isinstance(entry, Encoded):
+                encoder.append_bits(entry.data, entry.number_of_bits)
+            else:
+                self.element_type.encode(entry, encoder)
 
     def encode_unbound(self, data, encoder):
         encoder.align()
 
         for offset, length in encoder.append_length_determinant_chunks(len(data)):
             for entry in data[offset:offset + length]:
-                self.element_type.encode(entry, encoder)
+                if isinstance(entry, Encoded):
+                    encoder.append_bits(entry.data, entry.number_of_bits)
+                else:
+                    self.element_type.encode(entry, encoder)
 
     def decode(self, decoder):
         if self.has_extension_marker:
@@ -988,6 +1356,54 @@ class ArrayType(Type):
 
         return decoded
 
+    def decode_selected(self, decoder, selection):
+        if self.has_extension_marker:
+            if decoder.read_bit():
+                raise NotImplementedError('Extension is not yet implemented.')
+
+        decoded = []
+
+        if self.number_of_bits is None:
+            decoder.align()
+
+            for length in decoder.read_length_determinant_chunks():
+                for _ in range(length):
+                    decoded.append(
+                        self.element_type.decode_selected(decoder, selection))
+        else:
+            length = self.minimum
+
+            if self.minimum != self.maximum:
+                length += decoder.read_non_negative_binary_integer(
+                    self.number_of_bits)
+
+            for _ in range(length):
+                decoded.append(
+                    self.element_type.decode_selected(decoder, selection))
+
+        return decoded
+
+    def skip(self, decoder):
+        if self.has_extension_marker:
+            if decoder.read_bit():
+                raise NotImplementedError('Extension is not yet implemented.')
+
+        if self.number_of_bits is None:
+            decoder.align()
+
+            for length in decoder.read_length_determinant_chunks():
+                for _ in range(length):
+                    self.element_type.skip(decoder)
+        else:
+            length = self.minimum
+
+            if self.minimum != self.maximum:
+                length += decoder.read_non_negative_binary_integer(
+                    self.number_of_bits)
+
+            for _ in range(length):
+                self.element_type.skip(decoder)
+
     def __repr__(self):
         return '{}({}, {})'.format(self.__class__.__name__,
                                    self.name,
@@ -1005,6 +1421,9 @@ class Boolean(Type):
     def decode(self, decoder):
         return bool(decoder.read_bit())
 
+    def skip(self, decoder):
+        decoder.skip_bits(1)
+
     def __repr__(self):
         return 'Boolean({})'.format(self.name)
 
@@ -1074,19 +1493,36 @@ class Integer(Type):
 
             return decoder.read_unconstrained_whole_number()
         else:
-            if self.number_of_indefinite_bits is None:
-                number_of_bits = self.number_of_bits
-            else:
-                number_of_bits = decoder.read_constrained_whole_number(
-                    0,
-                    self.number_of_indefinite_bits,
-                    self.number_of_indefinite_bits)
-                number_of_bits += 1
-                number_of_bits *= 8
+            return self.decode_constrained(decoder)
+
+    def decode_constrained(self, decoder):
+        if self.number_of_indefinite_bits is None:
+            number_of_bits = self.number_of_bits
+        else:
+            number_of_bits = decoder.read_constrained_whole_number(
+                0,
+                self.number_of_indefinite_bits,
+                self.number_of_indefinite_bits)
+            number_of_bits += 1
+            number_of_bits *= 8
+
+        return decoder.read_constrained_whole_number(self.minimum,
+                                                     self.maximum,
+                                                     number_of_bits)
+
+    def skip(self, decoder):
+        if self.has_extension_marker:
+            if decoder.read_bit():
+                decoder.align()
+                decoder.skip_length_prefixed()
+
+                return
 
-            return decoder.read_constrained_whole_number(self.minimum,
-                                                         self.maximum,
-                                                         number_of_bits)
+        if self.number_of_bits is None:
+            decoder.align()
+            decoder.skip_length_prefixed()
+        else:
+            self.decode_constrained(decoder)
 
     def __repr__(self):
         return 'Integer({})'.format(self.name)
@@ -1107,6 +1543,11 @@ class Real(Type):
 
         return decode_real(decoder.read_bytes_aligned(length))
 
+    def skip(self, decoder):
+        length = decoder.read_length_determinant()
+        decoder.align_always()
+        decoder.skip_bits(8 * length)
+
     def __repr__(self):
         return 'Real({})'.format(self.name)
 
@@ -1122,6 +1563,9 @@ class Null(Type):
     def decode(self, _):
         return None
 
+    def skip(self, _):
+        pass
+
     def __repr__(self):
         return 'Null({})'.format(self.name)
 
@@ -1213,6 +1657,27 @@ class BitString(Type):
 
         return (b''.join(decoded), number_of_bits)
 
+    def skip(self, decoder):
+        if self.number_of_bits is None:
+            decoder.align()
+
+            for length in decoder.read_length_determinant_chunks():
+                decoder.skip_bits(length)
+
+            return
+
+        number_of_bits = self.minimum
+
+        if self.minimum != self.maximum:
+            decoder.align()
+            number_of_bits += decoder.read_non_negative_binary_integer(
+                self.number_of_bits)
+            decoder.align()
+        elif self.minimum > 16:
+            decoder.align()
+
+        decoder.skip_bits(number_of_bits)
+
     def __repr__(self):
         return 'BitString({})'.format(self.name)
 
@@ -1286,6 +1751,27 @@ class OctetString(Type):
 
         return b''.join(decoded)
 
+    def skip(self, decoder):
+        if self.number_of_bits is None:
+            decoder.align()
+
+            for length in decoder.read_length_determinant_chunks():
+                decoder.align()
+                decoder.skip_bits(8 * length)
+
+            return
+
+        length = self.minimum
+
+        if self.minimum != self.maximum:
+            length += decoder.read_non_negative_binary_integer(
+                self.number_of_bits)
+            decoder.align()
+        elif self.maximum > 2:
+            decoder.align()
+
+        decoder.skip_bits(8 * length)
+
     def __repr__(self):
         return 'OctetString({})'.format(self.name)
 
@@ -1308,6 +1794,10 @@ class ObjectIdentifier(Type):
 
         return decode_object_identifier(bytearray(data), 0, len(data))
 
+    def skip(self, decoder):
+        decoder.align()
+        decoder.skip_length_prefixed()
+
     def __repr__(self):
         return 'ObjectIdentifier({})'.format(self.name)
 
@@ -1562,7 +2052,10 @@ class Choice(Type):
 
     def encode_member(self, member, data, encoder):
         try:
-            member.encode(data, encoder)
+            if isinstance(data, Encoded):
+                encoder.append_bits(data.data, data.number_of_bits)
+            else:
+                member.encode(data, encoder)
         except EncodeError as e:
             e.location.append(member.name)
             raise
@@ -1577,6 +2070,11 @@ class Choice(Type):
             return self.decode_root(decoder)
 
     def decode_root(self, decoder):
+        member = self.read_root_member(decoder)
+
+        return (member.name, member.decode(decoder))
+
+    def read_root_member(self, decoder):
         if len(self.root_index_to_member) > 1:
             index = decoder.read_non_negative_binary_integer(
                 self.root_number_of_bits)
@@ -1584,26 +2082,27 @@ class Choice(Type):
             index = 0
 
         try:
-            member = self.root_index_to_member[index]
+            return self.root_index_to_member[index]
         except KeyError:
             raise DecodeError(
                 'Expected choice index {}, but got {}.'.format(
                     self.format_root_indexes(),
                     index))
 
-        return (member.name, member.decode(decoder))
-
-    def decode_additions(self, decoder):
+    def read_addition(self, decoder):
         index = decoder.read_normally_small_non_negative_whole_number()
 
         try:
-            addition = self.additions_index_to_member[index]
+            return self.additions_index_to_member[index]
         except KeyError:
             raise DecodeError(
                 'Expected choice index {}, but got {}.'.format(
                     self.format_addition_indexes(),
                     index))
 
+    def decode_additions(self, decoder):
+        addition = self.read_addition(decoder)
+
         # Open type decoding.
         decoder.align()
         decoder.read_length_determinant()
@@ -1616,6 +2115,50 @@ class Choice(Type):
 
         return (addition.name, decoded)
 
+    def decode_selected(self, decoder, selection):
+        if self.additions_index_to_member is not None:
+            if decoder.read_bit():
+                addition = self.read_addition(decoder)
+                decoder.align()
+
+                if addition.name not in selection:
+                    decoder.skip_length_prefixed()
+
+                    return (addition.name, None)
+
+                decoder.read_length_determinant()
+                offset = decoder.number_of_bits
+                decoded = decode_selected(addition,
+                                          decoder,
+                                          selection[addition.name])
+                alignment_bits = (offset - decoder.number_of_bits) % 8
+
+                if alignment_bits != 0:
+                    decoder.skip_bits(8 - alignment_bits)
+
+                return (addition.name, decoded)
+
+        member = self.read_root_member(decoder)
+
+        if member.name not in selection:
+            member.skip(decoder)
+
+            return (member.name, None)
+
+        return (member.name,
+                decode_selected(member, decoder, selection[member.name]))
+
+    def skip(self, decoder):
+        if self.additions_index_to_member is not None:
+            if decoder.read_bit():
+                self.read_addition(decoder)
+                decoder.align()
+                decoder.skip_length_prefixed()
+
+                return
+
+        self.read_root_member(decoder).skip(decoder)
+
     def __repr__(self):
         return 'Choice({}, [{}])'.format(
             self.name,
@@ -1644,6 +2187,12 @@ class UTF8String(Type):
 
         return b''.join(encoded).decode('utf-8')
 
+    def skip(self, decoder):
+        decoder.align()
+
+        for length in decoder.read_length_determinant_chunks():
+            decoder.skip_bits(8 * length)
+
     def __repr__(self):
         return 'UTF8String({})'.format(self.name)
 
@@ -1751,6 +2300,10 @@ class OpenType(Type):
 
         return decoder.read_bytes(length)
 
+    def skip(self, decoder):
+        decoder.align()
+        decoder.skip_length_prefixed()
+
     def __repr__(self):
         return 'OpenType({})'.format(self.name)
 
@@ -1787,6 +2340,12 @@ class Recursive(Type, compiler.Recursive):
     def decode(self, decoder):
         return self._inner.decode(decoder)
 
+    def decode_selected(self, decoder, selection):
+        return self._inner.decode_selected(decoder, selection)
+
+    def skip(self, decoder):
+        self._inner.skip(decoder)
+
     def __repr__(self):
         return 'Recursive({})'.format(self.type_name)
 
@@ -1811,10 +2370,24 @@ class CompiledType(compiler.CompiledType):
 
         return encoder.as_bytearray()
 
-    def decode(self, data):
+    def decode(self, data, select=None, lazy=False):
+        decoder = Decoder(bytearray(data), lazy)
+
+        if select is None:
+            return self._type.decode(decoder)
+        else:
+            return self._type.decode_selected(decoder,
+                                              self.selection_tree(select))
+
+    def decode_length(self, data):
         decoder = Decoder(bytearray(data))
 
-        return self._type.decode(decoder)
+        try:
+            self._type.skip(decoder)
+        except OutOfDataError:
+            return None
+
+        return (decoder.number_of_read_bits() + 7) // 8
 
     def __repr__(self):
         return repr(self._type)
@@ -1823,9 +2396,9 @@ class CompiledType(compiler.CompiledType):
 class Compiler(compiler.Compiler):
 
     def process_type(self, type_name, type_descriptor, module_name):
-        compiled_type = self.compile_type(type_name,
-                                          type_descriptor,
-                                          module_name)
+        compiled_type = self.compile_user_type(type_name,
+                                               type_name,
+                                               module_name)
 
         return CompiledType(compiled_type)
 
@@ -1943,6 +2516,10 @@ class Compiler(compiler.Compiler):
                                      type_name,
                                      module_name)
                 self.recursive_types.append(compiled)
+            elif 'actual-parameters' in type_descriptor:
+                compiled = self.compile_parameterized_type(name,
+                                                           type_descriptor,
+                                                           module_name)
             else:
                 compiled = self.compile_user_type(name,
                                                   type_name,
@@ -2050,4 +2627,6 @@ def compile_dict(specification):
 
 
 def decode_length(_data):
-    raise DecodeError('Decode length is not supported for this codec.')
+    raise DecodeError(
+        'Decode length requires a type name for this codec, as the length '
+        'is not part of the encoding.')
@@ -7,8 +7,11 @@ import datetime
 from copy import copy
 
 from . import EncodeError
+from . import Encoded
 from . import compiler
 from . import format_or
+from ..compat import Mapping
+from ..compat import Sequence
 
 
 STRING_TYPES = [
@@ -27,6 +30,12 @@ STRING_TYPES = [
 ]
 
 
+if sys.version_info[0] > 2:
+    STRING_CLASSES = (str, bytes, bytearray)
+else:
+    STRING_CLASSES = (str, unicode, bytearray)
+
+
 class Type(object):
 
     TYPE = None
@@ -91,7 +100,7 @@ class BitString(Type):
     def encode(self, data):
         if (not isinstance(data, tuple)
             or len(data) != 2
-            or not isinstance(data[0], (bytes, bytearray))
+            or not isinstance(data[0], (bytes, bytearray, memoryview))
             or not isinstance(data[1], int)):
             raise EncodeError(
                 'Expected data of type tuple(bytes, int), but got {}.'.format(
@@ -107,7 +116,7 @@ class BitString(Type):
 class Bytes(Type):
 
     def encode(self, data):
-        if not isinstance(data, (bytes, bytearray)):
+        if not isinstance(data, (bytes, bytearray, memoryview)):
             raise EncodeError(
                 'Expected data of type bytes or bytearray, but got {}.'.format(
                     data))
@@ -128,19 +137,20 @@ class String(Type):
 
 class Dict(Type):
 
-    TYPE = dict
-
     def __init__(self, name, members):
         super(Dict, self).__init__(name)
         self.members = members
 
     def encode(self, data):
-        super(Dict, self).encode(data)
+        # Any mapping, for example lazily decoded BER members.
+        if not isinstance(data, Mapping):
+            raise EncodeError(
+                'Expected data of type dict, but got {}.'.format(data))
 
         for member in self.members:
             name = member.name
 
-            if name in data:
+            if name in data and not isinstance(data[name], Encoded):
                 try:
                     member.encode(data[name])
                 except EncodeError as e:
@@ -150,17 +160,21 @@ class Dict(Type):
 
 class List(Type):
 
-    TYPE = list
-
     def __init__(self, name, element_type):
         super(List, self).__init__(name)
         self.element_type = element_type
 
     def encode(self, data):
-        super(List, self).encode(data)
+        # Any sequence but strings, for example lazily decoded BER
+        # elements.
+        if (not isinstance(data, Sequence)
+            or isinstance(data, STRING_CLASSES)):
+            raise EncodeError(
+                'Expected data of type list, but got {}.'.format(data))
 
         for entry in data:
-            self.element_type.encode(entry)
+            if not isinstance(entry, Encoded):
+                self.element_type.encode(entry)
 
 
 class Choice(Type):
@@ -197,6 +211,9 @@ class Choice(Type):
                     self.format_names(),
                     data[0]))
 
+        if isinstance(data[1], Encoded):
+            return
+
         try:
             member.encode(data[1])
         except EncodeError as e:
@@ -251,9 +268,9 @@ class CompiledType(compiler.CompiledType):
 class Compiler(compiler.Compiler):
 
     def process_type(self, type_name, type_descriptor, module_name):
-        compiled_type = self.compile_type(type_name,
-                                          type_descriptor,
-                                          module_name)
+        compiled_type = self.compile_user_type(type_name,
+                                               type_name,
+                                               module_name)
 
         return CompiledType(compiled_type)
 
@@ -5,6 +5,7 @@
 import string
 
 from . import DecodeError
+from . import OutOfDataError
 from . import per
 from . import restricted_utc_time_to_datetime
 from . import restricted_utc_time_from_datetime
@@ -33,6 +34,7 @@ from .per import GraphicString
 from .per import TeletexString
 from .per import UniversalString
 from .per import Any
+from .per import OpenType
 from .per import Recursive
 from .permitted_alphabet import NUMERIC_STRING
 from .permitted_alphabet import PRINTABLE_STRING
@@ -114,6 +116,23 @@ class KnownMultiplierStringType(per.KnownMultiplierStringType):
 
         return bytearray(data).decode('ascii')
 
+    def skip(self, decoder):
+        if self.has_extension_marker:
+            if decoder.read_bit():
+                raise NotImplementedError(
+                    'String size extension is not yet implemented.')
+
+        if self.number_of_bits is None:
+            for length in decoder.read_length_determinant_chunks():
+                decoder.skip_bits(length * self.bits_per_character)
+        else:
+            length = self.minimum
+
+            if self.minimum != self.maximum:
+                length += decoder.read_non_negative_binary_integer(self.number_of_bits)
+
+            decoder.skip_bits(length * self.bits_per_character)
+
 
 class Integer(Type):
 
@@ -158,6 +177,18 @@ class Integer(Type):
 
             return value + self.minimum
 
+    def skip(self, decoder):
+        if self.has_extension_marker:
+            if decoder.read_bit():
+                decoder.skip_length_prefixed()
+
+                return
+
+        if self.number_of_bits is None:
+            decoder.skip_length_prefixed()
+        else:
+            decoder.skip_bits(self.number_of_bits)
+
     def __repr__(self):
         return 'Integer({})'.format(self.name)
 
@@ -230,18 +261,32 @@ class CompiledType(per.CompiledType):
 
         return encoder.as_bytearray()
 
-    def decode(self, data):
+    def decode(self, data, select=None, lazy=False):
+        decoder = Decoder(bytearray(data), lazy)
+
+        if select is None:
+            return self._type.decode(decoder)
+        else:
+            return self._type.decode_selected(decoder,
+                                              self.selection_tree(select))
+
+    def decode_length(self, data):
         decoder = Decoder(bytearray(data))
 
-        return self._type.decode(decoder)
+        try:
+            self._type.skip(decoder)
+        except OutOfDataError:
+            return None
+
+        return (decoder.number_of_read_bits() + 7) // 8
 
 
 class Compiler(per.Compiler):
 
     def process_type(self, type_name, type_descriptor, module_name):
-        compiled_type = self.compile_type(type_name,
-                                          type_descriptor,
-                                          module_name)
+        compiled_type = self.compile_user_type(type_name,
+                                               type_name,
+                                               module_name)
 
         return CompiledType(compiled_type)
 
@@ -351,12 +396,18 @@ class Compiler(per.Compiler):
             compiled = Any(name)
         elif type_name == 'NULL':
             compiled = Null(name)
+        elif type_name == 'OpenType':
+            compiled = OpenType(name)
         else:
             if type_name in self.types_backtrace:
                 compiled = Recursive(name,
                                      type_name,
                                      module_name)
                 self.recursive_types.append(compiled)
+            elif 'actual-parameters' in type_descriptor:
+                compiled = self.compile_parameterized_type(name,
+                                                           type_descriptor,
+                                                           module_name)
             else:
                 compiled = self.compile_user_type(name,
                                                   type_name,
@@ -378,4 +429,6 @@ def compile_dict(specification):
 
 
 def decode_length(_data):
-    raise DecodeError('Decode length is not supported for this codec.')
+    raise DecodeError(
+        'Decode length requires a type name for this codec, as the length '
+        'is not part of the encoding.')
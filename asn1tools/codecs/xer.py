@@ -7,6 +7,7 @@ from xml.etree import ElementTree
 import binascii
 
 from . import EncodeError
+from . import check_not_encoded
 from . import DecodeError
 from . import compiler
 from . import format_or
@@ -105,6 +106,7 @@ class MembersType(Type):
 
             if name in data:
                 try:
+                    check_not_encoded(data[name], 'XER')
                     member_element = member.encode(data[name])
                 except EncodeError as e:
                     e.location.append(member.name)
@@ -156,6 +158,7 @@ class ArrayType(Type):
         element = ElementTree.Element(self.name)
 
         for entry in data:
+            check_not_encoded(entry, 'XER')
             element.append(self.element_type.encode_of(entry))
 
         return element
@@ -436,6 +439,7 @@ class Choice(Type):
         element = ElementTree.Element(self.name)
 
         try:
+            check_not_encoded(data[1], 'XER')
             element.append(member.encode(data[1]))
         except EncodeError as e:
             e.location.append(member.name)
@@ -617,10 +621,18 @@ class CompiledType(compiler.CompiledType):
 
         return ElementTree.tostring(element)
 
-    def decode(self, data):
+    def decode(self, data, select=None):
         element = ElementTree.fromstring(data.decode('utf-8'))
+        decoded = self._type.decode(element)
 
-        return self._type.decode(element)
+        if select is not None:
+            decoded = compiler.select_decoded(decoded,
+                                              self.selection_tree(select))
+
+        return decoded
+
+    def decode_length(self, data):
+        return decode_length(data)
 
     def __repr__(self):
         return repr(self._type)
@@ -629,12 +641,16 @@ class CompiledType(compiler.CompiledType):
 class Compiler(compiler.Compiler):
 
     def process_type(self, type_name, type_descriptor, module_name):
-        compiled_type = self.compile_type(type_name,
-                                          type_descriptor,
-                                          module_name)
+        compiled_type = self.compile_user_type(type_name,
+                                               type_name,
+                                               module_name)
 
         return CompiledType(compiled_type)
 
+    def rename(self, compiled_type, name):
+        return super(Compiler, self).rename(compiled_type,
+                                            name.replace(' ', '_'))
+
     def compile_type(self, name, type_descriptor, module_name):
         type_name = type_descriptor['type']
 
@@ -727,5 +743,58 @@ def compile_dict(specification):
     return Compiler(specification).process()
 
 
-def decode_length(_data):
-    raise DecodeError('Decode length is not supported for this codec.')
+def decode_length(data):
+    """Returns the length of the first complete element in given data,
+    including any preceding XML declaration, comments and whitespace,
+    or None if the element is not complete.
+
+    """
+
+    data = bytes(data)
+    depth = 0
+    offset = 0
+
+    while True:
+        offset = data.find(b'<', offset)
+
+        if offset == -1:
+            return None
+
+        if data.startswith(b'<?', offset):
+            end = data.find(b'?>', offset + 2)
+
+            if end == -1:
+                return None
+
+            offset = end + 2
+
+            continue
+
+        if data.startswith(b'<!--', offset):
+            end = data.find(b'-->', offset + 4)
+
+            if end == -1:
+                return None
+
+            offset = end + 3
+
+            continue
+
+        end = data.find(b'>', offset)
+
+        if end == -1:
+            return None
+
+        if data[offset + 1:offset + 2] == b'/':
+            depth -= 1
+
+            if depth < 0:
+                raise DecodeError(
+                    'Unexpected end tag at offset {}.'.format(offset))
+        elif data[end - 1:end] != b'/':
+            depth += 1
+
+        offset = end + 1
+
+        if depth == 0:
+            return offset
@@ -0,0 +1,923 @@
+"""Generate specialized Python source code that encodes and decodes
+types of a compiled UPER specification.
+
+The generated code accumulates encoded bits in local variables and
+reads them at offsets computed by the code itself, with bit widths,
+enumeration and choice indexes and member names inlined as constants.
+Each SEQUENCE, SET, CHOICE, SEQUENCE OF and SET OF type is generated
+once as a function, and shared by all members of that type.
+
+Types not supported by the generator, for example unconstrained
+integers, strings, recursive types and extension additions, are
+encoded and decoded by the generic codec from within the generated
+code. Values and data the generated code cannot handle, for example
+already encoded values and invalid data, are encoded or decoded once
+again with the generic codec, which raises the usual exceptions.
+
+"""
+
+import os
+import sys
+import hashlib
+
+from .errors import Error
+from .errors import EncodeError
+from .errors import DecodeError
+from .compat import replace
+from .codecs import per
+from .codecs import uper
+
+
+# Flush the accumulated bits to the encoder when this many bits have
+# been accumulated while encoding SEQUENCE OF and SET OF, as large
+# integers are slow to shift.
+FLUSH_NUMBER_OF_BITS = 4096
+
+# Errors raised by the generated encoders for values they do not
+# encode, for example Encoded objects, values of other types, invalid
+# enumerations and choices, and missing members.
+ENCODE_ERRORS = (EncodeError, KeyError, TypeError, ValueError)
+
+# Errors raised by the generated decoders for invalid data, for
+# example out of data, and invalid enumeration and choice indexes.
+DECODE_ERRORS = (DecodeError, IndexError, ValueError)
+
+HEADER = '''\
+# This file was generated by asn1tools {version}. Do not edit.
+{imports}
+from asn1tools.codecs.uper import Encoder
+from asn1tools.codecs.uper import Decoder
+from asn1tools.codegen import read_bits
+'''
+
+ENCODE_PDU = '''\
+def encode_{index}(data):
+    encoder = Encoder()
+    value, number_of_bits = {function}(data, encoder, 0, 0)
+    encoder.append_non_negative_binary_integer(value, number_of_bits)
+
+    return encoder.as_bytearray()
+'''
+
+DECODE_PDU = '''\
+def decode_{index}(data):
+    decoder = Decoder(bytearray(data) + b'\\x00\\x00')
+    decoder.total_number_of_bits -= 16
+    decoder.number_of_bits = decoder.total_number_of_bits
+    value, offset = {function}(decoder, decoder.encoded, 0)
+
+    if offset > decoder.total_number_of_bits:
+        raise ValueError('Out of data.')
+
+    return value
+'''
+
+
+def read_bits(decoder, offset, number_of_bits):
+    """Read given number of bits at given bit offset.
+
+    """
+
+    decoder.number_of_bits = decoder.total_number_of_bits - offset
+
+    return decoder.read_bits(number_of_bits)
+
+
+def is_supported(type_):
+    """Returns True if the generator generates code for given type, and
+    False if it is encoded and decoded by the generic codec.
+
+    """
+
+    if isinstance(type_, (per.Boolean, per.Null, per.Enumerated, per.Choice)):
+        return True
+    elif isinstance(type_, per.MembersType):
+        return (not isinstance(type_, per.AdditionGroup)
+                and not type_._open_types)
+    elif isinstance(type_, (uper.Integer, per.ArrayType, per.OctetString)):
+        return type_.number_of_bits is not None
+    elif isinstance(type_, per.BitString):
+        return (type_.number_of_bits is not None
+                and not type_.has_named_bits)
+    else:
+        return False
+
+
+def format_dict(items):
+    return '{{{}}}'.format(', '.join(['{!r}: {!r}'.format(key, value)
+                                      for key, value in sorted(items)]))
+
+
+class Function(object):
+
+    def __init__(self, name, arguments):
+        self.name = name
+        self.lines = ['def {}({}):'.format(name, arguments)]
+        self.indent = 1
+        self.number_of_variables = 0
+
+    def add(self, line):
+        if line:
+            line = 4 * self.indent * ' ' + line
+
+        self.lines.append(line)
+
+    def variable(self, prefix):
+        self.number_of_variables += 1
+
+        return '{}{}'.format(prefix, self.number_of_variables)
+
+    def append_bits(self, value, number_of_bits):
+        """Add code appending given value of given number of bits to the
+        accumulated bits.
+
+        """
+
+        if number_of_bits == 0:
+            return
+
+        self.add('v = (v << {}) | {}'.format(number_of_bits, value))
+        self.add('n += {}'.format(number_of_bits))
+
+    def read_bits(self, variable, number_of_bits):
+        """Add code reading given number of bits into given variable. Up to
+        nine bits are read directly from the two bytes at the current
+        offset, as the buffer is padded with two zero bytes.
+
+        """
+
+        if number_of_bits == 0:
+            self.add('{} = 0'.format(variable))
+            return
+        elif number_of_bits == 1:
+            self.add('{} = (b[p >> 3] >> (7 - (p & 7))) & 1'.format(variable))
+        elif number_of_bits <= 9:
+            self.add(
+                '{} = ((b[p >> 3] << 8 | b[(p >> 3) + 1]) >> ({} - (p & 7))) '
+                '& {}'.format(variable,
+                              16 - number_of_bits,
+                              (1 << number_of_bits) - 1))
+        else:
+            self.add('{} = d.get_non_negative_binary_integer(p, {})'.format(
+                variable,
+                number_of_bits))
+
+        self.add('p += {}'.format(number_of_bits))
+
+    def source(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+class Generator(object):
+
+    def __init__(self):
+        self.constants = []
+        self.constant_names = {}
+        self.definitions = []
+        self.definition_names = {}
+        self.functions = []
+        self.encoders = {}
+        self.decoders = {}
+        self.imports = set()
+
+    def constant(self, value):
+        """Returns the name of a module global that is set to given object
+        when the generated module is loaded.
+
+        """
+
+        key = id(value)
+
+        if key not in self.constant_names:
+            self.constant_names[key] = '_c{}'.format(len(self.constants))
+            self.constants.append(value)
+
+        return self.constant_names[key]
+
+    def definition(self, literal):
+        """Returns the name of a module global initialized with given
+        literal.
+
+        """
+
+        if literal not in self.definition_names:
+            name = '_m{}'.format(len(self.definitions))
+            self.definitions.append('{} = {}'.format(name, literal))
+            self.definition_names[literal] = name
+
+        return self.definition_names[literal]
+
+    def function_key(self, type_):
+        """Types sharing members, elements or choices are generated as one
+        function.
+
+        """
+
+        if isinstance(type_, per.MembersType):
+            return ('members', id(type_.root_members))
+        elif isinstance(type_, per.Choice):
+            return ('choice', id(type_.root_index_to_member))
+        elif isinstance(type_, per.ArrayType):
+            return ('array', id(type_.element_type))
+        else:
+            return ('type', id(type_))
+
+    def is_function(self, type_):
+        return isinstance(type_, (per.MembersType, per.Choice, per.ArrayType))
+
+    def generate(self, type_):
+        """Generate encode and decode functions of given type, and return
+        their names.
+
+        """
+
+        return (self.generate_encode_function(type_),
+                self.generate_decode_function(type_))
+
+    def generate_encode_function(self, type_):
+        key = self.function_key(type_)
+
+        if key not in self.encoders:
+            function = Function('_e{}'.format(len(self.encoders)),
+                                'data, e, v, n')
+            self.encoders[key] = function.name
+
+            if not is_supported(type_):
+                self.generate_encode(function, type_, 'data')
+            elif isinstance(type_, per.MembersType):
+                self.generate_encode_members(function, type_)
+            elif isinstance(type_, per.Choice):
+                self.generate_encode_choice(function, type_)
+            elif isinstance(type_, per.ArrayType):
+                self.generate_encode_array(function, type_)
+            else:
+                self.generate_encode(function, type_, 'data')
+
+            function.add('')
+            function.add('return v, n')
+            self.functions.append(function)
+
+        return self.encoders[key]
+
+    def generate_decode_function(self, type_):
+        key = self.function_key(type_)
+
+        if key not in self.decoders:
+            function = Function('_d{}'.format(len(self.decoders)),
+                                'd, b, p')
+            self.decoders[key] = function.name
+
+            if not is_supported(type_):
+                value = self.generate_decode(function, type_)
+            elif isinstance(type_, per.MembersType):
+                value = self.generate_decode_members(function, type_)
+            elif isinstance(type_, per.Choice):
+                value = self.generate_decode_choice(function, type_)
+            elif isinstance(type_, per.ArrayType):
+                value = self.generate_decode_array(function, type_)
+            else:
+                value = self.generate_decode(function, type_)
+
+            function.add('')
+            function.add('return {}, p'.format(value))
+            self.functions.append(function)
+
+        return self.decoders[key]
+
+    def generate_encode_fallback(self, function, type_, value):
+        function.add('e.append_non_negative_binary_integer(v, n)')
+        function.add('{}.encode({}, e)'.format(self.constant(type_), value))
+        function.add('v = 0')
+        function.add('n = 0')
+
+    def generate_decode_fallback(self, function, type_, variable):
+        function.add('d.number_of_bits = d.total_number_of_bits - p')
+        function.add('{} = {}.decode(d)'.format(variable,
+                                                self.constant(type_)))
+        function.add('p = d.total_number_of_bits - d.number_of_bits')
+
+    def generate_encode(self, function, type_, value):
+        """Add code encoding given value of given type.
+
+        """
+
+        if not is_supported(type_):
+            self.generate_encode_fallback(function, type_, value)
+        elif self.is_function(type_):
+            function.add('v, n = {}({}, e, v, n)'.format(
+                self.generate_encode_function(type_),
+                value))
+        elif isinstance(type_, per.Boolean):
+            # Raises for values other than booleans, for example
+            # Encoded, which are then encoded by the generic codec.
+            bits = self.definition('{False: 0, True: 1}')
+            function.append_bits('{}[{}]'.format(bits, value), 1)
+        elif isinstance(type_, per.Null):
+            function.add('if {} is not None:'.format(value))
+            function.indent += 1
+            function.add("raise ValueError('Not None.')")
+            function.indent -= 1
+        elif isinstance(type_, uper.Integer):
+            self.generate_encode_integer(function, type_, value)
+        elif isinstance(type_, per.Enumerated):
+            self.generate_encode_enumerated(function, type_, value)
+        elif isinstance(type_, per.OctetString):
+            self.generate_encode_octet_string(function, type_, value)
+        elif isinstance(type_, per.BitString):
+            self.generate_encode_bit_string(function, type_, value)
+
+    def generate_encode_integer(self, function, type_, value):
+        if type_.has_extension_marker:
+            function.add('if {} <= {} <= {}:'.format(type_.minimum,
+                                                     value,
+                                                     type_.maximum))
+            function.indent += 1
+            function.append_bits('({} - {})'.format(value, type_.minimum),
+                                 type_.number_of_bits + 1)
+            function.indent -= 1
+            function.add('else:')
+            function.indent += 1
+            self.generate_encode_fallback(function, type_, value)
+            function.indent -= 1
+        else:
+            function.append_bits('({} - {})'.format(value, type_.minimum),
+                                 type_.number_of_bits)
+
+    def generate_encode_enumerated(self, function, type_, value):
+        indexes = self.definition(format_dict(type_.root_name_to_index.items()))
+        number_of_bits = type_.root_number_of_bits
+
+        if type_.additions_index_to_name is not None:
+            function.add('if {} in {}:'.format(value, indexes))
+            function.indent += 1
+            function.append_bits('{}[{}]'.format(indexes, value),
+                                 number_of_bits + 1)
+            function.indent -= 1
+            function.add('else:')
+            function.indent += 1
+            self.generate_encode_fallback(function, type_, value)
+            function.indent -= 1
+        elif number_of_bits == 0:
+            # Raises KeyError if the value is invalid.
+            function.add('{}[{}]'.format(indexes, value))
+        else:
+            function.append_bits('{}[{}]'.format(indexes, value),
+                                 number_of_bits)
+
+    def generate_encode_octet_string(self, function, type_, value):
+        length = function.variable('l')
+        function.add('{} = len({})'.format(length, value))
+
+        if type_.minimum != type_.maximum:
+            function.append_bits('({} - {})'.format(length, type_.minimum),
+                                 type_.number_of_bits)
+
+        self.imports.add('from binascii import hexlify')
+        function.add('if {}:'.format(length))
+        function.indent += 1
+        function.add('v = (v << (8 * {0})) | int(hexlify({1}), 16)'.format(
+            length,
+            value))
+        function.add('n += 8 * {}'.format(length))
+        function.indent -= 1
+
+    def generate_encode_bit_string(self, function, type_, value):
+        data = function.variable('b')
+        length = function.variable('l')
+        function.add('{}, {} = {}'.format(data, length, value))
+
+        if type_.minimum != type_.maximum:
+            function.append_bits('({} - {})'.format(length, type_.minimum),
+                                 type_.number_of_bits)
+
+        self.imports.add('from binascii import hexlify')
+        function.add('if {}:'.format(length))
+        function.indent += 1
+        function.add(
+            'v = (v << {length}) | (int(hexlify({data}), 16) '
+            '>> (8 * len({data}) - {length}))'.format(data=data,
+                                                      length=length))
+        function.add('n += {}'.format(length))
+        function.indent -= 1
+
+    def generate_encode_members(self, function, type_):
+        if type_.additions:
+            names = []
+
+            for addition in type_.additions:
+                if isinstance(addition, per.AdditionGroup):
+                    names += [member.name for member in addition.root_members]
+                else:
+                    names.append(addition.name)
+
+            names = self.definition('frozenset({!r})'.format(sorted(names)))
+            function.add('if not {}.isdisjoint(data):'.format(names))
+            function.indent += 1
+            self.generate_encode_fallback(function, type_, 'data')
+            function.add('')
+            function.add('return v, n')
+            function.indent -= 1
+            function.add('')
+
+        # The extension bit and the presence bits.
+        presence_bits = []
+
+        for member in type_.optionals:
+            present = function.variable('p')
+
+            if member.optional:
+                function.add('{} = {!r} in data'.format(present, member.name))
+            elif isinstance(member, per.BitString):
+                function.add(
+                    '{present} = {name!r} in data and not '
+                    '{member}.is_default(data[{name!r}])'.format(
+                        present=present,
+                        name=member.name,
+                        member=self.constant(member)))
+            else:
+                function.add(
+                    '{present} = {name!r} in data and not '
+                    'data[{name!r}] == {default}'.format(
+                        present=present,
+                        name=member.name,
+                        default=self.constant(member.default)))
+
+            presence_bits.append((member, present))
+
+        number_of_bits = len(presence_bits)
+
+        if type_.additions is not None:
+            number_of_bits += 1
+
+        if number_of_bits > 0:
+            function.append_bits(
+                '({})'.format(' | '.join(
+                    ['0']
+                    + ['({} << {})'.format(present, len(presence_bits) - i - 1)
+                       for i, (_, present) in enumerate(presence_bits)])),
+                number_of_bits)
+
+        presence_bits = dict(presence_bits)
+
+        for member in type_.root_members:
+            value = function.variable('x')
+
+            if member in presence_bits:
+                function.add('if {}:'.format(presence_bits[member]))
+                function.indent += 1
+
+            function.add('{} = data[{!r}]'.format(value, member.name))
+            self.generate_encode(function, member, value)
+
+            if member in presence_bits:
+                function.indent -= 1
+
+    def generate_encode_choice(self, function, type_):
+        number_of_bits = type_.root_number_of_bits
+
+        if type_.additions_index_to_member is not None:
+            number_of_bits += 1
+
+        function.add('name = data[0]')
+
+        for index, member in sorted(type_.root_index_to_member.items()):
+            function.add('{} name == {!r}:'.format('if' if index == 0 else 'elif',
+                                                   member.name))
+            function.indent += 1
+            function.append_bits(index, number_of_bits)
+            value = function.variable('x')
+            function.add('{} = data[1]'.format(value))
+            self.generate_encode(function, member, value)
+            function.indent -= 1
+
+        function.add('else:')
+        function.indent += 1
+
+        if type_.additions_index_to_member is not None:
+            self.generate_encode_fallback(function, type_, 'data')
+        else:
+            function.add("raise ValueError('Bad choice.')")
+
+        function.indent -= 1
+
+    def generate_encode_array(self, function, type_):
+        function.add('l = len(data)')
+
+        if type_.has_extension_marker:
+            function.add('if not {} <= l <= {}:'.format(type_.minimum,
+                                                        type_.maximum))
+            function.indent += 1
+            self.generate_encode_fallback(function, type_, 'data')
+            function.add('')
+            function.add('return v, n')
+            function.indent -= 1
+            function.add('')
+            function.append_bits('(l - {})'.format(type_.minimum),
+                                 type_.number_of_bits + 1)
+        elif type_.minimum != type_.maximum:
+            function.append_bits('(l - {})'.format(type_.minimum),
+                                 type_.number_of_bits)
+
+        function.add('')
+        function.add('for x in data:')
+        function.indent += 1
+        self.generate_encode(function, type_.element_type, 'x')
+        function.add('')
+        function.add('if n > {}:'.format(FLUSH_NUMBER_OF_BITS))
+        function.indent += 1
+        function.add('e.append_non_negative_binary_integer(v, n)')
+        function.add('v = 0')
+        function.add('n = 0')
+        function.indent -= 2
+
+    def generate_decode(self, function, type_):
+        """Add code decoding a value of given type, and return the name of
+        the variable the decoded value is assigned to.
+
+        """
+
+        value = function.variable('x')
+
+        if not is_supported(type_):
+            self.generate_decode_fallback(function, type_, value)
+        elif self.is_function(type_):
+            function.add('{}, p = {}(d, b, p)'.format(
+                value,
+                self.generate_decode_function(type_)))
+        elif isinstance(type_, per.Boolean):
+            function.read_bits(value, 1)
+            function.add('{0} = ({0} == 1)'.format(value))
+        elif isinstance(type_, per.Null):
+            function.add('{} = None'.format(value))
+        elif isinstance(type_, uper.Integer):
+            self.generate_decode_integer(function, type_, value)
+        elif isinstance(type_, per.Enumerated):
+            self.generate_decode_enumerated(function, type_, value)
+        elif isinstance(type_, per.OctetString):
+            self.generate_decode_octet_string(function, type_, value)
+        elif isinstance(type_, per.BitString):
+            self.generate_decode_bit_string(function, type_, value)
+
+        return value
+
+    def generate_decode_extension_bit(self,
+                                      function,
+                                      type_,
+                                      value,
+                                      number_of_bits,
+                                      return_=False):
+        """Read the extension bit followed by given number of root bits into
+        given variable, and decode the value with the generic codec if
+        the extension bit is set. Returns from the function if `return_`
+        is ``True``, otherwise the caller adds the root code to an else
+        block.
+
+        """
+
+        function.read_bits(value, number_of_bits + 1)
+        function.add('')
+        function.add('if {} >> {}:'.format(value, number_of_bits))
+        function.indent += 1
+        function.add('p -= {}'.format(number_of_bits + 1))
+        self.generate_decode_fallback(function, type_, value)
+
+        if return_:
+            function.add('')
+            function.add('return {}, p'.format(value))
+            function.indent -= 1
+            function.add('')
+        else:
+            function.indent -= 1
+            function.add('else:')
+            function.indent += 1
+
+    def generate_decode_integer(self, function, type_, value):
+        if type_.has_extension_marker:
+            self.generate_decode_extension_bit(function,
+                                               type_,
+                                               value,
+                                               type_.number_of_bits)
+            function.add('{} += {}'.format(value, type_.minimum))
+            function.indent -= 1
+        else:
+            function.read_bits(value, type_.number_of_bits)
+            function.add('{} += {}'.format(value, type_.minimum))
+
+    def generate_decode_enumerated(self, function, type_, value):
+        names = self.definition(
+            repr(tuple([name
+                        for _, name in sorted(type_.root_index_to_name.items())])))
+        number_of_bits = type_.root_number_of_bits
+
+        if type_.additions_index_to_name is not None:
+            self.generate_decode_extension_bit(function,
+                                               type_,
+                                               value,
+                                               number_of_bits)
+            function.add('{0} = {1}[{0}]'.format(value, names))
+            function.indent -= 1
+        else:
+            function.read_bits(value, number_of_bits)
+            function.add('{0} = {1}[{0}]'.format(value, names))
+
+    def generate_decode_length(self, function, type_, length):
+        function.read_bits(length, type_.number_of_bits)
+        function.add('{} += {}'.format(length, type_.minimum))
+
+    def generate_decode_octet_string(self, function, type_, value):
+        length = function.variable('l')
+        self.generate_decode_length(function, type_, length)
+        function.add('{} = read_bits(d, p, 8 * {})'.format(value, length))
+        function.add('p += 8 * {}'.format(length))
+
+    def generate_decode_bit_string(self, function, type_, value):
+        length = function.variable('l')
+        self.generate_decode_length(function, type_, length)
+        function.add('{0} = (read_bits(d, p, {1}), {1})'.format(value, length))
+        function.add('p += {}'.format(length))
+
+    def generate_decode_members(self, function, type_):
+        number_of_bits = len(type_.optionals)
+
+        if type_.additions is not None:
+            self.generate_decode_extension_bit(function,
+                                               type_,
+                                               'bits',
+                                               number_of_bits,
+                                               return_=True)
+        elif number_of_bits > 0:
+            function.read_bits('bits', number_of_bits)
+
+        function.add('values = {}')
+        presence_masks = {
+            member: (1 << (number_of_bits - i - 1))
+            for i, member in enumerate(type_.optionals)
+        }
+
+        for member in type_.root_members:
+            if member in presence_masks:
+                function.add('')
+                function.add('if bits & {}:'.format(presence_masks[member]))
+                function.indent += 1
+
+            value = self.generate_decode(function, member)
+            function.add('values[{!r}] = {}'.format(member.name, value))
+
+            if member in presence_masks:
+                function.indent -= 1
+
+                if member.default is not None:
+                    function.add('else:')
+                    function.indent += 1
+                    function.add('values[{!r}] = {}'.format(
+                        member.name,
+                        self.constant(member.default)))
+                    function.indent -= 1
+
+                function.add('')
+
+        return 'values'
+
+    def generate_decode_choice(self, function, type_):
+        number_of_bits = type_.root_number_of_bits
+
+        if type_.additions_index_to_member is not None:
+            self.generate_decode_extension_bit(function,
+                                               type_,
+                                               'index',
+                                               number_of_bits,
+                                               return_=True)
+        else:
+            function.read_bits('index', number_of_bits)
+
+        function.add('')
+
+        for index, member in sorted(type_.root_index_to_member.items()):
+            function.add('{} index == {}:'.format('if' if index == 0 else 'elif',
+                                                  index))
+            function.indent += 1
+            value = self.generate_decode(function, member)
+            function.add('value = ({!r}, {})'.format(member.name, value))
+            function.indent -= 1
+
+        function.add('else:')
+        function.indent += 1
+        function.add("raise ValueError('Bad choice index.')")
+        function.indent -= 1
+
+        return 'value'
+
+    def generate_decode_array(self, function, type_):
+        if type_.has_extension_marker:
+            self.generate_decode_extension_bit(function,
+                                               type_,
+                                               'length',
+                                               type_.number_of_bits,
+                                               return_=True)
+            function.add('length += {}'.format(type_.minimum))
+        else:
+            self.generate_decode_length(function, type_, 'length')
+
+        function.add('values = []')
+        function.add('')
+        function.add('for _ in range(length):')
+        function.indent += 1
+        value = self.generate_decode(function, type_.element_type)
+        function.add('values.append({})'.format(value))
+        function.indent -= 1
+
+        return 'values'
+
+    def source(self, pdus):
+        from . import __version__
+
+        if self.imports:
+            imports = '\n' + '\n'.join(sorted(self.imports)) + '\n'
+        else:
+            imports = ''
+
+        parts = [HEADER.format(version=__version__, imports=imports)]
+
+        if self.definitions:
+            parts.append('\n'.join(self.definitions) + '\n')
+
+        for function in self.functions:
+            parts.append(function.source())
+
+        encoders = []
+        decoders = []
+
+        for index, (name, encode, decode) in enumerate(pdus):
+            parts.append(ENCODE_PDU.format(index=index, function=encode))
+            parts.append(DECODE_PDU.format(index=index, function=decode))
+            encoders.append('    {!r}: encode_{},'.format(name, index))
+            decoders.append('    {!r}: decode_{},'.format(name, index))
+
+        parts.append('ENCODERS = {\n' + '\n'.join(encoders) + '\n}\n')
+        parts.append('DECODERS = {\n' + '\n'.join(decoders) + '\n}\n')
+
+        return '\n\n'.join(parts)
+
+
+def _load_module(source, constants, cache_dir):
+    if cache_dir is None:
+        module = {}
+        exec(compile(source, '<asn1tools.codegen>', 'exec'), module)
+    else:
+        module_name = 'asn1tools_codegen_{}'.format(
+            hashlib.sha256(source.encode('utf-8')).hexdigest()[:32])
+        filename = os.path.join(cache_dir, module_name + '.py')
+
+        if not os.path.exists(filename):
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+
+            # Write to a temporary file and replace any existing module
+            # with it to make the module appear atomically to
+            # concurrent processes.
+            temporary_filename = '{}.{}.tmp'.format(filename, os.getpid())
+
+            with open(temporary_filename, 'w') as fout:
+                fout.write(source)
+
+            replace(temporary_filename, filename)
+
+        # The byte code of the module is cached by the import system.
+        if sys.version_info[0] > 2:
+            import importlib.util
+
+            spec = importlib.util.spec_from_file_location(module_name, filename)
+            loaded = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(loaded)
+        else:
+            import imp
+
+            loaded = imp.load_source(module_name, filename)
+
+        module = loaded.__dict__
+
+    for i, constant in enumerate(constants):
+        module['_c{}'.format(i)] = constant
+
+    return module
+
+
+class GeneratedSpecification(object):
+    """Encode and decode types of a UPER specification with generated
+    code. Instances of this class are created by
+    :func:`~asn1tools.codegen.generate()`.
+
+    """
+
+    def __init__(self, specification, source, module):
+        self._types = specification.types
+        self._source = source
+        self._encoders = module['ENCODERS']
+        self._decoders = module['DECODERS']
+
+    @property
+    def source(self):
+        """The generated Python source code.
+
+        """
+
+        return self._source
+
+    def encode(self, name, data, check_types=True, check_constraints=False):
+        """Encode given dictionary `data` as given type `name` and return the
+        encoded data as a bytes object. See
+        :meth:`asn1tools.compiler.Specification.encode()` for details.
+
+        """
+
+        try:
+            type_ = self._types[name]
+        except KeyError:
+            raise EncodeError(
+                "Type '{}' not found in types dictionary.".format(name))
+
+        if check_types:
+            type_.check_types(data)
+
+        if check_constraints:
+            type_.check_constraints(data)
+
+        if name in self._encoders:
+            try:
+                return self._encoders[name](data)
+            except ENCODE_ERRORS:
+                pass
+
+        return type_.encode(data)
+
+    def decode(self, name, data, check_constraints=False):
+        """Decode given bytes object `data` as given type `name` and return
+        the decoded data as a dictionary. See
+        :meth:`asn1tools.compiler.Specification.decode()` for details.
+
+        """
+
+        try:
+            type_ = self._types[name]
+        except KeyError:
+            raise DecodeError(
+                "Type '{}' not found in types dictionary.".format(name))
+
+        if name in self._decoders:
+            try:
+                decoded = self._decoders[name](data)
+            except DECODE_ERRORS:
+                decoded = type_.decode(data)
+        else:
+            decoded = type_.decode(data)
+
+        if check_constraints:
+            type_.check_constraints(decoded)
+
+        return decoded
+
+
+def generate(specification, type_names=None, cache_dir=None):
+    """Generate Python source code that encodes and decodes given types
+    `type_names` of given UPER specification `specification`, and
+    return a :class:`~asn1tools.codegen.GeneratedSpecification`
+    object. All types are generated if `type_names` is ``None``. Other
+    types are encoded and decoded by the specification.
+
+    `cache_dir` is a directory where the generated source code is
+    stored as a module, and its byte code cached by Python. Modules
+    are compiled from source every time if `cache_dir` is ``None``.
+
+    >>> from asn1tools import codegen
+    >>> foo = asn1tools.compile_files('tests/files/foo.asn', 'uper')
+    >>> generated = codegen.generate(foo, ['Question'])
+    >>> generated.encode('Question', {'id': 1, 'question': 'Is 1+1=3?'})
+    bytearray(b'\\x01\\x01\\t\\x93\\xcd\\x03\\x15l^\\xb3~')
+
+    """
+
+    if type_names is None:
+        type_names = sorted(specification.types)
+
+    generator = Generator()
+    pdus = []
+
+    for type_name in type_names:
+        try:
+            compiled = specification.types[type_name]
+        except KeyError:
+            raise Error(
+                "Type '{}' not found in types dictionary.".format(type_name))
+
+        if not isinstance(compiled, uper.CompiledType):
+            raise Error(
+                "Code can only be generated for the 'uper' codec, but type "
+                "'{}' is not a UPER type.".format(type_name))
+
+        encode, decode = generator.generate(compiled.type)
+        pdus.append((type_name, encode, decode))
+
+    source = generator.source(pdus)
+    module = _load_module(source, generator.constants, cache_dir)
+
+    return GeneratedSpecification(specification, source, module)
@@ -9,13 +9,25 @@ from datetime import tzinfo
 
 
 if sys.version_info[0] > 2:
+    from collections.abc import Mapping
+    from collections.abc import Sequence
     from datetime import timezone
+    from os import replace
 
+    STRING_TYPES = (str, )
+    INTEGER_TYPES = (int, )
     UTC = timezone.utc
 
     def strptime(data, fmt):
         return datetime.strptime(data, fmt)
 else:
+    from os import rename as replace
+    from collections import Mapping
+    from collections import Sequence
+
+    STRING_TYPES = (str, unicode)
+    INTEGER_TYPES = (int, long)
+
     class timezone(tzinfo):
 
         def __init__(self, offset):
@@ -3,6 +3,10 @@ encode and decode types.
 
 """
 
+import os
+import hashlib
+import pickle
+
 from .parser import parse_files
 from .parser import parse_string
 from .codecs import compiler
@@ -19,6 +23,21 @@ from .codecs import constraints_checker
 from .errors import CompileError
 from .errors import EncodeError
 from .errors import DecodeError
+from .compat import Mapping
+from .compat import replace
+from .compat import STRING_TYPES
+
+
+CODECS = {
+    'ber': ber,
+    'der': der,
+    'gser': gser,
+    'jer': jer,
+    'oer': oer,
+    'per': per,
+    'uper': uper,
+    'xer': xer
+}
 
 
 class Specification(object):
@@ -32,33 +51,10 @@ class Specification(object):
 
     """
 
-    def __init__(self,
-                 modules,
-                 decode_length,
-                 type_checkers,
-                 constraints_checkers):
+    def __init__(self, modules, types, decode_length):
         self._modules = modules
+        self._types = types
         self._decode_length = decode_length
-        self._types = {}
-
-        duplicated = set()
-
-        for module_name in modules:
-            types = modules[module_name]
-
-            for type_name, type_ in types.items():
-                type_.type_checker = type_checkers[module_name][type_name]
-                type_.constraints_checker = constraints_checkers[module_name][type_name]
-
-                if type_name in duplicated:
-                    continue
-
-                if type_name in self._types:
-                    del self._types[type_name]
-                    duplicated.add(type_name)
-                    continue
-
-                self._types[type_name] = type_
 
     @property
     def types(self):
@@ -116,6 +112,12 @@ class Specification(object):
         instead get less informative error messages and allow encoding
         of values not fulfilling the constraints.
 
+        With the BER, DER, PER, UPER and OER codecs the value of any
+        member, element or chosen alternative in `data` may be an
+        :class:`~asn1tools.Encoded` object with its already encoded
+        data, which is inserted as is into the encoding. The other
+        codecs raise an EncodeError for such values.
+
         >>> foo.encode('Question', {'id': 1, 'question': 'Is 1+1=3?'})
         b'0\\x0e\\x02\\x01\\x01\\x16\\x09Is 1+1=3?'
 
@@ -135,7 +137,7 @@ class Specification(object):
 
         return type_.encode(data, **kwargs)
 
-    def decode(self, name, data, check_constraints=False):
+    def decode(self, name, data, check_constraints=False, **kwargs):
         """Decode given bytes object `data` as given type `name` and return
         the decoded data as a dictionary.
 
@@ -147,6 +149,44 @@ class Specification(object):
         instead allow decoding of values not fulfilling the
         constraints.
 
+        BER and DER decoding of any object supporting the buffer
+        protocol, for example an :class:`mmap.mmap`, without copying
+        it is enabled by setting `zero_copy` to ``True`` (Python 3
+        only). OCTET STRING, BIT STRING and ANY values are then
+        :class:`memoryview` slices of `data`, unless encoded as
+        several segments. Such values can be encoded again.
+
+        BER and DER SEQUENCE, SET, SEQUENCE OF and SET OF values are
+        decoded on access if `lazy` is ``True``. They are then
+        read-only dictionaries and lists, where each member and
+        element is decoded on first access, and decode errors are
+        raised when accessed. They can be encoded again.
+
+        PER and UPER open types constrained by an information object
+        set are decoded as the type of the object given by the
+        constraining member, also when the object set is an actual
+        parameter of a parameterized type, as in S1AP and X2AP
+        protocol IE containers. Values of unknown objects are left
+        encoded. If `lazy` is ``True`` they are instead
+        :class:`~asn1tools.codecs.per.LazyOpenType` objects, decoded on
+        first access of their `value`, and encoded again as is.
+
+        The original BER and DER encodings of members are found by
+        giving their paths in `spans`, for example
+        ``['tbsCertificate', 'tbsCertificate.issuer']``. A path is
+        member names separated by dots, where elements of SEQUENCE
+        OF and SET OF are implicit. A tuple of the decoded data and a
+        dictionary of each path to a list of offsets and lengths of
+        its encodings in `data` is then returned.
+
+        Only the members at given paths in `select` are decoded, for
+        example ``['header.id', 'payload']``, with paths as in
+        `spans`. All other members are skipped over and left out of
+        the decoded data, and an unselected CHOICE alternative is
+        decoded as ``(name, None)``. Selecting a member selects its
+        whole value. XER and JER data is decoded in full and then
+        filtered.
+
         >>> foo.decode('Question', b'0\\x0e\\x02\\x01\\x01\\x16\\x09Is 1+1=3?')
         {'id': 1, 'question': 'Is 1+1=3?'}
 
@@ -158,27 +198,226 @@ class Specification(object):
             raise DecodeError(
                 "Type '{}' not found in types dictionary.".format(name))
 
-        decoded = type_.decode(data)
+        decoded = type_.decode(data, **kwargs)
 
         if check_constraints:
             type_.check_constraints(decoded)
 
         return decoded
 
-    def decode_length(self, data):
+    def decode_length(self, data, name=None):
         """Decode the length of given data `data`. Returns None if not enough
         data was given to decode the length.
 
-        This method only works for BER and DER codecs with definite
-        length in the first data encoding. Other codecs and
-        combinations lacks length information in the data.
+        BER and DER lengths are found in the encoding. An indefinite
+        length in the first data encoding is only decoded when all
+        its contents have been given.
+
+        XER and JER lengths are found by scanning for the end of the
+        first element or JSON value. JER numbers, true, false and
+        null are only complete when followed by another character.
+
+        PER, UPER and OER encodings lack length information, so the
+        type `name` of the data must be given. The encoding is then
+        walked, skipping over values where possible instead of decoding
+        them.
 
         >>> foo.decode_length(b'\\x30\\x0e\\x02\\x01\\x01')
         16
 
         """
 
-        return self._decode_length(data)
+        if name is None:
+            return self._decode_length(data)
+
+        try:
+            type_ = self._types[name]
+        except KeyError:
+            raise DecodeError(
+                "Type '{}' not found in types dictionary.".format(name))
+
+        return type_.decode_length(data)
+
+
+class LazyModule(Mapping):
+    """A dictionary of the types in a module, where each type is
+    compiled on first access.
+
+    """
+
+    def __init__(self, compiler, module_name, type_descriptors):
+        self._compiler = compiler
+        self._module_name = module_name
+        self._type_descriptors = type_descriptors
+
+    def __getitem__(self, type_name):
+        if type_name not in self._type_descriptors:
+            raise KeyError(type_name)
+
+        return self._compiler.compile_type(self._module_name, type_name)
+
+    def __iter__(self):
+        return iter(self._type_descriptors)
+
+    def __len__(self):
+        return len(self._type_descriptors)
+
+    def __repr__(self):
+        return 'LazyModule({})'.format(self._module_name)
+
+
+class LazyTypes(Mapping):
+    """A dictionary of all unique types in a specification, where each
+    type is compiled on first access.
+
+    """
+
+    def __init__(self, compiler, type_name_to_module_name):
+        self._compiler = compiler
+        self._type_name_to_module_name = type_name_to_module_name
+
+    def __getitem__(self, type_name):
+        module_name = self._type_name_to_module_name[type_name]
+
+        return self._compiler.compile_type(module_name, type_name)
+
+    def __iter__(self):
+        return iter(self._type_name_to_module_name)
+
+    def __len__(self):
+        return len(self._type_name_to_module_name)
+
+    def __repr__(self):
+        return 'LazyTypes()'
+
+
+class LazyCheckersCompiler(object):
+    """Compiles type and constraints checkers one type at a time when
+    requested.
+
+    """
+
+    def __init__(self, specification):
+        self._type_checker_compiler = type_checker.Compiler(specification)
+        self._constraints_checker_compiler = constraints_checker.Compiler(
+            specification)
+
+    def compile_type(self, module_name, type_name):
+        return (
+            self._type_checker_compiler.process_lazy(module_name, type_name),
+            self._constraints_checker_compiler.process_lazy(module_name,
+                                                            type_name)
+        )
+
+
+class LazyCompiler(object):
+    """Compiles types one at a time when requested, and attaches type
+    and constraints checkers to them.
+
+    """
+
+    def __init__(self, specification, codec, checkers_compiler):
+        self._codec_compiler = codec.Compiler(specification)
+        self._checkers_compiler = checkers_compiler
+        self._compiled = {}
+
+    def compile_type(self, module_name, type_name):
+        key = (module_name, type_name)
+
+        try:
+            return self._compiled[key]
+        except KeyError:
+            pass
+
+        compiled = self._codec_compiler.process_lazy(module_name, type_name)
+        compiled.type_checker, compiled.constraints_checker = (
+            self._checkers_compiler.compile_type(module_name, type_name))
+        self._compiled[key] = compiled
+
+        return compiled
+
+
+def _unique_type_names(specification):
+    """Returns a dictionary of type names found in exactly one module,
+    mapped to the name of that module.
+
+    """
+
+    type_name_to_module_name = {}
+    duplicated = set()
+
+    for module_name in specification:
+        for type_name in specification[module_name]['types']:
+            if type_name in duplicated:
+                continue
+
+            if type_name in type_name_to_module_name:
+                del type_name_to_module_name[type_name]
+                duplicated.add(type_name)
+                continue
+
+            type_name_to_module_name[type_name] = module_name
+
+    return type_name_to_module_name
+
+
+def _compile_eager(specification, codecs):
+    """Compile given pre-processed specification for each codec in
+    `codecs`. All codecs share the same type and constraints checkers.
+
+    """
+
+    type_checkers = type_checker.Compiler(specification).process_types()
+    constraints_checkers = constraints_checker.Compiler(
+        specification).process_types()
+    type_names = _unique_type_names(specification)
+    specifications = []
+
+    for codec in codecs:
+        modules = codec.Compiler(specification).process_types()
+
+        for module_name, types in modules.items():
+            for type_name, type_ in types.items():
+                type_.type_checker = type_checkers[module_name][type_name]
+                type_.constraints_checker = (
+                    constraints_checkers[module_name][type_name])
+
+        types = {
+            type_name: modules[module_name][type_name]
+            for type_name, module_name in type_names.items()
+        }
+        specifications.append(Specification(modules,
+                                            types,
+                                            codec.decode_length))
+
+    return specifications
+
+
+def _compile_lazy(specification, codecs):
+    """Create a specification that compiles types on first access for
+    each codec in `codecs`. All codecs share the same type and
+    constraints checkers.
+
+    """
+
+    checkers_compiler = LazyCheckersCompiler(specification)
+    type_names = _unique_type_names(specification)
+    specifications = []
+
+    for codec in codecs:
+        codec_compiler = LazyCompiler(specification, codec, checkers_compiler)
+        modules = {
+            module_name: LazyModule(codec_compiler,
+                                    module_name,
+                                    specification[module_name]['types'])
+            for module_name in specification
+        }
+        types = LazyTypes(codec_compiler, type_names)
+        specifications.append(Specification(modules,
+                                            types,
+                                            codec.decode_length))
+
+    return specifications
 
 
 def _compile_any_defined_by_type(type_, choices):
@@ -211,50 +450,200 @@ def _compile_any_defined_by_choices(specification,
                 break
 
 
-def compile_dict(specification, codec='ber', any_defined_by_choices=None):
+SECTIONS = ['types', 'values', 'object-classes', 'object-sets']
+
+
+def _iter_strings(item):
+    """Yields all strings found in given descriptor.
+
+    """
+
+    if isinstance(item, str):
+        yield item
+    elif isinstance(item, dict):
+        for value in item.values():
+            for string in _iter_strings(value):
+                yield string
+    elif isinstance(item, (list, tuple)):
+        for value in item:
+            for string in _iter_strings(value):
+                yield string
+
+
+def _lookup_definitions(specification, module_name, name):
+    """Returns a list of (module name, section, name) tuples of all
+    definitions that may be referenced by given name in given module.
+
+    """
+
+    module = specification[module_name]
+    definitions = []
+
+    for section in SECTIONS:
+        if name in module.get(section, {}):
+            definitions.append((module_name, section, name))
+
+    for from_module_name, imports in module['imports'].items():
+        if name not in imports:
+            continue
+
+        from_module = specification.get(from_module_name)
+
+        if from_module is None:
+            continue
+
+        for section in SECTIONS:
+            if name in from_module.get(section, {}):
+                definitions.append((from_module_name, section, name))
+
+    return definitions
+
+
+def _prune_specification(specification, roots):
+    """Returns a copy of given specification with only the types, values,
+    object classes and object sets reachable from the root types
+    `roots`.
+
+    """
+
+    stack = []
+
+    for root in roots:
+        module_names = [
+            module_name
+            for module_name in specification
+            if root in specification[module_name]['types']
+        ]
+
+        if not module_names:
+            raise CompileError("Root type '{}' not found.".format(root))
+
+        for module_name in module_names:
+            stack.append((module_name, 'types', root))
+
+    reachable = set()
+
+    while stack:
+        definition = stack.pop()
+
+        if definition in reachable:
+            continue
+
+        reachable.add(definition)
+        module_name, section, name = definition
+        descriptor = specification[module_name][section][name]
+
+        for string in set(_iter_strings(descriptor)):
+            names = set([string, string.split('.')[0]])
+
+            for name in names:
+                stack.extend(_lookup_definitions(specification,
+                                                 module_name,
+                                                 name))
+
+    pruned = {}
+
+    for module_name, module in specification.items():
+        module = dict(module)
+
+        for section in SECTIONS:
+            if section not in module:
+                continue
+
+            module[section] = {
+                name: descriptor
+                for name, descriptor in module[section].items()
+                if (module_name, section, name) in reachable
+            }
+
+        pruned[module_name] = module
+
+    return pruned
+
+
+def compile_dict(specification,
+                 codec='ber',
+                 any_defined_by_choices=None,
+                 lazy=False,
+                 roots=None,
+                 codecs=None):
     """Compile given ASN.1 specification dictionary and return a
     :class:`~asn1tools.compiler.Specification` object that can be used
     to encode and decode data structures with given codec
     `codec`. `codec` may be one of ``'ber'``, ``'der'``, ``'gser'``,
     ``'jer'``, ``oer``, ``'per'``, ``'uper'`` and ``'xer'``.
 
+    Give `lazy` as ``True`` to compile each type on first access
+    instead of compiling all types up front. Types that are never used
+    are never compiled, but compile errors are raised on first access.
+
+    Give `roots` as a list of type names to only compile those types
+    and the types, values, object classes and object sets they
+    reference, directly or indirectly. Everything else is removed from
+    the specification before it is compiled.
+
+    Give `codecs` as a list of codecs to compile the specification for
+    all of them at once, instead of for `codec` only. A dictionary of
+    codec names and :class:`~asn1tools.compiler.Specification`
+    objects is returned. The specification is pre-processed once, and
+    the type and constraints checkers are shared by all codecs.
+
     >>> foo = asn1tools.compile_dict(asn1tools.parse_files('foo.asn'))
+    >>> foo = asn1tools.compile_dict(asn1tools.parse_files('foo.asn'),
+    ...                              codecs=['uper', 'jer'])
+    >>> foo['jer'].encode('Question', {'id': 1, 'question': 'Is 1+1=3?'})
+    b'{"id":1,"question":"Is 1+1=3?"}'
 
     """
 
-    codecs = {
-        'ber': ber,
-        'der': der,
-        'gser': gser,
-        'jer': jer,
-        'oer': oer,
-        'per': per,
-        'uper': uper,
-        'xer': xer
-    }
+    if codecs is None:
+        codec_names = [codec]
+    else:
+        codec_names = codecs
 
-    try:
-        codec = codecs[codec]
-    except KeyError:
-        raise CompileError("Unsupported codec '{}'.".format(codec))
+    codec_modules = []
+
+    for codec_name in codec_names:
+        try:
+            codec_modules.append(CODECS[codec_name])
+        except KeyError:
+            raise CompileError("Unsupported codec '{}'.".format(codec_name))
 
     if any_defined_by_choices:
         _compile_any_defined_by_choices(specification,
                                         any_defined_by_choices)
 
-    return Specification(codec.compile_dict(specification),
-                         codec.decode_length,
-                         type_checker.compile_dict(specification),
-                         constraints_checker.compile_dict(specification))
+    if roots is not None:
+        specification = _prune_specification(specification, roots)
+
+    compiler.pre_process(specification)
+
+    if lazy:
+        specifications = _compile_lazy(specification, codec_modules)
+    else:
+        specifications = _compile_eager(specification, codec_modules)
 
+    if codecs is None:
+        return specifications[0]
+    else:
+        return dict(zip(codec_names, specifications))
 
-def compile_string(string, codec='ber', any_defined_by_choices=None):
+
+def compile_string(string,
+                   codec='ber',
+                   any_defined_by_choices=None,
+                   lazy=False,
+                   roots=None,
+                   codecs=None):
     """Compile given ASN.1 specification string and return a
     :class:`~asn1tools.compiler.Specification` object that can be used
     to encode and decode data structures with given codec
     `codec`. `codec` may be one of ``'ber'``, ``'der'``, ``'gser'``,
     ``'jer'``, ``oer``, ``'per'``, ``'uper'`` and ``'xer'``.
 
+    See :func:`~asn1tools.compile_dict()` for a description of
+    `lazy`, `roots` and `codecs`.
+
     >>> with open('foo.asn') as fin:
     ...     foo = asn1tools.compile_string(fin.read())
 
@@ -262,13 +651,20 @@ def compile_string(string, codec='ber', any_defined_by_choices=None):
 
     return compile_dict(parse_string(string),
                         codec,
-                        any_defined_by_choices)
+                        any_defined_by_choices,
+                        lazy,
+                        roots,
+                        codecs)
 
 
 def compile_files(filenames,
                   codec='ber',
                   any_defined_by_choices=None,
-                  encoding='utf-8'):
+                  encoding='utf-8',
+                  cache_dir=None,
+                  lazy=False,
+                  roots=None,
+                  codecs=None):
     """Compile given ASN.1 specification file(s) and return a
     :class:`~asn1tools.compiler.Specification` object that can be used
     to encode and decode data structures with given codec
@@ -278,13 +674,120 @@ def compile_files(filenames,
     `encoding` is the text encoding. This argument is passed to the
     built-in function `open()`.
 
+    `cache_dir` is a directory where the compiled specification is
+    stored, and loaded from on subsequent calls with the same file
+    contents, codec, `any_defined_by_choices` and asn1tools
+    version. The specification is compiled as usual if `cache_dir` is
+    ``None``.
+
+    See :func:`~asn1tools.compile_dict()` for a description of
+    `lazy`, `roots` and `codecs`.
+
     >>> foo = asn1tools.compile_files('foo.asn')
 
     """
 
-    return compile_dict(parse_files(filenames, encoding),
-                        codec,
-                        any_defined_by_choices)
+    if cache_dir is None:
+        return compile_dict(parse_files(filenames, encoding),
+                            codec,
+                            any_defined_by_choices,
+                            lazy,
+                            roots,
+                            codecs)
+
+    return _compile_files_cache(filenames,
+                                codec,
+                                any_defined_by_choices,
+                                encoding,
+                                cache_dir,
+                                lazy,
+                                roots,
+                                codecs)
+
+
+def _compile_files_cache_key(filenames,
+                             codec,
+                             any_defined_by_choices,
+                             lazy,
+                             roots,
+                             codecs):
+    from . import __version__
+
+    key = hashlib.sha256()
+    key.update(__version__.encode('ascii'))
+    key.update(codec.encode('ascii'))
+    key.update(b'lazy' if lazy else b'eager')
+
+    if roots is not None:
+        key.update(repr(sorted(roots)).encode('utf-8'))
+
+    if codecs is not None:
+        key.update(repr(list(codecs)).encode('utf-8'))
+
+    if any_defined_by_choices:
+        choices = sorted([
+            (location, sorted(choices.items()))
+            for location, choices in any_defined_by_choices.items()
+        ])
+        key.update(repr(choices).encode('utf-8'))
+
+    for filename in filenames:
+        with open(filename, 'rb') as fin:
+            contents = fin.read()
+
+        key.update(str(len(contents)).encode('ascii'))
+        key.update(contents)
+
+    return key.hexdigest()
+
+
+def _compile_files_cache(filenames,
+                         codec,
+                         any_defined_by_choices,
+                         encoding,
+                         cache_dir,
+                         lazy,
+                         roots,
+                         codecs):
+    if isinstance(filenames, STRING_TYPES):
+        filenames = [filenames]
+
+    key = _compile_files_cache_key(filenames,
+                                   codec,
+                                   any_defined_by_choices,
+                                   lazy,
+                                   roots,
+                                   codecs)
+    cached_filename = os.path.join(cache_dir, '{}.pkl'.format(key))
+
+    try:
+        with open(cached_filename, 'rb') as fin:
+            return pickle.load(fin)
+    except (IOError, OSError, EOFError, pickle.UnpicklingError):
+        # Missing or corrupt cache entry.
+        pass
+
+    compiled = compile_dict(parse_files(filenames, encoding),
+                            codec,
+                            any_defined_by_choices,
+                            lazy,
+                            roots,
+                            codecs)
+
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    # Write to a temporary file and replace any existing entry with it
+    # to make the cache entry appear atomically to concurrent
+    # processes.
+    temporary_filename = '{}.{}.tmp'.format(cached_filename, os.getpid())
+
+    with open(temporary_filename, 'wb') as fout:
+        pickle.dump(compiled, fout, pickle.HIGHEST_PROTOCOL)
+
+    replace(temporary_filename, cached_filename)
+
+    return compiled
 
 
 def pre_process_dict(specification):
@@ -5,6 +5,7 @@
 import logging
 import re
 import sys
+import threading
 
 from pyparsing import Literal
 from pyparsing import Keyword
@@ -36,6 +37,12 @@ LOGGER = logging.getLogger(__name__)
 
 EXTENSION_MARKER = None
 
+# The grammar is created on first use and then shared by all parse
+# calls. The lock protects both the creation and the parsing, as
+# pyparsing grammars are not guaranteed to be reentrant.
+_GRAMMAR = None
+_GRAMMAR_LOCK = threading.Lock()
+
 
 class ParseError(Error):
     pass
@@ -413,11 +420,29 @@ def convert_choice_type(_s, _l, tokens):
     }
 
 
+def convert_actual_parameter(tokens):
+    while isinstance(tokens, list) and len(tokens) == 1:
+        tokens = tokens[0]
+
+    if isinstance(tokens, list) and tokens and isinstance(tokens[0], dict):
+        tokens = tokens[0]['type']
+
+    return tokens
+
+
 def convert_defined_type(_s, _l, tokens):
-    return {
+    converted_type = {
         'type': tokens[0]
     }
 
+    if len(tokens) == 2 and isinstance(tokens[1], ParseResults):
+        converted_type['actual-parameters'] = [
+            convert_actual_parameter(parameter_tokens)
+            for parameter_tokens in tokens[1].asList()
+        ]
+
+    return converted_type
+
 
 def convert_integer_type(_s, _l, _tokens):
     return {'type': 'INTEGER'}
@@ -592,6 +617,67 @@ def convert_value(tokens, type_=None):
     return value
 
 
+def convert_object_fields(tokens):
+    """Returns given default syntax field settings of an object as a
+    dictionary. Raises IndexError for other syntaxes.
+
+    """
+
+    fields = {}
+
+    for item_tokens in tokens:
+        name = item_tokens[0]
+        value = item_tokens[1][0]
+
+        if isinstance(value, Tokens):
+            value = value[0]
+
+        fields[name] = convert_number(value)
+
+    return fields
+
+
+def convert_object(tokens):
+    """Returns given object as a dictionary of its field settings if in
+    the default syntax, or as a list of its words if in a defined
+    syntax. Returns ``None`` if neither.
+
+    """
+
+    try:
+        return convert_object_fields(tokens)
+    except IndexError:
+        pass
+
+    for word_tokens in tokens:
+        if len(word_tokens) != 1 or not isinstance(word_tokens[0], str):
+            return None
+
+    return [word_tokens[0] for word_tokens in tokens]
+
+
+def convert_syntax_list(tokens):
+    """Returns given defined syntax of an object class as a list of
+    literals and field names, with optional groups as nested lists.
+
+    """
+
+    syntax = []
+    groups = [syntax]
+
+    for token in tokens:
+        if token == '[':
+            group = []
+            groups[-1].append(group)
+            groups.append(group)
+        elif token == ']':
+            groups.pop()
+        else:
+            groups[-1].append(token)
+
+    return syntax
+
+
 def convert_parameterized_object_set_assignment(_s, _l, tokens):
     members = []
 
@@ -600,15 +686,7 @@ def convert_parameterized_object_set_assignment(_s, _l, tokens):
             if len(member_tokens[0]) == 1:
                 member = member_tokens[0][0]
             else:
-                member = {}
-
-                for item_tokens in member_tokens[0]:
-                    name = item_tokens[0]
-                    value = item_tokens[1][0]
-
-                    if isinstance(value, Tokens):
-                        value = value[0]
-                    member[name] = convert_number(value)
+                member = convert_object(member_tokens[0])
 
             members.append(member)
     except IndexError:
@@ -627,9 +705,10 @@ def convert_parameterized_object_set_assignment(_s, _l, tokens):
 def convert_parameterized_object_assignment(_s, _l, tokens):
     type_ = tokens[1]
 
+    value = convert_object(tokens.asList()[2])
     converted_type = {
         'type': type_,
-        'value': None
+        'value': value
     }
 
     return ('parameterized-object-assignment',
@@ -657,6 +736,9 @@ def convert_parameterized_object_class_assignment(_s, _l, tokens):
         'members': members
     }
 
+    if len(tokens) > 4:
+        converted_type['with-syntax'] = convert_syntax_list(tokens[6:-1])
+
     return ('parameterized-object-class-assignment',
             tokens[0],
             converted_type)
@@ -664,16 +746,21 @@ def convert_parameterized_object_class_assignment(_s, _l, tokens):
 
 def convert_parameterized_type_assignment(_s, _l, tokens):
     tokens = tokens.asList()
-    converted_type = convert_type(tokens[3])
+    converted_type = convert_type(tokens[4])
 
     try:
-        tag = convert_tag(tokens[2])
+        tag = convert_tag(tokens[3])
     except ValueError:
         tag = None
 
     if tag:
         converted_type['tag'] = tag
 
+    if tokens[1]:
+        converted_type['parameters'] = [
+            parameter_tokens[-1] for parameter_tokens in tokens[1]
+        ]
+
     return ('parameterized-type-assignment',
             tokens[0],
             converted_type)
@@ -687,9 +774,14 @@ def convert_parameterized_value_assignment(_s, _l, tokens):
     elif isinstance(type_, dict):
         type_ = type_['type']
 
+    value = convert_value(tokens[2], type_)
+
+    if value is None and re.match(r'[A-Z][A-Z0-9-]*$', type_):
+        value = convert_object(tokens[2].asList())
+
     converted_type = {
         'type': type_,
-        'value': convert_value(tokens[2], type_)
+        'value': value
     }
 
     return ('parameterized-value-assignment',
@@ -959,6 +1051,9 @@ def create_grammar():
     parameter_list = Suppress(Optional(left_brace
                                        + delimitedList(parameter)
                                        + right_brace))
+    type_parameter_list = Group(Optional(Suppress(left_brace)
+                                         + delimitedList(Group(parameter))
+                                         + Suppress(right_brace)))
 
     # X.683: 9. Referencing parameterized definitions
     actual_parameter = Group(type_
@@ -1556,7 +1651,7 @@ def create_grammar():
     value_reference <<= Regex(r'[a-z][a-zA-Z0-9-]*')
     value_set <<= NoMatch().setName('"valueSet" not implemented')
     parameterized_type_assignment = (type_reference
-                                     + parameter_list
+                                     + type_parameter_list
                                      - assign
                                      - tag
                                      - type_)
@@ -1689,6 +1784,21 @@ def create_grammar():
     return specification
 
 
+def get_grammar():
+    """Returns the grammar, which is created on the first call.
+
+    Must be called with the grammar lock held.
+
+    """
+
+    global _GRAMMAR
+
+    if _GRAMMAR is None:
+        _GRAMMAR = create_grammar()
+
+    return _GRAMMAR
+
+
 def ignore_comments(string):
     """Ignore comments in given string by replacing them with spaces. This
     reduces the parsing time by roughly a factor of two.
@@ -1714,11 +1824,11 @@ def parse_string(string):
 
     """
 
-    grammar = create_grammar()
+    string = ignore_comments(string)
 
     try:
-        string = ignore_comments(string)
-        tokens = grammar.parseString(string).asList()
+        with _GRAMMAR_LOCK:
+            tokens = get_grammar().parseString(string).asList()
     except (ParseException, ParseSyntaxException) as e:
         raise ParseError("Invalid ASN.1 syntax at line {}, column {}: '{}': {}.".format(
             e.lineno,
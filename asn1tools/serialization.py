@@ -0,0 +1,535 @@
+"""Serialize compiled specifications to a compact, versioned binary
+format, and load them back.
+
+The compiled object graph is flattened into tables of strings,
+integers, byte strings, containers and objects, where every value is
+an index into the tables. Strings are interned, shared nodes are
+stored once and objects with the same attribute names share one list
+of names. The tables are stored with marshal. Only classes and
+functions defined in the asn1tools package can be referenced, but
+objects are created without calling their constructors, so loading is
+not safe for untrusted data.
+
+"""
+
+import gc
+import sys
+import zlib
+import marshal
+import struct
+import inspect
+import importlib
+from array import array
+
+from .errors import Error
+from .compat import STRING_TYPES
+from .compat import INTEGER_TYPES
+
+
+MAGIC = b'ASN1TOOLS-COMPILED'
+
+FORMAT_VERSION = 1
+
+# Version 2 is the newest marshal format that both Python 2 and 3 can
+# read.
+MARSHAL_VERSION = 2
+
+HEADER_FORMAT = '>{}sH'.format(len(MAGIC))
+
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Indexes of the constants in the value tables.
+NONE = 0
+FALSE = 1
+TRUE = 2
+
+# The order of the value tables. Tuples are last as they are created
+# after all other values.
+KINDS = [
+    'strings',
+    'integers',
+    'floats',
+    'bytes',
+    'bytearrays',
+    'lists',
+    'dicts',
+    'sets',
+    'objects',
+    'functions',
+    'tuples'
+]
+
+
+def _pack(values):
+    """Pack given list of non-negative integers as little endian 32 bits
+    integers.
+
+    """
+
+    packed = array('i', values)
+
+    if sys.byteorder == 'big':
+        packed.byteswap()
+
+    if sys.version_info[0] > 2:
+        return packed.tobytes()
+    else:
+        return packed.tostring()
+
+
+def _unpack(data):
+    unpacked = array('i', data)
+
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+
+    return unpacked.tolist()
+
+
+def _is_asn1tools_module(module_name):
+    return module_name == 'asn1tools' or module_name.startswith('asn1tools.')
+
+
+class Dumper(object):
+
+    def __init__(self):
+        self._tables = {kind: [] for kind in KINDS}
+        self._memo = {}
+        self._keep_alive = []
+        self._string_indexes = {}
+        self._integer_indexes = {}
+        self._class_indexes = {}
+        self._shape_indexes = {}
+        self.classes = []
+        self.shapes = []
+
+    def _add(self, kind, value, key):
+        table = self._tables[kind]
+        self._memo[key] = (kind, len(table))
+        table.append(value)
+
+    def _collect(self, root):
+        """Assign a table and an index within it to all values reachable
+        from given root.
+
+        """
+
+        stack = [root]
+
+        while stack:
+            value = stack.pop()
+
+            if value is None or value is True or value is False:
+                continue
+
+            if isinstance(value, STRING_TYPES):
+                if value not in self._string_indexes:
+                    self._string_indexes[value] = len(self._tables['strings'])
+                    self._tables['strings'].append(value)
+
+                continue
+
+            if isinstance(value, INTEGER_TYPES):
+                if value not in self._integer_indexes:
+                    self._integer_indexes[value] = len(self._tables['integers'])
+                    self._tables['integers'].append(value)
+
+                continue
+
+            key = id(value)
+
+            if key in self._memo:
+                continue
+
+            self._keep_alive.append(value)
+
+            if isinstance(value, float):
+                self._add('floats', value, key)
+            elif isinstance(value, bytearray):
+                self._add('bytearrays', value, key)
+            elif isinstance(value, bytes):
+                self._add('bytes', value, key)
+            elif isinstance(value, list):
+                self._add('lists', value, key)
+                stack.extend(value)
+            elif isinstance(value, tuple):
+                self._add('tuples', value, key)
+                stack.extend(value)
+            elif isinstance(value, dict):
+                self._add('dicts', value, key)
+                stack.extend(value.keys())
+                stack.extend(value.values())
+            elif isinstance(value, set):
+                self._add('sets', value, key)
+                stack.extend(value)
+            elif type(value).__name__ == 'function':
+                if not _is_asn1tools_module(value.__module__):
+                    raise Error(
+                        "Cannot serialize function '{}' from module "
+                        "'{}'.".format(value.__name__, value.__module__))
+
+                self._add('functions', value, key)
+            elif hasattr(value, '__dict__'):
+                cls = type(value)
+
+                if not _is_asn1tools_module(cls.__module__):
+                    raise Error(
+                        "Cannot serialize object of class '{}' from module "
+                        "'{}'.".format(cls.__name__, cls.__module__))
+
+                self._add('objects', value, key)
+                stack.extend(vars(value).keys())
+                stack.extend(vars(value).values())
+            else:
+                raise Error("Cannot serialize value of type '{}'.".format(
+                    type(value).__name__))
+
+    def _offsets(self):
+        offsets = {}
+        offset = TRUE + 1
+
+        for kind in KINDS:
+            offsets[kind] = offset
+            offset += len(self._tables[kind])
+
+        return offsets
+
+    def _class_index(self, cls):
+        try:
+            return self._class_indexes[cls]
+        except KeyError:
+            index = len(self.classes)
+            self._class_indexes[cls] = index
+            self.classes.append([cls.__module__, cls.__name__])
+
+            return index
+
+    def _shape_index(self, keys):
+        keys = tuple(keys)
+
+        try:
+            return self._shape_indexes[keys]
+        except KeyError:
+            index = len(self.shapes)
+            self._shape_indexes[keys] = index
+            self.shapes.append(keys)
+
+            return index
+
+    def _order_tuples(self):
+        """Order the tuples so that all tuples in a tuple are created
+        before the tuple itself.
+
+        """
+
+        ordered = []
+        visited = set()
+
+        def visit(value):
+            key = id(value)
+
+            if key in visited:
+                return
+
+            visited.add(key)
+
+            for item in value:
+                if isinstance(item, tuple):
+                    visit(item)
+
+            ordered.append(value)
+
+        for value in self._tables['tuples']:
+            visit(value)
+
+        self._tables['tuples'] = ordered
+
+        for index, value in enumerate(ordered):
+            self._memo[id(value)] = ('tuples', index)
+
+    def dump(self, root):
+        self._collect(root)
+        self._order_tuples()
+        offsets = self._offsets()
+        string_offset = offsets['strings']
+        integer_offset = offsets['integers']
+
+        def ref(value):
+            if value is None:
+                return NONE
+            elif value is False:
+                return FALSE
+            elif value is True:
+                return TRUE
+            elif isinstance(value, STRING_TYPES):
+                return string_offset + self._string_indexes[value]
+            elif isinstance(value, INTEGER_TYPES):
+                return integer_offset + self._integer_indexes[value]
+            else:
+                kind, index = self._memo[id(value)]
+
+                return offsets[kind] + index
+
+        def refs(values):
+            return [ref(value) for value in values]
+
+        def pack_sequences(sequences):
+            lengths = []
+            items = []
+
+            for sequence in sequences:
+                lengths.append(len(sequence))
+                items.extend(refs(sequence))
+
+            return _pack(lengths), _pack(items)
+
+        tables = self._tables
+        objects = tables['objects']
+
+        for value in objects:
+            self._class_index(type(value))
+            self._shape_index(vars(value).keys())
+
+        payload = {
+            'strings': tables['strings'],
+            'integers': tables['integers'],
+            'floats': tables['floats'],
+            'bytes': tables['bytes'],
+            'bytearrays': [bytes(value) for value in tables['bytearrays']],
+            'lists': pack_sequences(tables['lists']),
+            'dicts': pack_sequences([
+                [item for pair in value.items() for item in pair]
+                for value in tables['dicts']
+            ]),
+            'sets': pack_sequences(tables['sets']),
+            'tuples': pack_sequences(tables['tuples']),
+            'classes': self.classes,
+            'shapes': pack_sequences(self.shapes),
+            'objects': (
+                _pack([self._class_indexes[type(value)] for value in objects]),
+                _pack([
+                    self._shape_indexes[tuple(vars(value).keys())]
+                    for value in objects
+                ]),
+                _pack(refs([
+                    item for value in objects for item in vars(value).values()
+                ]))
+            ),
+            'functions': [
+                [value.__module__, value.__name__]
+                for value in tables['functions']
+            ],
+            'root': ref(root)
+        }
+
+        return payload
+
+
+def _lookup(module_name, name, kind):
+    error = Error("Cannot load {} '{}' from module '{}'.".format(kind,
+                                                                 name,
+                                                                 module_name))
+
+    if not _is_asn1tools_module(module_name):
+        raise error
+
+    try:
+        value = getattr(importlib.import_module(module_name), name)
+    except (ImportError, AttributeError):
+        raise Error("{} '{}' not found in module '{}'.".format(
+            kind[:1].upper() + kind[1:],
+            name,
+            module_name))
+
+    # Modules, and classes and functions imported from other packages,
+    # are also attributes of asn1tools modules.
+    if kind == 'class':
+        is_kind = inspect.isclass(value)
+    else:
+        is_kind = inspect.isfunction(value)
+
+    if not is_kind or not _is_asn1tools_module(value.__module__):
+        raise error
+
+    return value
+
+
+def _load_payload(payload):
+    classes = [
+        _lookup(module_name, name, 'class')
+        for module_name, name in payload['classes']
+    ]
+
+    class_indexes, shape_indexes, object_items = payload['objects']
+    class_indexes = _unpack(class_indexes)
+    shape_indexes = _unpack(shape_indexes)
+    list_lengths, list_items = map(_unpack, payload['lists'])
+    dict_lengths, dict_items = map(_unpack, payload['dicts'])
+    set_lengths, set_items = map(_unpack, payload['sets'])
+    tuple_lengths, tuple_items = map(_unpack, payload['tuples'])
+    shape_lengths, shape_items = map(_unpack, payload['shapes'])
+
+    values = [None, False, True]
+    values.extend(payload['strings'])
+    values.extend(payload['integers'])
+    values.extend(payload['floats'])
+    values.extend(payload['bytes'])
+    values.extend([bytearray(value) for value in payload['bytearrays']])
+    lists = [[] for _ in list_lengths]
+    values.extend(lists)
+    dicts = [{} for _ in dict_lengths]
+    values.extend(dicts)
+    sets = [set() for _ in set_lengths]
+    values.extend(sets)
+    objects = [object.__new__(classes[index]) for index in class_indexes]
+    values.extend(objects)
+    values.extend([
+        _lookup(module_name, name, 'function')
+        for module_name, name in payload['functions']
+    ])
+    get = values.__getitem__
+    position = 0
+
+    # A tuple may contain tuples created before it, so create them one
+    # at a time.
+    for length in tuple_lengths:
+        end = position + length
+        values.append(tuple(map(get, tuple_items[position:end])))
+        position = end
+
+    position = 0
+    list_items = list(map(get, list_items))
+
+    for list_, length in zip(lists, list_lengths):
+        end = position + length
+        list_.extend(list_items[position:end])
+        position = end
+
+    position = 0
+    dict_items = list(map(get, dict_items))
+
+    for dict_, length in zip(dicts, dict_lengths):
+        end = position + length
+        dict_.update(zip(dict_items[position:end:2],
+                         dict_items[position + 1:end:2]))
+        position = end
+
+    position = 0
+    set_items = list(map(get, set_items))
+
+    for set_, length in zip(sets, set_lengths):
+        end = position + length
+        set_.update(set_items[position:end])
+        position = end
+
+    position = 0
+    shapes = []
+
+    for length in shape_lengths:
+        end = position + length
+        shapes.append(list(map(get, shape_items[position:end])))
+        position = end
+
+    position = 0
+    object_items = list(map(get, _unpack(object_items)))
+
+    for object_, shape_index in zip(objects, shape_indexes):
+        keys = shapes[shape_index]
+        end = position + len(keys)
+        object_.__dict__.update(zip(keys, object_items[position:end]))
+        position = end
+
+    return values[payload['root']]
+
+
+def dumps_compiled(compiled):
+    """Serialize given compiled specification and return it as bytes.
+
+    """
+
+    from . import __version__
+
+    payload = Dumper().dump(compiled)
+    payload['version'] = __version__
+    encoded = marshal.dumps(payload, MARSHAL_VERSION)
+
+    return (struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION)
+            + zlib.compress(encoded, 9))
+
+
+def loads_compiled(data):
+    """Load a compiled specification from given bytes, created by
+    :func:`~asn1tools.dumps_compiled()`. Only load data from trusted
+    sources.
+
+    """
+
+    from . import __version__
+
+    if len(data) < HEADER_SIZE:
+        raise Error('Not a compiled specification.')
+
+    magic, format_version = struct.unpack(HEADER_FORMAT, data[:HEADER_SIZE])
+
+    if magic != MAGIC:
+        raise Error('Not a compiled specification.')
+
+    if format_version != FORMAT_VERSION:
+        raise Error(
+            'Expected compiled specification format version {}, but got '
+            '{}.'.format(FORMAT_VERSION, format_version))
+
+    try:
+        payload = marshal.loads(zlib.decompress(data[HEADER_SIZE:]))
+    except (zlib.error, ValueError, EOFError, TypeError):
+        raise Error('Corrupt compiled specification.')
+
+    if not isinstance(payload, dict):
+        raise Error('Corrupt compiled specification.')
+
+    if payload.get('version') != __version__:
+        raise Error(
+            'Compiled specification created by asn1tools version {}, but '
+            'this is version {}.'.format(payload.get('version'), __version__))
+
+    # Lots of objects are created, but there are no cycles to collect
+    # until loading is done.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        return _load_payload(payload)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def dump_compiled(compiled, filename):
+    """Serialize given compiled specification `compiled` to file with
+    given name `filename`. Load it with
+    :func:`~asn1tools.load_compiled()`.
+
+    >>> foo = asn1tools.compile_files('foo.asn')
+    >>> asn1tools.dump_compiled(foo, 'foo.compiled')
+
+    """
+
+    with open(filename, 'wb') as fout:
+        fout.write(dumps_compiled(compiled))
+
+
+def load_compiled(filename):
+    """Load a compiled specification from file with given name
+    `filename`, created by :func:`~asn1tools.dump_compiled()`.
+
+    The file must be created by the same version of asn1tools. Only
+    load files from trusted sources, as neither marshal nor the
+    loaded objects are protected against maliciously constructed
+    data.
+
+    >>> foo = asn1tools.load_compiled('foo.compiled')
+
+    """
+
+    with open(filename, 'rb') as fin:
+        return loads_compiled(fin.read())
@@ -0,0 +1,174 @@
+"""Decode a stream of BER or DER encoded PDUs, for example received on
+a socket, as the data arrives.
+
+"""
+
+from .errors import Error
+from .codecs import ber
+from .codecs import DecodeContentsLengthError
+
+
+# Consumed data is removed from the start of the buffer when at least
+# this many bytes and half the buffer have been consumed.
+COMPACT_MINIMUM = 4096
+
+
+def decode_header(data, offset):
+    """Returns the contents length, or None if indefinite, and offset of
+    the encoding starting at given offset. Raises IndexError if the
+    header is incomplete.
+
+    """
+
+    offset = ber.skip_tag(data, offset)
+
+    try:
+        return ber.decode_length_constructed(data, offset)
+    except DecodeContentsLengthError as e:
+        return e.length, e.offset
+
+
+class StreamDecoder(object):
+    """Decode PDUs of given type `name` in given BER or DER specification
+    `specification` from a stream of data given to :meth:`.feed()`.
+
+    Data is appended to an internal buffer, and consumed data is
+    removed from the start of the buffer once at least half of it
+    has been consumed. Headers of the PDU being received are only
+    parsed once, and contents with definite length are skipped, so
+    the time spent per byte is constant, independent of how the
+    stream is split into chunks.
+
+    If `check_constraints` is ``True`` all decoded PDUs are checked
+    against their ASN.1 type constraints.
+
+    >>> decoder = asn1tools.StreamDecoder(foo, 'Question')
+    >>> list(decoder.feed(b'0\\x0e\\x02\\x01\\x01\\x16\\x09Is 1+'))
+    []
+    >>> list(decoder.feed(b'1=3?0\\x0e\\x02\\x01\\x02'))
+    [{'id': 1, 'question': 'Is 1+1=3?'}]
+
+    """
+
+    def __init__(self, specification, name, check_constraints=False):
+        try:
+            compiled = specification.types[name]
+        except KeyError:
+            raise Error(
+                "Type '{}' not found in types dictionary.".format(name))
+
+        if not isinstance(compiled, ber.CompiledType):
+            raise Error(
+                "Streams can only be decoded with the 'ber' and 'der' codecs, "
+                "but type '{}' is not a BER or DER type.".format(name))
+
+        self._compiled = compiled
+        self._check_constraints = check_constraints
+        self._buffer = bytearray()
+
+        # Offset of the PDU being received.
+        self._offset = 0
+
+        # Offset of the next header to parse and the number of open
+        # indefinite length encodings at that offset.
+        self._header_offset = 0
+        self._depth = 0
+
+        # Offset after the PDU being received, once known.
+        self._end_offset = None
+
+    def feed(self, data):
+        """Append given data `data` to the stream, and return an iterator of
+        all PDUs completed by it, decoded as dictionaries.
+
+        The data is buffered immediately. PDUs not iterated over are
+        returned by the next call to this method. A PDU that fails to
+        decode is discarded before its exception is raised.
+
+        """
+
+        self._compact()
+        self._buffer.extend(data)
+
+        return self._decode_pdus()
+
+    def _compact(self):
+        offset = self._offset
+
+        if offset < COMPACT_MINIMUM or 2 * offset < len(self._buffer):
+            return
+
+        del self._buffer[:offset]
+        self._offset = 0
+        self._header_offset -= offset
+
+        if self._end_offset is not None:
+            self._end_offset -= offset
+
+    def _decode_pdus(self):
+        while True:
+            end_offset = self._find_end_offset()
+
+            if end_offset is None or end_offset > len(self._buffer):
+                break
+
+            offset = self._offset
+            self._offset = end_offset
+            self._header_offset = end_offset
+            self._end_offset = None
+            data = self._buffer[offset:end_offset]
+            decoded = self._compiled.type.decode(data, 0)[0]
+
+            if self._check_constraints:
+                self._compiled.check_constraints(decoded)
+
+            yield decoded
+
+    def _find_end_offset(self):
+        """Parse all received headers of the PDU being received until its
+        length is known. Returns the offset after the PDU, or None if
+        more data is needed to know it.
+
+        """
+
+        if self._end_offset is not None:
+            return self._end_offset
+
+        buffer = self._buffer
+        offset = self._header_offset
+        depth = self._depth
+
+        # Only headers of indefinite length encodings and their
+        # children are parsed.
+        try:
+            while True:
+                if depth > 0 and ber.is_end_of_contents(buffer, offset):
+                    offset += 2
+                    depth -= 1
+
+                    if depth == 0:
+                        break
+
+                    continue
+
+                length, offset = decode_header(buffer, offset)
+
+                if length is None:
+                    depth += 1
+                else:
+                    offset += length
+
+                    if depth == 0:
+                        break
+
+                    if offset > len(buffer):
+                        return None
+        except IndexError:
+            return None
+        finally:
+            self._header_offset = offset
+            self._depth = depth
+
+        self._end_offset = offset
+
+        return offset
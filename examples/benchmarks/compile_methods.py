@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 
 """A performance example comparing the compile time and storage size
-of three compile methods; pickle, compile string and compile
-dictionary.
+of four compile methods; load compiled, pickle, compile string and
+compile dictionary.
 
 Example execution:
 
@@ -11,11 +11,13 @@ $ ./compile_methods.py
 Parsing and compiling '/home/erik/asn1tools/tests/files/3gpp/rrc_8_6_0.asn' 5 times... done.
 Compiling RRC_8_6_0 dictionary 5 times... done.
 Unpickling compiled object 5 times... done.
+Loading compiled object 5 times... done.
 
 METHOD               TIME  STORAGE-SIZE
-unpickle           0.2258       1051696
-compile-string    7.01243        122595
-compile-dict      0.92199        175035
+load-compiled     0.04887         70532
+unpickle          0.02985        264840
+compile-string    2.55591        122595
+compile-dict      0.09843        175035
 $
 
 """
@@ -74,6 +76,23 @@ def method_compile_dict():
     return round(time, 5), len(str(dictionary))
 
 
+def method_load_compiled():
+    dumped = asn1tools.dumps_compiled(asn1tools.compile_files(RRC_8_6_0_ASN_PATH))
+
+    print("Loading compiled object {} times... ".format(ITERATIONS),
+          end='',
+          flush=True)
+
+    def load_compiled():
+        asn1tools.loads_compiled(dumped)
+
+    time = timeit.timeit(load_compiled, number=ITERATIONS)
+
+    print('done.')
+
+    return round(time, 5), len(dumped)
+
+
 def method_unpickle():
     pickled = pickle.dumps(asn1tools.compile_files(RRC_8_6_0_ASN_PATH))
 
@@ -96,9 +115,12 @@ print()
 compile_string_time, compile_string_size = method_compile_string()
 compile_dict_time, compile_dict_size = method_compile_dict()
 unpickle_time, unpickle_size = method_unpickle()
+load_compiled_time, load_compiled_size = method_load_compiled()
 
 print()
 print('METHOD               TIME  STORAGE-SIZE')
+print('load-compiled   {:>9} {:>13}'.format(load_compiled_time,
+                                            load_compiled_size))
 print('unpickle        {:>9} {:>13}'.format(unpickle_time,
                                             unpickle_size))
 print('compile-string  {:>9} {:>13}'.format(compile_string_time,
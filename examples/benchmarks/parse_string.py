@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+"""A performance example comparing parsing of many small ASN.1
+specifications with a grammar created for each specification, as
+done by asn1tools 0.124.0 and earlier, and the grammar shared by all
+calls to parse_string().
+
+Example execution:
+
+$ ./parse_string.py
+Parsing a small specification 500 times with a new grammar... done.
+Parsing a small specification 500 times with the shared grammar... done.
+
+METHOD               TIME
+new-grammar      11.71098
+shared-grammar    0.53952
+$
+
+"""
+
+from __future__ import print_function
+
+import timeit
+import asn1tools
+from asn1tools.parser import create_grammar
+from asn1tools.parser import ignore_comments
+
+SPECIFICATION = 'A DEFINITIONS ::= BEGIN B ::= SEQUENCE { a INTEGER } END'
+ITERATIONS = 500
+
+
+def method_new_grammar():
+    print("Parsing a small specification {} times with a new "
+          "grammar... ".format(ITERATIONS),
+          end='',
+          flush=True)
+
+    def parse_string():
+        create_grammar().parseString(ignore_comments(SPECIFICATION))
+
+    time = timeit.timeit(parse_string, number=ITERATIONS)
+
+    print('done.')
+
+    return round(time, 5)
+
+
+def method_shared_grammar():
+    print("Parsing a small specification {} times with the shared "
+          "grammar... ".format(ITERATIONS),
+          end='',
+          flush=True)
+
+    def parse_string():
+        asn1tools.parse_string(SPECIFICATION)
+
+    time = timeit.timeit(parse_string, number=ITERATIONS)
+
+    print('done.')
+
+    return round(time, 5)
+
+
+new_grammar_time = method_new_grammar()
+shared_grammar_time = method_shared_grammar()
+
+print()
+print('METHOD               TIME')
+print('new-grammar     {:>9}'.format(new_grammar_time))
+print('shared-grammar  {:>9}'.format(shared_grammar_time))
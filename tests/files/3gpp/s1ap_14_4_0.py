@@ -727,7 +727,15 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                          {'name': '&Value',
                                                                           'type': 'OpenType'},
                                                                          {'name': '&presence',
-                                                                          'type': 'Presence'}]},
+                                                                          'type': 'Presence'}],
+                                                             'with-syntax': ['ID',
+                                                                             '&id',
+                                                                             'CRITICALITY',
+                                                                             '&criticality',
+                                                                             'TYPE',
+                                                                             '&Value',
+                                                                             'PRESENCE',
+                                                                             '&presence']},
                                         'S1AP-PROTOCOL-EXTENSION': {'members': [{'name': '&id',
                                                                                  'type': 'ProtocolExtensionID'},
                                                                                 {'name': '&criticality',
@@ -735,7 +743,15 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                 {'name': '&Extension',
                                                                                  'type': 'OpenType'},
                                                                                 {'name': '&presence',
-                                                                                 'type': 'Presence'}]},
+                                                                                 'type': 'Presence'}],
+                                                                    'with-syntax': ['ID',
+                                                                                    '&id',
+                                                                                    'CRITICALITY',
+                                                                                    '&criticality',
+                                                                                    'EXTENSION',
+                                                                                    '&Extension',
+                                                                                    'PRESENCE',
+                                                                                    '&presence']},
                                         'S1AP-PROTOCOL-IES': {'members': [{'name': '&id',
                                                                            'type': 'ProtocolIE-ID'},
                                                                           {'name': '&criticality',
@@ -743,7 +759,15 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                           {'name': '&Value',
                                                                            'type': 'OpenType'},
                                                                           {'name': '&presence',
-                                                                           'type': 'Presence'}]},
+                                                                           'type': 'Presence'}],
+                                                              'with-syntax': ['ID',
+                                                                              '&id',
+                                                                              'CRITICALITY',
+                                                                              '&criticality',
+                                                                              'TYPE',
+                                                                              '&Value',
+                                                                              'PRESENCE',
+                                                                              '&presence']},
                                         'S1AP-PROTOCOL-IES-PAIR': {'members': [{'name': '&id',
                                                                                 'type': 'ProtocolIE-ID'},
                                                                                {'name': '&firstCriticality',
@@ -755,10 +779,28 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                {'name': '&SecondValue',
                                                                                 'type': 'OpenType'},
                                                                                {'name': '&presence',
-                                                                                'type': 'Presence'}]}},
+                                                                                'type': 'Presence'}],
+                                                                   'with-syntax': ['ID',
+                                                                                   '&id',
+                                                                                   'FIRST',
+                                                                                   'CRITICALITY',
+                                                                                   '&firstCriticality',
+                                                                                   'FIRST',
+                                                                                   'TYPE',
+                                                                                   '&FirstValue',
+                                                                                   'SECOND',
+                                                                                   'CRITICALITY',
+                                                                                   '&secondCriticality',
+                                                                                   'SECOND',
+                                                                                   'TYPE',
+                                                                                   '&SecondValue',
+                                                                                   'PRESENCE',
+                                                                                   '&presence']}},
                      'object-sets': {},
                      'tags': 'AUTOMATIC',
-                     'types': {'PrivateIE-Container': {'element': {'type': 'PrivateIE-Field'},
+                     'types': {'PrivateIE-Container': {'element': {'actual-parameters': ['IEsSetParam'],
+                                                                   'type': 'PrivateIE-Field'},
+                                                       'parameters': ['IEsSetParam'],
                                                        'size': [(1,
                                                                  'maxPrivateIEs')],
                                                        'type': 'SEQUENCE OF'},
@@ -773,8 +815,11 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                 'table': ['IEsSetParam',
                                                                           ['id']],
                                                                 'type': 'S1AP-PRIVATE-IES.&Value'}],
+                                                   'parameters': ['IEsSetParam'],
                                                    'type': 'SEQUENCE'},
-                               'ProtocolExtensionContainer': {'element': {'type': 'ProtocolExtensionField'},
+                               'ProtocolExtensionContainer': {'element': {'actual-parameters': ['ExtensionSetParam'],
+                                                                          'type': 'ProtocolExtensionField'},
+                                                              'parameters': ['ExtensionSetParam'],
                                                               'size': [(1,
                                                                         'maxProtocolExtensions')],
                                                               'type': 'SEQUENCE '
@@ -790,22 +835,35 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                        'table': ['ExtensionSetParam',
                                                                                  ['id']],
                                                                        'type': 'S1AP-PROTOCOL-EXTENSION.&Extension'}],
+                                                          'parameters': ['ExtensionSetParam'],
                                                           'type': 'SEQUENCE'},
-                               'ProtocolIE-Container': {'element': {'type': 'ProtocolIE-Field'},
+                               'ProtocolIE-Container': {'element': {'actual-parameters': ['IEsSetParam'],
+                                                                    'type': 'ProtocolIE-Field'},
+                                                        'parameters': ['IEsSetParam'],
                                                         'size': [(0,
                                                                   'maxProtocolIEs')],
                                                         'type': 'SEQUENCE OF'},
-                               'ProtocolIE-ContainerList': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                               'ProtocolIE-ContainerList': {'element': {'actual-parameters': ['IEsSetParam'],
+                                                                        'type': 'ProtocolIE-SingleContainer'},
+                                                            'parameters': ['lowerBound',
+                                                                           'upperBound',
+                                                                           'IEsSetParam'],
                                                             'size': [('lowerBound',
                                                                       'upperBound')],
                                                             'type': 'SEQUENCE '
                                                                     'OF'},
-                               'ProtocolIE-ContainerPair': {'element': {'type': 'ProtocolIE-FieldPair'},
+                               'ProtocolIE-ContainerPair': {'element': {'actual-parameters': ['IEsSetParam'],
+                                                                        'type': 'ProtocolIE-FieldPair'},
+                                                            'parameters': ['IEsSetParam'],
                                                             'size': [(0,
                                                                       'maxProtocolIEs')],
                                                             'type': 'SEQUENCE '
                                                                     'OF'},
-                               'ProtocolIE-ContainerPairList': {'element': {'type': 'ProtocolIE-ContainerPair'},
+                               'ProtocolIE-ContainerPairList': {'element': {'actual-parameters': ['IEsSetParam'],
+                                                                            'type': 'ProtocolIE-ContainerPair'},
+                                                                'parameters': ['lowerBound',
+                                                                               'upperBound',
+                                                                               'IEsSetParam'],
                                                                 'size': [('lowerBound',
                                                                           'upperBound')],
                                                                 'type': 'SEQUENCE '
@@ -821,6 +879,7 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                  'table': ['IEsSetParam',
                                                                            ['id']],
                                                                  'type': 'S1AP-PROTOCOL-IES.&Value'}],
+                                                    'parameters': ['IEsSetParam'],
                                                     'type': 'SEQUENCE'},
                                'ProtocolIE-FieldPair': {'members': [{'name': 'id',
                                                                      'table': 'IEsSetParam',
@@ -841,8 +900,11 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                      'table': ['IEsSetParam',
                                                                                ['id']],
                                                                      'type': 'S1AP-PROTOCOL-IES-PAIR.&SecondValue'}],
+                                                        'parameters': ['IEsSetParam'],
                                                         'type': 'SEQUENCE'},
-                               'ProtocolIE-SingleContainer': {'type': 'ProtocolIE-Field'}},
+                               'ProtocolIE-SingleContainer': {'actual-parameters': ['IEsSetParam'],
+                                                              'parameters': ['IEsSetParam'],
+                                                              'type': 'ProtocolIE-Field'}},
                      'values': {}},
  'S1AP-IEs': {'extensibility-implied': False,
               'imports': {'S1AP-CommonDataTypes': ['Criticality',
@@ -935,9 +997,67 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'AssistanceDataForRecommendedCells-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                            'members': ['.']},
                               'Bearers-SubjectToStatusTransfer-ItemExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                                             'members': []},
+                                                                             'members': [['ID',
+                                                                                          'id-ULCOUNTValueExtended',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'EXTENSION',
+                                                                                          'COUNTValueExtended',
+                                                                                          'PRESENCE',
+                                                                                          'optional'],
+                                                                                         ['ID',
+                                                                                          'id-DLCOUNTValueExtended',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'EXTENSION',
+                                                                                          'COUNTValueExtended',
+                                                                                          'PRESENCE',
+                                                                                          'optional'],
+                                                                                         ['ID',
+                                                                                          'id-ReceiveStatusOfULPDCPSDUsExtended',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'EXTENSION',
+                                                                                          'ReceiveStatusOfULPDCPSDUsExtended',
+                                                                                          'PRESENCE',
+                                                                                          'optional'],
+                                                                                         ['ID',
+                                                                                          'id-ULCOUNTValuePDCP-SNlength18',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'EXTENSION',
+                                                                                          'COUNTvaluePDCP-SNlength18',
+                                                                                          'PRESENCE',
+                                                                                          'optional'],
+                                                                                         ['ID',
+                                                                                          'id-DLCOUNTValuePDCP-SNlength18',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'EXTENSION',
+                                                                                          'COUNTvaluePDCP-SNlength18',
+                                                                                          'PRESENCE',
+                                                                                          'optional'],
+                                                                                         ['ID',
+                                                                                          'id-ReceiveStatusOfULPDCPSDUsPDCP-SNlength18',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'EXTENSION',
+                                                                                          'ReceiveStatusOfULPDCPSDUsPDCP-SNlength18',
+                                                                                          'PRESENCE',
+                                                                                          'optional'],
+                                                                                         ',',
+                                                                                         '.']},
                               'Bearers-SubjectToStatusTransfer-ItemIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                          'members': []},
+                                                                          'members': [['ID',
+                                                                                       'id-Bearers-SubjectToStatusTransfer-Item',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'TYPE',
+                                                                                       'Bearers-SubjectToStatusTransfer-Item',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ',',
+                                                                                      '.']},
                               'CGI-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                              'members': ['.']},
                               'COUNTValueExtended-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
@@ -975,13 +1095,31 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'DL-CP-SecurityInformation-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                    'members': ['.']},
                               'E-RABInformationListIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                          'members': []},
+                                                          'members': [['ID',
+                                                                       'id-E-RABInformationListItem',
+                                                                       'CRITICALITY',
+                                                                       'ignore',
+                                                                       'TYPE',
+                                                                       'E-RABInformationListItem',
+                                                                       'PRESENCE',
+                                                                       'mandatory'],
+                                                                      ',',
+                                                                      '.']},
                               'E-RABInformationListItem-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                   'members': ['.']},
                               'E-RABItem-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                    'members': ['.']},
                               'E-RABItemIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                               'members': []},
+                                               'members': [['ID',
+                                                            'id-E-RABItem',
+                                                            'CRITICALITY',
+                                                            'ignore',
+                                                            'TYPE',
+                                                            'E-RABItem',
+                                                            'PRESENCE',
+                                                            'mandatory'],
+                                                           ',',
+                                                           '.']},
                               'E-RABQoSParameters-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                             'members': ['.']},
                               'ENB-StatusTransfer-TransparentContainer-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
@@ -1013,7 +1151,56 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'HandoverRestrictionList-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                  'members': ['.']},
                               'ImmediateMDT-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                      'members': []},
+                                                      'members': [['ID',
+                                                                   'id-M3Configuration',
+                                                                   'CRITICALITY',
+                                                                   'ignore',
+                                                                   'EXTENSION',
+                                                                   'M3Configuration',
+                                                                   'PRESENCE',
+                                                                   'conditional'],
+                                                                  ['ID',
+                                                                   'id-M4Configuration',
+                                                                   'CRITICALITY',
+                                                                   'ignore',
+                                                                   'EXTENSION',
+                                                                   'M4Configuration',
+                                                                   'PRESENCE',
+                                                                   'conditional'],
+                                                                  ['ID',
+                                                                   'id-M5Configuration',
+                                                                   'CRITICALITY',
+                                                                   'ignore',
+                                                                   'EXTENSION',
+                                                                   'M5Configuration',
+                                                                   'PRESENCE',
+                                                                   'conditional'],
+                                                                  ['ID',
+                                                                   'id-MDT-Location-Info',
+                                                                   'CRITICALITY',
+                                                                   'ignore',
+                                                                   'EXTENSION',
+                                                                   'MDT-Location-Info',
+                                                                   'PRESENCE',
+                                                                   'optional'],
+                                                                  ['ID',
+                                                                   'id-M6Configuration',
+                                                                   'CRITICALITY',
+                                                                   'ignore',
+                                                                   'EXTENSION',
+                                                                   'M6Configuration',
+                                                                   'PRESENCE',
+                                                                   'conditional'],
+                                                                  ['ID',
+                                                                   'id-M7Configuration',
+                                                                   'CRITICALITY',
+                                                                   'ignore',
+                                                                   'EXTENSION',
+                                                                   'M7Configuration',
+                                                                   'PRESENCE',
+                                                                   'conditional'],
+                                                                  ',',
+                                                                  '.']},
                               'InformationForCECapableUEs-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                     'members': ['.']},
                               'InformationOnRecommendedCellsAndENBsForPaging-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
@@ -1021,7 +1208,24 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'LAI-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                              'members': ['.']},
                               'LastVisitedEUTRANCellInformation-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                                          'members': []},
+                                                                          'members': [['ID',
+                                                                                       'id-Time-UE-StayedInCell-EnhancedGranularity',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'EXTENSION',
+                                                                                       'Time-UE-StayedInCell-EnhancedGranularity',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ['ID',
+                                                                                       'id-HO-Cause',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'EXTENSION',
+                                                                                       'Cause',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ',',
+                                                                                      '.']},
                               'ListeningSubframePattern-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                   'members': ['.']},
                               'LoggedMBSFNMDT-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
@@ -1045,9 +1249,25 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'MBSFN-ResultToLogInfo-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                'members': ['.']},
                               'MDT-Configuration-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                           'members': []},
+                                                           'members': [['ID',
+                                                                        'id-SignallingBasedMDTPLMNList',
+                                                                        'CRITICALITY',
+                                                                        'ignore',
+                                                                        'EXTENSION',
+                                                                        'MDTPLMNList',
+                                                                        'PRESENCE',
+                                                                        'optional'],
+                                                                       ',',
+                                                                       '.']},
                               'MDTMode-ExtensionIE': {'class': 'S1AP-PROTOCOL-IES',
-                                                      'members': []},
+                                                      'members': [['ID',
+                                                                   'id-LoggedMBSFNMDT',
+                                                                   'CRITICALITY',
+                                                                   'ignore',
+                                                                   'TYPE',
+                                                                   'LoggedMBSFNMDT',
+                                                                   'PRESENCE',
+                                                                   'mandatory']]},
                               'MutingPatternInformation-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                   'members': ['.']},
                               'NB-IoT-Paging-eDRXInformation-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
@@ -1057,13 +1277,31 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'PagingAttemptInformation-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                   'members': ['.']},
                               'ProSeAuthorized-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                         'members': []},
+                                                         'members': [['ID',
+                                                                      'id-ProSeUEtoNetworkRelaying',
+                                                                      'CRITICALITY',
+                                                                      'ignore',
+                                                                      'EXTENSION',
+                                                                      'ProSeUEtoNetworkRelaying',
+                                                                      'PRESENCE',
+                                                                      'optional'],
+                                                                     ',',
+                                                                     '.']},
                               'RIMTransfer-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                      'members': ['.']},
                               'RLFReportInformation-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                               'members': ['.']},
                               'RecommendedCellItemIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                         'members': []},
+                                                         'members': [['ID',
+                                                                      'id-RecommendedCellItem',
+                                                                      'CRITICALITY',
+                                                                      'ignore',
+                                                                      'TYPE',
+                                                                      'RecommendedCellItem',
+                                                                      'PRESENCE',
+                                                                      'mandatory'],
+                                                                     ',',
+                                                                     '.']},
                               'RecommendedCellsForPaging-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                    'members': ['.']},
                               'RecommendedCellsForPagingItem-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
@@ -1071,7 +1309,16 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'RecommendedENBItem-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                             'members': ['.']},
                               'RecommendedENBItemIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                        'members': []},
+                                                        'members': [['ID',
+                                                                     'id-RecommendedENBItem',
+                                                                     'CRITICALITY',
+                                                                     'ignore',
+                                                                     'TYPE',
+                                                                     'RecommendedENBItem',
+                                                                     'PRESENCE',
+                                                                     'mandatory'],
+                                                                    ',',
+                                                                    '.']},
                               'RecommendedENBsForPaging-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                   'members': ['.']},
                               'RequestType-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
@@ -1079,11 +1326,53 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'S-TMSI-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                 'members': ['.']},
                               'SONConfigurationTransfer-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                                  'members': []},
+                                                                  'members': [['ID',
+                                                                               'id-x2TNLConfigurationInfo',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'EXTENSION',
+                                                                               'X2TNLConfigurationInfo',
+                                                                               'PRESENCE',
+                                                                               'conditional'],
+                                                                              ['ID',
+                                                                               'id-Synchronisation-Information',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'EXTENSION',
+                                                                               'SynchronisationInformation',
+                                                                               'PRESENCE',
+                                                                               'conditional'],
+                                                                              ',',
+                                                                              '.']},
                               'SONInformation-ExtensionIE': {'class': 'S1AP-PROTOCOL-IES',
-                                                             'members': []},
+                                                             'members': [['ID',
+                                                                          'id-SON-Information-Report',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'SONInformationReport',
+                                                                          'PRESENCE',
+                                                                          'mandatory']]},
                               'SONInformationReply-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                             'members': []},
+                                                             'members': [['ID',
+                                                                          'id-Time-Synchronisation-Info',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'EXTENSION',
+                                                                          'TimeSynchronisationInfo',
+                                                                          'PRESENCE',
+                                                                          'optional'],
+                                                                         ',',
+                                                                         '.',
+                                                                         ',',
+                                                                         ['ID',
+                                                                          'id-Muting-Pattern-Information',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'EXTENSION',
+                                                                          'MutingPatternInformation',
+                                                                          'PRESENCE',
+                                                                          'optional']]},
                               'SecurityContext-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                          'members': ['.']},
                               'ServedDCNsItem-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
@@ -1093,9 +1382,35 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'SourceeNB-ID-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                       'members': ['.']},
                               'SourceeNB-ToTargeteNB-TransparentContainer-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                                                    'members': []},
+                                                                                    'members': [['ID',
+                                                                                                 'id-MobilityInformation',
+                                                                                                 'CRITICALITY',
+                                                                                                 'ignore',
+                                                                                                 'EXTENSION',
+                                                                                                 'MobilityInformation',
+                                                                                                 'PRESENCE',
+                                                                                                 'optional'],
+                                                                                                ['ID',
+                                                                                                 'id-uE-HistoryInformationFromTheUE',
+                                                                                                 'CRITICALITY',
+                                                                                                 'ignore',
+                                                                                                 'EXTENSION',
+                                                                                                 'UE-HistoryInformationFromTheUE',
+                                                                                                 'PRESENCE',
+                                                                                                 'optional'],
+                                                                                                ',',
+                                                                                                '.']},
                               'SupportedTAs-Item-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                           'members': []},
+                                                           'members': [['ID',
+                                                                        'id-RAT-Type',
+                                                                        'CRITICALITY',
+                                                                        'reject',
+                                                                        'EXTENSION',
+                                                                        'RAT-Type',
+                                                                        'PRESENCE',
+                                                                        'optional'],
+                                                                       ',',
+                                                                       '.']},
                               'SynchronisationInformation-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                     'members': ['.']},
                               'TABasedMDT-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
@@ -1115,9 +1430,27 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'TargeteNB-ToSourceeNB-TransparentContainer-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                                     'members': ['.']},
                               'TimeSynchronisationInfo-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                                 'members': []},
+                                                                 'members': [['ID',
+                                                                              'id-Muting-Availability-Indication',
+                                                                              'CRITICALITY',
+                                                                              'ignore',
+                                                                              'EXTENSION',
+                                                                              'MutingAvailabilityIndication',
+                                                                              'PRESENCE',
+                                                                              'optional'],
+                                                                             ',',
+                                                                             '.']},
                               'TraceActivation-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                         'members': []},
+                                                         'members': [['ID',
+                                                                      'id-MDTConfiguration',
+                                                                      'CRITICALITY',
+                                                                      'ignore',
+                                                                      'EXTENSION',
+                                                                      'MDT-Configuration',
+                                                                      'PRESENCE',
+                                                                      'optional'],
+                                                                     ',',
+                                                                     '.']},
                               'Tunnel-Information-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                             'members': ['.']},
                               'UE-S1AP-ID-pair-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
@@ -1137,13 +1470,31 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                               'V2XServicesAuthorized-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                'members': ['.']},
                               'X2TNLConfigurationInfo-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                                'members': []}},
+                                                                'members': [['ID',
+                                                                             'id-eNBX2ExtendedTransportLayerAddresses',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'EXTENSION',
+                                                                             'ENBX2ExtTLAs',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-eNBIndirectX2TransportLayerAddresses',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'EXTENSION',
+                                                                             'ENBIndirectX2TransportLayerAddresses',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ',',
+                                                                            '.']}},
               'tags': 'AUTOMATIC',
               'types': {'Additional-GUTI': {'members': [{'name': 'gUMMEI',
                                                          'type': 'GUMMEI'},
                                                         {'name': 'm-TMSI',
                                                          'type': 'M-TMSI'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['Additional-GUTI-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -1160,7 +1511,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                         'type': 'Pre-emptionCapability'},
                                                                        {'name': 'pre-emptionVulnerability',
                                                                         'type': 'Pre-emptionVulnerability'},
-                                                                       {'name': 'iE-Extensions',
+                                                                       {'actual-parameters': ['AllocationAndRetentionPriority-ExtIEs'],
+                                                                        'name': 'iE-Extensions',
                                                                         'optional': True,
                                                                         'type': 'ProtocolExtensionContainer'},
                                                                        None],
@@ -1177,7 +1529,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                            'type': 'CHOICE'},
                         'AssistanceDataForCECapableUEs': {'members': [{'name': 'cellIdentifierAndCELevelForCECapableUEs',
                                                                        'type': 'CellIdentifierAndCELevelForCECapableUEs'},
-                                                                      {'name': 'iE-Extensions',
+                                                                      {'actual-parameters': ['InformationForCECapableUEs-ExtIEs'],
+                                                                       'name': 'iE-Extensions',
                                                                        'optional': True,
                                                                        'type': 'ProtocolExtensionContainer'},
                                                                       None],
@@ -1191,14 +1544,16 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                 {'name': 'pagingAttemptInformation',
                                                                  'optional': True,
                                                                  'type': 'PagingAttemptInformation'},
-                                                                {'name': 'iE-Extensions',
+                                                                {'actual-parameters': ['AssistanceDataForPaging-ExtIEs'],
+                                                                 'name': 'iE-Extensions',
                                                                  'optional': True,
                                                                  'type': 'ProtocolExtensionContainer'},
                                                                 None],
                                                     'type': 'SEQUENCE'},
                         'AssistanceDataForRecommendedCells': {'members': [{'name': 'recommendedCellsForPaging',
                                                                            'type': 'RecommendedCellsForPaging'},
-                                                                          {'name': 'iE-Extensions',
+                                                                          {'actual-parameters': ['AssistanceDataForRecommendedCells-ExtIEs'],
+                                                                           'name': 'iE-Extensions',
                                                                            'optional': True,
                                                                            'type': 'ProtocolExtensionContainer'},
                                                                           None],
@@ -1217,12 +1572,14 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                              {'name': 'receiveStatusofULPDCPSDUs',
                                                                               'optional': True,
                                                                               'type': 'ReceiveStatusofULPDCPSDUs'},
-                                                                             {'name': 'iE-Extensions',
+                                                                             {'actual-parameters': ['Bearers-SubjectToStatusTransfer-ItemExtIEs'],
+                                                                              'name': 'iE-Extensions',
                                                                               'optional': True,
                                                                               'type': 'ProtocolExtensionContainer'},
                                                                              None],
                                                                  'type': 'SEQUENCE'},
-                        'Bearers-SubjectToStatusTransferList': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                        'Bearers-SubjectToStatusTransferList': {'element': {'actual-parameters': ['Bearers-SubjectToStatusTransfer-ItemIEs'],
+                                                                            'type': 'ProtocolIE-SingleContainer'},
                                                                 'size': [(1,
                                                                           'maxnoofE-RABs')],
                                                                 'type': 'SEQUENCE '
@@ -1257,7 +1614,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                             {'name': 'rAC',
                                              'optional': True,
                                              'type': 'RAC'},
-                                            {'name': 'iE-Extensions',
+                                            {'actual-parameters': ['CGI-ExtIEs'],
+                                             'name': 'iE-Extensions',
                                              'optional': True,
                                              'type': 'ProtocolExtensionContainer'},
                                             None],
@@ -1269,7 +1627,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                             'type': 'PDCP-SNExtended'},
                                                            {'name': 'hFNModified',
                                                             'type': 'HFNModified'},
-                                                           {'name': 'iE-Extensions',
+                                                           {'actual-parameters': ['COUNTValueExtended-ExtIEs'],
+                                                            'name': 'iE-Extensions',
                                                             'optional': True,
                                                             'type': 'ProtocolExtensionContainer'},
                                                            None],
@@ -1278,7 +1637,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                     'type': 'PDCP-SN'},
                                                    {'name': 'hFN',
                                                     'type': 'HFN'},
-                                                   {'name': 'iE-Extensions',
+                                                   {'actual-parameters': ['COUNTvalue-ExtIEs'],
+                                                    'name': 'iE-Extensions',
                                                     'optional': True,
                                                     'type': 'ProtocolExtensionContainer'},
                                                    None],
@@ -1287,7 +1647,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                    'type': 'PDCP-SNlength18'},
                                                                   {'name': 'hFNforPDCP-SNlength18',
                                                                    'type': 'HFNforPDCP-SNlength18'},
-                                                                  {'name': 'iE-Extensions',
+                                                                  {'actual-parameters': ['COUNTvaluePDCP-SNlength18-ExtIEs'],
+                                                                   'name': 'iE-Extensions',
                                                                    'optional': True,
                                                                    'type': 'ProtocolExtensionContainer'},
                                                                   None],
@@ -1304,7 +1665,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                        'type': 'SEQUENCE OF'},
                         'CSG-IdList-Item': {'members': [{'name': 'cSG-Id',
                                                          'type': 'CSG-Id'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['CSG-IdList-Item-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -1320,7 +1682,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                  'type': 'EUTRAN-CGI'},
                                                                 {'name': 'numberOfBroadcasts',
                                                                  'type': 'NumberOfBroadcasts'},
-                                                                {'name': 'iE-Extensions',
+                                                                {'actual-parameters': ['CancelledCellinEAI-Item-ExtIEs'],
+                                                                 'name': 'iE-Extensions',
                                                                  'optional': True,
                                                                  'type': 'ProtocolExtensionContainer'},
                                                                 None],
@@ -1333,7 +1696,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                  'type': 'EUTRAN-CGI'},
                                                                 {'name': 'numberOfBroadcasts',
                                                                  'type': 'NumberOfBroadcasts'},
-                                                                {'name': 'iE-Extensions',
+                                                                {'actual-parameters': ['CancelledCellinTAI-Item-ExtIEs'],
+                                                                 'name': 'iE-Extensions',
                                                                  'optional': True,
                                                                  'type': 'ProtocolExtensionContainer'},
                                                                 None],
@@ -1484,7 +1848,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                'type': 'Cdma2000OneXMSI'},
                                                               {'name': 'cdma2000OneXPilot',
                                                                'type': 'Cdma2000OneXPilot'},
-                                                              {'name': 'iE-Extensions',
+                                                              {'actual-parameters': ['Cdma2000OneXSRVCCInfo-ExtIEs'],
+                                                               'name': 'iE-Extensions',
                                                                'optional': True,
                                                                'type': 'ProtocolExtensionContainer'},
                                                               None],
@@ -1505,7 +1870,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                            'values': [('hybrid', 0), None]},
                         'CellBasedMDT': {'members': [{'name': 'cellIdListforMDT',
                                                       'type': 'CellIdListforMDT'},
-                                                     {'name': 'iE-Extensions',
+                                                     {'actual-parameters': ['CellBasedMDT-ExtIEs'],
+                                                      'name': 'iE-Extensions',
                                                       'optional': True,
                                                       'type': 'ProtocolExtensionContainer'},
                                                      None],
@@ -1515,7 +1881,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                              'type': 'SEQUENCE OF'},
                         'CellID-Broadcast-Item': {'members': [{'name': 'eCGI',
                                                                'type': 'EUTRAN-CGI'},
-                                                              {'name': 'iE-Extensions',
+                                                              {'actual-parameters': ['CellID-Broadcast-Item-ExtIEs'],
+                                                               'name': 'iE-Extensions',
                                                                'optional': True,
                                                                'type': 'ProtocolExtensionContainer'},
                                                               None],
@@ -1527,7 +1894,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                'type': 'EUTRAN-CGI'},
                                                               {'name': 'numberOfBroadcasts',
                                                                'type': 'NumberOfBroadcasts'},
-                                                              {'name': 'iE-Extensions',
+                                                              {'actual-parameters': ['CellID-Cancelled-Item-ExtIEs'],
+                                                               'name': 'iE-Extensions',
                                                                'optional': True,
                                                                'type': 'ProtocolExtensionContainer'},
                                                               None],
@@ -1540,7 +1908,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                  'type': 'EUTRAN-CGI'},
                                                                                 {'name': 'cELevel',
                                                                                  'type': 'CELevel'},
-                                                                                {'name': 'iE-Extensions',
+                                                                                {'actual-parameters': ['CellIdentifierAndCELevelForCECapableUEs-ExtIEs'],
+                                                                                 'name': 'iE-Extensions',
                                                                                  'optional': True,
                                                                                  'type': 'ProtocolExtensionContainer'},
                                                                                 None],
@@ -1548,7 +1917,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                         'CellIdentity': {'size': [28], 'type': 'BIT STRING'},
                         'CellType': {'members': [{'name': 'cell-Size',
                                                   'type': 'Cell-Size'},
-                                                 {'name': 'iE-Extensions',
+                                                 {'actual-parameters': ['CellType-ExtIEs'],
+                                                  'name': 'iE-Extensions',
                                                   'optional': True,
                                                   'type': 'ProtocolExtensionContainer'},
                                                  None],
@@ -1559,7 +1929,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                'type': 'SEQUENCE OF'},
                         'CompletedCellinEAI-Item': {'members': [{'name': 'eCGI',
                                                                  'type': 'EUTRAN-CGI'},
-                                                                {'name': 'iE-Extensions',
+                                                                {'actual-parameters': ['CompletedCellinEAI-Item-ExtIEs'],
+                                                                 'name': 'iE-Extensions',
                                                                  'optional': True,
                                                                  'type': 'ProtocolExtensionContainer'},
                                                                 None],
@@ -1570,7 +1941,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                'type': 'SEQUENCE OF'},
                         'CompletedCellinTAI-Item': {'members': [{'name': 'eCGI',
                                                                  'type': 'EUTRAN-CGI'},
-                                                                {'name': 'iE-Extensions',
+                                                                {'actual-parameters': ['CompletedCellinTAI-Item-ExtIEs'],
+                                                                 'name': 'iE-Extensions',
                                                                  'optional': True,
                                                                  'type': 'ProtocolExtensionContainer'},
                                                                 None],
@@ -1594,7 +1966,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                {'name': 'iEsCriticalityDiagnostics',
                                                                 'optional': True,
                                                                 'type': 'CriticalityDiagnostics-IE-List'},
-                                                               {'name': 'iE-Extensions',
+                                                               {'actual-parameters': ['CriticalityDiagnostics-ExtIEs'],
+                                                                'name': 'iE-Extensions',
                                                                 'optional': True,
                                                                 'type': 'ProtocolExtensionContainer'},
                                                                None],
@@ -1605,7 +1978,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                         'type': 'ProtocolIE-ID'},
                                                                        {'name': 'typeOfError',
                                                                         'type': 'TypeOfError'},
-                                                                       {'name': 'iE-Extensions',
+                                                                       {'actual-parameters': ['CriticalityDiagnostics-IE-Item-ExtIEs'],
+                                                                        'name': 'iE-Extensions',
                                                                         'optional': True,
                                                                         'type': 'ProtocolExtensionContainer'},
                                                                        None],
@@ -1619,7 +1993,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                    'type': 'INTEGER'},
                         'DL-CP-SecurityInformation': {'members': [{'name': 'dl-NAS-MAC',
                                                                    'type': 'DL-NAS-MAC'},
-                                                                  {'name': 'iE-Extensions',
+                                                                  {'actual-parameters': ['DL-CP-SecurityInformation-ExtIEs'],
+                                                                   'name': 'iE-Extensions',
                                                                    'optional': True,
                                                                    'type': 'ProtocolExtensionContainer'},
                                                                   None],
@@ -1644,7 +2019,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                            None]},
                         'E-RAB-ID': {'restricted-to': [(0, 15), None],
                                      'type': 'INTEGER'},
-                        'E-RABInformationList': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                        'E-RABInformationList': {'element': {'actual-parameters': ['E-RABInformationListIEs'],
+                                                             'type': 'ProtocolIE-SingleContainer'},
                                                  'size': [(1, 'maxnoofE-RABs')],
                                                  'type': 'SEQUENCE OF'},
                         'E-RABInformationListItem': {'members': [{'name': 'e-RAB-ID',
@@ -1652,7 +2028,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                  {'name': 'dL-Forwarding',
                                                                   'optional': True,
                                                                   'type': 'DL-Forwarding'},
-                                                                 {'name': 'iE-Extensions',
+                                                                 {'actual-parameters': ['E-RABInformationListItem-ExtIEs'],
+                                                                  'name': 'iE-Extensions',
                                                                   'optional': True,
                                                                   'type': 'ProtocolExtensionContainer'},
                                                                  None],
@@ -1661,7 +2038,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                    'type': 'E-RAB-ID'},
                                                   {'name': 'cause',
                                                    'type': 'Cause'},
-                                                  {'name': 'iE-Extensions',
+                                                  {'actual-parameters': ['E-RABItem-ExtIEs'],
+                                                   'name': 'iE-Extensions',
                                                    'optional': True,
                                                    'type': 'ProtocolExtensionContainer'},
                                                   None],
@@ -1673,12 +2051,14 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                 {'name': 'gbrQosInformation',
                                                                  'optional': True,
                                                                  'type': 'GBR-QosInformation'},
-                                                                {'name': 'iE-Extensions',
+                                                                {'actual-parameters': ['E-RABQoSParameters-ExtIEs'],
+                                                                 'name': 'iE-Extensions',
                                                                  'optional': True,
                                                                  'type': 'ProtocolExtensionContainer'},
                                                                 None],
                                                     'type': 'SEQUENCE'},
-                        'E-RABList': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                        'E-RABList': {'element': {'actual-parameters': ['E-RABItemIEs'],
+                                                  'type': 'ProtocolIE-SingleContainer'},
                                       'size': [(1, 'maxnoofE-RABs')],
                                       'type': 'SEQUENCE OF'},
                         'E-UTRAN-Trace-ID': {'size': [8],
@@ -1711,7 +2091,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                    'type': 'CHOICE'},
                         'ENB-StatusTransfer-TransparentContainer': {'members': [{'name': 'bearers-SubjectToStatusTransferList',
                                                                                  'type': 'Bearers-SubjectToStatusTransferList'},
-                                                                                {'name': 'iE-Extensions',
+                                                                                {'actual-parameters': ['ENB-StatusTransfer-TransparentContainer-ExtIEs'],
+                                                                                 'name': 'iE-Extensions',
                                                                                  'optional': True,
                                                                                  'type': 'ProtocolExtensionContainer'},
                                                                                 None],
@@ -1729,7 +2110,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                     {'name': 'gTPTLAa',
                                                      'optional': True,
                                                      'type': 'ENBX2GTPTLAs'},
-                                                    {'name': 'iE-Extensions',
+                                                    {'actual-parameters': ['ENBX2ExtTLA-ExtIEs'],
+                                                     'name': 'iE-Extensions',
                                                      'optional': True,
                                                      'type': 'ProtocolExtensionContainer'},
                                                     None],
@@ -1752,7 +2134,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                     'type': 'PLMNidentity'},
                                                    {'name': 'cell-ID',
                                                     'type': 'CellIdentity'},
-                                                   {'name': 'iE-Extensions',
+                                                   {'actual-parameters': ['EUTRAN-CGI-ExtIEs'],
+                                                    'name': 'iE-Extensions',
                                                     'optional': True,
                                                     'type': 'ProtocolExtensionContainer'},
                                                    None],
@@ -1770,7 +2153,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                         'type': 'EmergencyAreaID'},
                                                                        {'name': 'completedCellinEAI',
                                                                         'type': 'CompletedCellinEAI'},
-                                                                       {'name': 'iE-Extensions',
+                                                                       {'actual-parameters': ['EmergencyAreaID-Broadcast-Item-ExtIEs'],
+                                                                        'name': 'iE-Extensions',
                                                                         'optional': True,
                                                                         'type': 'ProtocolExtensionContainer'},
                                                                        None],
@@ -1783,7 +2167,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                         'type': 'EmergencyAreaID'},
                                                                        {'name': 'cancelledCellinEAI',
                                                                         'type': 'CancelledCellinEAI'},
-                                                                       {'name': 'iE-Extensions',
+                                                                       {'actual-parameters': ['EmergencyAreaID-Cancelled-Item-ExtIEs'],
+                                                                        'name': 'iE-Extensions',
                                                                         'optional': True,
                                                                         'type': 'ProtocolExtensionContainer'},
                                                                        None],
@@ -1851,7 +2236,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                     {'name': 'sourceofUEActivityBehaviourInformation',
                                                                      'optional': True,
                                                                      'type': 'SourceOfUEActivityBehaviourInformation'},
-                                                                    {'name': 'iE-Extensions',
+                                                                    {'actual-parameters': ['ExpectedUEActivityBehaviour-ExtIEs'],
+                                                                     'name': 'iE-Extensions',
                                                                      'optional': True,
                                                                      'type': 'ProtocolExtensionContainer'},
                                                                     None],
@@ -1862,7 +2248,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                             {'name': 'expectedHOInterval',
                                                              'optional': True,
                                                              'type': 'ExpectedHOInterval'},
-                                                            {'name': 'iE-Extensions',
+                                                            {'actual-parameters': ['ExpectedUEBehaviour-ExtIEs'],
+                                                             'name': 'iE-Extensions',
                                                              'optional': True,
                                                              'type': 'ProtocolExtensionContainer'},
                                                             None],
@@ -1893,7 +2280,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                            'type': 'PLMNidentity'},
                                                           {'name': 'forbiddenLACs',
                                                            'type': 'ForbiddenLACs'},
-                                                          {'name': 'iE-Extensions',
+                                                          {'actual-parameters': ['ForbiddenLAs-Item-ExtIEs'],
+                                                           'name': 'iE-Extensions',
                                                            'optional': True,
                                                            'type': 'ProtocolExtensionContainer'},
                                                           None],
@@ -1908,7 +2296,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                            'type': 'PLMNidentity'},
                                                           {'name': 'forbiddenTACs',
                                                            'type': 'ForbiddenTACs'},
-                                                          {'name': 'iE-Extensions',
+                                                          {'actual-parameters': ['ForbiddenTAs-Item-ExtIEs'],
+                                                           'name': 'iE-Extensions',
                                                            'optional': True,
                                                            'type': 'ProtocolExtensionContainer'},
                                                           None],
@@ -1921,7 +2310,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                             'type': 'BitRate'},
                                                            {'name': 'e-RAB-GuaranteedBitrateUL',
                                                             'type': 'BitRate'},
-                                                           {'name': 'iE-Extensions',
+                                                           {'actual-parameters': ['GBR-QosInformation-ExtIEs'],
+                                                            'name': 'iE-Extensions',
                                                             'optional': True,
                                                             'type': 'ProtocolExtensionContainer'},
                                                            None],
@@ -1932,7 +2322,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                        'type': 'RAC'},
                                                       {'name': 'cI',
                                                        'type': 'CI'},
-                                                      {'name': 'iE-Extensions',
+                                                      {'actual-parameters': ['GERAN-Cell-ID-ExtIEs'],
+                                                       'name': 'iE-Extensions',
                                                        'optional': True,
                                                        'type': 'ProtocolExtensionContainer'},
                                                       None],
@@ -1944,7 +2335,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                 'type': 'MME-Group-ID'},
                                                {'name': 'mME-Code',
                                                 'type': 'MME-Code'},
-                                               {'name': 'iE-Extensions',
+                                               {'actual-parameters': ['GUMMEI-ExtIEs'],
+                                                'name': 'iE-Extensions',
                                                 'optional': True,
                                                 'type': 'ProtocolExtensionContainer'},
                                                None],
@@ -1963,7 +2355,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                        'type': 'PLMNidentity'},
                                                       {'name': 'eNB-ID',
                                                        'type': 'ENB-ID'},
-                                                      {'name': 'iE-Extensions',
+                                                      {'actual-parameters': ['GlobalENB-ID-ExtIEs'],
+                                                       'name': 'iE-Extensions',
                                                        'optional': True,
                                                        'type': 'ProtocolExtensionContainer'},
                                                       None],
@@ -1988,7 +2381,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                 {'name': 'forbiddenInterRATs',
                                                                  'optional': True,
                                                                  'type': 'ForbiddenInterRATs'},
-                                                                {'name': 'iE-Extensions',
+                                                                {'actual-parameters': ['HandoverRestrictionList-ExtIEs'],
+                                                                 'name': 'iE-Extensions',
                                                                  'optional': True,
                                                                  'type': 'ProtocolExtensionContainer'},
                                                                 None],
@@ -2011,7 +2405,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                      {'name': 'm1periodicReporting',
                                                       'optional': True,
                                                       'type': 'M1PeriodicReporting'},
-                                                     {'name': 'iE-Extensions',
+                                                     {'actual-parameters': ['ImmediateMDT-ExtIEs'],
+                                                      'name': 'iE-Extensions',
                                                       'optional': True,
                                                       'type': 'ProtocolExtensionContainer'},
                                                      None],
@@ -2020,7 +2415,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                        'type': 'RecommendedCellsForPaging'},
                                                                                       {'name': 'recommendENBsForPaging',
                                                                                        'type': 'RecommendedENBsForPaging'},
-                                                                                      {'name': 'iE-Extensions',
+                                                                                      {'actual-parameters': ['InformationOnRecommendedCellsAndENBsForPaging-ExtIEs'],
+                                                                                       'name': 'iE-Extensions',
                                                                                        'optional': True,
                                                                                        'type': 'ProtocolExtensionContainer'},
                                                                                       None],
@@ -2040,7 +2436,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                         'LAI': {'members': [{'name': 'pLMNidentity',
                                              'type': 'PLMNidentity'},
                                             {'name': 'lAC', 'type': 'LAC'},
-                                            {'name': 'iE-Extensions',
+                                            {'actual-parameters': ['LAI-ExtIEs'],
+                                             'name': 'iE-Extensions',
                                              'optional': True,
                                              'type': 'ProtocolExtensionContainer'},
                                             None],
@@ -2061,7 +2458,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                           'type': 'CellType'},
                                                                          {'name': 'time-UE-StayedInCell',
                                                                           'type': 'Time-UE-StayedInCell'},
-                                                                         {'name': 'iE-Extensions',
+                                                                         {'actual-parameters': ['LastVisitedEUTRANCellInformation-ExtIEs'],
+                                                                          'name': 'iE-Extensions',
                                                                           'optional': True,
                                                                           'type': 'ProtocolExtensionContainer'},
                                                                          None],
@@ -2094,7 +2492,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                      10239),
                                                                                     None],
                                                                   'type': 'INTEGER'},
-                                                                 {'name': 'iE-Extensions',
+                                                                 {'actual-parameters': ['ListeningSubframePattern-ExtIEs'],
+                                                                  'name': 'iE-Extensions',
                                                                   'optional': True,
                                                                   'type': 'ProtocolExtensionContainer'},
                                                                  None],
@@ -2106,7 +2505,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                        {'name': 'mBSFN-ResultToLog',
                                                         'optional': True,
                                                         'type': 'MBSFN-ResultToLog'},
-                                                       {'name': 'iE-Extensions',
+                                                       {'actual-parameters': ['LoggedMBSFNMDT-ExtIEs'],
+                                                        'name': 'iE-Extensions',
                                                         'optional': True,
                                                         'type': 'ProtocolExtensionContainer'},
                                                        None],
@@ -2115,7 +2515,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                    'type': 'LoggingInterval'},
                                                   {'name': 'loggingDuration',
                                                    'type': 'LoggingDuration'},
-                                                  {'name': 'iE-Extensions',
+                                                  {'actual-parameters': ['LoggedMDT-ExtIEs'],
+                                                   'name': 'iE-Extensions',
                                                    'optional': True,
                                                    'type': 'ProtocolExtensionContainer'},
                                                   None],
@@ -2141,7 +2542,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                              'type': 'ReportIntervalMDT'},
                                                             {'name': 'reportAmount',
                                                              'type': 'ReportAmountMDT'},
-                                                            {'name': 'iE-Extensions',
+                                                            {'actual-parameters': ['M1PeriodicReporting-ExtIEs'],
+                                                             'name': 'iE-Extensions',
                                                              'optional': True,
                                                              'type': 'ProtocolExtensionContainer'},
                                                             None],
@@ -2155,14 +2557,16 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                            2)]},
                         'M1ThresholdEventA2': {'members': [{'name': 'measurementThreshold',
                                                             'type': 'MeasurementThresholdA2'},
-                                                           {'name': 'iE-Extensions',
+                                                           {'actual-parameters': ['M1ThresholdEventA2-ExtIEs'],
+                                                            'name': 'iE-Extensions',
                                                             'optional': True,
                                                             'type': 'ProtocolExtensionContainer'},
                                                            None],
                                                'type': 'SEQUENCE'},
                         'M3Configuration': {'members': [{'name': 'm3period',
                                                          'type': 'M3period'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['M3Configuration-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -2176,7 +2580,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                          'type': 'M4period'},
                                                         {'name': 'm4-links-to-log',
                                                          'type': 'Links-to-log'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['M4Configuration-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -2192,7 +2597,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                          'type': 'M5period'},
                                                         {'name': 'm5-links-to-log',
                                                          'type': 'Links-to-log'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['M5Configuration-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -2211,7 +2617,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                          'type': 'M6delay-threshold'},
                                                         {'name': 'm6-links-to-log',
                                                          'type': 'Links-to-log'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['M6Configuration-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -2240,7 +2647,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                          'type': 'M7period'},
                                                         {'name': 'm7-links-to-log',
                                                          'type': 'Links-to-log'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['M7Configuration-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -2258,7 +2666,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                'type': 'INTEGER'},
                                                               {'name': 'carrierFreq',
                                                                'type': 'EARFCN'},
-                                                              {'name': 'iE-Extensions',
+                                                              {'actual-parameters': ['MBSFN-ResultToLogInfo-ExtIEs'],
+                                                               'name': 'iE-Extensions',
                                                                'optional': True,
                                                                'type': 'ProtocolExtensionContainer'},
                                                               None],
@@ -2276,7 +2685,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                            'type': 'AreaScopeOfMDT'},
                                                           {'name': 'mDTMode',
                                                            'type': 'MDTMode'},
-                                                          {'name': 'iE-Extensions',
+                                                          {'actual-parameters': ['MDT-Configuration-ExtIEs'],
+                                                           'name': 'iE-Extensions',
                                                            'optional': True,
                                                            'type': 'ProtocolExtensionContainer'},
                                                           None],
@@ -2291,7 +2701,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                 {'name': 'mDTMode-Extension',
                                                  'type': 'MDTMode-Extension'}],
                                     'type': 'CHOICE'},
-                        'MDTMode-Extension': {'type': 'ProtocolIE-SingleContainer'},
+                        'MDTMode-Extension': {'actual-parameters': ['MDTMode-ExtensionIE'],
+                                              'type': 'ProtocolIE-SingleContainer'},
                         'MDTPLMNList': {'element': {'type': 'PLMNidentity'},
                                         'size': [(1, 'maxnoofMDTPLMNs')],
                                         'type': 'SEQUENCE OF'},
@@ -2353,7 +2764,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                      10239),
                                                                                     None],
                                                                   'type': 'INTEGER'},
-                                                                 {'name': 'iE-Extensions',
+                                                                 {'actual-parameters': ['MutingPatternInformation-ExtIEs'],
+                                                                  'name': 'iE-Extensions',
                                                                   'optional': True,
                                                                   'type': 'ProtocolExtensionContainer'},
                                                                  None],
@@ -2390,7 +2802,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                       {'name': 'nB-IoT-pagingTimeWindow',
                                                                        'optional': True,
                                                                        'type': 'NB-IoT-PagingTimeWindow'},
-                                                                      {'name': 'iE-Extensions',
+                                                                      {'actual-parameters': ['NB-IoT-Paging-eDRXInformation-ExtIEs'],
+                                                                       'name': 'iE-Extensions',
                                                                        'optional': True,
                                                                        'type': 'ProtocolExtensionContainer'},
                                                                       None],
@@ -2481,7 +2894,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                {'name': 'pagingTimeWindow',
                                                                 'optional': True,
                                                                 'type': 'PagingTimeWindow'},
-                                                               {'name': 'iE-Extensions',
+                                                               {'actual-parameters': ['Paging-eDRXInformation-ExtIEs'],
+                                                                'name': 'iE-Extensions',
                                                                 'optional': True,
                                                                 'type': 'ProtocolExtensionContainer'},
                                                                None],
@@ -2495,7 +2909,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                  {'name': 'nextPagingAreaScope',
                                                                   'optional': True,
                                                                   'type': 'NextPagingAreaScope'},
-                                                                 {'name': 'iE-Extensions',
+                                                                 {'actual-parameters': ['PagingAttemptInformation-ExtIEs'],
+                                                                  'name': 'iE-Extensions',
                                                                   'optional': True,
                                                                   'type': 'ProtocolExtensionContainer'},
                                                                  None],
@@ -2561,7 +2976,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                         {'name': 'proSeDirectCommunication',
                                                          'optional': True,
                                                          'type': 'ProSeDirectCommunication'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['ProSeAuthorized-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -2603,7 +3019,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                     {'name': 'rIMRoutingAddress',
                                                      'optional': True,
                                                      'type': 'RIMRoutingAddress'},
-                                                    {'name': 'iE-Extensions',
+                                                    {'actual-parameters': ['RIMTransfer-ExtIEs'],
+                                                     'name': 'iE-Extensions',
                                                      'optional': True,
                                                      'type': 'ProtocolExtensionContainer'},
                                                     None],
@@ -2613,7 +3030,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                              {'name': 'uE-RLF-Report-Container-for-extended-bands',
                                                               'optional': True,
                                                               'type': 'UE-RLF-Report-Container-for-extended-bands'},
-                                                             {'name': 'iE-Extensions',
+                                                             {'actual-parameters': ['RLFReportInformation-ExtIEs'],
+                                                              'name': 'iE-Extensions',
                                                               'optional': True,
                                                               'type': 'ProtocolExtensionContainer'},
                                                              None],
@@ -2653,36 +3071,42 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                              'restricted-to': [(0,
                                                                                 4095)],
                                                              'type': 'INTEGER'},
-                                                            {'name': 'iE-Extensions',
+                                                            {'actual-parameters': ['RecommendedCellsForPagingItem-ExtIEs'],
+                                                             'name': 'iE-Extensions',
                                                              'optional': True,
                                                              'type': 'ProtocolExtensionContainer'},
                                                             None],
                                                 'type': 'SEQUENCE'},
-                        'RecommendedCellList': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                        'RecommendedCellList': {'element': {'actual-parameters': ['RecommendedCellItemIEs'],
+                                                            'type': 'ProtocolIE-SingleContainer'},
                                                 'size': [(1,
                                                           'maxnoofRecommendedCells')],
                                                 'type': 'SEQUENCE OF'},
                         'RecommendedCellsForPaging': {'members': [{'name': 'recommendedCellList',
                                                                    'type': 'RecommendedCellList'},
-                                                                  {'name': 'iE-Extensions',
+                                                                  {'actual-parameters': ['RecommendedCellsForPaging-ExtIEs'],
+                                                                   'name': 'iE-Extensions',
                                                                    'optional': True,
                                                                    'type': 'ProtocolExtensionContainer'},
                                                                   None],
                                                       'type': 'SEQUENCE'},
                         'RecommendedENBItem': {'members': [{'name': 'mMEPagingTarget',
                                                             'type': 'MMEPagingTarget'},
-                                                           {'name': 'iE-Extensions',
+                                                           {'actual-parameters': ['RecommendedENBItem-ExtIEs'],
+                                                            'name': 'iE-Extensions',
                                                             'optional': True,
                                                             'type': 'ProtocolExtensionContainer'},
                                                            None],
                                                'type': 'SEQUENCE'},
-                        'RecommendedENBList': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                        'RecommendedENBList': {'element': {'actual-parameters': ['RecommendedENBItemIEs'],
+                                                           'type': 'ProtocolIE-SingleContainer'},
                                                'size': [(1,
                                                          'maxnoofRecommendedENBs')],
                                                'type': 'SEQUENCE OF'},
                         'RecommendedENBsForPaging': {'members': [{'name': 'recommendedENBList',
                                                                   'type': 'RecommendedENBList'},
-                                                                 {'name': 'iE-Extensions',
+                                                                 {'actual-parameters': ['RecommendedENBsForPaging-ExtIEs'],
+                                                                  'name': 'iE-Extensions',
                                                                   'optional': True,
                                                                   'type': 'ProtocolExtensionContainer'},
                                                                  None],
@@ -2722,7 +3146,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                      'type': 'EventType'},
                                                     {'name': 'reportArea',
                                                      'type': 'ReportArea'},
-                                                    {'name': 'iE-Extensions',
+                                                    {'actual-parameters': ['RequestType-ExtIEs'],
+                                                     'name': 'iE-Extensions',
                                                      'optional': True,
                                                      'type': 'ProtocolExtensionContainer'},
                                                     None],
@@ -2733,7 +3158,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                 'type': 'MME-Code'},
                                                {'name': 'm-TMSI',
                                                 'type': 'M-TMSI'},
-                                               {'name': 'iE-Extensions',
+                                               {'actual-parameters': ['S-TMSI-ExtIEs'],
+                                                'name': 'iE-Extensions',
                                                 'optional': True,
                                                 'type': 'ProtocolExtensionContainer'},
                                                None],
@@ -2744,7 +3170,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                   'type': 'SourceeNB-ID'},
                                                                  {'name': 'sONInformation',
                                                                   'type': 'SONInformation'},
-                                                                 {'name': 'iE-Extensions',
+                                                                 {'actual-parameters': ['SONConfigurationTransfer-ExtIEs'],
+                                                                  'name': 'iE-Extensions',
                                                                   'optional': True,
                                                                   'type': 'ProtocolExtensionContainer'},
                                                                  None],
@@ -2757,11 +3184,13 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                        {'name': 'sONInformation-Extension',
                                                         'type': 'SONInformation-Extension'}],
                                            'type': 'CHOICE'},
-                        'SONInformation-Extension': {'type': 'ProtocolIE-SingleContainer'},
+                        'SONInformation-Extension': {'actual-parameters': ['SONInformation-ExtensionIE'],
+                                                     'type': 'ProtocolIE-SingleContainer'},
                         'SONInformationReply': {'members': [{'name': 'x2TNLConfigurationInfo',
                                                              'optional': True,
                                                              'type': 'X2TNLConfigurationInfo'},
-                                                            {'name': 'iE-Extensions',
+                                                            {'actual-parameters': ['SONInformationReply-ExtIEs'],
+                                                             'name': 'iE-Extensions',
                                                              'optional': True,
                                                              'type': 'ProtocolExtensionContainer'},
                                                             None],
@@ -2797,7 +3226,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                          'type': 'INTEGER'},
                                                         {'name': 'nextHopParameter',
                                                          'type': 'SecurityKey'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['SecurityContext-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -2811,7 +3241,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                         'type': 'DCN-ID'},
                                                        {'name': 'relativeDCNCapacity',
                                                         'type': 'RelativeMMECapacity'},
-                                                       {'name': 'iE-Extensions',
+                                                       {'actual-parameters': ['ServedDCNsItem-ExtIEs'],
+                                                        'name': 'iE-Extensions',
                                                         'optional': True,
                                                         'type': 'ProtocolExtensionContainer'},
                                                        None],
@@ -2825,7 +3256,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                            'type': 'ServedGroupIDs'},
                                                           {'name': 'servedMMECs',
                                                            'type': 'ServedMMECs'},
-                                                          {'name': 'iE-Extensions',
+                                                          {'actual-parameters': ['ServedGUMMEIsItem-ExtIEs'],
+                                                           'name': 'iE-Extensions',
                                                            'optional': True,
                                                            'type': 'ProtocolExtensionContainer'},
                                                           None],
@@ -2855,7 +3287,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                       'type': 'Global-ENB-ID'},
                                                      {'name': 'selected-TAI',
                                                       'type': 'TAI'},
-                                                     {'name': 'iE-Extensions',
+                                                     {'actual-parameters': ['SourceeNB-ID-ExtIEs'],
+                                                      'name': 'iE-Extensions',
                                                       'optional': True,
                                                       'type': 'ProtocolExtensionContainer'}],
                                          'type': 'SEQUENCE'},
@@ -2871,7 +3304,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                     'type': 'SubscriberProfileIDforRFP'},
                                                                                    {'name': 'uE-HistoryInformation',
                                                                                     'type': 'UE-HistoryInformation'},
-                                                                                   {'name': 'iE-Extensions',
+                                                                                   {'actual-parameters': ['SourceeNB-ToTargeteNB-TransparentContainer-ExtIEs'],
+                                                                                    'name': 'iE-Extensions',
                                                                                     'optional': True,
                                                                                     'type': 'ProtocolExtensionContainer'},
                                                                                    None],
@@ -2888,7 +3322,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                            'type': 'TAC'},
                                                           {'name': 'broadcastPLMNs',
                                                            'type': 'BPLMNs'},
-                                                          {'name': 'iE-Extensions',
+                                                          {'actual-parameters': ['SupportedTAs-Item-ExtIEs'],
+                                                           'name': 'iE-Extensions',
                                                            'optional': True,
                                                            'type': 'ProtocolExtensionContainer'},
                                                           None],
@@ -2902,7 +3337,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                    {'name': 'aggressoreCGI-List',
                                                                     'optional': True,
                                                                     'type': 'ECGI-List'},
-                                                                   {'name': 'iE-Extensions',
+                                                                   {'actual-parameters': ['SynchronisationInformation-ExtIEs'],
+                                                                    'name': 'iE-Extensions',
                                                                     'optional': True,
                                                                     'type': 'ProtocolExtensionContainer'},
                                                                    None],
@@ -2914,7 +3350,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                              None]},
                         'TABasedMDT': {'members': [{'name': 'tAListforMDT',
                                                     'type': 'TAListforMDT'},
-                                                   {'name': 'iE-Extensions',
+                                                   {'actual-parameters': ['TABasedMDT-ExtIEs'],
+                                                    'name': 'iE-Extensions',
                                                     'optional': True,
                                                     'type': 'ProtocolExtensionContainer'},
                                                    None],
@@ -2923,7 +3360,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                         'TAI': {'members': [{'name': 'pLMNidentity',
                                              'type': 'PLMNidentity'},
                                             {'name': 'tAC', 'type': 'TAC'},
-                                            {'name': 'iE-Extensions',
+                                            {'actual-parameters': ['TAI-ExtIEs'],
+                                             'name': 'iE-Extensions',
                                              'optional': True,
                                              'type': 'ProtocolExtensionContainer'},
                                             None],
@@ -2935,7 +3373,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                             'type': 'TAI'},
                                                            {'name': 'completedCellinTAI',
                                                             'type': 'CompletedCellinTAI'},
-                                                           {'name': 'iE-Extensions',
+                                                           {'actual-parameters': ['TAI-Broadcast-Item-ExtIEs'],
+                                                            'name': 'iE-Extensions',
                                                             'optional': True,
                                                             'type': 'ProtocolExtensionContainer'},
                                                            None],
@@ -2947,14 +3386,16 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                             'type': 'TAI'},
                                                            {'name': 'cancelledCellinTAI',
                                                             'type': 'CancelledCellinTAI'},
-                                                           {'name': 'iE-Extensions',
+                                                           {'actual-parameters': ['TAI-Cancelled-Item-ExtIEs'],
+                                                            'name': 'iE-Extensions',
                                                             'optional': True,
                                                             'type': 'ProtocolExtensionContainer'},
                                                            None],
                                                'type': 'SEQUENCE'},
                         'TAIBasedMDT': {'members': [{'name': 'tAIListforMDT',
                                                      'type': 'TAIListforMDT'},
-                                                    {'name': 'iE-Extensions',
+                                                    {'actual-parameters': ['TAIBasedMDT-ExtIEs'],
+                                                     'name': 'iE-Extensions',
                                                      'optional': True,
                                                      'type': 'ProtocolExtensionContainer'},
                                                     None],
@@ -2995,7 +3436,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                      {'name': 'extendedRNC-ID',
                                                       'optional': True,
                                                       'type': 'ExtendedRNC-ID'},
-                                                     {'name': 'iE-Extensions',
+                                                     {'actual-parameters': ['TargetRNC-ID-ExtIEs'],
+                                                      'name': 'iE-Extensions',
                                                       'optional': True,
                                                       'type': 'ProtocolExtensionContainer'},
                                                      None],
@@ -3006,14 +3448,16 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                       'type': 'Global-ENB-ID'},
                                                      {'name': 'selected-TAI',
                                                       'type': 'TAI'},
-                                                     {'name': 'iE-Extensions',
+                                                     {'actual-parameters': ['TargeteNB-ID-ExtIEs'],
+                                                      'name': 'iE-Extensions',
                                                       'optional': True,
                                                       'type': 'ProtocolExtensionContainer'},
                                                      None],
                                          'type': 'SEQUENCE'},
                         'TargeteNB-ToSourceeNB-TransparentContainer': {'members': [{'name': 'rRC-Container',
                                                                                     'type': 'RRC-Container'},
-                                                                                   {'name': 'iE-Extensions',
+                                                                                   {'actual-parameters': ['TargeteNB-ToSourceeNB-TransparentContainer-ExtIEs'],
+                                                                                    'name': 'iE-Extensions',
                                                                                     'optional': True,
                                                                                     'type': 'ProtocolExtensionContainer'},
                                                                                    None],
@@ -3031,7 +3475,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                  'type': 'StratumLevel'},
                                                                 {'name': 'synchronisationStatus',
                                                                  'type': 'SynchronisationStatus'},
-                                                                {'name': 'iE-Extensions',
+                                                                {'actual-parameters': ['TimeSynchronisationInfo-ExtIEs'],
+                                                                 'name': 'iE-Extensions',
                                                                  'optional': True,
                                                                  'type': 'ProtocolExtensionContainer'},
                                                                 None],
@@ -3052,7 +3497,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                          'type': 'TraceDepth'},
                                                         {'name': 'traceCollectionEntityIPAddress',
                                                          'type': 'TransportLayerAddress'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['TraceActivation-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -3084,7 +3530,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                           {'name': 'uDP-Port-Number',
                                                            'optional': True,
                                                            'type': 'Port-Number'},
-                                                          {'name': 'iE-Extensions',
+                                                          {'actual-parameters': ['Tunnel-Information-ExtIEs'],
+                                                           'name': 'iE-Extensions',
                                                            'optional': True,
                                                            'type': 'ProtocolExtensionContainer'},
                                                           None],
@@ -3109,7 +3556,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                          'type': 'MME-UE-S1AP-ID'},
                                                         {'name': 'eNB-UE-S1AP-ID',
                                                          'type': 'ENB-UE-S1AP-ID'},
-                                                        {'name': 'iE-Extensions',
+                                                        {'actual-parameters': ['UE-S1AP-ID-pair-ExtIEs'],
+                                                         'name': 'iE-Extensions',
                                                          'optional': True,
                                                          'type': 'ProtocolExtensionContainer'},
                                                         None],
@@ -3128,7 +3576,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                               {'name': 'eNB-UE-S1AP-ID',
                                                                                'optional': True,
                                                                                'type': 'ENB-UE-S1AP-ID'},
-                                                                              {'name': 'iE-Extensions',
+                                                                              {'actual-parameters': ['UE-associatedLogicalS1-ConnectionItemExtIEs'],
+                                                                               'name': 'iE-Extensions',
                                                                                'optional': True,
                                                                                'type': 'ProtocolExtensionContainer'},
                                                                               None],
@@ -3137,7 +3586,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                    'type': 'BitRate'},
                                                                   {'name': 'uEaggregateMaximumBitRateUL',
                                                                    'type': 'BitRate'},
-                                                                  {'name': 'iE-Extensions',
+                                                                  {'actual-parameters': ['UEAggregate-MaximumBitrates-ExtIEs'],
+                                                                   'name': 'iE-Extensions',
                                                                    'optional': True,
                                                                    'type': 'ProtocolExtensionContainer'},
                                                                   None],
@@ -3156,14 +3606,16 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                 'type': 'EncryptionAlgorithms'},
                                                                {'name': 'integrityProtectionAlgorithms',
                                                                 'type': 'IntegrityProtectionAlgorithms'},
-                                                               {'name': 'iE-Extensions',
+                                                               {'actual-parameters': ['UESecurityCapabilities-ExtIEs'],
+                                                                'name': 'iE-Extensions',
                                                                 'optional': True,
                                                                 'type': 'ProtocolExtensionContainer'},
                                                                None],
                                                    'type': 'SEQUENCE'},
                         'UESidelinkAggregateMaximumBitrate': {'members': [{'name': 'uESidelinkAggregateMaximumBitRate',
                                                                            'type': 'BitRate'},
-                                                                          {'name': 'iE-Extensions',
+                                                                          {'actual-parameters': ['UE-Sidelink-Aggregate-MaximumBitrates-ExtIEs'],
+                                                                           'name': 'iE-Extensions',
                                                                            'optional': True,
                                                                            'type': 'ProtocolExtensionContainer'},
                                                                           None],
@@ -3176,7 +3628,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                    'type': 'UL-NAS-MAC'},
                                                                   {'name': 'ul-NAS-Count',
                                                                    'type': 'UL-NAS-Count'},
-                                                                  {'name': 'iE-Extensions',
+                                                                  {'actual-parameters': ['UL-CP-SecurityInformation-ExtIEs'],
+                                                                   'name': 'iE-Extensions',
                                                                    'optional': True,
                                                                    'type': 'ProtocolExtensionContainer'},
                                                                   None],
@@ -3187,7 +3640,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                  'type': 'EUTRAN-CGI'},
                                                                 {'name': 'tai',
                                                                  'type': 'TAI'},
-                                                                {'name': 'iE-Extensions',
+                                                                {'actual-parameters': ['UserLocationInformation-ExtIEs'],
+                                                                 'name': 'iE-Extensions',
                                                                  'optional': True,
                                                                  'type': 'ProtocolExtensionContainer'},
                                                                 None],
@@ -3198,7 +3652,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                               {'name': 'pedestrianUE',
                                                                'optional': True,
                                                                'type': 'PedestrianUE'},
-                                                              {'name': 'iE-Extensions',
+                                                              {'actual-parameters': ['V2XServicesAuthorized-ExtIEs'],
+                                                               'name': 'iE-Extensions',
                                                                'optional': True,
                                                                'type': 'ProtocolExtensionContainer'},
                                                               None],
@@ -3228,7 +3683,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                         'WarningType': {'size': [2], 'type': 'OCTET STRING'},
                         'X2TNLConfigurationInfo': {'members': [{'name': 'eNBX2TransportLayerAddresses',
                                                                 'type': 'ENBX2TLAs'},
-                                                               {'name': 'iE-Extensions',
+                                                               {'actual-parameters': ['X2TNLConfigurationInfo-ExtIEs'],
+                                                                'name': 'iE-Extensions',
                                                                 'optional': True,
                                                                 'type': 'ProtocolExtensionContainer'},
                                                                None],
@@ -3621,269 +4077,4441 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                        'object-sets': {'CSGMembershipInfo-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                     'members': ['.']},
                                        'CellTrafficTraceIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                               'members': []},
+                                                               'members': [['ID',
+                                                                            'id-MME-UE-S1AP-ID',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'MME-UE-S1AP-ID',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-eNB-UE-S1AP-ID',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'ENB-UE-S1AP-ID',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-E-UTRAN-Trace-ID',
+                                                                            'CRITICALITY',
+                                                                            'ignore',
+                                                                            'TYPE',
+                                                                            'E-UTRAN-Trace-ID',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-EUTRAN-CGI',
+                                                                            'CRITICALITY',
+                                                                            'ignore',
+                                                                            'TYPE',
+                                                                            'EUTRAN-CGI',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-TraceCollectionEntityIPAddress',
+                                                                            'CRITICALITY',
+                                                                            'ignore',
+                                                                            'TYPE',
+                                                                            'TransportLayerAddress',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-PrivacyIndicator',
+                                                                            'CRITICALITY',
+                                                                            'ignore',
+                                                                            'TYPE',
+                                                                            'PrivacyIndicator',
+                                                                            'PRESENCE',
+                                                                            'optional'],
+                                                                           ',',
+                                                                           '.']},
                                        'ConnectionEstablishmentIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                'members': []},
+                                                                                'members': [['ID',
+                                                                                             'id-MME-UE-S1AP-ID',
+                                                                                             'CRITICALITY',
+                                                                                             'ignore',
+                                                                                             'TYPE',
+                                                                                             'MME-UE-S1AP-ID',
+                                                                                             'PRESENCE',
+                                                                                             'mandatory'],
+                                                                                            ['ID',
+                                                                                             'id-eNB-UE-S1AP-ID',
+                                                                                             'CRITICALITY',
+                                                                                             'ignore',
+                                                                                             'TYPE',
+                                                                                             'ENB-UE-S1AP-ID',
+                                                                                             'PRESENCE',
+                                                                                             'mandatory'],
+                                                                                            ['ID',
+                                                                                             'id-UERadioCapability',
+                                                                                             'CRITICALITY',
+                                                                                             'ignore',
+                                                                                             'TYPE',
+                                                                                             'UERadioCapability',
+                                                                                             'PRESENCE',
+                                                                                             'optional'],
+                                                                                            ['ID',
+                                                                                             'id-EnhancedCoverageRestricted',
+                                                                                             'CRITICALITY',
+                                                                                             'ignore',
+                                                                                             'TYPE',
+                                                                                             'EnhancedCoverageRestricted',
+                                                                                             'PRESENCE',
+                                                                                             'optional'],
+                                                                                            ['ID',
+                                                                                             'id-DL-CP-SecurityInformation',
+                                                                                             'CRITICALITY',
+                                                                                             'ignore',
+                                                                                             'TYPE',
+                                                                                             'DL-CP-SecurityInformation',
+                                                                                             'PRESENCE',
+                                                                                             'optional'],
+                                                                                            ',',
+                                                                                            '.']},
                                        'DeactivateTraceIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                              'members': []},
+                                                              'members': [['ID',
+                                                                           'id-MME-UE-S1AP-ID',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'MME-UE-S1AP-ID',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-eNB-UE-S1AP-ID',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'ENB-UE-S1AP-ID',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-E-UTRAN-Trace-ID',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'E-UTRAN-Trace-ID',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ',',
+                                                                          '.']},
                                        'DownlinkNASTransport-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                    'members': []},
+                                                                    'members': [['ID',
+                                                                                 'id-MME-UE-S1AP-ID',
+                                                                                 'CRITICALITY',
+                                                                                 'reject',
+                                                                                 'TYPE',
+                                                                                 'MME-UE-S1AP-ID',
+                                                                                 'PRESENCE',
+                                                                                 'mandatory'],
+                                                                                ['ID',
+                                                                                 'id-eNB-UE-S1AP-ID',
+                                                                                 'CRITICALITY',
+                                                                                 'reject',
+                                                                                 'TYPE',
+                                                                                 'ENB-UE-S1AP-ID',
+                                                                                 'PRESENCE',
+                                                                                 'mandatory'],
+                                                                                ['ID',
+                                                                                 'id-NAS-PDU',
+                                                                                 'CRITICALITY',
+                                                                                 'reject',
+                                                                                 'TYPE',
+                                                                                 'NAS-PDU',
+                                                                                 'PRESENCE',
+                                                                                 'mandatory'],
+                                                                                ['ID',
+                                                                                 'id-HandoverRestrictionList',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore',
+                                                                                 'TYPE',
+                                                                                 'HandoverRestrictionList',
+                                                                                 'PRESENCE',
+                                                                                 'optional'],
+                                                                                ['ID',
+                                                                                 'id-SubscriberProfileIDforRFP',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore',
+                                                                                 'TYPE',
+                                                                                 'SubscriberProfileIDforRFP',
+                                                                                 'PRESENCE',
+                                                                                 'optional'],
+                                                                                ['ID',
+                                                                                 'id-SRVCCOperationPossible',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore',
+                                                                                 'TYPE',
+                                                                                 'SRVCCOperationPossible',
+                                                                                 'PRESENCE',
+                                                                                 'optional'],
+                                                                                ['ID',
+                                                                                 'id-UERadioCapability',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore',
+                                                                                 'TYPE',
+                                                                                 'UERadioCapability',
+                                                                                 'PRESENCE',
+                                                                                 'optional'],
+                                                                                ['ID',
+                                                                                 'id-DLNASPDUDeliveryAckRequest',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore',
+                                                                                 'TYPE',
+                                                                                 'DLNASPDUDeliveryAckRequest',
+                                                                                 'PRESENCE',
+                                                                                 'optional'],
+                                                                                ['ID',
+                                                                                 'id-EnhancedCoverageRestricted',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore',
+                                                                                 'TYPE',
+                                                                                 'EnhancedCoverageRestricted',
+                                                                                 'PRESENCE',
+                                                                                 'optional'],
+                                                                                ',',
+                                                                                '.']},
                                        'DownlinkNonUEAssociatedLPPaTransport-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                    'members': []},
+                                                                                    'members': [['ID',
+                                                                                                 'id-Routing-ID',
+                                                                                                 'CRITICALITY',
+                                                                                                 'reject',
+                                                                                                 'TYPE',
+                                                                                                 'Routing-ID',
+                                                                                                 'PRESENCE',
+                                                                                                 'mandatory'],
+                                                                                                ['ID',
+                                                                                                 'id-LPPa-PDU',
+                                                                                                 'CRITICALITY',
+                                                                                                 'reject',
+                                                                                                 'TYPE',
+                                                                                                 'LPPa-PDU',
+                                                                                                 'PRESENCE',
+                                                                                                 'mandatory'],
+                                                                                                ',',
+                                                                                                '.']},
                                        'DownlinkS1cdma2000tunnellingIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                           'members': []},
+                                                                           'members': [['ID',
+                                                                                        'id-MME-UE-S1AP-ID',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'MME-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-eNB-UE-S1AP-ID',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'ENB-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-E-RABSubjecttoDataForwardingList',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'E-RABSubjecttoDataForwardingList',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-cdma2000HOStatus',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'Cdma2000HOStatus',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-cdma2000RATType',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'Cdma2000RATType',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-cdma2000PDU',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'Cdma2000PDU',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ',',
+                                                                                       '.']},
                                        'DownlinkUEAssociatedLPPaTransport-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                 'members': []},
+                                                                                 'members': [['ID',
+                                                                                              'id-MME-UE-S1AP-ID',
+                                                                                              'CRITICALITY',
+                                                                                              'reject',
+                                                                                              'TYPE',
+                                                                                              'MME-UE-S1AP-ID',
+                                                                                              'PRESENCE',
+                                                                                              'mandatory'],
+                                                                                             ['ID',
+                                                                                              'id-eNB-UE-S1AP-ID',
+                                                                                              'CRITICALITY',
+                                                                                              'reject',
+                                                                                              'TYPE',
+                                                                                              'ENB-UE-S1AP-ID',
+                                                                                              'PRESENCE',
+                                                                                              'mandatory'],
+                                                                                             ['ID',
+                                                                                              'id-Routing-ID',
+                                                                                              'CRITICALITY',
+                                                                                              'reject',
+                                                                                              'TYPE',
+                                                                                              'Routing-ID',
+                                                                                              'PRESENCE',
+                                                                                              'mandatory'],
+                                                                                             ['ID',
+                                                                                              'id-LPPa-PDU',
+                                                                                              'CRITICALITY',
+                                                                                              'reject',
+                                                                                              'TYPE',
+                                                                                              'LPPa-PDU',
+                                                                                              'PRESENCE',
+                                                                                              'mandatory'],
+                                                                                             ',',
+                                                                                             '.']},
                                        'E-RABAdmittedItem-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                     'members': ['.']},
                                        'E-RABAdmittedItemIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                'members': []},
+                                                                'members': [['ID',
+                                                                             'id-E-RABAdmittedItem',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'E-RABAdmittedItem',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ',',
+                                                                            '.']},
                                        'E-RABDataForwardingItem-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                           'members': ['.']},
                                        'E-RABDataForwardingItemIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                      'members': []},
+                                                                      'members': [['ID',
+                                                                                   'id-E-RABDataForwardingItem',
+                                                                                   'CRITICALITY',
+                                                                                   'ignore',
+                                                                                   'TYPE',
+                                                                                   'E-RABDataForwardingItem',
+                                                                                   'PRESENCE',
+                                                                                   'mandatory'],
+                                                                                  ',',
+                                                                                  '.']},
                                        'E-RABFailedToResumeItemResumeReq-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                                    'members': ['.']},
                                        'E-RABFailedToResumeItemResumeReqIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                               'members': []},
+                                                                               'members': [['ID',
+                                                                                            'id-E-RABFailedToResumeItemResumeReq',
+                                                                                            'CRITICALITY',
+                                                                                            'reject',
+                                                                                            'TYPE',
+                                                                                            'E-RABFailedToResumeItemResumeReq',
+                                                                                            'PRESENCE',
+                                                                                            'mandatory'],
+                                                                                           ',',
+                                                                                           '.']},
                                        'E-RABFailedToResumeItemResumeRes-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                                    'members': ['.']},
                                        'E-RABFailedToResumeItemResumeResIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                               'members': []},
+                                                                               'members': [['ID',
+                                                                                            'id-E-RABFailedToResumeItemResumeRes',
+                                                                                            'CRITICALITY',
+                                                                                            'reject',
+                                                                                            'TYPE',
+                                                                                            'E-RABFailedToResumeItemResumeRes',
+                                                                                            'PRESENCE',
+                                                                                            'mandatory'],
+                                                                                           ',',
+                                                                                           '.']},
                                        'E-RABFailedToSetupItemHOReqAckExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                                 'members': ['.']},
                                        'E-RABFailedtoSetupItemHOReqAckIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                             'members': []},
+                                                                             'members': [['ID',
+                                                                                          'id-E-RABFailedtoSetupItemHOReqAck',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'TYPE',
+                                                                                          'E-RABFailedToSetupItemHOReqAck',
+                                                                                          'PRESENCE',
+                                                                                          'mandatory'],
+                                                                                         ',',
+                                                                                         '.']},
                                        'E-RABModificationConfirmIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                       'members': []},
+                                                                       'members': [['ID',
+                                                                                    'id-MME-UE-S1AP-ID',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'MME-UE-S1AP-ID',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-eNB-UE-S1AP-ID',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'ENB-UE-S1AP-ID',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-E-RABModifyListBearerModConf',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'E-RABModifyListBearerModConf',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ['ID',
+                                                                                    'id-E-RABFailedToModifyListBearerModConf',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'E-RABList',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ['ID',
+                                                                                    'id-E-RABToBeReleasedListBearerModConf',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'E-RABList',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ['ID',
+                                                                                    'id-CriticalityDiagnostics',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'CriticalityDiagnostics',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ['ID',
+                                                                                    'id-CSGMembershipStatus',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'CSGMembershipStatus',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ',',
+                                                                                   '.']},
                                        'E-RABModificationIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                          'members': []},
+                                                                          'members': [['ID',
+                                                                                       'id-MME-UE-S1AP-ID',
+                                                                                       'CRITICALITY',
+                                                                                       'reject',
+                                                                                       'TYPE',
+                                                                                       'MME-UE-S1AP-ID',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ['ID',
+                                                                                       'id-eNB-UE-S1AP-ID',
+                                                                                       'CRITICALITY',
+                                                                                       'reject',
+                                                                                       'TYPE',
+                                                                                       'ENB-UE-S1AP-ID',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ['ID',
+                                                                                       'id-E-RABToBeModifiedListBearerModInd',
+                                                                                       'CRITICALITY',
+                                                                                       'reject',
+                                                                                       'TYPE',
+                                                                                       'E-RABToBeModifiedListBearerModInd',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ['ID',
+                                                                                       'id-E-RABNotToBeModifiedListBearerModInd',
+                                                                                       'CRITICALITY',
+                                                                                       'reject',
+                                                                                       'TYPE',
+                                                                                       'E-RABNotToBeModifiedListBearerModInd',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ['ID',
+                                                                                       'id-CSGMembershipInfo',
+                                                                                       'CRITICALITY',
+                                                                                       'reject',
+                                                                                       'TYPE',
+                                                                                       'CSGMembershipInfo',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ['ID',
+                                                                                       'id-Tunnel-Information-for-BBF',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'TYPE',
+                                                                                       'TunnelInformation',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ',',
+                                                                                      '.']},
                                        'E-RABModifyItemBearerModConfExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                               'members': ['.']},
                                        'E-RABModifyItemBearerModConfIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                           'members': []},
+                                                                           'members': [['ID',
+                                                                                        'id-E-RABModifyItemBearerModConf',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'E-RABModifyItemBearerModConf',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ',',
+                                                                                       '.']},
                                        'E-RABModifyItemBearerModResExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                              'members': ['.']},
                                        'E-RABModifyItemBearerModResIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                          'members': []},
+                                                                          'members': [['ID',
+                                                                                       'id-E-RABModifyItemBearerModRes',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'TYPE',
+                                                                                       'E-RABModifyItemBearerModRes',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ',',
+                                                                                      '.']},
                                        'E-RABModifyRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                 'members': []},
+                                                                 'members': [['ID',
+                                                                              'id-MME-UE-S1AP-ID',
+                                                                              'CRITICALITY',
+                                                                              'reject',
+                                                                              'TYPE',
+                                                                              'MME-UE-S1AP-ID',
+                                                                              'PRESENCE',
+                                                                              'mandatory'],
+                                                                             ['ID',
+                                                                              'id-eNB-UE-S1AP-ID',
+                                                                              'CRITICALITY',
+                                                                              'reject',
+                                                                              'TYPE',
+                                                                              'ENB-UE-S1AP-ID',
+                                                                              'PRESENCE',
+                                                                              'mandatory'],
+                                                                             ['ID',
+                                                                              'id-uEaggregateMaximumBitrate',
+                                                                              'CRITICALITY',
+                                                                              'reject',
+                                                                              'TYPE',
+                                                                              'UEAggregateMaximumBitrate',
+                                                                              'PRESENCE',
+                                                                              'optional'],
+                                                                             ['ID',
+                                                                              'id-E-RABToBeModifiedListBearerModReq',
+                                                                              'CRITICALITY',
+                                                                              'reject',
+                                                                              'TYPE',
+                                                                              'E-RABToBeModifiedListBearerModReq',
+                                                                              'PRESENCE',
+                                                                              'mandatory'],
+                                                                             ',',
+                                                                             '.']},
                                        'E-RABModifyResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                  'members': []},
+                                                                  'members': [['ID',
+                                                                               'id-MME-UE-S1AP-ID',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'MME-UE-S1AP-ID',
+                                                                               'PRESENCE',
+                                                                               'mandatory'],
+                                                                              ['ID',
+                                                                               'id-eNB-UE-S1AP-ID',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'ENB-UE-S1AP-ID',
+                                                                               'PRESENCE',
+                                                                               'mandatory'],
+                                                                              ['ID',
+                                                                               'id-E-RABModifyListBearerModRes',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'E-RABModifyListBearerModRes',
+                                                                               'PRESENCE',
+                                                                               'optional'],
+                                                                              ['ID',
+                                                                               'id-E-RABFailedToModifyList',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'E-RABList',
+                                                                               'PRESENCE',
+                                                                               'optional'],
+                                                                              ['ID',
+                                                                               'id-CriticalityDiagnostics',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'CriticalityDiagnostics',
+                                                                               'PRESENCE',
+                                                                               'optional'],
+                                                                              ',',
+                                                                              '.']},
                                        'E-RABNotToBeModifiedItemBearerModInd-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                                        'members': ['.']},
                                        'E-RABNotToBeModifiedItemBearerModIndIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                   'members': []},
+                                                                                   'members': [['ID',
+                                                                                                'id-E-RABNotToBeModifiedItemBearerModInd',
+                                                                                                'CRITICALITY',
+                                                                                                'reject',
+                                                                                                'TYPE',
+                                                                                                'E-RABNotToBeModifiedItemBearerModInd',
+                                                                                                'PRESENCE',
+                                                                                                'mandatory'],
+                                                                                               ',',
+                                                                                               '.']},
                                        'E-RABReleaseCommandIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                  'members': []},
+                                                                  'members': [['ID',
+                                                                               'id-MME-UE-S1AP-ID',
+                                                                               'CRITICALITY',
+                                                                               'reject',
+                                                                               'TYPE',
+                                                                               'MME-UE-S1AP-ID',
+                                                                               'PRESENCE',
+                                                                               'mandatory'],
+                                                                              ['ID',
+                                                                               'id-eNB-UE-S1AP-ID',
+                                                                               'CRITICALITY',
+                                                                               'reject',
+                                                                               'TYPE',
+                                                                               'ENB-UE-S1AP-ID',
+                                                                               'PRESENCE',
+                                                                               'mandatory'],
+                                                                              ['ID',
+                                                                               'id-uEaggregateMaximumBitrate',
+                                                                               'CRITICALITY',
+                                                                               'reject',
+                                                                               'TYPE',
+                                                                               'UEAggregateMaximumBitrate',
+                                                                               'PRESENCE',
+                                                                               'optional'],
+                                                                              ['ID',
+                                                                               'id-E-RABToBeReleasedList',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'E-RABList',
+                                                                               'PRESENCE',
+                                                                               'mandatory'],
+                                                                              ['ID',
+                                                                               'id-NAS-PDU',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'NAS-PDU',
+                                                                               'PRESENCE',
+                                                                               'optional'],
+                                                                              ',',
+                                                                              '.']},
                                        'E-RABReleaseIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                     'members': []},
+                                                                     'members': [['ID',
+                                                                                  'id-MME-UE-S1AP-ID',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'MME-UE-S1AP-ID',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-eNB-UE-S1AP-ID',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'ENB-UE-S1AP-ID',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-E-RABReleasedList',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'E-RABList',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-UserLocationInformation',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'UserLocationInformation',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ',',
+                                                                                 '.']},
                                        'E-RABReleaseItemBearerRelCompExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                                'members': ['.']},
                                        'E-RABReleaseItemBearerRelCompIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                            'members': []},
+                                                                            'members': [['ID',
+                                                                                         'id-E-RABReleaseItemBearerRelComp',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'E-RABReleaseItemBearerRelComp',
+                                                                                         'PRESENCE',
+                                                                                         'mandatory'],
+                                                                                        ',',
+                                                                                        '.']},
                                        'E-RABReleaseResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                   'members': []},
+                                                                   'members': [['ID',
+                                                                                'id-MME-UE-S1AP-ID',
+                                                                                'CRITICALITY',
+                                                                                'ignore',
+                                                                                'TYPE',
+                                                                                'MME-UE-S1AP-ID',
+                                                                                'PRESENCE',
+                                                                                'mandatory'],
+                                                                               ['ID',
+                                                                                'id-eNB-UE-S1AP-ID',
+                                                                                'CRITICALITY',
+                                                                                'ignore',
+                                                                                'TYPE',
+                                                                                'ENB-UE-S1AP-ID',
+                                                                                'PRESENCE',
+                                                                                'mandatory'],
+                                                                               ['ID',
+                                                                                'id-E-RABReleaseListBearerRelComp',
+                                                                                'CRITICALITY',
+                                                                                'ignore',
+                                                                                'TYPE',
+                                                                                'E-RABReleaseListBearerRelComp',
+                                                                                'PRESENCE',
+                                                                                'optional'],
+                                                                               ['ID',
+                                                                                'id-E-RABFailedToReleaseList',
+                                                                                'CRITICALITY',
+                                                                                'ignore',
+                                                                                'TYPE',
+                                                                                'E-RABList',
+                                                                                'PRESENCE',
+                                                                                'optional'],
+                                                                               ['ID',
+                                                                                'id-CriticalityDiagnostics',
+                                                                                'CRITICALITY',
+                                                                                'ignore',
+                                                                                'TYPE',
+                                                                                'CriticalityDiagnostics',
+                                                                                'PRESENCE',
+                                                                                'optional'],
+                                                                               ['ID',
+                                                                                'id-UserLocationInformation',
+                                                                                'CRITICALITY',
+                                                                                'ignore',
+                                                                                'TYPE',
+                                                                                'UserLocationInformation',
+                                                                                'PRESENCE',
+                                                                                'optional'],
+                                                                               ',',
+                                                                               '.']},
                                        'E-RABSetupItemBearerSUResExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                            'members': ['.']},
                                        'E-RABSetupItemBearerSUResIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                        'members': []},
+                                                                        'members': [['ID',
+                                                                                     'id-E-RABSetupItemBearerSURes',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'E-RABSetupItemBearerSURes',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ',',
+                                                                                    '.']},
                                        'E-RABSetupItemCtxtSUResExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                          'members': ['.']},
                                        'E-RABSetupItemCtxtSUResIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                      'members': []},
+                                                                      'members': [['ID',
+                                                                                   'id-E-RABSetupItemCtxtSURes',
+                                                                                   'CRITICALITY',
+                                                                                   'ignore',
+                                                                                   'TYPE',
+                                                                                   'E-RABSetupItemCtxtSURes',
+                                                                                   'PRESENCE',
+                                                                                   'mandatory'],
+                                                                                  ',',
+                                                                                  '.']},
                                        'E-RABSetupRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                'members': []},
+                                                                'members': [['ID',
+                                                                             'id-MME-UE-S1AP-ID',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'MME-UE-S1AP-ID',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-eNB-UE-S1AP-ID',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'ENB-UE-S1AP-ID',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-uEaggregateMaximumBitrate',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'UEAggregateMaximumBitrate',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-E-RABToBeSetupListBearerSUReq',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'E-RABToBeSetupListBearerSUReq',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ',',
+                                                                            '.']},
                                        'E-RABSetupResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                 'members': []},
+                                                                 'members': [['ID',
+                                                                              'id-MME-UE-S1AP-ID',
+                                                                              'CRITICALITY',
+                                                                              'ignore',
+                                                                              'TYPE',
+                                                                              'MME-UE-S1AP-ID',
+                                                                              'PRESENCE',
+                                                                              'mandatory'],
+                                                                             ['ID',
+                                                                              'id-eNB-UE-S1AP-ID',
+                                                                              'CRITICALITY',
+                                                                              'ignore',
+                                                                              'TYPE',
+                                                                              'ENB-UE-S1AP-ID',
+                                                                              'PRESENCE',
+                                                                              'mandatory'],
+                                                                             ['ID',
+                                                                              'id-E-RABSetupListBearerSURes',
+                                                                              'CRITICALITY',
+                                                                              'ignore',
+                                                                              'TYPE',
+                                                                              'E-RABSetupListBearerSURes',
+                                                                              'PRESENCE',
+                                                                              'optional'],
+                                                                             ['ID',
+                                                                              'id-E-RABFailedToSetupListBearerSURes',
+                                                                              'CRITICALITY',
+                                                                              'ignore',
+                                                                              'TYPE',
+                                                                              'E-RABList',
+                                                                              'PRESENCE',
+                                                                              'optional'],
+                                                                             ['ID',
+                                                                              'id-CriticalityDiagnostics',
+                                                                              'CRITICALITY',
+                                                                              'ignore',
+                                                                              'TYPE',
+                                                                              'CriticalityDiagnostics',
+                                                                              'PRESENCE',
+                                                                              'optional'],
+                                                                             ',',
+                                                                             '.']},
                                        'E-RABToBeModifiedItemBearerModInd-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                                     'members': ['.']},
                                        'E-RABToBeModifiedItemBearerModIndIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                'members': []},
+                                                                                'members': [['ID',
+                                                                                             'id-E-RABToBeModifiedItemBearerModInd',
+                                                                                             'CRITICALITY',
+                                                                                             'reject',
+                                                                                             'TYPE',
+                                                                                             'E-RABToBeModifiedItemBearerModInd',
+                                                                                             'PRESENCE',
+                                                                                             'mandatory'],
+                                                                                            ',',
+                                                                                            '.']},
                                        'E-RABToBeModifiedItemBearerModReqIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                'members': []},
+                                                                                'members': [['ID',
+                                                                                             'id-E-RABToBeModifiedItemBearerModReq',
+                                                                                             'CRITICALITY',
+                                                                                             'reject',
+                                                                                             'TYPE',
+                                                                                             'E-RABToBeModifiedItemBearerModReq',
+                                                                                             'PRESENCE',
+                                                                                             'mandatory'],
+                                                                                            ',',
+                                                                                            '.']},
                                        'E-RABToBeModifyItemBearerModReqExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                                                 'members': []},
+                                                                                 'members': [['ID',
+                                                                                              'id-TransportInformation',
+                                                                                              'CRITICALITY',
+                                                                                              'reject',
+                                                                                              'EXTENSION',
+                                                                                              'TransportInformation',
+                                                                                              'PRESENCE',
+                                                                                              'optional'],
+                                                                                             ',',
+                                                                                             '.']},
                                        'E-RABToBeSetupItemBearerSUReqExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                                               'members': []},
+                                                                               'members': [['ID',
+                                                                                            'id-Correlation-ID',
+                                                                                            'CRITICALITY',
+                                                                                            'ignore',
+                                                                                            'EXTENSION',
+                                                                                            'Correlation-ID',
+                                                                                            'PRESENCE',
+                                                                                            'optional'],
+                                                                                           ['ID',
+                                                                                            'id-SIPTO-Correlation-ID',
+                                                                                            'CRITICALITY',
+                                                                                            'ignore',
+                                                                                            'EXTENSION',
+                                                                                            'Correlation-ID',
+                                                                                            'PRESENCE',
+                                                                                            'optional'],
+                                                                                           ['ID',
+                                                                                            'id-BearerType',
+                                                                                            'CRITICALITY',
+                                                                                            'reject',
+                                                                                            'EXTENSION',
+                                                                                            'BearerType',
+                                                                                            'PRESENCE',
+                                                                                            'optional'],
+                                                                                           ',',
+                                                                                           '.']},
                                        'E-RABToBeSetupItemBearerSUReqIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                            'members': []},
+                                                                            'members': [['ID',
+                                                                                         'id-E-RABToBeSetupItemBearerSUReq',
+                                                                                         'CRITICALITY',
+                                                                                         'reject',
+                                                                                         'TYPE',
+                                                                                         'E-RABToBeSetupItemBearerSUReq',
+                                                                                         'PRESENCE',
+                                                                                         'mandatory'],
+                                                                                        ',',
+                                                                                        '.']},
                                        'E-RABToBeSetupItemCtxtSUReqExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                                             'members': []},
+                                                                             'members': [['ID',
+                                                                                          'id-Correlation-ID',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'EXTENSION',
+                                                                                          'Correlation-ID',
+                                                                                          'PRESENCE',
+                                                                                          'optional'],
+                                                                                         ['ID',
+                                                                                          'id-SIPTO-Correlation-ID',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'EXTENSION',
+                                                                                          'Correlation-ID',
+                                                                                          'PRESENCE',
+                                                                                          'optional'],
+                                                                                         ['ID',
+                                                                                          'id-BearerType',
+                                                                                          'CRITICALITY',
+                                                                                          'reject',
+                                                                                          'EXTENSION',
+                                                                                          'BearerType',
+                                                                                          'PRESENCE',
+                                                                                          'optional'],
+                                                                                         ',',
+                                                                                         '.']},
                                        'E-RABToBeSetupItemCtxtSUReqIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                          'members': []},
+                                                                          'members': [['ID',
+                                                                                       'id-E-RABToBeSetupItemCtxtSUReq',
+                                                                                       'CRITICALITY',
+                                                                                       'reject',
+                                                                                       'TYPE',
+                                                                                       'E-RABToBeSetupItemCtxtSUReq',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ',',
+                                                                                      '.']},
                                        'E-RABToBeSetupItemHOReq-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
-                                                                          'members': []},
+                                                                          'members': [['ID',
+                                                                                       'id-Data-Forwarding-Not-Possible',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'EXTENSION',
+                                                                                       'Data-Forwarding-Not-Possible',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ['ID',
+                                                                                       'id-BearerType',
+                                                                                       'CRITICALITY',
+                                                                                       'reject',
+                                                                                       'EXTENSION',
+                                                                                       'BearerType',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ',',
+                                                                                      '.']},
                                        'E-RABToBeSetupItemHOReqIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                      'members': []},
+                                                                      'members': [['ID',
+                                                                                   'id-E-RABToBeSetupItemHOReq',
+                                                                                   'CRITICALITY',
+                                                                                   'reject',
+                                                                                   'TYPE',
+                                                                                   'E-RABToBeSetupItemHOReq',
+                                                                                   'PRESENCE',
+                                                                                   'mandatory'],
+                                                                                  ',',
+                                                                                  '.']},
                                        'E-RABToBeSwitchedDLItem-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                           'members': ['.']},
                                        'E-RABToBeSwitchedDLItemIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                      'members': []},
+                                                                      'members': [['ID',
+                                                                                   'id-E-RABToBeSwitchedDLItem',
+                                                                                   'CRITICALITY',
+                                                                                   'reject',
+                                                                                   'TYPE',
+                                                                                   'E-RABToBeSwitchedDLItem',
+                                                                                   'PRESENCE',
+                                                                                   'mandatory'],
+                                                                                  ',',
+                                                                                  '.']},
                                        'E-RABToBeSwitchedULItem-ExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                                           'members': ['.']},
                                        'E-RABToBeSwitchedULItemIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                      'members': []},
+                                                                      'members': [['ID',
+                                                                                   'id-E-RABToBeSwitchedULItem',
+                                                                                   'CRITICALITY',
+                                                                                   'ignore',
+                                                                                   'TYPE',
+                                                                                   'E-RABToBeSwitchedULItem',
+                                                                                   'PRESENCE',
+                                                                                   'mandatory'],
+                                                                                  ',',
+                                                                                  '.']},
                                        'ENBCPRelocationIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                        'members': []},
+                                                                        'members': [['ID',
+                                                                                     'id-eNB-UE-S1AP-ID',
+                                                                                     'CRITICALITY',
+                                                                                     'reject',
+                                                                                     'TYPE',
+                                                                                     'ENB-UE-S1AP-ID',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-S-TMSI',
+                                                                                     'CRITICALITY',
+                                                                                     'reject',
+                                                                                     'TYPE',
+                                                                                     'S-TMSI',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-EUTRAN-CGI',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'EUTRAN-CGI',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-TAI',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'TAI',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-UL-CP-SecurityInformation',
+                                                                                     'CRITICALITY',
+                                                                                     'reject',
+                                                                                     'TYPE',
+                                                                                     'UL-CP-SecurityInformation',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ',',
+                                                                                    '.']},
                                        'ENBConfigurationTransferIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                       'members': []},
+                                                                       'members': [['ID',
+                                                                                    'id-SONConfigurationTransferECT',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'SONConfigurationTransfer',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ',',
+                                                                                   '.']},
                                        'ENBConfigurationUpdateAcknowledgeIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                'members': []},
+                                                                                'members': [['ID',
+                                                                                             'id-CriticalityDiagnostics',
+                                                                                             'CRITICALITY',
+                                                                                             'ignore',
+                                                                                             'TYPE',
+                                                                                             'CriticalityDiagnostics',
+                                                                                             'PRESENCE',
+                                                                                             'optional'],
+                                                                                            ',',
+                                                                                            '.']},
                                        'ENBConfigurationUpdateFailureIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                            'members': []},
+                                                                            'members': [['ID',
+                                                                                         'id-Cause',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'Cause',
+                                                                                         'PRESENCE',
+                                                                                         'mandatory'],
+                                                                                        ['ID',
+                                                                                         'id-TimeToWait',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'TimeToWait',
+                                                                                         'PRESENCE',
+                                                                                         'optional'],
+                                                                                        ['ID',
+                                                                                         'id-CriticalityDiagnostics',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'CriticalityDiagnostics',
+                                                                                         'PRESENCE',
+                                                                                         'optional'],
+                                                                                        ',',
+                                                                                        '.']},
                                        'ENBConfigurationUpdateIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                     'members': []},
+                                                                     'members': [['ID',
+                                                                                  'id-eNBname',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'ENBname',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ['ID',
+                                                                                  'id-SupportedTAs',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'SupportedTAs',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ['ID',
+                                                                                  'id-CSG-IdList',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'CSG-IdList',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ['ID',
+                                                                                  'id-DefaultPagingDRX',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'PagingDRX',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ['ID',
+                                                                                  'id-NB-IoT-DefaultPagingDRX',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'NB-IoT-DefaultPagingDRX',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ',',
+                                                                                 '.']},
                                        'ENBDirectInformationTransferIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                           'members': []},
+                                                                           'members': [['ID',
+                                                                                        'id-Inter-SystemInformationTransferTypeEDT',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'Inter-SystemInformationTransferType',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ',',
+                                                                                       '.']},
                                        'ENBStatusTransferIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                'members': []},
+                                                                'members': [['ID',
+                                                                             'id-MME-UE-S1AP-ID',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'MME-UE-S1AP-ID',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-eNB-UE-S1AP-ID',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'ENB-UE-S1AP-ID',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-eNB-StatusTransfer-TransparentContainer',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'ENB-StatusTransfer-TransparentContainer',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ',',
+                                                                            '.']},
                                        'ErrorIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                              'members': []},
+                                                              'members': [['ID',
+                                                                           'id-MME-UE-S1AP-ID',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'MME-UE-S1AP-ID',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-eNB-UE-S1AP-ID',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'ENB-UE-S1AP-ID',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-Cause',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'Cause',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-CriticalityDiagnostics',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'CriticalityDiagnostics',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ',',
+                                                                          '.']},
                                        'HandoverCancelAcknowledgeIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                        'members': []},
+                                                                        'members': [['ID',
+                                                                                     'id-MME-UE-S1AP-ID',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'MME-UE-S1AP-ID',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-eNB-UE-S1AP-ID',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'ENB-UE-S1AP-ID',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-CriticalityDiagnostics',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'CriticalityDiagnostics',
+                                                                                     'PRESENCE',
+                                                                                     'optional'],
+                                                                                    ',',
+                                                                                    '.']},
                                        'HandoverCancelIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                             'members': []},
+                                                             'members': [['ID',
+                                                                          'id-MME-UE-S1AP-ID',
+                                                                          'CRITICALITY',
+                                                                          'reject',
+                                                                          'TYPE',
+                                                                          'MME-UE-S1AP-ID',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-eNB-UE-S1AP-ID',
+                                                                          'CRITICALITY',
+                                                                          'reject',
+                                                                          'TYPE',
+                                                                          'ENB-UE-S1AP-ID',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-Cause',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'Cause',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ',',
+                                                                         '.']},
                                        'HandoverCommandIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                              'members': []},
+                                                              'members': [['ID',
+                                                                           'id-MME-UE-S1AP-ID',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'MME-UE-S1AP-ID',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-eNB-UE-S1AP-ID',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'ENB-UE-S1AP-ID',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-HandoverType',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'HandoverType',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-NASSecurityParametersfromE-UTRAN',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'NASSecurityParametersfromE-UTRAN',
+                                                                           'PRESENCE',
+                                                                           'conditional'],
+                                                                          ['ID',
+                                                                           'id-E-RABSubjecttoDataForwardingList',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'E-RABSubjecttoDataForwardingList',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-E-RABtoReleaseListHOCmd',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'E-RABList',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-Target-ToSource-TransparentContainer',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'Target-ToSource-TransparentContainer',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-Target-ToSource-TransparentContainer-Secondary',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'Target-ToSource-TransparentContainer',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-CriticalityDiagnostics',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'CriticalityDiagnostics',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ',',
+                                                                          '.']},
                                        'HandoverFailureIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                              'members': []},
+                                                              'members': [['ID',
+                                                                           'id-MME-UE-S1AP-ID',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'MME-UE-S1AP-ID',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-Cause',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'Cause',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-CriticalityDiagnostics',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'CriticalityDiagnostics',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ',',
+                                                                          '.']},
                                        'HandoverNotifyIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                             'members': []},
+                                                             'members': [['ID',
+                                                                          'id-MME-UE-S1AP-ID',
+                                                                          'CRITICALITY',
+                                                                          'reject',
+                                                                          'TYPE',
+                                                                          'MME-UE-S1AP-ID',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-eNB-UE-S1AP-ID',
+                                                                          'CRITICALITY',
+                                                                          'reject',
+                                                                          'TYPE',
+                                                                          'ENB-UE-S1AP-ID',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-EUTRAN-CGI',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'EUTRAN-CGI',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-TAI',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'TAI',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-Tunnel-Information-for-BBF',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'TunnelInformation',
+                                                                          'PRESENCE',
+                                                                          'optional'],
+                                                                         ['ID',
+                                                                          'id-LHN-ID',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'LHN-ID',
+                                                                          'PRESENCE',
+                                                                          'optional'],
+                                                                         ',',
+                                                                         '.']},
                                        'HandoverPreparationFailureIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                         'members': []},
+                                                                         'members': [['ID',
+                                                                                      'id-MME-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'MME-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-eNB-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'ENB-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-Cause',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'Cause',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-CriticalityDiagnostics',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'CriticalityDiagnostics',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ',',
+                                                                                     '.']},
                                        'HandoverRequestAcknowledgeIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                         'members': []},
+                                                                         'members': [['ID',
+                                                                                      'id-MME-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'MME-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-eNB-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'ENB-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-E-RABAdmittedList',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'E-RABAdmittedList',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-E-RABFailedToSetupListHOReqAck',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'E-RABFailedtoSetupListHOReqAck',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-Target-ToSource-TransparentContainer',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'Target-ToSource-TransparentContainer',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-CSG-Id',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'CSG-Id',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-CriticalityDiagnostics',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'CriticalityDiagnostics',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-CellAccessMode',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'CellAccessMode',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-CE-mode-B-SupportIndicator',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'CE-mode-B-SupportIndicator',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ',',
+                                                                                     '.']},
                                        'HandoverRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                              'members': []},
+                                                              'members': [['ID',
+                                                                           'id-MME-UE-S1AP-ID',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'MME-UE-S1AP-ID',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-HandoverType',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'HandoverType',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-Cause',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'Cause',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-uEaggregateMaximumBitrate',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'UEAggregateMaximumBitrate',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-E-RABToBeSetupListHOReq',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'E-RABToBeSetupListHOReq',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-Source-ToTarget-TransparentContainer',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'Source-ToTarget-TransparentContainer',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-UESecurityCapabilities',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'UESecurityCapabilities',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-HandoverRestrictionList',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'HandoverRestrictionList',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-TraceActivation',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'TraceActivation',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-RequestType',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'RequestType',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-SRVCCOperationPossible',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'SRVCCOperationPossible',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-SecurityContext',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'SecurityContext',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-NASSecurityParameterstoE-UTRAN',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'NASSecurityParameterstoE-UTRAN',
+                                                                           'PRESENCE',
+                                                                           'conditional'],
+                                                                          ['ID',
+                                                                           'id-CSG-Id',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'CSG-Id',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-CSGMembershipStatus',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'CSGMembershipStatus',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-GUMMEI-ID',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'GUMMEI',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-MME-UE-S1AP-ID-2',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'MME-UE-S1AP-ID',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-ManagementBasedMDTAllowed',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'ManagementBasedMDTAllowed',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-ManagementBasedMDTPLMNList',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'MDTPLMNList',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-Masked-IMEISV',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'Masked-IMEISV',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-ExpectedUEBehaviour',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'ExpectedUEBehaviour',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-ProSeAuthorized',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'ProSeAuthorized',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-UEUserPlaneCIoTSupportIndicator',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'UEUserPlaneCIoTSupportIndicator',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-V2XServicesAuthorized',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'V2XServicesAuthorized',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-UESidelinkAggregateMaximumBitrate',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'UESidelinkAggregateMaximumBitrate',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-EnhancedCoverageRestricted',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'EnhancedCoverageRestricted',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ',',
+                                                                          '.']},
                                        'HandoverRequiredIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                               'members': []},
+                                                               'members': [['ID',
+                                                                            'id-MME-UE-S1AP-ID',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'MME-UE-S1AP-ID',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-eNB-UE-S1AP-ID',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'ENB-UE-S1AP-ID',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-HandoverType',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'HandoverType',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-Cause',
+                                                                            'CRITICALITY',
+                                                                            'ignore',
+                                                                            'TYPE',
+                                                                            'Cause',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-TargetID',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'TargetID',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-Direct-Forwarding-Path-Availability',
+                                                                            'CRITICALITY',
+                                                                            'ignore',
+                                                                            'TYPE',
+                                                                            'Direct-Forwarding-Path-Availability',
+                                                                            'PRESENCE',
+                                                                            'optional'],
+                                                                           ['ID',
+                                                                            'id-SRVCCHOIndication',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'SRVCCHOIndication',
+                                                                            'PRESENCE',
+                                                                            'optional'],
+                                                                           ['ID',
+                                                                            'id-Source-ToTarget-TransparentContainer',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'Source-ToTarget-TransparentContainer',
+                                                                            'PRESENCE',
+                                                                            'mandatory'],
+                                                                           ['ID',
+                                                                            'id-Source-ToTarget-TransparentContainer-Secondary',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'Source-ToTarget-TransparentContainer',
+                                                                            'PRESENCE',
+                                                                            'optional'],
+                                                                           ['ID',
+                                                                            'id-MSClassmark2',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'MSClassmark2',
+                                                                            'PRESENCE',
+                                                                            'conditional'],
+                                                                           ['ID',
+                                                                            'id-MSClassmark3',
+                                                                            'CRITICALITY',
+                                                                            'ignore',
+                                                                            'TYPE',
+                                                                            'MSClassmark3',
+                                                                            'PRESENCE',
+                                                                            'conditional'],
+                                                                           ['ID',
+                                                                            'id-CSG-Id',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'CSG-Id',
+                                                                            'PRESENCE',
+                                                                            'optional'],
+                                                                           ['ID',
+                                                                            'id-CellAccessMode',
+                                                                            'CRITICALITY',
+                                                                            'reject',
+                                                                            'TYPE',
+                                                                            'CellAccessMode',
+                                                                            'PRESENCE',
+                                                                            'optional'],
+                                                                           ['ID',
+                                                                            'id-PS-ServiceNotAvailable',
+                                                                            'CRITICALITY',
+                                                                            'ignore',
+                                                                            'TYPE',
+                                                                            'PS-ServiceNotAvailable',
+                                                                            'PRESENCE',
+                                                                            'optional'],
+                                                                           ',',
+                                                                           '.']},
                                        'InitialContextSetupFailureIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                         'members': []},
+                                                                         'members': [['ID',
+                                                                                      'id-MME-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'MME-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-eNB-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'ENB-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-Cause',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'Cause',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-CriticalityDiagnostics',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'CriticalityDiagnostics',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ',',
+                                                                                     '.']},
                                        'InitialContextSetupRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                         'members': []},
+                                                                         'members': [['ID',
+                                                                                      'id-MME-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'MME-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-eNB-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'ENB-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-uEaggregateMaximumBitrate',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'UEAggregateMaximumBitrate',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-E-RABToBeSetupListCtxtSUReq',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'E-RABToBeSetupListCtxtSUReq',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-UESecurityCapabilities',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'UESecurityCapabilities',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-SecurityKey',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'SecurityKey',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-TraceActivation',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'TraceActivation',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-HandoverRestrictionList',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'HandoverRestrictionList',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-UERadioCapability',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'UERadioCapability',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-SubscriberProfileIDforRFP',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'SubscriberProfileIDforRFP',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-CSFallbackIndicator',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'CSFallbackIndicator',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-SRVCCOperationPossible',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'SRVCCOperationPossible',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-CSGMembershipStatus',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'CSGMembershipStatus',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-RegisteredLAI',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'LAI',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-GUMMEI-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'GUMMEI',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-MME-UE-S1AP-ID-2',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'MME-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-ManagementBasedMDTAllowed',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'ManagementBasedMDTAllowed',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-ManagementBasedMDTPLMNList',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'MDTPLMNList',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-AdditionalCSFallbackIndicator',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'AdditionalCSFallbackIndicator',
+                                                                                      'PRESENCE',
+                                                                                      'conditional'],
+                                                                                     ['ID',
+                                                                                      'id-Masked-IMEISV',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'Masked-IMEISV',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-ExpectedUEBehaviour',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'ExpectedUEBehaviour',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-ProSeAuthorized',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'ProSeAuthorized',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-UEUserPlaneCIoTSupportIndicator',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'UEUserPlaneCIoTSupportIndicator',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-V2XServicesAuthorized',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'V2XServicesAuthorized',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-UESidelinkAggregateMaximumBitrate',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'UESidelinkAggregateMaximumBitrate',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-EnhancedCoverageRestricted',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'EnhancedCoverageRestricted',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ',',
+                                                                                     '.']},
                                        'InitialContextSetupResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                          'members': []},
+                                                                          'members': [['ID',
+                                                                                       'id-MME-UE-S1AP-ID',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'TYPE',
+                                                                                       'MME-UE-S1AP-ID',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ['ID',
+                                                                                       'id-eNB-UE-S1AP-ID',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'TYPE',
+                                                                                       'ENB-UE-S1AP-ID',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ['ID',
+                                                                                       'id-E-RABSetupListCtxtSURes',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'TYPE',
+                                                                                       'E-RABSetupListCtxtSURes',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ['ID',
+                                                                                       'id-E-RABFailedToSetupListCtxtSURes',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'TYPE',
+                                                                                       'E-RABList',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ['ID',
+                                                                                       'id-CriticalityDiagnostics',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'TYPE',
+                                                                                       'CriticalityDiagnostics',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ',',
+                                                                                      '.']},
                                        'InitialUEMessage-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                'members': []},
+                                                                'members': [['ID',
+                                                                             'id-eNB-UE-S1AP-ID',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'ENB-UE-S1AP-ID',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-NAS-PDU',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'NAS-PDU',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-TAI',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'TAI',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-EUTRAN-CGI',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'EUTRAN-CGI',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-RRC-Establishment-Cause',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'RRC-Establishment-Cause',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-S-TMSI',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'S-TMSI',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-CSG-Id',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'CSG-Id',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-GUMMEI-ID',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'GUMMEI',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-CellAccessMode',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'CellAccessMode',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-GW-TransportLayerAddress',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'TransportLayerAddress',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-RelayNode-Indicator',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'RelayNode-Indicator',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-GUMMEIType',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'GUMMEIType',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-Tunnel-Information-for-BBF',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'TunnelInformation',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-SIPTO-L-GW-TransportLayerAddress',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'TransportLayerAddress',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-LHN-ID',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'LHN-ID',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-MME-Group-ID',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'MME-Group-ID',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-UE-Usage-Type',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'UE-Usage-Type',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-CE-mode-B-SupportIndicator',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'CE-mode-B-SupportIndicator',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-DCN-ID',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'DCN-ID',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-Coverage-Level',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'Coverage-Level',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ',',
+                                                                            '.']},
                                        'KillRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                          'members': []},
+                                                          'members': [['ID',
+                                                                       'id-MessageIdentifier',
+                                                                       'CRITICALITY',
+                                                                       'reject',
+                                                                       'TYPE',
+                                                                       'MessageIdentifier',
+                                                                       'PRESENCE',
+                                                                       'mandatory'],
+                                                                      ['ID',
+                                                                       'id-SerialNumber',
+                                                                       'CRITICALITY',
+                                                                       'reject',
+                                                                       'TYPE',
+                                                                       'SerialNumber',
+                                                                       'PRESENCE',
+                                                                       'mandatory'],
+                                                                      ['ID',
+                                                                       'id-WarningAreaList',
+                                                                       'CRITICALITY',
+                                                                       'ignore',
+                                                                       'TYPE',
+                                                                       'WarningAreaList',
+                                                                       'PRESENCE',
+                                                                       'optional'],
+                                                                      ['ID',
+                                                                       'id-KillAllWarningMessages',
+                                                                       'CRITICALITY',
+                                                                       'reject',
+                                                                       'TYPE',
+                                                                       'KillAllWarningMessages',
+                                                                       'PRESENCE',
+                                                                       'optional'],
+                                                                      ',',
+                                                                      '.']},
                                        'KillResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                           'members': []},
+                                                           'members': [['ID',
+                                                                        'id-MessageIdentifier',
+                                                                        'CRITICALITY',
+                                                                        'reject',
+                                                                        'TYPE',
+                                                                        'MessageIdentifier',
+                                                                        'PRESENCE',
+                                                                        'mandatory'],
+                                                                       ['ID',
+                                                                        'id-SerialNumber',
+                                                                        'CRITICALITY',
+                                                                        'reject',
+                                                                        'TYPE',
+                                                                        'SerialNumber',
+                                                                        'PRESENCE',
+                                                                        'mandatory'],
+                                                                       ['ID',
+                                                                        'id-BroadcastCancelledAreaList',
+                                                                        'CRITICALITY',
+                                                                        'ignore',
+                                                                        'TYPE',
+                                                                        'BroadcastCancelledAreaList',
+                                                                        'PRESENCE',
+                                                                        'optional'],
+                                                                       ['ID',
+                                                                        'id-CriticalityDiagnostics',
+                                                                        'CRITICALITY',
+                                                                        'ignore',
+                                                                        'TYPE',
+                                                                        'CriticalityDiagnostics',
+                                                                        'PRESENCE',
+                                                                        'optional'],
+                                                                       ',',
+                                                                       '.']},
                                        'LocationReportIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                             'members': []},
+                                                             'members': [['ID',
+                                                                          'id-MME-UE-S1AP-ID',
+                                                                          'CRITICALITY',
+                                                                          'reject',
+                                                                          'TYPE',
+                                                                          'MME-UE-S1AP-ID',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-eNB-UE-S1AP-ID',
+                                                                          'CRITICALITY',
+                                                                          'reject',
+                                                                          'TYPE',
+                                                                          'ENB-UE-S1AP-ID',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-EUTRAN-CGI',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'EUTRAN-CGI',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-TAI',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'TAI',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-RequestType',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'RequestType',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ',',
+                                                                         '.']},
                                        'LocationReportingControlIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                       'members': []},
+                                                                       'members': [['ID',
+                                                                                    'id-MME-UE-S1AP-ID',
+                                                                                    'CRITICALITY',
+                                                                                    'reject',
+                                                                                    'TYPE',
+                                                                                    'MME-UE-S1AP-ID',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-eNB-UE-S1AP-ID',
+                                                                                    'CRITICALITY',
+                                                                                    'reject',
+                                                                                    'TYPE',
+                                                                                    'ENB-UE-S1AP-ID',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-RequestType',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'RequestType',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ',',
+                                                                                   '.']},
                                        'LocationReportingFailureIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                 'members': []},
+                                                                                 'members': [['ID',
+                                                                                              'id-MME-UE-S1AP-ID',
+                                                                                              'CRITICALITY',
+                                                                                              'reject',
+                                                                                              'TYPE',
+                                                                                              'MME-UE-S1AP-ID',
+                                                                                              'PRESENCE',
+                                                                                              'mandatory'],
+                                                                                             ['ID',
+                                                                                              'id-eNB-UE-S1AP-ID',
+                                                                                              'CRITICALITY',
+                                                                                              'reject',
+                                                                                              'TYPE',
+                                                                                              'ENB-UE-S1AP-ID',
+                                                                                              'PRESENCE',
+                                                                                              'mandatory'],
+                                                                                             ['ID',
+                                                                                              'id-Cause',
+                                                                                              'CRITICALITY',
+                                                                                              'ignore',
+                                                                                              'TYPE',
+                                                                                              'Cause',
+                                                                                              'PRESENCE',
+                                                                                              'mandatory'],
+                                                                                             ',',
+                                                                                             '.']},
                                        'MMECPRelocationIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                        'members': []},
+                                                                        'members': [['ID',
+                                                                                     'id-MME-UE-S1AP-ID',
+                                                                                     'CRITICALITY',
+                                                                                     'reject',
+                                                                                     'TYPE',
+                                                                                     'MME-UE-S1AP-ID',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-eNB-UE-S1AP-ID',
+                                                                                     'CRITICALITY',
+                                                                                     'reject',
+                                                                                     'TYPE',
+                                                                                     'ENB-UE-S1AP-ID',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ',',
+                                                                                    '.']},
                                        'MMEConfigurationTransferIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                       'members': []},
+                                                                       'members': [['ID',
+                                                                                    'id-SONConfigurationTransferMCT',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'SONConfigurationTransfer',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ',',
+                                                                                   '.']},
                                        'MMEConfigurationUpdateAcknowledgeIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                'members': []},
+                                                                                'members': [['ID',
+                                                                                             'id-CriticalityDiagnostics',
+                                                                                             'CRITICALITY',
+                                                                                             'ignore',
+                                                                                             'TYPE',
+                                                                                             'CriticalityDiagnostics',
+                                                                                             'PRESENCE',
+                                                                                             'optional'],
+                                                                                            ',',
+                                                                                            '.']},
                                        'MMEConfigurationUpdateFailureIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                            'members': []},
+                                                                            'members': [['ID',
+                                                                                         'id-Cause',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'Cause',
+                                                                                         'PRESENCE',
+                                                                                         'mandatory'],
+                                                                                        ['ID',
+                                                                                         'id-TimeToWait',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'TimeToWait',
+                                                                                         'PRESENCE',
+                                                                                         'optional'],
+                                                                                        ['ID',
+                                                                                         'id-CriticalityDiagnostics',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'CriticalityDiagnostics',
+                                                                                         'PRESENCE',
+                                                                                         'optional'],
+                                                                                        ',',
+                                                                                        '.']},
                                        'MMEConfigurationUpdateIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                     'members': []},
+                                                                     'members': [['ID',
+                                                                                  'id-MMEname',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'MMEname',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ['ID',
+                                                                                  'id-ServedGUMMEIs',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'ServedGUMMEIs',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ['ID',
+                                                                                  'id-RelativeMMECapacity',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'RelativeMMECapacity',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ['ID',
+                                                                                  'id-ServedDCNs',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'ServedDCNs',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ',',
+                                                                                 '.']},
                                        'MMEDirectInformationTransferIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                           'members': []},
+                                                                           'members': [['ID',
+                                                                                        'id-Inter-SystemInformationTransferTypeMDT',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'Inter-SystemInformationTransferType',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ',',
+                                                                                       '.']},
                                        'MMEStatusTransferIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                'members': []},
+                                                                'members': [['ID',
+                                                                             'id-MME-UE-S1AP-ID',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'MME-UE-S1AP-ID',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-eNB-UE-S1AP-ID',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'ENB-UE-S1AP-ID',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-eNB-StatusTransfer-TransparentContainer',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'ENB-StatusTransfer-TransparentContainer',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ',',
+                                                                            '.']},
                                        'NASDeliveryIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
                                                                     'members': ['.']},
                                        'NASNonDeliveryIndication-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                        'members': []},
+                                                                        'members': [['ID',
+                                                                                     'id-MME-UE-S1AP-ID',
+                                                                                     'CRITICALITY',
+                                                                                     'reject',
+                                                                                     'TYPE',
+                                                                                     'MME-UE-S1AP-ID',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-eNB-UE-S1AP-ID',
+                                                                                     'CRITICALITY',
+                                                                                     'reject',
+                                                                                     'TYPE',
+                                                                                     'ENB-UE-S1AP-ID',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-NAS-PDU',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'NAS-PDU',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-Cause',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'Cause',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ',',
+                                                                                    '.']},
                                        'OverloadStartIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                            'members': []},
+                                                            'members': [['ID',
+                                                                         'id-OverloadResponse',
+                                                                         'CRITICALITY',
+                                                                         'reject',
+                                                                         'TYPE',
+                                                                         'OverloadResponse',
+                                                                         'PRESENCE',
+                                                                         'mandatory'],
+                                                                        ['ID',
+                                                                         'id-GUMMEIList',
+                                                                         'CRITICALITY',
+                                                                         'ignore',
+                                                                         'TYPE',
+                                                                         'GUMMEIList',
+                                                                         'PRESENCE',
+                                                                         'optional'],
+                                                                        ['ID',
+                                                                         'id-TrafficLoadReductionIndication',
+                                                                         'CRITICALITY',
+                                                                         'ignore',
+                                                                         'TYPE',
+                                                                         'TrafficLoadReductionIndication',
+                                                                         'PRESENCE',
+                                                                         'optional'],
+                                                                        ',',
+                                                                        '.']},
                                        'OverloadStopIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                           'members': []},
+                                                           'members': [['ID',
+                                                                        'id-GUMMEIList',
+                                                                        'CRITICALITY',
+                                                                        'ignore',
+                                                                        'TYPE',
+                                                                        'GUMMEIList',
+                                                                        'PRESENCE',
+                                                                        'optional'],
+                                                                       ',',
+                                                                       '.']},
                                        'PWSFailureIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                   'members': []},
+                                                                   'members': [['ID',
+                                                                                'id-PWSfailedECGIList',
+                                                                                'CRITICALITY',
+                                                                                'reject',
+                                                                                'TYPE',
+                                                                                'PWSfailedECGIList',
+                                                                                'PRESENCE',
+                                                                                'mandatory'],
+                                                                               ['ID',
+                                                                                'id-Global-ENB-ID',
+                                                                                'CRITICALITY',
+                                                                                'reject',
+                                                                                'TYPE',
+                                                                                'Global-ENB-ID',
+                                                                                'PRESENCE',
+                                                                                'mandatory'],
+                                                                               ',',
+                                                                               '.']},
                                        'PWSRestartIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                   'members': []},
+                                                                   'members': [['ID',
+                                                                                'id-ECGIListForRestart',
+                                                                                'CRITICALITY',
+                                                                                'reject',
+                                                                                'TYPE',
+                                                                                'ECGIListForRestart',
+                                                                                'PRESENCE',
+                                                                                'mandatory'],
+                                                                               ['ID',
+                                                                                'id-Global-ENB-ID',
+                                                                                'CRITICALITY',
+                                                                                'reject',
+                                                                                'TYPE',
+                                                                                'Global-ENB-ID',
+                                                                                'PRESENCE',
+                                                                                'mandatory'],
+                                                                               ['ID',
+                                                                                'id-TAIListForRestart',
+                                                                                'CRITICALITY',
+                                                                                'reject',
+                                                                                'TYPE',
+                                                                                'TAIListForRestart',
+                                                                                'PRESENCE',
+                                                                                'mandatory'],
+                                                                               ['ID',
+                                                                                'id-EmergencyAreaIDListForRestart',
+                                                                                'CRITICALITY',
+                                                                                'reject',
+                                                                                'TYPE',
+                                                                                'EmergencyAreaIDListForRestart',
+                                                                                'PRESENCE',
+                                                                                'optional'],
+                                                                               ',',
+                                                                               '.']},
                                        'PagingIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                     'members': []},
+                                                     'members': [['ID',
+                                                                  'id-UEIdentityIndexValue',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'UEIdentityIndexValue',
+                                                                  'PRESENCE',
+                                                                  'mandatory'],
+                                                                 ['ID',
+                                                                  'id-UEPagingID',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'UEPagingID',
+                                                                  'PRESENCE',
+                                                                  'mandatory'],
+                                                                 ['ID',
+                                                                  'id-pagingDRX',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'PagingDRX',
+                                                                  'PRESENCE',
+                                                                  'optional'],
+                                                                 ['ID',
+                                                                  'id-CNDomain',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'CNDomain',
+                                                                  'PRESENCE',
+                                                                  'mandatory'],
+                                                                 ['ID',
+                                                                  'id-TAIList',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'TAIList',
+                                                                  'PRESENCE',
+                                                                  'mandatory'],
+                                                                 ['ID',
+                                                                  'id-CSG-IdList',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'CSG-IdList',
+                                                                  'PRESENCE',
+                                                                  'optional'],
+                                                                 ['ID',
+                                                                  'id-PagingPriority',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'PagingPriority',
+                                                                  'PRESENCE',
+                                                                  'optional'],
+                                                                 ['ID',
+                                                                  'id-UERadioCapabilityForPaging',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'UERadioCapabilityForPaging',
+                                                                  'PRESENCE',
+                                                                  'optional'],
+                                                                 ['ID',
+                                                                  'id-AssistanceDataForPaging',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'AssistanceDataForPaging',
+                                                                  'PRESENCE',
+                                                                  'optional'],
+                                                                 ['ID',
+                                                                  'id-Paging-eDRXInformation',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'Paging-eDRXInformation',
+                                                                  'PRESENCE',
+                                                                  'optional'],
+                                                                 ['ID',
+                                                                  'id-extended-UEIdentityIndexValue',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'Extended-UEIdentityIndexValue',
+                                                                  'PRESENCE',
+                                                                  'optional'],
+                                                                 ['ID',
+                                                                  'id-NB-IoT-Paging-eDRXInformation',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'NB-IoT-Paging-eDRXInformation',
+                                                                  'PRESENCE',
+                                                                  'optional'],
+                                                                 ['ID',
+                                                                  'id-NB-IoT-UEIdentityIndexValue',
+                                                                  'CRITICALITY',
+                                                                  'ignore',
+                                                                  'TYPE',
+                                                                  'NB-IoT-UEIdentityIndexValue',
+                                                                  'PRESENCE',
+                                                                  'optional'],
+                                                                 ',',
+                                                                 '.']},
                                        'PathSwitchRequestAcknowledgeIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                           'members': []},
+                                                                           'members': [['ID',
+                                                                                        'id-MME-UE-S1AP-ID',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'MME-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-eNB-UE-S1AP-ID',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'ENB-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-uEaggregateMaximumBitrate',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'UEAggregateMaximumBitrate',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-E-RABToBeSwitchedULList',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'E-RABToBeSwitchedULList',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-E-RABToBeReleasedList',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'E-RABList',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-SecurityContext',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'SecurityContext',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-CriticalityDiagnostics',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'CriticalityDiagnostics',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-MME-UE-S1AP-ID-2',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'MME-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-CSGMembershipStatus',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'CSGMembershipStatus',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-ProSeAuthorized',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'ProSeAuthorized',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-UEUserPlaneCIoTSupportIndicator',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'UEUserPlaneCIoTSupportIndicator',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-V2XServicesAuthorized',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'V2XServicesAuthorized',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-UESidelinkAggregateMaximumBitrate',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'UESidelinkAggregateMaximumBitrate',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-EnhancedCoverageRestricted',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'EnhancedCoverageRestricted',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ',',
+                                                                                       '.']},
                                        'PathSwitchRequestFailureIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                       'members': []},
+                                                                       'members': [['ID',
+                                                                                    'id-MME-UE-S1AP-ID',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'MME-UE-S1AP-ID',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-eNB-UE-S1AP-ID',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'ENB-UE-S1AP-ID',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-Cause',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'Cause',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-CriticalityDiagnostics',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'CriticalityDiagnostics',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ',',
+                                                                                   '.']},
                                        'PathSwitchRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                'members': []},
+                                                                'members': [['ID',
+                                                                             'id-eNB-UE-S1AP-ID',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'ENB-UE-S1AP-ID',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-E-RABToBeSwitchedDLList',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'E-RABToBeSwitchedDLList',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-SourceMME-UE-S1AP-ID',
+                                                                             'CRITICALITY',
+                                                                             'reject',
+                                                                             'TYPE',
+                                                                             'MME-UE-S1AP-ID',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-EUTRAN-CGI',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'EUTRAN-CGI',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-TAI',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'TAI',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-UESecurityCapabilities',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'UESecurityCapabilities',
+                                                                             'PRESENCE',
+                                                                             'mandatory'],
+                                                                            ['ID',
+                                                                             'id-CSG-Id',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'CSG-Id',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-CellAccessMode',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'CellAccessMode',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-SourceMME-GUMMEI',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'GUMMEI',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-CSGMembershipStatus',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'CSGMembershipStatus',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-Tunnel-Information-for-BBF',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'TunnelInformation',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-LHN-ID',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'LHN-ID',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ['ID',
+                                                                             'id-RRC-Resume-Cause',
+                                                                             'CRITICALITY',
+                                                                             'ignore',
+                                                                             'TYPE',
+                                                                             'RRC-Establishment-Cause',
+                                                                             'PRESENCE',
+                                                                             'optional'],
+                                                                            ',',
+                                                                            '.']},
                                        'PrivateMessageIEs': {'class': 'S1AP-PRIVATE-IES',
                                                              'members': ['.']},
                                        'RerouteNASRequest-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                 'members': []},
+                                                                 'members': [['ID',
+                                                                              'id-eNB-UE-S1AP-ID',
+                                                                              'CRITICALITY',
+                                                                              'reject',
+                                                                              'TYPE',
+                                                                              'ENB-UE-S1AP-ID',
+                                                                              'PRESENCE',
+                                                                              'mandatory'],
+                                                                             ['ID',
+                                                                              'id-MME-UE-S1AP-ID',
+                                                                              'CRITICALITY',
+                                                                              'ignore',
+                                                                              'TYPE',
+                                                                              'MME-UE-S1AP-ID',
+                                                                              'PRESENCE',
+                                                                              'optional'],
+                                                                             ['ID',
+                                                                              'id-S1-Message',
+                                                                              'CRITICALITY',
+                                                                              'reject',
+                                                                              'TYPE',
+                                                                              'OCTET',
+                                                                              'STRING',
+                                                                              'PRESENCE',
+                                                                              'mandatory'],
+                                                                             ['ID',
+                                                                              'id-MME-Group-ID',
+                                                                              'CRITICALITY',
+                                                                              'reject',
+                                                                              'TYPE',
+                                                                              'MME-Group-ID',
+                                                                              'PRESENCE',
+                                                                              'mandatory'],
+                                                                             ['ID',
+                                                                              'id-Additional-GUTI',
+                                                                              'CRITICALITY',
+                                                                              'ignore',
+                                                                              'TYPE',
+                                                                              'Additional-GUTI',
+                                                                              'PRESENCE',
+                                                                              'optional'],
+                                                                             ['ID',
+                                                                              'id-UE-Usage-Type',
+                                                                              'CRITICALITY',
+                                                                              'ignore',
+                                                                              'TYPE',
+                                                                              'UE-Usage-Type',
+                                                                              'PRESENCE',
+                                                                              'optional'],
+                                                                             ',',
+                                                                             '.']},
                                        'ResetAcknowledgeIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                               'members': []},
+                                                               'members': [['ID',
+                                                                            'id-UE-associatedLogicalS1-ConnectionListResAck',
+                                                                            'CRITICALITY',
+                                                                            'ignore',
+                                                                            'TYPE',
+                                                                            'UE-associatedLogicalS1-ConnectionListResAck',
+                                                                            'PRESENCE',
+                                                                            'optional'],
+                                                                           ['ID',
+                                                                            'id-CriticalityDiagnostics',
+                                                                            'CRITICALITY',
+                                                                            'ignore',
+                                                                            'TYPE',
+                                                                            'CriticalityDiagnostics',
+                                                                            'PRESENCE',
+                                                                            'optional'],
+                                                                           ',',
+                                                                           '.']},
                                        'ResetIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                    'members': []},
+                                                    'members': [['ID',
+                                                                 'id-Cause',
+                                                                 'CRITICALITY',
+                                                                 'ignore',
+                                                                 'TYPE',
+                                                                 'Cause',
+                                                                 'PRESENCE',
+                                                                 'mandatory'],
+                                                                ['ID',
+                                                                 'id-ResetType',
+                                                                 'CRITICALITY',
+                                                                 'reject',
+                                                                 'TYPE',
+                                                                 'ResetType',
+                                                                 'PRESENCE',
+                                                                 'mandatory'],
+                                                                ',',
+                                                                '.']},
                                        'RetrieveUEInformationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                    'members': []},
+                                                                    'members': [['ID',
+                                                                                 'id-S-TMSI',
+                                                                                 'CRITICALITY',
+                                                                                 'reject',
+                                                                                 'TYPE',
+                                                                                 'S-TMSI',
+                                                                                 'PRESENCE',
+                                                                                 'mandatory'],
+                                                                                ',',
+                                                                                '.']},
                                        'S1SetupFailureIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                             'members': []},
+                                                             'members': [['ID',
+                                                                          'id-Cause',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'Cause',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-TimeToWait',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'TimeToWait',
+                                                                          'PRESENCE',
+                                                                          'optional'],
+                                                                         ['ID',
+                                                                          'id-CriticalityDiagnostics',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'CriticalityDiagnostics',
+                                                                          'PRESENCE',
+                                                                          'optional'],
+                                                                         ',',
+                                                                         '.']},
                                        'S1SetupRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                             'members': []},
+                                                             'members': [['ID',
+                                                                          'id-Global-ENB-ID',
+                                                                          'CRITICALITY',
+                                                                          'reject',
+                                                                          'TYPE',
+                                                                          'Global-ENB-ID',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-eNBname',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'ENBname',
+                                                                          'PRESENCE',
+                                                                          'optional'],
+                                                                         ['ID',
+                                                                          'id-SupportedTAs',
+                                                                          'CRITICALITY',
+                                                                          'reject',
+                                                                          'TYPE',
+                                                                          'SupportedTAs',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-DefaultPagingDRX',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'PagingDRX',
+                                                                          'PRESENCE',
+                                                                          'mandatory'],
+                                                                         ['ID',
+                                                                          'id-CSG-IdList',
+                                                                          'CRITICALITY',
+                                                                          'reject',
+                                                                          'TYPE',
+                                                                          'CSG-IdList',
+                                                                          'PRESENCE',
+                                                                          'optional'],
+                                                                         ['ID',
+                                                                          'id-UE-RetentionInformation',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'UE-RetentionInformation',
+                                                                          'PRESENCE',
+                                                                          'optional'],
+                                                                         ['ID',
+                                                                          'id-NB-IoT-DefaultPagingDRX',
+                                                                          'CRITICALITY',
+                                                                          'ignore',
+                                                                          'TYPE',
+                                                                          'NB-IoT-DefaultPagingDRX',
+                                                                          'PRESENCE',
+                                                                          'optional'],
+                                                                         ',',
+                                                                         '.']},
                                        'S1SetupResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                              'members': []},
+                                                              'members': [['ID',
+                                                                           'id-MMEname',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'MMEname',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-ServedGUMMEIs',
+                                                                           'CRITICALITY',
+                                                                           'reject',
+                                                                           'TYPE',
+                                                                           'ServedGUMMEIs',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-RelativeMMECapacity',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'RelativeMMECapacity',
+                                                                           'PRESENCE',
+                                                                           'mandatory'],
+                                                                          ['ID',
+                                                                           'id-MMERelaySupportIndicator',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'MMERelaySupportIndicator',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-CriticalityDiagnostics',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'CriticalityDiagnostics',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-UE-RetentionInformation',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'UE-RetentionInformation',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ['ID',
+                                                                           'id-ServedDCNs',
+                                                                           'CRITICALITY',
+                                                                           'ignore',
+                                                                           'TYPE',
+                                                                           'ServedDCNs',
+                                                                           'PRESENCE',
+                                                                           'optional'],
+                                                                          ',',
+                                                                          '.']},
                                        'TAIItemExtIEs': {'class': 'S1AP-PROTOCOL-EXTENSION',
                                                          'members': ['.']},
                                        'TAIItemIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                      'members': []},
+                                                      'members': [['ID',
+                                                                   'id-TAIItem',
+                                                                   'CRITICALITY',
+                                                                   'ignore',
+                                                                   'TYPE',
+                                                                   'TAIItem',
+                                                                   'PRESENCE',
+                                                                   'mandatory'],
+                                                                  ',',
+                                                                  '.']},
                                        'TraceFailureIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                     'members': []},
+                                                                     'members': [['ID',
+                                                                                  'id-MME-UE-S1AP-ID',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'MME-UE-S1AP-ID',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-eNB-UE-S1AP-ID',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'ENB-UE-S1AP-ID',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-E-UTRAN-Trace-ID',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'E-UTRAN-Trace-ID',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-Cause',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'Cause',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ',',
+                                                                                 '.']},
                                        'TraceStartIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                         'members': []},
+                                                         'members': [['ID',
+                                                                      'id-MME-UE-S1AP-ID',
+                                                                      'CRITICALITY',
+                                                                      'reject',
+                                                                      'TYPE',
+                                                                      'MME-UE-S1AP-ID',
+                                                                      'PRESENCE',
+                                                                      'mandatory'],
+                                                                     ['ID',
+                                                                      'id-eNB-UE-S1AP-ID',
+                                                                      'CRITICALITY',
+                                                                      'reject',
+                                                                      'TYPE',
+                                                                      'ENB-UE-S1AP-ID',
+                                                                      'PRESENCE',
+                                                                      'mandatory'],
+                                                                     ['ID',
+                                                                      'id-TraceActivation',
+                                                                      'CRITICALITY',
+                                                                      'ignore',
+                                                                      'TYPE',
+                                                                      'TraceActivation',
+                                                                      'PRESENCE',
+                                                                      'mandatory'],
+                                                                     ',',
+                                                                     '.']},
                                        'UE-associatedLogicalS1-ConnectionItemRes': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                    'members': []},
+                                                                                    'members': [['ID',
+                                                                                                 'id-UE-associatedLogicalS1-ConnectionItem',
+                                                                                                 'CRITICALITY',
+                                                                                                 'reject',
+                                                                                                 'TYPE',
+                                                                                                 'UE-associatedLogicalS1-ConnectionItem',
+                                                                                                 'PRESENCE',
+                                                                                                 'mandatory'],
+                                                                                                ',',
+                                                                                                '.']},
                                        'UE-associatedLogicalS1-ConnectionItemResAck': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                       'members': []},
+                                                                                       'members': [['ID',
+                                                                                                    'id-UE-associatedLogicalS1-ConnectionItem',
+                                                                                                    'CRITICALITY',
+                                                                                                    'ignore',
+                                                                                                    'TYPE',
+                                                                                                    'UE-associatedLogicalS1-ConnectionItem',
+                                                                                                    'PRESENCE',
+                                                                                                    'mandatory'],
+                                                                                                   ',',
+                                                                                                   '.']},
                                        'UECapabilityInfoIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                         'members': []},
+                                                                         'members': [['ID',
+                                                                                      'id-MME-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'MME-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-eNB-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'ENB-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-UERadioCapability',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'UERadioCapability',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-UERadioCapabilityForPaging',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'UERadioCapabilityForPaging',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ',',
+                                                                                     '.']},
                                        'UEContextModificationConfirmIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                           'members': []},
+                                                                           'members': [['ID',
+                                                                                        'id-MME-UE-S1AP-ID',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'MME-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-eNB-UE-S1AP-ID',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'ENB-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-CSGMembershipStatus',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'CSGMembershipStatus',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-CriticalityDiagnostics',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'CriticalityDiagnostics',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ',',
+                                                                                       '.']},
                                        'UEContextModificationFailureIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                           'members': []},
+                                                                           'members': [['ID',
+                                                                                        'id-MME-UE-S1AP-ID',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'MME-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-eNB-UE-S1AP-ID',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'ENB-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-Cause',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'Cause',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-CriticalityDiagnostics',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'CriticalityDiagnostics',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ',',
+                                                                                       '.']},
                                        'UEContextModificationIndicationIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                              'members': []},
+                                                                              'members': [['ID',
+                                                                                           'id-MME-UE-S1AP-ID',
+                                                                                           'CRITICALITY',
+                                                                                           'reject',
+                                                                                           'TYPE',
+                                                                                           'MME-UE-S1AP-ID',
+                                                                                           'PRESENCE',
+                                                                                           'mandatory'],
+                                                                                          ['ID',
+                                                                                           'id-eNB-UE-S1AP-ID',
+                                                                                           'CRITICALITY',
+                                                                                           'reject',
+                                                                                           'TYPE',
+                                                                                           'ENB-UE-S1AP-ID',
+                                                                                           'PRESENCE',
+                                                                                           'mandatory'],
+                                                                                          ['ID',
+                                                                                           'id-CSGMembershipInfo',
+                                                                                           'CRITICALITY',
+                                                                                           'reject',
+                                                                                           'TYPE',
+                                                                                           'CSGMembershipInfo',
+                                                                                           'PRESENCE',
+                                                                                           'optional'],
+                                                                                          ',',
+                                                                                          '.']},
                                        'UEContextModificationRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                           'members': []},
+                                                                           'members': [['ID',
+                                                                                        'id-MME-UE-S1AP-ID',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'MME-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-eNB-UE-S1AP-ID',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'ENB-UE-S1AP-ID',
+                                                                                        'PRESENCE',
+                                                                                        'mandatory'],
+                                                                                       ['ID',
+                                                                                        'id-SecurityKey',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'SecurityKey',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-SubscriberProfileIDforRFP',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'SubscriberProfileIDforRFP',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-uEaggregateMaximumBitrate',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'UEAggregateMaximumBitrate',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-CSFallbackIndicator',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'CSFallbackIndicator',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-UESecurityCapabilities',
+                                                                                        'CRITICALITY',
+                                                                                        'reject',
+                                                                                        'TYPE',
+                                                                                        'UESecurityCapabilities',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-CSGMembershipStatus',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'CSGMembershipStatus',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-RegisteredLAI',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'LAI',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-AdditionalCSFallbackIndicator',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'AdditionalCSFallbackIndicator',
+                                                                                        'PRESENCE',
+                                                                                        'conditional'],
+                                                                                       ['ID',
+                                                                                        'id-ProSeAuthorized',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'ProSeAuthorized',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-SRVCCOperationPossible',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'SRVCCOperationPossible',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-SRVCCOperationNotPossible',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'SRVCCOperationNotPossible',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-V2XServicesAuthorized',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'V2XServicesAuthorized',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ['ID',
+                                                                                        'id-UESidelinkAggregateMaximumBitrate',
+                                                                                        'CRITICALITY',
+                                                                                        'ignore',
+                                                                                        'TYPE',
+                                                                                        'UESidelinkAggregateMaximumBitrate',
+                                                                                        'PRESENCE',
+                                                                                        'optional'],
+                                                                                       ',',
+                                                                                       '.']},
                                        'UEContextModificationResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                            'members': []},
+                                                                            'members': [['ID',
+                                                                                         'id-MME-UE-S1AP-ID',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'MME-UE-S1AP-ID',
+                                                                                         'PRESENCE',
+                                                                                         'mandatory'],
+                                                                                        ['ID',
+                                                                                         'id-eNB-UE-S1AP-ID',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'ENB-UE-S1AP-ID',
+                                                                                         'PRESENCE',
+                                                                                         'mandatory'],
+                                                                                        ['ID',
+                                                                                         'id-CriticalityDiagnostics',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'CriticalityDiagnostics',
+                                                                                         'PRESENCE',
+                                                                                         'optional'],
+                                                                                        ',',
+                                                                                        '.']},
                                        'UEContextReleaseCommand-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                       'members': []},
+                                                                       'members': [['ID',
+                                                                                    'id-UE-S1AP-IDs',
+                                                                                    'CRITICALITY',
+                                                                                    'reject',
+                                                                                    'TYPE',
+                                                                                    'UE-S1AP-IDs',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-Cause',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'Cause',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ',',
+                                                                                   '.']},
                                        'UEContextReleaseComplete-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                        'members': []},
+                                                                        'members': [['ID',
+                                                                                     'id-MME-UE-S1AP-ID',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'MME-UE-S1AP-ID',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-eNB-UE-S1AP-ID',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'ENB-UE-S1AP-ID',
+                                                                                     'PRESENCE',
+                                                                                     'mandatory'],
+                                                                                    ['ID',
+                                                                                     'id-CriticalityDiagnostics',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'CriticalityDiagnostics',
+                                                                                     'PRESENCE',
+                                                                                     'optional'],
+                                                                                    ['ID',
+                                                                                     'id-UserLocationInformation',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'UserLocationInformation',
+                                                                                     'PRESENCE',
+                                                                                     'optional'],
+                                                                                    ['ID',
+                                                                                     'id-InformationOnRecommendedCellsAndENBsForPaging',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'InformationOnRecommendedCellsAndENBsForPaging',
+                                                                                     'PRESENCE',
+                                                                                     'optional'],
+                                                                                    ['ID',
+                                                                                     'id-CellIdentifierAndCELevelForCECapableUEs',
+                                                                                     'CRITICALITY',
+                                                                                     'ignore',
+                                                                                     'TYPE',
+                                                                                     'CellIdentifierAndCELevelForCECapableUEs',
+                                                                                     'PRESENCE',
+                                                                                     'optional'],
+                                                                                    ',',
+                                                                                    '.']},
                                        'UEContextReleaseRequest-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                       'members': []},
+                                                                       'members': [['ID',
+                                                                                    'id-MME-UE-S1AP-ID',
+                                                                                    'CRITICALITY',
+                                                                                    'reject',
+                                                                                    'TYPE',
+                                                                                    'MME-UE-S1AP-ID',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-eNB-UE-S1AP-ID',
+                                                                                    'CRITICALITY',
+                                                                                    'reject',
+                                                                                    'TYPE',
+                                                                                    'ENB-UE-S1AP-ID',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-Cause',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'Cause',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-GWContextReleaseIndication',
+                                                                                    'CRITICALITY',
+                                                                                    'reject',
+                                                                                    'TYPE',
+                                                                                    'GWContextReleaseIndication',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ',',
+                                                                                   '.']},
                                        'UEContextResumeFailureIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                     'members': []},
+                                                                     'members': [['ID',
+                                                                                  'id-MME-UE-S1AP-ID',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'MME-UE-S1AP-ID',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-eNB-UE-S1AP-ID',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'ENB-UE-S1AP-ID',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-Cause',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'Cause',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-CriticalityDiagnostics',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'CriticalityDiagnostics',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ',',
+                                                                                 '.']},
                                        'UEContextResumeRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                     'members': []},
+                                                                     'members': [['ID',
+                                                                                  'id-MME-UE-S1AP-ID',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'MME-UE-S1AP-ID',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-eNB-UE-S1AP-ID',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'ENB-UE-S1AP-ID',
+                                                                                  'PRESENCE',
+                                                                                  'mandatory'],
+                                                                                 ['ID',
+                                                                                  'id-E-RABFailedToResumeListResumeReq',
+                                                                                  'CRITICALITY',
+                                                                                  'reject',
+                                                                                  'TYPE',
+                                                                                  'E-RABFailedToResumeListResumeReq',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ['ID',
+                                                                                  'id-RRC-Resume-Cause',
+                                                                                  'CRITICALITY',
+                                                                                  'ignore',
+                                                                                  'TYPE',
+                                                                                  'RRC-Establishment-Cause',
+                                                                                  'PRESENCE',
+                                                                                  'optional'],
+                                                                                 ',',
+                                                                                 '.']},
                                        'UEContextResumeResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                      'members': []},
+                                                                      'members': [['ID',
+                                                                                   'id-MME-UE-S1AP-ID',
+                                                                                   'CRITICALITY',
+                                                                                   'ignore',
+                                                                                   'TYPE',
+                                                                                   'MME-UE-S1AP-ID',
+                                                                                   'PRESENCE',
+                                                                                   'mandatory'],
+                                                                                  ['ID',
+                                                                                   'id-eNB-UE-S1AP-ID',
+                                                                                   'CRITICALITY',
+                                                                                   'ignore',
+                                                                                   'TYPE',
+                                                                                   'ENB-UE-S1AP-ID',
+                                                                                   'PRESENCE',
+                                                                                   'mandatory'],
+                                                                                  ['ID',
+                                                                                   'id-E-RABFailedToResumeListResumeRes',
+                                                                                   'CRITICALITY',
+                                                                                   'reject',
+                                                                                   'TYPE',
+                                                                                   'E-RABFailedToResumeListResumeRes',
+                                                                                   'PRESENCE',
+                                                                                   'optional'],
+                                                                                  ['ID',
+                                                                                   'id-CriticalityDiagnostics',
+                                                                                   'CRITICALITY',
+                                                                                   'ignore',
+                                                                                   'TYPE',
+                                                                                   'CriticalityDiagnostics',
+                                                                                   'PRESENCE',
+                                                                                   'optional'],
+                                                                                  ['ID',
+                                                                                   'id-SecurityContext',
+                                                                                   'CRITICALITY',
+                                                                                   'reject',
+                                                                                   'TYPE',
+                                                                                   'SecurityContext',
+                                                                                   'PRESENCE',
+                                                                                   'optional'],
+                                                                                  ',',
+                                                                                  '.']},
                                        'UEContextSuspendRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                      'members': []},
+                                                                      'members': [['ID',
+                                                                                   'id-MME-UE-S1AP-ID',
+                                                                                   'CRITICALITY',
+                                                                                   'reject',
+                                                                                   'TYPE',
+                                                                                   'MME-UE-S1AP-ID',
+                                                                                   'PRESENCE',
+                                                                                   'mandatory'],
+                                                                                  ['ID',
+                                                                                   'id-eNB-UE-S1AP-ID',
+                                                                                   'CRITICALITY',
+                                                                                   'reject',
+                                                                                   'TYPE',
+                                                                                   'ENB-UE-S1AP-ID',
+                                                                                   'PRESENCE',
+                                                                                   'mandatory'],
+                                                                                  ['ID',
+                                                                                   'id-InformationOnRecommendedCellsAndENBsForPaging',
+                                                                                   'CRITICALITY',
+                                                                                   'ignore',
+                                                                                   'TYPE',
+                                                                                   'InformationOnRecommendedCellsAndENBsForPaging',
+                                                                                   'PRESENCE',
+                                                                                   'optional'],
+                                                                                  ['ID',
+                                                                                   'id-CellIdentifierAndCELevelForCECapableUEs',
+                                                                                   'CRITICALITY',
+                                                                                   'ignore',
+                                                                                   'TYPE',
+                                                                                   'CellIdentifierAndCELevelForCECapableUEs',
+                                                                                   'PRESENCE',
+                                                                                   'optional'],
+                                                                                  ',',
+                                                                                  '.']},
                                        'UEContextSuspendResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                       'members': []},
+                                                                       'members': [['ID',
+                                                                                    'id-MME-UE-S1AP-ID',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'MME-UE-S1AP-ID',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-eNB-UE-S1AP-ID',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'ENB-UE-S1AP-ID',
+                                                                                    'PRESENCE',
+                                                                                    'mandatory'],
+                                                                                   ['ID',
+                                                                                    'id-CriticalityDiagnostics',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore',
+                                                                                    'TYPE',
+                                                                                    'CriticalityDiagnostics',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ['ID',
+                                                                                    'id-SecurityContext',
+                                                                                    'CRITICALITY',
+                                                                                    'reject',
+                                                                                    'TYPE',
+                                                                                    'SecurityContext',
+                                                                                    'PRESENCE',
+                                                                                    'optional'],
+                                                                                   ',',
+                                                                                   '.']},
                                        'UEInformationTransferIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                    'members': []},
+                                                                    'members': [['ID',
+                                                                                 'id-S-TMSI',
+                                                                                 'CRITICALITY',
+                                                                                 'reject',
+                                                                                 'TYPE',
+                                                                                 'S-TMSI',
+                                                                                 'PRESENCE',
+                                                                                 'mandatory'],
+                                                                                ['ID',
+                                                                                 'id-UE-Level-QoS-Parameters',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore',
+                                                                                 'TYPE',
+                                                                                 'E-RABLevelQoSParameters',
+                                                                                 'PRESENCE',
+                                                                                 'optional'],
+                                                                                ['ID',
+                                                                                 'id-UERadioCapability',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore',
+                                                                                 'TYPE',
+                                                                                 'UERadioCapability',
+                                                                                 'PRESENCE',
+                                                                                 'optional'],
+                                                                                ',',
+                                                                                '.']},
                                        'UERadioCapabilityMatchRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                            'members': []},
+                                                                            'members': [['ID',
+                                                                                         'id-MME-UE-S1AP-ID',
+                                                                                         'CRITICALITY',
+                                                                                         'reject',
+                                                                                         'TYPE',
+                                                                                         'MME-UE-S1AP-ID',
+                                                                                         'PRESENCE',
+                                                                                         'mandatory'],
+                                                                                        ['ID',
+                                                                                         'id-eNB-UE-S1AP-ID',
+                                                                                         'CRITICALITY',
+                                                                                         'reject',
+                                                                                         'TYPE',
+                                                                                         'ENB-UE-S1AP-ID',
+                                                                                         'PRESENCE',
+                                                                                         'mandatory'],
+                                                                                        ['ID',
+                                                                                         'id-UERadioCapability',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore',
+                                                                                         'TYPE',
+                                                                                         'UERadioCapability',
+                                                                                         'PRESENCE',
+                                                                                         'optional'],
+                                                                                        ',',
+                                                                                        '.']},
                                        'UERadioCapabilityMatchResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                             'members': []},
+                                                                             'members': [['ID',
+                                                                                          'id-MME-UE-S1AP-ID',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'TYPE',
+                                                                                          'MME-UE-S1AP-ID',
+                                                                                          'PRESENCE',
+                                                                                          'mandatory'],
+                                                                                         ['ID',
+                                                                                          'id-eNB-UE-S1AP-ID',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'TYPE',
+                                                                                          'ENB-UE-S1AP-ID',
+                                                                                          'PRESENCE',
+                                                                                          'mandatory'],
+                                                                                         ['ID',
+                                                                                          'id-VoiceSupportMatchIndicator',
+                                                                                          'CRITICALITY',
+                                                                                          'reject',
+                                                                                          'TYPE',
+                                                                                          'VoiceSupportMatchIndicator',
+                                                                                          'PRESENCE',
+                                                                                          'mandatory'],
+                                                                                         ['ID',
+                                                                                          'id-CriticalityDiagnostics',
+                                                                                          'CRITICALITY',
+                                                                                          'ignore',
+                                                                                          'TYPE',
+                                                                                          'CriticalityDiagnostics',
+                                                                                          'PRESENCE',
+                                                                                          'optional'],
+                                                                                         ',',
+                                                                                         '.']},
                                        'UplinkNASTransport-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                  'members': []},
+                                                                  'members': [['ID',
+                                                                               'id-MME-UE-S1AP-ID',
+                                                                               'CRITICALITY',
+                                                                               'reject',
+                                                                               'TYPE',
+                                                                               'MME-UE-S1AP-ID',
+                                                                               'PRESENCE',
+                                                                               'mandatory'],
+                                                                              ['ID',
+                                                                               'id-eNB-UE-S1AP-ID',
+                                                                               'CRITICALITY',
+                                                                               'reject',
+                                                                               'TYPE',
+                                                                               'ENB-UE-S1AP-ID',
+                                                                               'PRESENCE',
+                                                                               'mandatory'],
+                                                                              ['ID',
+                                                                               'id-NAS-PDU',
+                                                                               'CRITICALITY',
+                                                                               'reject',
+                                                                               'TYPE',
+                                                                               'NAS-PDU',
+                                                                               'PRESENCE',
+                                                                               'mandatory'],
+                                                                              ['ID',
+                                                                               'id-EUTRAN-CGI',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'EUTRAN-CGI',
+                                                                               'PRESENCE',
+                                                                               'mandatory'],
+                                                                              ['ID',
+                                                                               'id-TAI',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'TAI',
+                                                                               'PRESENCE',
+                                                                               'mandatory'],
+                                                                              ['ID',
+                                                                               'id-GW-TransportLayerAddress',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'TransportLayerAddress',
+                                                                               'PRESENCE',
+                                                                               'optional'],
+                                                                              ['ID',
+                                                                               'id-SIPTO-L-GW-TransportLayerAddress',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'TransportLayerAddress',
+                                                                               'PRESENCE',
+                                                                               'optional'],
+                                                                              ['ID',
+                                                                               'id-LHN-ID',
+                                                                               'CRITICALITY',
+                                                                               'ignore',
+                                                                               'TYPE',
+                                                                               'LHN-ID',
+                                                                               'PRESENCE',
+                                                                               'optional'],
+                                                                              ',',
+                                                                              '.']},
                                        'UplinkNonUEAssociatedLPPaTransport-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                                  'members': []},
+                                                                                  'members': [['ID',
+                                                                                               'id-Routing-ID',
+                                                                                               'CRITICALITY',
+                                                                                               'reject',
+                                                                                               'TYPE',
+                                                                                               'Routing-ID',
+                                                                                               'PRESENCE',
+                                                                                               'mandatory'],
+                                                                                              ['ID',
+                                                                                               'id-LPPa-PDU',
+                                                                                               'CRITICALITY',
+                                                                                               'reject',
+                                                                                               'TYPE',
+                                                                                               'LPPa-PDU',
+                                                                                               'PRESENCE',
+                                                                                               'mandatory'],
+                                                                                              ',',
+                                                                                              '.']},
                                        'UplinkS1cdma2000tunnellingIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                         'members': []},
+                                                                         'members': [['ID',
+                                                                                      'id-MME-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'MME-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-eNB-UE-S1AP-ID',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'ENB-UE-S1AP-ID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-cdma2000RATType',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'Cdma2000RATType',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-cdma2000SectorID',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'Cdma2000SectorID',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-cdma2000HORequiredIndication',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'Cdma2000HORequiredIndication',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-cdma2000OneXSRVCCInfo',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'Cdma2000OneXSRVCCInfo',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-cdma2000OneXRAND',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'Cdma2000OneXRAND',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-cdma2000PDU',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'Cdma2000PDU',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-EUTRANRoundTripDelayEstimationInfo',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'EUTRANRoundTripDelayEstimationInfo',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ',',
+                                                                                     '.']},
                                        'UplinkUEAssociatedLPPaTransport-IEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                               'members': []},
+                                                                               'members': [['ID',
+                                                                                            'id-MME-UE-S1AP-ID',
+                                                                                            'CRITICALITY',
+                                                                                            'reject',
+                                                                                            'TYPE',
+                                                                                            'MME-UE-S1AP-ID',
+                                                                                            'PRESENCE',
+                                                                                            'mandatory'],
+                                                                                           ['ID',
+                                                                                            'id-eNB-UE-S1AP-ID',
+                                                                                            'CRITICALITY',
+                                                                                            'reject',
+                                                                                            'TYPE',
+                                                                                            'ENB-UE-S1AP-ID',
+                                                                                            'PRESENCE',
+                                                                                            'mandatory'],
+                                                                                           ['ID',
+                                                                                            'id-Routing-ID',
+                                                                                            'CRITICALITY',
+                                                                                            'reject',
+                                                                                            'TYPE',
+                                                                                            'Routing-ID',
+                                                                                            'PRESENCE',
+                                                                                            'mandatory'],
+                                                                                           ['ID',
+                                                                                            'id-LPPa-PDU',
+                                                                                            'CRITICALITY',
+                                                                                            'reject',
+                                                                                            'TYPE',
+                                                                                            'LPPa-PDU',
+                                                                                            'PRESENCE',
+                                                                                            'mandatory'],
+                                                                                           ',',
+                                                                                           '.']},
                                        'WriteReplaceWarningRequestIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                         'members': []},
+                                                                         'members': [['ID',
+                                                                                      'id-MessageIdentifier',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'MessageIdentifier',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-SerialNumber',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'SerialNumber',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-WarningAreaList',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'WarningAreaList',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-RepetitionPeriod',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'RepetitionPeriod',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-ExtendedRepetitionPeriod',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'ExtendedRepetitionPeriod',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-NumberofBroadcastRequest',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'NumberofBroadcastRequest',
+                                                                                      'PRESENCE',
+                                                                                      'mandatory'],
+                                                                                     ['ID',
+                                                                                      'id-WarningType',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'WarningType',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-WarningSecurityInfo',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'WarningSecurityInfo',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-DataCodingScheme',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'DataCodingScheme',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-WarningMessageContents',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore',
+                                                                                      'TYPE',
+                                                                                      'WarningMessageContents',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ['ID',
+                                                                                      'id-ConcurrentWarningMessageIndicator',
+                                                                                      'CRITICALITY',
+                                                                                      'reject',
+                                                                                      'TYPE',
+                                                                                      'ConcurrentWarningMessageIndicator',
+                                                                                      'PRESENCE',
+                                                                                      'optional'],
+                                                                                     ',',
+                                                                                     '.']},
                                        'WriteReplaceWarningResponseIEs': {'class': 'S1AP-PROTOCOL-IES',
-                                                                          'members': []}},
+                                                                          'members': [['ID',
+                                                                                       'id-MessageIdentifier',
+                                                                                       'CRITICALITY',
+                                                                                       'reject',
+                                                                                       'TYPE',
+                                                                                       'MessageIdentifier',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ['ID',
+                                                                                       'id-SerialNumber',
+                                                                                       'CRITICALITY',
+                                                                                       'reject',
+                                                                                       'TYPE',
+                                                                                       'SerialNumber',
+                                                                                       'PRESENCE',
+                                                                                       'mandatory'],
+                                                                                      ['ID',
+                                                                                       'id-BroadcastCompletedAreaList',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'TYPE',
+                                                                                       'BroadcastCompletedAreaList',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ['ID',
+                                                                                       'id-CriticalityDiagnostics',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore',
+                                                                                       'TYPE',
+                                                                                       'CriticalityDiagnostics',
+                                                                                       'PRESENCE',
+                                                                                       'optional'],
+                                                                                      ',',
+                                                                                      '.']}},
                        'tags': 'AUTOMATIC',
                        'types': {'CSGMembershipInfo': {'members': [{'name': 'cSGMembershipStatus',
                                                                     'type': 'CSGMembershipStatus'},
@@ -3895,41 +8523,57 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                    {'name': 'pLMNidentity',
                                                                     'optional': True,
                                                                     'type': 'PLMNidentity'},
-                                                                   {'name': 'iE-Extensions',
+                                                                   {'actual-parameters': ['CSGMembershipInfo-ExtIEs'],
+                                                                    'name': 'iE-Extensions',
                                                                     'optional': True,
                                                                     'type': 'ProtocolExtensionContainer'},
                                                                    None],
                                                        'type': 'SEQUENCE'},
-                                 'CellTrafficTrace': {'members': [{'name': 'protocolIEs',
+                                 'CellTrafficTrace': {'members': [{'actual-parameters': ['CellTrafficTraceIEs'],
+                                                                   'name': 'protocolIEs',
                                                                    'type': 'ProtocolIE-Container'},
                                                                   None],
                                                       'type': 'SEQUENCE'},
-                                 'ConnectionEstablishmentIndication': {'members': [{'name': 'protocolIEs',
+                                 'ConnectionEstablishmentIndication': {'members': [{'actual-parameters': ['ConnectionEstablishmentIndicationIEs'],
+                                                                                    'name': 'protocolIEs',
                                                                                     'type': 'ProtocolIE-Container'},
                                                                                    None],
                                                                        'type': 'SEQUENCE'},
-                                 'DeactivateTrace': {'members': [{'name': 'protocolIEs',
+                                 'DeactivateTrace': {'members': [{'actual-parameters': ['DeactivateTraceIEs'],
+                                                                  'name': 'protocolIEs',
                                                                   'type': 'ProtocolIE-Container'},
                                                                  None],
                                                      'type': 'SEQUENCE'},
-                                 'DownlinkNASTransport': {'members': [{'name': 'protocolIEs',
+                                 'DownlinkNASTransport': {'members': [{'actual-parameters': ['DownlinkNASTransport-IEs'],
+                                                                       'name': 'protocolIEs',
                                                                        'type': 'ProtocolIE-Container'},
                                                                       None],
                                                           'type': 'SEQUENCE'},
-                                 'DownlinkNonUEAssociatedLPPaTransport': {'members': [{'name': 'protocolIEs',
+                                 'DownlinkNonUEAssociatedLPPaTransport': {'members': [{'actual-parameters': ['DownlinkNonUEAssociatedLPPaTransport-IEs'],
+                                                                                       'name': 'protocolIEs',
                                                                                        'type': 'ProtocolIE-Container'},
                                                                                       None],
                                                                           'type': 'SEQUENCE'},
-                                 'DownlinkS1cdma2000tunnelling': {'members': [{'name': 'protocolIEs',
+                                 'DownlinkS1cdma2000tunnelling': {'members': [{'actual-parameters': ['DownlinkS1cdma2000tunnellingIEs'],
+                                                                               'name': 'protocolIEs',
                                                                                'type': 'ProtocolIE-Container'},
                                                                               None],
                                                                   'type': 'SEQUENCE'},
-                                 'DownlinkUEAssociatedLPPaTransport': {'members': [{'name': 'protocolIEs',
+                                 'DownlinkUEAssociatedLPPaTransport': {'members': [{'actual-parameters': ['DownlinkUEAssociatedLPPaTransport-IEs'],
+                                                                                    'name': 'protocolIEs',
                                                                                     'type': 'ProtocolIE-Container'},
                                                                                    None],
                                                                        'type': 'SEQUENCE'},
-                                 'E-RAB-IE-ContainerList': {'type': 'ProtocolIE-ContainerList'},
-                                 'E-RAB-IE-ContainerPairList': {'type': 'ProtocolIE-ContainerPairList'},
+                                 'E-RAB-IE-ContainerList': {'actual-parameters': [1,
+                                                                                  'maxnoofE-RABs',
+                                                                                  'IEsSetParam'],
+                                                            'parameters': ['IEsSetParam'],
+                                                            'type': 'ProtocolIE-ContainerList'},
+                                 'E-RAB-IE-ContainerPairList': {'actual-parameters': [1,
+                                                                                      'maxnoofE-RABs',
+                                                                                      'IEsSetParam'],
+                                                                'parameters': ['IEsSetParam'],
+                                                                'type': 'ProtocolIE-ContainerPairList'},
                                  'E-RABAdmittedItem': {'members': [{'name': 'e-RAB-ID',
                                                                     'type': 'E-RAB-ID'},
                                                                    {'name': 'transportLayerAddress',
@@ -3948,12 +8592,14 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                    {'name': 'uL-GTP-TEID',
                                                                     'optional': True,
                                                                     'type': 'GTP-TEID'},
-                                                                   {'name': 'iE-Extensions',
+                                                                   {'actual-parameters': ['E-RABAdmittedItem-ExtIEs'],
+                                                                    'name': 'iE-Extensions',
                                                                     'optional': True,
                                                                     'type': 'ProtocolExtensionContainer'},
                                                                    None],
                                                        'type': 'SEQUENCE'},
-                                 'E-RABAdmittedList': {'type': 'E-RAB-IE-ContainerList'},
+                                 'E-RABAdmittedList': {'actual-parameters': ['E-RABAdmittedItemIEs'],
+                                                       'type': 'E-RAB-IE-ContainerList'},
                                  'E-RABDataForwardingItem': {'members': [{'name': 'e-RAB-ID',
                                                                           'type': 'E-RAB-ID'},
                                                                          {'name': 'dL-transportLayerAddress',
@@ -3968,7 +8614,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                          {'name': 'uL-GTP-TEID',
                                                                           'optional': True,
                                                                           'type': 'GTP-TEID'},
-                                                                         {'name': 'iE-Extensions',
+                                                                         {'actual-parameters': ['E-RABDataForwardingItem-ExtIEs'],
+                                                                          'name': 'iE-Extensions',
                                                                           'optional': True,
                                                                           'type': 'ProtocolExtensionContainer'},
                                                                          None],
@@ -3977,7 +8624,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                    'type': 'E-RAB-ID'},
                                                                                   {'name': 'cause',
                                                                                    'type': 'Cause'},
-                                                                                  {'name': 'iE-Extensions',
+                                                                                  {'actual-parameters': ['E-RABFailedToResumeItemResumeReq-ExtIEs'],
+                                                                                   'name': 'iE-Extensions',
                                                                                    'optional': True,
                                                                                    'type': 'ProtocolExtensionContainer'},
                                                                                   None],
@@ -3986,60 +8634,73 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                    'type': 'E-RAB-ID'},
                                                                                   {'name': 'cause',
                                                                                    'type': 'Cause'},
-                                                                                  {'name': 'iE-Extensions',
+                                                                                  {'actual-parameters': ['E-RABFailedToResumeItemResumeRes-ExtIEs'],
+                                                                                   'name': 'iE-Extensions',
                                                                                    'optional': True,
                                                                                    'type': 'ProtocolExtensionContainer'},
                                                                                   None],
                                                                       'type': 'SEQUENCE'},
-                                 'E-RABFailedToResumeListResumeReq': {'type': 'E-RAB-IE-ContainerList'},
-                                 'E-RABFailedToResumeListResumeRes': {'type': 'E-RAB-IE-ContainerList'},
+                                 'E-RABFailedToResumeListResumeReq': {'actual-parameters': ['E-RABFailedToResumeItemResumeReqIEs'],
+                                                                      'type': 'E-RAB-IE-ContainerList'},
+                                 'E-RABFailedToResumeListResumeRes': {'actual-parameters': ['E-RABFailedToResumeItemResumeResIEs'],
+                                                                      'type': 'E-RAB-IE-ContainerList'},
                                  'E-RABFailedToSetupItemHOReqAck': {'members': [{'name': 'e-RAB-ID',
                                                                                  'type': 'E-RAB-ID'},
                                                                                 {'name': 'cause',
                                                                                  'type': 'Cause'},
-                                                                                {'name': 'iE-Extensions',
+                                                                                {'actual-parameters': ['E-RABFailedToSetupItemHOReqAckExtIEs'],
+                                                                                 'name': 'iE-Extensions',
                                                                                  'optional': True,
                                                                                  'type': 'ProtocolExtensionContainer'},
                                                                                 None],
                                                                     'type': 'SEQUENCE'},
-                                 'E-RABFailedtoSetupListHOReqAck': {'type': 'E-RAB-IE-ContainerList'},
-                                 'E-RABModificationConfirm': {'members': [{'name': 'protocolIEs',
+                                 'E-RABFailedtoSetupListHOReqAck': {'actual-parameters': ['E-RABFailedtoSetupItemHOReqAckIEs'],
+                                                                    'type': 'E-RAB-IE-ContainerList'},
+                                 'E-RABModificationConfirm': {'members': [{'actual-parameters': ['E-RABModificationConfirmIEs'],
+                                                                           'name': 'protocolIEs',
                                                                            'type': 'ProtocolIE-Container'},
                                                                           None],
                                                               'type': 'SEQUENCE'},
-                                 'E-RABModificationIndication': {'members': [{'name': 'protocolIEs',
+                                 'E-RABModificationIndication': {'members': [{'actual-parameters': ['E-RABModificationIndicationIEs'],
+                                                                              'name': 'protocolIEs',
                                                                               'type': 'ProtocolIE-Container'},
                                                                              None],
                                                                  'type': 'SEQUENCE'},
                                  'E-RABModifyItemBearerModConf': {'members': [{'name': 'e-RAB-ID',
                                                                                'type': 'E-RAB-ID'},
-                                                                              {'name': 'iE-Extensions',
+                                                                              {'actual-parameters': ['E-RABModifyItemBearerModConfExtIEs'],
+                                                                               'name': 'iE-Extensions',
                                                                                'optional': True,
                                                                                'type': 'ProtocolExtensionContainer'},
                                                                               None],
                                                                   'type': 'SEQUENCE'},
                                  'E-RABModifyItemBearerModRes': {'members': [{'name': 'e-RAB-ID',
                                                                               'type': 'E-RAB-ID'},
-                                                                             {'name': 'iE-Extensions',
+                                                                             {'actual-parameters': ['E-RABModifyItemBearerModResExtIEs'],
+                                                                              'name': 'iE-Extensions',
                                                                               'optional': True,
                                                                               'type': 'ProtocolExtensionContainer'},
                                                                              None],
                                                                  'type': 'SEQUENCE'},
-                                 'E-RABModifyListBearerModConf': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'E-RABModifyListBearerModConf': {'element': {'actual-parameters': ['E-RABModifyItemBearerModConfIEs'],
+                                                                              'type': 'ProtocolIE-SingleContainer'},
                                                                   'size': [(1,
                                                                             'maxnoofE-RABs')],
                                                                   'type': 'SEQUENCE '
                                                                           'OF'},
-                                 'E-RABModifyListBearerModRes': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'E-RABModifyListBearerModRes': {'element': {'actual-parameters': ['E-RABModifyItemBearerModResIEs'],
+                                                                             'type': 'ProtocolIE-SingleContainer'},
                                                                  'size': [(1,
                                                                            'maxnoofE-RABs')],
                                                                  'type': 'SEQUENCE '
                                                                          'OF'},
-                                 'E-RABModifyRequest': {'members': [{'name': 'protocolIEs',
+                                 'E-RABModifyRequest': {'members': [{'actual-parameters': ['E-RABModifyRequestIEs'],
+                                                                     'name': 'protocolIEs',
                                                                      'type': 'ProtocolIE-Container'},
                                                                     None],
                                                         'type': 'SEQUENCE'},
-                                 'E-RABModifyResponse': {'members': [{'name': 'protocolIEs',
+                                 'E-RABModifyResponse': {'members': [{'actual-parameters': ['E-RABModifyResponseIEs'],
+                                                                      'name': 'protocolIEs',
                                                                       'type': 'ProtocolIE-Container'},
                                                                      None],
                                                          'type': 'SEQUENCE'},
@@ -4049,33 +8710,40 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                        'type': 'TransportLayerAddress'},
                                                                                       {'name': 'dL-GTP-TEID',
                                                                                        'type': 'GTP-TEID'},
-                                                                                      {'name': 'iE-Extensions',
+                                                                                      {'actual-parameters': ['E-RABNotToBeModifiedItemBearerModInd-ExtIEs'],
+                                                                                       'name': 'iE-Extensions',
                                                                                        'optional': True,
                                                                                        'type': 'ProtocolExtensionContainer'},
                                                                                       None],
                                                                           'type': 'SEQUENCE'},
-                                 'E-RABNotToBeModifiedListBearerModInd': {'type': 'E-RAB-IE-ContainerList'},
-                                 'E-RABReleaseCommand': {'members': [{'name': 'protocolIEs',
+                                 'E-RABNotToBeModifiedListBearerModInd': {'actual-parameters': ['E-RABNotToBeModifiedItemBearerModIndIEs'],
+                                                                          'type': 'E-RAB-IE-ContainerList'},
+                                 'E-RABReleaseCommand': {'members': [{'actual-parameters': ['E-RABReleaseCommandIEs'],
+                                                                      'name': 'protocolIEs',
                                                                       'type': 'ProtocolIE-Container'},
                                                                      None],
                                                          'type': 'SEQUENCE'},
-                                 'E-RABReleaseIndication': {'members': [{'name': 'protocolIEs',
+                                 'E-RABReleaseIndication': {'members': [{'actual-parameters': ['E-RABReleaseIndicationIEs'],
+                                                                         'name': 'protocolIEs',
                                                                          'type': 'ProtocolIE-Container'},
                                                                         None],
                                                             'type': 'SEQUENCE'},
                                  'E-RABReleaseItemBearerRelComp': {'members': [{'name': 'e-RAB-ID',
                                                                                 'type': 'E-RAB-ID'},
-                                                                               {'name': 'iE-Extensions',
+                                                                               {'actual-parameters': ['E-RABReleaseItemBearerRelCompExtIEs'],
+                                                                                'name': 'iE-Extensions',
                                                                                 'optional': True,
                                                                                 'type': 'ProtocolExtensionContainer'},
                                                                                None],
                                                                    'type': 'SEQUENCE'},
-                                 'E-RABReleaseListBearerRelComp': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'E-RABReleaseListBearerRelComp': {'element': {'actual-parameters': ['E-RABReleaseItemBearerRelCompIEs'],
+                                                                               'type': 'ProtocolIE-SingleContainer'},
                                                                    'size': [(1,
                                                                              'maxnoofE-RABs')],
                                                                    'type': 'SEQUENCE '
                                                                            'OF'},
-                                 'E-RABReleaseResponse': {'members': [{'name': 'protocolIEs',
+                                 'E-RABReleaseResponse': {'members': [{'actual-parameters': ['E-RABReleaseResponseIEs'],
+                                                                       'name': 'protocolIEs',
                                                                        'type': 'ProtocolIE-Container'},
                                                                       None],
                                                           'type': 'SEQUENCE'},
@@ -4085,7 +8753,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                             'type': 'TransportLayerAddress'},
                                                                            {'name': 'gTP-TEID',
                                                                             'type': 'GTP-TEID'},
-                                                                           {'name': 'iE-Extensions',
+                                                                           {'actual-parameters': ['E-RABSetupItemBearerSUResExtIEs'],
+                                                                            'name': 'iE-Extensions',
                                                                             'optional': True,
                                                                             'type': 'ProtocolExtensionContainer'},
                                                                            None],
@@ -4096,37 +8765,44 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                           'type': 'TransportLayerAddress'},
                                                                          {'name': 'gTP-TEID',
                                                                           'type': 'GTP-TEID'},
-                                                                         {'name': 'iE-Extensions',
+                                                                         {'actual-parameters': ['E-RABSetupItemCtxtSUResExtIEs'],
+                                                                          'name': 'iE-Extensions',
                                                                           'optional': True,
                                                                           'type': 'ProtocolExtensionContainer'},
                                                                          None],
                                                              'type': 'SEQUENCE'},
-                                 'E-RABSetupListBearerSURes': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'E-RABSetupListBearerSURes': {'element': {'actual-parameters': ['E-RABSetupItemBearerSUResIEs'],
+                                                                           'type': 'ProtocolIE-SingleContainer'},
                                                                'size': [(1,
                                                                          'maxnoofE-RABs')],
                                                                'type': 'SEQUENCE '
                                                                        'OF'},
-                                 'E-RABSetupListCtxtSURes': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'E-RABSetupListCtxtSURes': {'element': {'actual-parameters': ['E-RABSetupItemCtxtSUResIEs'],
+                                                                         'type': 'ProtocolIE-SingleContainer'},
                                                              'size': [(1,
                                                                        'maxnoofE-RABs')],
                                                              'type': 'SEQUENCE '
                                                                      'OF'},
-                                 'E-RABSetupRequest': {'members': [{'name': 'protocolIEs',
+                                 'E-RABSetupRequest': {'members': [{'actual-parameters': ['E-RABSetupRequestIEs'],
+                                                                    'name': 'protocolIEs',
                                                                     'type': 'ProtocolIE-Container'},
                                                                    None],
                                                        'type': 'SEQUENCE'},
-                                 'E-RABSetupResponse': {'members': [{'name': 'protocolIEs',
+                                 'E-RABSetupResponse': {'members': [{'actual-parameters': ['E-RABSetupResponseIEs'],
+                                                                     'name': 'protocolIEs',
                                                                      'type': 'ProtocolIE-Container'},
                                                                     None],
                                                         'type': 'SEQUENCE'},
-                                 'E-RABSubjecttoDataForwardingList': {'type': 'E-RAB-IE-ContainerList'},
+                                 'E-RABSubjecttoDataForwardingList': {'actual-parameters': ['E-RABDataForwardingItemIEs'],
+                                                                      'type': 'E-RAB-IE-ContainerList'},
                                  'E-RABToBeModifiedItemBearerModInd': {'members': [{'name': 'e-RAB-ID',
                                                                                     'type': 'E-RAB-ID'},
                                                                                    {'name': 'transportLayerAddress',
                                                                                     'type': 'TransportLayerAddress'},
                                                                                    {'name': 'dL-GTP-TEID',
                                                                                     'type': 'GTP-TEID'},
-                                                                                   {'name': 'iE-Extensions',
+                                                                                   {'actual-parameters': ['E-RABToBeModifiedItemBearerModInd-ExtIEs'],
+                                                                                    'name': 'iE-Extensions',
                                                                                     'optional': True,
                                                                                     'type': 'ProtocolExtensionContainer'},
                                                                                    None],
@@ -4137,13 +8813,16 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                     'type': 'E-RABLevelQoSParameters'},
                                                                                    {'name': 'nAS-PDU',
                                                                                     'type': 'NAS-PDU'},
-                                                                                   {'name': 'iE-Extensions',
+                                                                                   {'actual-parameters': ['E-RABToBeModifyItemBearerModReqExtIEs'],
+                                                                                    'name': 'iE-Extensions',
                                                                                     'optional': True,
                                                                                     'type': 'ProtocolExtensionContainer'},
                                                                                    None],
                                                                        'type': 'SEQUENCE'},
-                                 'E-RABToBeModifiedListBearerModInd': {'type': 'E-RAB-IE-ContainerList'},
-                                 'E-RABToBeModifiedListBearerModReq': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'E-RABToBeModifiedListBearerModInd': {'actual-parameters': ['E-RABToBeModifiedItemBearerModIndIEs'],
+                                                                       'type': 'E-RAB-IE-ContainerList'},
+                                 'E-RABToBeModifiedListBearerModReq': {'element': {'actual-parameters': ['E-RABToBeModifiedItemBearerModReqIEs'],
+                                                                                   'type': 'ProtocolIE-SingleContainer'},
                                                                        'size': [(1,
                                                                                  'maxnoofE-RABs')],
                                                                        'type': 'SEQUENCE '
@@ -4158,7 +8837,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                 'type': 'GTP-TEID'},
                                                                                {'name': 'nAS-PDU',
                                                                                 'type': 'NAS-PDU'},
-                                                                               {'name': 'iE-Extensions',
+                                                                               {'actual-parameters': ['E-RABToBeSetupItemBearerSUReqExtIEs'],
+                                                                                'name': 'iE-Extensions',
                                                                                 'optional': True,
                                                                                 'type': 'ProtocolExtensionContainer'},
                                                                                None],
@@ -4174,7 +8854,8 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                              {'name': 'nAS-PDU',
                                                                               'optional': True,
                                                                               'type': 'NAS-PDU'},
-                                                                             {'name': 'iE-Extensions',
+                                                                             {'actual-parameters': ['E-RABToBeSetupItemCtxtSUReqExtIEs'],
+                                                                              'name': 'iE-Extensions',
                                                                               'optional': True,
                                                                               'type': 'ProtocolExtensionContainer'},
                                                                              None],
@@ -4187,127 +8868,156 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                           'type': 'GTP-TEID'},
                                                                          {'name': 'e-RABlevelQosParameters',
                                                                           'type': 'E-RABLevelQoSParameters'},
-                                                                         {'name': 'iE-Extensions',
+                                                                         {'actual-parameters': ['E-RABToBeSetupItemHOReq-ExtIEs'],
+                                                                          'name': 'iE-Extensions',
                                                                           'optional': True,
                                                                           'type': 'ProtocolExtensionContainer'},
                                                                          None],
                                                              'type': 'SEQUENCE'},
-                                 'E-RABToBeSetupListBearerSUReq': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'E-RABToBeSetupListBearerSUReq': {'element': {'actual-parameters': ['E-RABToBeSetupItemBearerSUReqIEs'],
+                                                                               'type': 'ProtocolIE-SingleContainer'},
                                                                    'size': [(1,
                                                                              'maxnoofE-RABs')],
                                                                    'type': 'SEQUENCE '
                                                                            'OF'},
-                                 'E-RABToBeSetupListCtxtSUReq': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'E-RABToBeSetupListCtxtSUReq': {'element': {'actual-parameters': ['E-RABToBeSetupItemCtxtSUReqIEs'],
+                                                                             'type': 'ProtocolIE-SingleContainer'},
                                                                  'size': [(1,
                                                                            'maxnoofE-RABs')],
                                                                  'type': 'SEQUENCE '
                                                                          'OF'},
-                                 'E-RABToBeSetupListHOReq': {'type': 'E-RAB-IE-ContainerList'},
+                                 'E-RABToBeSetupListHOReq': {'actual-parameters': ['E-RABToBeSetupItemHOReqIEs'],
+                                                             'type': 'E-RAB-IE-ContainerList'},
                                  'E-RABToBeSwitchedDLItem': {'members': [{'name': 'e-RAB-ID',
                                                                           'type': 'E-RAB-ID'},
                                                                          {'name': 'transportLayerAddress',
                                                                           'type': 'TransportLayerAddress'},
                                                                          {'name': 'gTP-TEID',
                                                                           'type': 'GTP-TEID'},
-                                                                         {'name': 'iE-Extensions',
+                                                                         {'actual-parameters': ['E-RABToBeSwitchedDLItem-ExtIEs'],
+                                                                          'name': 'iE-Extensions',
                                                                           'optional': True,
                                                                           'type': 'ProtocolExtensionContainer'},
                                                                          None],
                                                              'type': 'SEQUENCE'},
-                                 'E-RABToBeSwitchedDLList': {'type': 'E-RAB-IE-ContainerList'},
+                                 'E-RABToBeSwitchedDLList': {'actual-parameters': ['E-RABToBeSwitchedDLItemIEs'],
+                                                             'type': 'E-RAB-IE-ContainerList'},
                                  'E-RABToBeSwitchedULItem': {'members': [{'name': 'e-RAB-ID',
                                                                           'type': 'E-RAB-ID'},
                                                                          {'name': 'transportLayerAddress',
                                                                           'type': 'TransportLayerAddress'},
                                                                          {'name': 'gTP-TEID',
                                                                           'type': 'GTP-TEID'},
-                                                                         {'name': 'iE-Extensions',
+                                                                         {'actual-parameters': ['E-RABToBeSwitchedULItem-ExtIEs'],
+                                                                          'name': 'iE-Extensions',
                                                                           'optional': True,
                                                                           'type': 'ProtocolExtensionContainer'},
                                                                          None],
                                                              'type': 'SEQUENCE'},
-                                 'E-RABToBeSwitchedULList': {'type': 'E-RAB-IE-ContainerList'},
-                                 'ENBCPRelocationIndication': {'members': [{'name': 'protocolIEs',
+                                 'E-RABToBeSwitchedULList': {'actual-parameters': ['E-RABToBeSwitchedULItemIEs'],
+                                                             'type': 'E-RAB-IE-ContainerList'},
+                                 'ENBCPRelocationIndication': {'members': [{'actual-parameters': ['ENBCPRelocationIndicationIEs'],
+                                                                            'name': 'protocolIEs',
                                                                             'type': 'ProtocolIE-Container'},
                                                                            None],
                                                                'type': 'SEQUENCE'},
-                                 'ENBConfigurationTransfer': {'members': [{'name': 'protocolIEs',
+                                 'ENBConfigurationTransfer': {'members': [{'actual-parameters': ['ENBConfigurationTransferIEs'],
+                                                                           'name': 'protocolIEs',
                                                                            'type': 'ProtocolIE-Container'},
                                                                           None],
                                                               'type': 'SEQUENCE'},
-                                 'ENBConfigurationUpdate': {'members': [{'name': 'protocolIEs',
+                                 'ENBConfigurationUpdate': {'members': [{'actual-parameters': ['ENBConfigurationUpdateIEs'],
+                                                                         'name': 'protocolIEs',
                                                                          'type': 'ProtocolIE-Container'},
                                                                         None],
                                                             'type': 'SEQUENCE'},
-                                 'ENBConfigurationUpdateAcknowledge': {'members': [{'name': 'protocolIEs',
+                                 'ENBConfigurationUpdateAcknowledge': {'members': [{'actual-parameters': ['ENBConfigurationUpdateAcknowledgeIEs'],
+                                                                                    'name': 'protocolIEs',
                                                                                     'type': 'ProtocolIE-Container'},
                                                                                    None],
                                                                        'type': 'SEQUENCE'},
-                                 'ENBConfigurationUpdateFailure': {'members': [{'name': 'protocolIEs',
+                                 'ENBConfigurationUpdateFailure': {'members': [{'actual-parameters': ['ENBConfigurationUpdateFailureIEs'],
+                                                                                'name': 'protocolIEs',
                                                                                 'type': 'ProtocolIE-Container'},
                                                                                None],
                                                                    'type': 'SEQUENCE'},
-                                 'ENBDirectInformationTransfer': {'members': [{'name': 'protocolIEs',
+                                 'ENBDirectInformationTransfer': {'members': [{'actual-parameters': ['ENBDirectInformationTransferIEs'],
+                                                                               'name': 'protocolIEs',
                                                                                'type': 'ProtocolIE-Container'},
                                                                               None],
                                                                   'type': 'SEQUENCE'},
-                                 'ENBStatusTransfer': {'members': [{'name': 'protocolIEs',
+                                 'ENBStatusTransfer': {'members': [{'actual-parameters': ['ENBStatusTransferIEs'],
+                                                                    'name': 'protocolIEs',
                                                                     'type': 'ProtocolIE-Container'},
                                                                    None],
                                                        'type': 'SEQUENCE'},
-                                 'ErrorIndication': {'members': [{'name': 'protocolIEs',
+                                 'ErrorIndication': {'members': [{'actual-parameters': ['ErrorIndicationIEs'],
+                                                                  'name': 'protocolIEs',
                                                                   'type': 'ProtocolIE-Container'},
                                                                  None],
                                                      'type': 'SEQUENCE'},
-                                 'HandoverCancel': {'members': [{'name': 'protocolIEs',
+                                 'HandoverCancel': {'members': [{'actual-parameters': ['HandoverCancelIEs'],
+                                                                 'name': 'protocolIEs',
                                                                  'type': 'ProtocolIE-Container'},
                                                                 None],
                                                     'type': 'SEQUENCE'},
-                                 'HandoverCancelAcknowledge': {'members': [{'name': 'protocolIEs',
+                                 'HandoverCancelAcknowledge': {'members': [{'actual-parameters': ['HandoverCancelAcknowledgeIEs'],
+                                                                            'name': 'protocolIEs',
                                                                             'type': 'ProtocolIE-Container'},
                                                                            None],
                                                                'type': 'SEQUENCE'},
-                                 'HandoverCommand': {'members': [{'name': 'protocolIEs',
+                                 'HandoverCommand': {'members': [{'actual-parameters': ['HandoverCommandIEs'],
+                                                                  'name': 'protocolIEs',
                                                                   'type': 'ProtocolIE-Container'},
                                                                  None],
                                                      'type': 'SEQUENCE'},
-                                 'HandoverFailure': {'members': [{'name': 'protocolIEs',
+                                 'HandoverFailure': {'members': [{'actual-parameters': ['HandoverFailureIEs'],
+                                                                  'name': 'protocolIEs',
                                                                   'type': 'ProtocolIE-Container'},
                                                                  None],
                                                      'type': 'SEQUENCE'},
-                                 'HandoverNotify': {'members': [{'name': 'protocolIEs',
+                                 'HandoverNotify': {'members': [{'actual-parameters': ['HandoverNotifyIEs'],
+                                                                 'name': 'protocolIEs',
                                                                  'type': 'ProtocolIE-Container'},
                                                                 None],
                                                     'type': 'SEQUENCE'},
-                                 'HandoverPreparationFailure': {'members': [{'name': 'protocolIEs',
+                                 'HandoverPreparationFailure': {'members': [{'actual-parameters': ['HandoverPreparationFailureIEs'],
+                                                                             'name': 'protocolIEs',
                                                                              'type': 'ProtocolIE-Container'},
                                                                             None],
                                                                 'type': 'SEQUENCE'},
-                                 'HandoverRequest': {'members': [{'name': 'protocolIEs',
+                                 'HandoverRequest': {'members': [{'actual-parameters': ['HandoverRequestIEs'],
+                                                                  'name': 'protocolIEs',
                                                                   'type': 'ProtocolIE-Container'},
                                                                  None],
                                                      'type': 'SEQUENCE'},
-                                 'HandoverRequestAcknowledge': {'members': [{'name': 'protocolIEs',
+                                 'HandoverRequestAcknowledge': {'members': [{'actual-parameters': ['HandoverRequestAcknowledgeIEs'],
+                                                                             'name': 'protocolIEs',
                                                                              'type': 'ProtocolIE-Container'},
                                                                             None],
                                                                 'type': 'SEQUENCE'},
-                                 'HandoverRequired': {'members': [{'name': 'protocolIEs',
+                                 'HandoverRequired': {'members': [{'actual-parameters': ['HandoverRequiredIEs'],
+                                                                   'name': 'protocolIEs',
                                                                    'type': 'ProtocolIE-Container'},
                                                                   None],
                                                       'type': 'SEQUENCE'},
-                                 'InitialContextSetupFailure': {'members': [{'name': 'protocolIEs',
+                                 'InitialContextSetupFailure': {'members': [{'actual-parameters': ['InitialContextSetupFailureIEs'],
+                                                                             'name': 'protocolIEs',
                                                                              'type': 'ProtocolIE-Container'},
                                                                             None],
                                                                 'type': 'SEQUENCE'},
-                                 'InitialContextSetupRequest': {'members': [{'name': 'protocolIEs',
+                                 'InitialContextSetupRequest': {'members': [{'actual-parameters': ['InitialContextSetupRequestIEs'],
+                                                                             'name': 'protocolIEs',
                                                                              'type': 'ProtocolIE-Container'},
                                                                             None],
                                                                 'type': 'SEQUENCE'},
-                                 'InitialContextSetupResponse': {'members': [{'name': 'protocolIEs',
+                                 'InitialContextSetupResponse': {'members': [{'actual-parameters': ['InitialContextSetupResponseIEs'],
+                                                                              'name': 'protocolIEs',
                                                                               'type': 'ProtocolIE-Container'},
                                                                              None],
                                                                  'type': 'SEQUENCE'},
-                                 'InitialUEMessage': {'members': [{'name': 'protocolIEs',
+                                 'InitialUEMessage': {'members': [{'actual-parameters': ['InitialUEMessage-IEs'],
+                                                                   'name': 'protocolIEs',
                                                                    'type': 'ProtocolIE-Container'},
                                                                   None],
                                                       'type': 'SEQUENCE'},
@@ -4315,108 +9025,138 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                       'type': 'RIMTransfer'},
                                                                                      None],
                                                                          'type': 'CHOICE'},
-                                 'KillRequest': {'members': [{'name': 'protocolIEs',
+                                 'KillRequest': {'members': [{'actual-parameters': ['KillRequestIEs'],
+                                                              'name': 'protocolIEs',
                                                               'type': 'ProtocolIE-Container'},
                                                              None],
                                                  'type': 'SEQUENCE'},
-                                 'KillResponse': {'members': [{'name': 'protocolIEs',
+                                 'KillResponse': {'members': [{'actual-parameters': ['KillResponseIEs'],
+                                                               'name': 'protocolIEs',
                                                                'type': 'ProtocolIE-Container'},
                                                               None],
                                                   'type': 'SEQUENCE'},
-                                 'LocationReport': {'members': [{'name': 'protocolIEs',
+                                 'LocationReport': {'members': [{'actual-parameters': ['LocationReportIEs'],
+                                                                 'name': 'protocolIEs',
                                                                  'type': 'ProtocolIE-Container'},
                                                                 None],
                                                     'type': 'SEQUENCE'},
-                                 'LocationReportingControl': {'members': [{'name': 'protocolIEs',
+                                 'LocationReportingControl': {'members': [{'actual-parameters': ['LocationReportingControlIEs'],
+                                                                           'name': 'protocolIEs',
                                                                            'type': 'ProtocolIE-Container'},
                                                                           None],
                                                               'type': 'SEQUENCE'},
-                                 'LocationReportingFailureIndication': {'members': [{'name': 'protocolIEs',
+                                 'LocationReportingFailureIndication': {'members': [{'actual-parameters': ['LocationReportingFailureIndicationIEs'],
+                                                                                     'name': 'protocolIEs',
                                                                                      'type': 'ProtocolIE-Container'},
                                                                                     None],
                                                                         'type': 'SEQUENCE'},
-                                 'MMECPRelocationIndication': {'members': [{'name': 'protocolIEs',
+                                 'MMECPRelocationIndication': {'members': [{'actual-parameters': ['MMECPRelocationIndicationIEs'],
+                                                                            'name': 'protocolIEs',
                                                                             'type': 'ProtocolIE-Container'},
                                                                            None],
                                                                'type': 'SEQUENCE'},
-                                 'MMEConfigurationTransfer': {'members': [{'name': 'protocolIEs',
+                                 'MMEConfigurationTransfer': {'members': [{'actual-parameters': ['MMEConfigurationTransferIEs'],
+                                                                           'name': 'protocolIEs',
                                                                            'type': 'ProtocolIE-Container'},
                                                                           None],
                                                               'type': 'SEQUENCE'},
-                                 'MMEConfigurationUpdate': {'members': [{'name': 'protocolIEs',
+                                 'MMEConfigurationUpdate': {'members': [{'actual-parameters': ['MMEConfigurationUpdateIEs'],
+                                                                         'name': 'protocolIEs',
                                                                          'type': 'ProtocolIE-Container'},
                                                                         None],
                                                             'type': 'SEQUENCE'},
-                                 'MMEConfigurationUpdateAcknowledge': {'members': [{'name': 'protocolIEs',
+                                 'MMEConfigurationUpdateAcknowledge': {'members': [{'actual-parameters': ['MMEConfigurationUpdateAcknowledgeIEs'],
+                                                                                    'name': 'protocolIEs',
                                                                                     'type': 'ProtocolIE-Container'},
                                                                                    None],
                                                                        'type': 'SEQUENCE'},
-                                 'MMEConfigurationUpdateFailure': {'members': [{'name': 'protocolIEs',
+                                 'MMEConfigurationUpdateFailure': {'members': [{'actual-parameters': ['MMEConfigurationUpdateFailureIEs'],
+                                                                                'name': 'protocolIEs',
                                                                                 'type': 'ProtocolIE-Container'},
                                                                                None],
                                                                    'type': 'SEQUENCE'},
-                                 'MMEDirectInformationTransfer': {'members': [{'name': 'protocolIEs',
+                                 'MMEDirectInformationTransfer': {'members': [{'actual-parameters': ['MMEDirectInformationTransferIEs'],
+                                                                               'name': 'protocolIEs',
                                                                                'type': 'ProtocolIE-Container'},
                                                                               None],
                                                                   'type': 'SEQUENCE'},
-                                 'MMEStatusTransfer': {'members': [{'name': 'protocolIEs',
+                                 'MMEStatusTransfer': {'members': [{'actual-parameters': ['MMEStatusTransferIEs'],
+                                                                    'name': 'protocolIEs',
                                                                     'type': 'ProtocolIE-Container'},
                                                                    None],
                                                        'type': 'SEQUENCE'},
-                                 'NASDeliveryIndication': {'members': [{'name': 'protocolIEs',
+                                 'NASDeliveryIndication': {'members': [{'actual-parameters': ['NASDeliveryIndicationIEs'],
+                                                                        'name': 'protocolIEs',
                                                                         'type': 'ProtocolIE-Container'},
                                                                        None],
                                                            'type': 'SEQUENCE'},
-                                 'NASNonDeliveryIndication': {'members': [{'name': 'protocolIEs',
+                                 'NASNonDeliveryIndication': {'members': [{'actual-parameters': ['NASNonDeliveryIndication-IEs'],
+                                                                           'name': 'protocolIEs',
                                                                            'type': 'ProtocolIE-Container'},
                                                                           None],
                                                               'type': 'SEQUENCE'},
-                                 'OverloadStart': {'members': [{'name': 'protocolIEs',
+                                 'OverloadStart': {'members': [{'actual-parameters': ['OverloadStartIEs'],
+                                                                'name': 'protocolIEs',
                                                                 'type': 'ProtocolIE-Container'},
                                                                None],
                                                    'type': 'SEQUENCE'},
-                                 'OverloadStop': {'members': [{'name': 'protocolIEs',
+                                 'OverloadStop': {'members': [{'actual-parameters': ['OverloadStopIEs'],
+                                                               'name': 'protocolIEs',
                                                                'type': 'ProtocolIE-Container'},
                                                               None],
                                                   'type': 'SEQUENCE'},
-                                 'PWSFailureIndication': {'members': [{'name': 'protocolIEs',
+                                 'PWSFailureIndication': {'members': [{'actual-parameters': ['PWSFailureIndicationIEs'],
+                                                                       'name': 'protocolIEs',
                                                                        'type': 'ProtocolIE-Container'},
                                                                       None],
                                                           'type': 'SEQUENCE'},
-                                 'PWSRestartIndication': {'members': [{'name': 'protocolIEs',
+                                 'PWSRestartIndication': {'members': [{'actual-parameters': ['PWSRestartIndicationIEs'],
+                                                                       'name': 'protocolIEs',
                                                                        'type': 'ProtocolIE-Container'},
                                                                       None],
                                                           'type': 'SEQUENCE'},
-                                 'Paging': {'members': [{'name': 'protocolIEs',
+                                 'Paging': {'members': [{'actual-parameters': ['PagingIEs'],
+                                                         'name': 'protocolIEs',
                                                          'type': 'ProtocolIE-Container'},
                                                         None],
                                             'type': 'SEQUENCE'},
-                                 'PathSwitchRequest': {'members': [{'name': 'protocolIEs',
+                                 'PathSwitchRequest': {'members': [{'actual-parameters': ['PathSwitchRequestIEs'],
+                                                                    'name': 'protocolIEs',
                                                                     'type': 'ProtocolIE-Container'},
                                                                    None],
                                                        'type': 'SEQUENCE'},
-                                 'PathSwitchRequestAcknowledge': {'members': [{'name': 'protocolIEs',
+                                 'PathSwitchRequestAcknowledge': {'members': [{'actual-parameters': ['PathSwitchRequestAcknowledgeIEs'],
+                                                                               'name': 'protocolIEs',
                                                                                'type': 'ProtocolIE-Container'},
                                                                               None],
                                                                   'type': 'SEQUENCE'},
-                                 'PathSwitchRequestFailure': {'members': [{'name': 'protocolIEs',
+                                 'PathSwitchRequestFailure': {'members': [{'actual-parameters': ['PathSwitchRequestFailureIEs'],
+                                                                           'name': 'protocolIEs',
                                                                            'type': 'ProtocolIE-Container'},
                                                                           None],
                                                               'type': 'SEQUENCE'},
-                                 'PrivateMessage': {'members': [{'name': 'privateIEs',
+                                 'PrivateMessage': {'members': [{'actual-parameters': ['PrivateMessageIEs'],
+                                                                 'name': 'privateIEs',
                                                                  'type': 'PrivateIE-Container'},
                                                                 None],
                                                     'type': 'SEQUENCE'},
-                                 'ProtocolError-IE-ContainerList': {'type': 'ProtocolIE-ContainerList'},
-                                 'RerouteNASRequest': {'members': [{'name': 'protocolIEs',
+                                 'ProtocolError-IE-ContainerList': {'actual-parameters': [1,
+                                                                                          'maxnoofE-RABs',
+                                                                                          'IEsSetParam'],
+                                                                    'parameters': ['IEsSetParam'],
+                                                                    'type': 'ProtocolIE-ContainerList'},
+                                 'RerouteNASRequest': {'members': [{'actual-parameters': ['RerouteNASRequest-IEs'],
+                                                                    'name': 'protocolIEs',
                                                                     'type': 'ProtocolIE-Container'},
                                                                    None],
                                                        'type': 'SEQUENCE'},
-                                 'Reset': {'members': [{'name': 'protocolIEs',
+                                 'Reset': {'members': [{'actual-parameters': ['ResetIEs'],
+                                                        'name': 'protocolIEs',
                                                         'type': 'ProtocolIE-Container'},
                                                        None],
                                            'type': 'SEQUENCE'},
-                                 'ResetAcknowledge': {'members': [{'name': 'protocolIEs',
+                                 'ResetAcknowledge': {'members': [{'actual-parameters': ['ResetAcknowledgeIEs'],
+                                                                   'name': 'protocolIEs',
                                                                    'type': 'ProtocolIE-Container'},
                                                                   None],
                                                       'type': 'SEQUENCE'},
@@ -4429,139 +9169,172 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                             'type': 'UE-associatedLogicalS1-ConnectionListRes'},
                                                            None],
                                                'type': 'CHOICE'},
-                                 'RetrieveUEInformation': {'members': [{'name': 'protocolIEs',
+                                 'RetrieveUEInformation': {'members': [{'actual-parameters': ['RetrieveUEInformationIEs'],
+                                                                        'name': 'protocolIEs',
                                                                         'type': 'ProtocolIE-Container'},
                                                                        None],
                                                            'type': 'SEQUENCE'},
-                                 'S1SetupFailure': {'members': [{'name': 'protocolIEs',
+                                 'S1SetupFailure': {'members': [{'actual-parameters': ['S1SetupFailureIEs'],
+                                                                 'name': 'protocolIEs',
                                                                  'type': 'ProtocolIE-Container'},
                                                                 None],
                                                     'type': 'SEQUENCE'},
-                                 'S1SetupRequest': {'members': [{'name': 'protocolIEs',
+                                 'S1SetupRequest': {'members': [{'actual-parameters': ['S1SetupRequestIEs'],
+                                                                 'name': 'protocolIEs',
                                                                  'type': 'ProtocolIE-Container'},
                                                                 None],
                                                     'type': 'SEQUENCE'},
-                                 'S1SetupResponse': {'members': [{'name': 'protocolIEs',
+                                 'S1SetupResponse': {'members': [{'actual-parameters': ['S1SetupResponseIEs'],
+                                                                  'name': 'protocolIEs',
                                                                   'type': 'ProtocolIE-Container'},
                                                                  None],
                                                      'type': 'SEQUENCE'},
                                  'TAIItem': {'members': [{'name': 'tAI',
                                                           'type': 'TAI'},
-                                                         {'name': 'iE-Extensions',
+                                                         {'actual-parameters': ['TAIItemExtIEs'],
+                                                          'name': 'iE-Extensions',
                                                           'optional': True,
                                                           'type': 'ProtocolExtensionContainer'},
                                                          None],
                                              'type': 'SEQUENCE'},
-                                 'TAIList': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'TAIList': {'element': {'actual-parameters': ['TAIItemIEs'],
+                                                         'type': 'ProtocolIE-SingleContainer'},
                                              'size': [(1, 'maxnoofTAIs')],
                                              'type': 'SEQUENCE OF'},
-                                 'TraceFailureIndication': {'members': [{'name': 'protocolIEs',
+                                 'TraceFailureIndication': {'members': [{'actual-parameters': ['TraceFailureIndicationIEs'],
+                                                                         'name': 'protocolIEs',
                                                                          'type': 'ProtocolIE-Container'},
                                                                         None],
                                                             'type': 'SEQUENCE'},
-                                 'TraceStart': {'members': [{'name': 'protocolIEs',
+                                 'TraceStart': {'members': [{'actual-parameters': ['TraceStartIEs'],
+                                                             'name': 'protocolIEs',
                                                              'type': 'ProtocolIE-Container'},
                                                             None],
                                                 'type': 'SEQUENCE'},
-                                 'UE-associatedLogicalS1-ConnectionListRes': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'UE-associatedLogicalS1-ConnectionListRes': {'element': {'actual-parameters': ['UE-associatedLogicalS1-ConnectionItemRes'],
+                                                                                          'type': 'ProtocolIE-SingleContainer'},
                                                                               'size': [(1,
                                                                                         'maxnoofIndividualS1ConnectionsToReset')],
                                                                               'type': 'SEQUENCE '
                                                                                       'OF'},
-                                 'UE-associatedLogicalS1-ConnectionListResAck': {'element': {'type': 'ProtocolIE-SingleContainer'},
+                                 'UE-associatedLogicalS1-ConnectionListResAck': {'element': {'actual-parameters': ['UE-associatedLogicalS1-ConnectionItemResAck'],
+                                                                                             'type': 'ProtocolIE-SingleContainer'},
                                                                                  'size': [(1,
                                                                                            'maxnoofIndividualS1ConnectionsToReset')],
                                                                                  'type': 'SEQUENCE '
                                                                                          'OF'},
-                                 'UECapabilityInfoIndication': {'members': [{'name': 'protocolIEs',
+                                 'UECapabilityInfoIndication': {'members': [{'actual-parameters': ['UECapabilityInfoIndicationIEs'],
+                                                                             'name': 'protocolIEs',
                                                                              'type': 'ProtocolIE-Container'},
                                                                             None],
                                                                 'type': 'SEQUENCE'},
-                                 'UEContextModificationConfirm': {'members': [{'name': 'protocolIEs',
+                                 'UEContextModificationConfirm': {'members': [{'actual-parameters': ['UEContextModificationConfirmIEs'],
+                                                                               'name': 'protocolIEs',
                                                                                'type': 'ProtocolIE-Container'},
                                                                               None],
                                                                   'type': 'SEQUENCE'},
-                                 'UEContextModificationFailure': {'members': [{'name': 'protocolIEs',
+                                 'UEContextModificationFailure': {'members': [{'actual-parameters': ['UEContextModificationFailureIEs'],
+                                                                               'name': 'protocolIEs',
                                                                                'type': 'ProtocolIE-Container'},
                                                                               None],
                                                                   'type': 'SEQUENCE'},
-                                 'UEContextModificationIndication': {'members': [{'name': 'protocolIEs',
+                                 'UEContextModificationIndication': {'members': [{'actual-parameters': ['UEContextModificationIndicationIEs'],
+                                                                                  'name': 'protocolIEs',
                                                                                   'type': 'ProtocolIE-Container'},
                                                                                  None],
                                                                      'type': 'SEQUENCE'},
-                                 'UEContextModificationRequest': {'members': [{'name': 'protocolIEs',
+                                 'UEContextModificationRequest': {'members': [{'actual-parameters': ['UEContextModificationRequestIEs'],
+                                                                               'name': 'protocolIEs',
                                                                                'type': 'ProtocolIE-Container'},
                                                                               None],
                                                                   'type': 'SEQUENCE'},
-                                 'UEContextModificationResponse': {'members': [{'name': 'protocolIEs',
+                                 'UEContextModificationResponse': {'members': [{'actual-parameters': ['UEContextModificationResponseIEs'],
+                                                                                'name': 'protocolIEs',
                                                                                 'type': 'ProtocolIE-Container'},
                                                                                None],
                                                                    'type': 'SEQUENCE'},
-                                 'UEContextReleaseCommand': {'members': [{'name': 'protocolIEs',
+                                 'UEContextReleaseCommand': {'members': [{'actual-parameters': ['UEContextReleaseCommand-IEs'],
+                                                                          'name': 'protocolIEs',
                                                                           'type': 'ProtocolIE-Container'},
                                                                          None],
                                                              'type': 'SEQUENCE'},
-                                 'UEContextReleaseComplete': {'members': [{'name': 'protocolIEs',
+                                 'UEContextReleaseComplete': {'members': [{'actual-parameters': ['UEContextReleaseComplete-IEs'],
+                                                                           'name': 'protocolIEs',
                                                                            'type': 'ProtocolIE-Container'},
                                                                           None],
                                                               'type': 'SEQUENCE'},
-                                 'UEContextReleaseRequest': {'members': [{'name': 'protocolIEs',
+                                 'UEContextReleaseRequest': {'members': [{'actual-parameters': ['UEContextReleaseRequest-IEs'],
+                                                                          'name': 'protocolIEs',
                                                                           'type': 'ProtocolIE-Container'},
                                                                          None],
                                                              'type': 'SEQUENCE'},
-                                 'UEContextResumeFailure': {'members': [{'name': 'protocolIEs',
+                                 'UEContextResumeFailure': {'members': [{'actual-parameters': ['UEContextResumeFailureIEs'],
+                                                                         'name': 'protocolIEs',
                                                                          'type': 'ProtocolIE-Container'},
                                                                         None],
                                                             'type': 'SEQUENCE'},
-                                 'UEContextResumeRequest': {'members': [{'name': 'protocolIEs',
+                                 'UEContextResumeRequest': {'members': [{'actual-parameters': ['UEContextResumeRequestIEs'],
+                                                                         'name': 'protocolIEs',
                                                                          'type': 'ProtocolIE-Container'},
                                                                         None],
                                                             'type': 'SEQUENCE'},
-                                 'UEContextResumeResponse': {'members': [{'name': 'protocolIEs',
+                                 'UEContextResumeResponse': {'members': [{'actual-parameters': ['UEContextResumeResponseIEs'],
+                                                                          'name': 'protocolIEs',
                                                                           'type': 'ProtocolIE-Container'},
                                                                          None],
                                                              'type': 'SEQUENCE'},
-                                 'UEContextSuspendRequest': {'members': [{'name': 'protocolIEs',
+                                 'UEContextSuspendRequest': {'members': [{'actual-parameters': ['UEContextSuspendRequestIEs'],
+                                                                          'name': 'protocolIEs',
                                                                           'type': 'ProtocolIE-Container'},
                                                                          None],
                                                              'type': 'SEQUENCE'},
-                                 'UEContextSuspendResponse': {'members': [{'name': 'protocolIEs',
+                                 'UEContextSuspendResponse': {'members': [{'actual-parameters': ['UEContextSuspendResponseIEs'],
+                                                                           'name': 'protocolIEs',
                                                                            'type': 'ProtocolIE-Container'},
                                                                           None],
                                                               'type': 'SEQUENCE'},
-                                 'UEInformationTransfer': {'members': [{'name': 'protocolIEs',
+                                 'UEInformationTransfer': {'members': [{'actual-parameters': ['UEInformationTransferIEs'],
+                                                                        'name': 'protocolIEs',
                                                                         'type': 'ProtocolIE-Container'},
                                                                        None],
                                                            'type': 'SEQUENCE'},
-                                 'UERadioCapabilityMatchRequest': {'members': [{'name': 'protocolIEs',
+                                 'UERadioCapabilityMatchRequest': {'members': [{'actual-parameters': ['UERadioCapabilityMatchRequestIEs'],
+                                                                                'name': 'protocolIEs',
                                                                                 'type': 'ProtocolIE-Container'},
                                                                                None],
                                                                    'type': 'SEQUENCE'},
-                                 'UERadioCapabilityMatchResponse': {'members': [{'name': 'protocolIEs',
+                                 'UERadioCapabilityMatchResponse': {'members': [{'actual-parameters': ['UERadioCapabilityMatchResponseIEs'],
+                                                                                 'name': 'protocolIEs',
                                                                                  'type': 'ProtocolIE-Container'},
                                                                                 None],
                                                                     'type': 'SEQUENCE'},
-                                 'UplinkNASTransport': {'members': [{'name': 'protocolIEs',
+                                 'UplinkNASTransport': {'members': [{'actual-parameters': ['UplinkNASTransport-IEs'],
+                                                                     'name': 'protocolIEs',
                                                                      'type': 'ProtocolIE-Container'},
                                                                     None],
                                                         'type': 'SEQUENCE'},
-                                 'UplinkNonUEAssociatedLPPaTransport': {'members': [{'name': 'protocolIEs',
+                                 'UplinkNonUEAssociatedLPPaTransport': {'members': [{'actual-parameters': ['UplinkNonUEAssociatedLPPaTransport-IEs'],
+                                                                                     'name': 'protocolIEs',
                                                                                      'type': 'ProtocolIE-Container'},
                                                                                     None],
                                                                         'type': 'SEQUENCE'},
-                                 'UplinkS1cdma2000tunnelling': {'members': [{'name': 'protocolIEs',
+                                 'UplinkS1cdma2000tunnelling': {'members': [{'actual-parameters': ['UplinkS1cdma2000tunnellingIEs'],
+                                                                             'name': 'protocolIEs',
                                                                              'type': 'ProtocolIE-Container'},
                                                                             None],
                                                                 'type': 'SEQUENCE'},
-                                 'UplinkUEAssociatedLPPaTransport': {'members': [{'name': 'protocolIEs',
+                                 'UplinkUEAssociatedLPPaTransport': {'members': [{'actual-parameters': ['UplinkUEAssociatedLPPaTransport-IEs'],
+                                                                                  'name': 'protocolIEs',
                                                                                   'type': 'ProtocolIE-Container'},
                                                                                  None],
                                                                      'type': 'SEQUENCE'},
-                                 'WriteReplaceWarningRequest': {'members': [{'name': 'protocolIEs',
+                                 'WriteReplaceWarningRequest': {'members': [{'actual-parameters': ['WriteReplaceWarningRequestIEs'],
+                                                                             'name': 'protocolIEs',
                                                                              'type': 'ProtocolIE-Container'},
                                                                             None],
                                                                 'type': 'SEQUENCE'},
-                                 'WriteReplaceWarningResponse': {'members': [{'name': 'protocolIEs',
+                                 'WriteReplaceWarningResponse': {'members': [{'actual-parameters': ['WriteReplaceWarningResponseIEs'],
+                                                                              'name': 'protocolIEs',
                                                                               'type': 'ProtocolIE-Container'},
                                                                              None],
                                                                  'type': 'SEQUENCE'}},
@@ -4732,7 +9505,21 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                                         {'name': '&procedureCode',
                                                                                          'type': 'ProcedureCode'},
                                                                                         {'name': '&criticality',
-                                                                                         'type': 'Criticality'}]}},
+                                                                                         'type': 'Criticality'}],
+                                                                            'with-syntax': ['INITIATING',
+                                                                                            'MESSAGE',
+                                                                                            '&InitiatingMessage',
+                                                                                            ['SUCCESSFUL',
+                                                                                             'OUTCOME',
+                                                                                             '&SuccessfulOutcome'],
+                                                                                            ['UNSUCCESSFUL',
+                                                                                             'OUTCOME',
+                                                                                             '&UnsuccessfulOutcome'],
+                                                                                            'PROCEDURE',
+                                                                                            'CODE',
+                                                                                            '&procedureCode',
+                                                                                            ['CRITICALITY',
+                                                                                             '&criticality']]}},
                            'object-sets': {'S1AP-ELEMENTARY-PROCEDURES': {'class': 'S1AP-ELEMENTARY-PROCEDURE',
                                                                           'members': ['S1AP-ELEMENTARY-PROCEDURES-CLASS-1',
                                                                                       'S1AP-ELEMENTARY-PROCEDURES-CLASS-2',
@@ -4854,126 +9641,650 @@ EXPECTED = {'S1AP-CommonDataTypes': {'extensibility-implied': False,
                                                                           'type': 'S1AP-ELEMENTARY-PROCEDURE.&UnsuccessfulOutcome'}],
                                                              'type': 'SEQUENCE'}},
                            'values': {'cellTrafficTrace': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                           'value': None},
+                                                           'value': ['INITIATING',
+                                                                     'MESSAGE',
+                                                                     'CellTrafficTrace',
+                                                                     'PROCEDURE',
+                                                                     'CODE',
+                                                                     'id-CellTrafficTrace',
+                                                                     'CRITICALITY',
+                                                                     'ignore']},
                                       'connectionEstablishmentIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                            'value': None},
+                                                                            'value': ['INITIATING',
+                                                                                      'MESSAGE',
+                                                                                      'ConnectionEstablishmentIndication',
+                                                                                      'PROCEDURE',
+                                                                                      'CODE',
+                                                                                      'id-ConnectionEstablishmentIndication',
+                                                                                      'CRITICALITY',
+                                                                                      'reject']},
                                       'deactivateTrace': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                          'value': None},
+                                                          'value': ['INITIATING',
+                                                                    'MESSAGE',
+                                                                    'DeactivateTrace',
+                                                                    'PROCEDURE',
+                                                                    'CODE',
+                                                                    'id-DeactivateTrace',
+                                                                    'CRITICALITY',
+                                                                    'ignore']},
                                       'downlinkNASTransport': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                               'value': None},
+                                                               'value': ['INITIATING',
+                                                                         'MESSAGE',
+                                                                         'DownlinkNASTransport',
+                                                                         'PROCEDURE',
+                                                                         'CODE',
+                                                                         'id-downlinkNASTransport',
+                                                                         'CRITICALITY',
+                                                                         'ignore']},
                                       'downlinkNonUEAssociatedLPPaTransport': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                               'value': None},
+                                                                               'value': ['INITIATING',
+                                                                                         'MESSAGE',
+                                                                                         'DownlinkNonUEAssociatedLPPaTransport',
+                                                                                         'PROCEDURE',
+                                                                                         'CODE',
+                                                                                         'id-downlinkNonUEAssociatedLPPaTransport',
+                                                                                         'CRITICALITY',
+                                                                                         'ignore']},
                                       'downlinkS1cdma2000tunnelling': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                       'value': None},
+                                                                       'value': ['INITIATING',
+                                                                                 'MESSAGE',
+                                                                                 'DownlinkS1cdma2000tunnelling',
+                                                                                 'PROCEDURE',
+                                                                                 'CODE',
+                                                                                 'id-DownlinkS1cdma2000tunnelling',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore']},
                                       'downlinkUEAssociatedLPPaTransport': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                            'value': None},
+                                                                            'value': ['INITIATING',
+                                                                                      'MESSAGE',
+                                                                                      'DownlinkUEAssociatedLPPaTransport',
+                                                                                      'PROCEDURE',
+                                                                                      'CODE',
+                                                                                      'id-downlinkUEAssociatedLPPaTransport',
+                                                                                      'CRITICALITY',
+                                                                                      'ignore']},
                                       'e-RABModificationIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                      'value': None},
+                                                                      'value': ['INITIATING',
+                                                                                'MESSAGE',
+                                                                                'E-RABModificationIndication',
+                                                                                'SUCCESSFUL',
+                                                                                'OUTCOME',
+                                                                                'E-RABModificationConfirm',
+                                                                                'PROCEDURE',
+                                                                                'CODE',
+                                                                                'id-E-RABModificationIndication',
+                                                                                'CRITICALITY',
+                                                                                'reject']},
                                       'e-RABModify': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                      'value': None},
+                                                      'value': ['INITIATING',
+                                                                'MESSAGE',
+                                                                'E-RABModifyRequest',
+                                                                'SUCCESSFUL',
+                                                                'OUTCOME',
+                                                                'E-RABModifyResponse',
+                                                                'PROCEDURE',
+                                                                'CODE',
+                                                                'id-E-RABModify',
+                                                                'CRITICALITY',
+                                                                'reject']},
                                       'e-RABRelease': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                       'value': None},
+                                                       'value': ['INITIATING',
+                                                                 'MESSAGE',
+                                                                 'E-RABReleaseCommand',
+                                                                 'SUCCESSFUL',
+                                                                 'OUTCOME',
+                                                                 'E-RABReleaseResponse',
+                                                                 'PROCEDURE',
+                                                                 'CODE',
+                                                                 'id-E-RABRelease',
+                                                                 'CRITICALITY',
+                                                                 'reject']},
                                       'e-RABReleaseIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                 'value': None},
+                                                                 'value': ['INITIATING',
+                                                                           'MESSAGE',
+                                                                           'E-RABReleaseIndication',
+                                                                           'PROCEDURE',
+                                                                           'CODE',
+                                                                           'id-E-RABReleaseIndication',
+                                                                           'CRITICALITY',
+                                                                           'ignore']},
                                       'e-RABSetup': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                     'value': None},
+                                                     'value': ['INITIATING',
+                                                               'MESSAGE',
+                                                               'E-RABSetupRequest',
+                                                               'SUCCESSFUL',
+                                                               'OUTCOME',
+                                                               'E-RABSetupResponse',
+                                                               'PROCEDURE',
+                                                               'CODE',
+                                                               'id-E-RABSetup',
+                                                               'CRITICALITY',
+                                                               'reject']},
                                       'eNBCPRelocationIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                    'value': None},
+                                                                    'value': ['INITIATING',
+                                                                              'MESSAGE',
+                                                                              'ENBCPRelocationIndication',
+                                                                              'PROCEDURE',
+                                                                              'CODE',
+                                                                              'id-eNBCPRelocationIndication',
+                                                                              'CRITICALITY',
+                                                                              'reject']},
                                       'eNBConfigurationTransfer': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                   'value': None},
+                                                                   'value': ['INITIATING',
+                                                                             'MESSAGE',
+                                                                             'ENBConfigurationTransfer',
+                                                                             'PROCEDURE',
+                                                                             'CODE',
+                                                                             'id-eNBConfigurationTransfer',
+                                                                             'CRITICALITY',
+                                                                             'ignore']},
                                       'eNBConfigurationUpdate': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                 'value': None},
+                                                                 'value': ['INITIATING',
+                                                                           'MESSAGE',
+                                                                           'ENBConfigurationUpdate',
+                                                                           'SUCCESSFUL',
+                                                                           'OUTCOME',
+                                                                           'ENBConfigurationUpdateAcknowledge',
+                                                                           'UNSUCCESSFUL',
+                                                                           'OUTCOME',
+                                                                           'ENBConfigurationUpdateFailure',
+                                                                           'PROCEDURE',
+                                                                           'CODE',
+                                                                           'id-ENBConfigurationUpdate',
+                                                                           'CRITICALITY',
+                                                                           'reject']},
                                       'eNBDirectInformationTransfer': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                       'value': None},
+                                                                       'value': ['INITIATING',
+                                                                                 'MESSAGE',
+                                                                                 'ENBDirectInformationTransfer',
+                                                                                 'PROCEDURE',
+                                                                                 'CODE',
+                                                                                 'id-eNBDirectInformationTransfer',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore']},
                                       'eNBStatusTransfer': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                            'value': None},
+                                                            'value': ['INITIATING',
+                                                                      'MESSAGE',
+                                                                      'ENBStatusTransfer',
+                                                                      'PROCEDURE',
+                                                                      'CODE',
+                                                                      'id-eNBStatusTransfer',
+                                                                      'CRITICALITY',
+                                                                      'ignore']},
                                       'errorIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                          'value': None},
+                                                          'value': ['INITIATING',
+                                                                    'MESSAGE',
+                                                                    'ErrorIndication',
+                                                                    'PROCEDURE',
+                                                                    'CODE',
+                                                                    'id-ErrorIndication',
+                                                                    'CRITICALITY',
+                                                                    'ignore']},
                                       'handoverCancel': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                         'value': None},
+                                                         'value': ['INITIATING',
+                                                                   'MESSAGE',
+                                                                   'HandoverCancel',
+                                                                   'SUCCESSFUL',
+                                                                   'OUTCOME',
+                                                                   'HandoverCancelAcknowledge',
+                                                                   'PROCEDURE',
+                                                                   'CODE',
+                                                                   'id-HandoverCancel',
+                                                                   'CRITICALITY',
+                                                                   'reject']},
                                       'handoverNotification': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                               'value': None},
+                                                               'value': ['INITIATING',
+                                                                         'MESSAGE',
+                                                                         'HandoverNotify',
+                                                                         'PROCEDURE',
+                                                                         'CODE',
+                                                                         'id-HandoverNotification',
+                                                                         'CRITICALITY',
+                                                                         'ignore']},
                                       'handoverPreparation': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                              'value': None},
+                                                              'value': ['INITIATING',
+                                                                        'MESSAGE',
+                                                                        'HandoverRequired',
+                                                                        'SUCCESSFUL',
+                                                                        'OUTCOME',
+                                                                        'HandoverCommand',
+                                                                        'UNSUCCESSFUL',
+                                                                        'OUTCOME',
+                                                                        'HandoverPreparationFailure',
+                                                                        'PROCEDURE',
+                                                                        'CODE',
+                                                                        'id-HandoverPreparation',
+                                                                        'CRITICALITY',
+                                                                        'reject']},
                                       'handoverResourceAllocation': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                     'value': None},
+                                                                     'value': ['INITIATING',
+                                                                               'MESSAGE',
+                                                                               'HandoverRequest',
+                                                                               'SUCCESSFUL',
+                                                                               'OUTCOME',
+                                                                               'HandoverRequestAcknowledge',
+                                                                               'UNSUCCESSFUL',
+                                                                               'OUTCOME',
+                                                                               'HandoverFailure',
+                                                                               'PROCEDURE',
+                                                                               'CODE',
+                                                                               'id-HandoverResourceAllocation',
+                                                                               'CRITICALITY',
+                                                                               'reject']},
                                       'initialContextSetup': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                              'value': None},
+                                                              'value': ['INITIATING',
+                                                                        'MESSAGE',
+                                                                        'InitialContextSetupRequest',
+                                                                        'SUCCESSFUL',
+                                                                        'OUTCOME',
+                                                                        'InitialContextSetupResponse',
+                                                                        'UNSUCCESSFUL',
+                                                                        'OUTCOME',
+                                                                        'InitialContextSetupFailure',
+                                                                        'PROCEDURE',
+                                                                        'CODE',
+                                                                        'id-InitialContextSetup',
+                                                                        'CRITICALITY',
+                                                                        'reject']},
                                       'initialUEMessage': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                           'value': None},
+                                                           'value': ['INITIATING',
+                                                                     'MESSAGE',
+                                                                     'InitialUEMessage',
+                                                                     'PROCEDURE',
+                                                                     'CODE',
+                                                                     'id-initialUEMessage',
+                                                                     'CRITICALITY',
+                                                                     'ignore']},
                                       'kill': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                               'value': None},
+                                               'value': ['INITIATING',
+                                                         'MESSAGE',
+                                                         'KillRequest',
+                                                         'SUCCESSFUL',
+                                                         'OUTCOME',
+                                                         'KillResponse',
+                                                         'PROCEDURE',
+                                                         'CODE',
+                                                         'id-Kill',
+                                                         'CRITICALITY',
+                                                         'reject']},
                                       'locationReport': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                         'value': None},
+                                                         'value': ['INITIATING',
+                                                                   'MESSAGE',
+                                                                   'LocationReport',
+                                                                   'PROCEDURE',
+                                                                   'CODE',
+                                                                   'id-LocationReport',
+                                                                   'CRITICALITY',
+                                                                   'ignore']},
                                       'locationReportingControl': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                   'value': None},
+                                                                   'value': ['INITIATING',
+                                                                             'MESSAGE',
+                                                                             'LocationReportingControl',
+                                                                             'PROCEDURE',
+                                                                             'CODE',
+                                                                             'id-LocationReportingControl',
+                                                                             'CRITICALITY',
+                                                                             'ignore']},
                                       'locationReportingFailureIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                             'value': None},
+                                                                             'value': ['INITIATING',
+                                                                                       'MESSAGE',
+                                                                                       'LocationReportingFailureIndication',
+                                                                                       'PROCEDURE',
+                                                                                       'CODE',
+                                                                                       'id-LocationReportingFailureIndication',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore']},
                                       'mMECPRelocationIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                    'value': None},
+                                                                    'value': ['INITIATING',
+                                                                              'MESSAGE',
+                                                                              'MMECPRelocationIndication',
+                                                                              'PROCEDURE',
+                                                                              'CODE',
+                                                                              'id-MMECPRelocationIndication',
+                                                                              'CRITICALITY',
+                                                                              'reject']},
                                       'mMEConfigurationTransfer': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                   'value': None},
+                                                                   'value': ['INITIATING',
+                                                                             'MESSAGE',
+                                                                             'MMEConfigurationTransfer',
+                                                                             'PROCEDURE',
+                                                                             'CODE',
+                                                                             'id-MMEConfigurationTransfer',
+                                                                             'CRITICALITY',
+                                                                             'ignore']},
                                       'mMEConfigurationUpdate': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                 'value': None},
+                                                                 'value': ['INITIATING',
+                                                                           'MESSAGE',
+                                                                           'MMEConfigurationUpdate',
+                                                                           'SUCCESSFUL',
+                                                                           'OUTCOME',
+                                                                           'MMEConfigurationUpdateAcknowledge',
+                                                                           'UNSUCCESSFUL',
+                                                                           'OUTCOME',
+                                                                           'MMEConfigurationUpdateFailure',
+                                                                           'PROCEDURE',
+                                                                           'CODE',
+                                                                           'id-MMEConfigurationUpdate',
+                                                                           'CRITICALITY',
+                                                                           'reject']},
                                       'mMEDirectInformationTransfer': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                       'value': None},
+                                                                       'value': ['INITIATING',
+                                                                                 'MESSAGE',
+                                                                                 'MMEDirectInformationTransfer',
+                                                                                 'PROCEDURE',
+                                                                                 'CODE',
+                                                                                 'id-MMEDirectInformationTransfer',
+                                                                                 'CRITICALITY',
+                                                                                 'ignore']},
                                       'mMEStatusTransfer': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                            'value': None},
+                                                            'value': ['INITIATING',
+                                                                      'MESSAGE',
+                                                                      'MMEStatusTransfer',
+                                                                      'PROCEDURE',
+                                                                      'CODE',
+                                                                      'id-MMEStatusTransfer',
+                                                                      'CRITICALITY',
+                                                                      'ignore']},
                                       'nASDeliveryIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                'value': None},
+                                                                'value': ['INITIATING',
+                                                                          'MESSAGE',
+                                                                          'NASDeliveryIndication',
+                                                                          'PROCEDURE',
+                                                                          'CODE',
+                                                                          'id-NASDeliveryIndication',
+                                                                          'CRITICALITY',
+                                                                          'ignore']},
                                       'nASNonDeliveryIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                   'value': None},
+                                                                   'value': ['INITIATING',
+                                                                             'MESSAGE',
+                                                                             'NASNonDeliveryIndication',
+                                                                             'PROCEDURE',
+                                                                             'CODE',
+                                                                             'id-NASNonDeliveryIndication',
+                                                                             'CRITICALITY',
+                                                                             'ignore']},
                                       'overloadStart': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                        'value': None},
+                                                        'value': ['INITIATING',
+                                                                  'MESSAGE',
+                                                                  'OverloadStart',
+                                                                  'PROCEDURE',
+                                                                  'CODE',
+                                                                  'id-OverloadStart',
+                                                                  'CRITICALITY',
+                                                                  'ignore']},
                                       'overloadStop': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                       'value': None},
+                                                       'value': ['INITIATING',
+                                                                 'MESSAGE',
+                                                                 'OverloadStop',
+                                                                 'PROCEDURE',
+                                                                 'CODE',
+                                                                 'id-OverloadStop',
+                                                                 'CRITICALITY',
+                                                                 'reject']},
                                       'pWSFailureIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                               'value': None},
+                                                               'value': ['INITIATING',
+                                                                         'MESSAGE',
+                                                                         'PWSFailureIndication',
+                                                                         'PROCEDURE',
+                                                                         'CODE',
+                                                                         'id-PWSFailureIndication',
+                                                                         'CRITICALITY',
+                                                                         'ignore']},
                                       'pWSRestartIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                               'value': None},
+                                                               'value': ['INITIATING',
+                                                                         'MESSAGE',
+                                                                         'PWSRestartIndication',
+                                                                         'PROCEDURE',
+                                                                         'CODE',
+                                                                         'id-PWSRestartIndication',
+                                                                         'CRITICALITY',
+                                                                         'ignore']},
                                       'paging': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                 'value': None},
+                                                 'value': ['INITIATING',
+                                                           'MESSAGE',
+                                                           'Paging',
+                                                           'PROCEDURE',
+                                                           'CODE',
+                                                           'id-Paging',
+                                                           'CRITICALITY',
+                                                           'ignore']},
                                       'pathSwitchRequest': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                            'value': None},
+                                                            'value': ['INITIATING',
+                                                                      'MESSAGE',
+                                                                      'PathSwitchRequest',
+                                                                      'SUCCESSFUL',
+                                                                      'OUTCOME',
+                                                                      'PathSwitchRequestAcknowledge',
+                                                                      'UNSUCCESSFUL',
+                                                                      'OUTCOME',
+                                                                      'PathSwitchRequestFailure',
+                                                                      'PROCEDURE',
+                                                                      'CODE',
+                                                                      'id-PathSwitchRequest',
+                                                                      'CRITICALITY',
+                                                                      'reject']},
                                       'privateMessage': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                         'value': None},
+                                                         'value': ['INITIATING',
+                                                                   'MESSAGE',
+                                                                   'PrivateMessage',
+                                                                   'PROCEDURE',
+                                                                   'CODE',
+                                                                   'id-PrivateMessage',
+                                                                   'CRITICALITY',
+                                                                   'ignore']},
                                       'rerouteNASRequest': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                            'value': None},
+                                                            'value': ['INITIATING',
+                                                                      'MESSAGE',
+                                                                      'RerouteNASRequest',
+                                                                      'PROCEDURE',
+                                                                      'CODE',
+                                                                      'id-RerouteNASRequest',
+                                                                      'CRITICALITY',
+                                                                      'reject']},
                                       'reset': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                'value': None},
+                                                'value': ['INITIATING',
+                                                          'MESSAGE',
+                                                          'Reset',
+                                                          'SUCCESSFUL',
+                                                          'OUTCOME',
+                                                          'ResetAcknowledge',
+                                                          'PROCEDURE',
+                                                          'CODE',
+                                                          'id-Reset',
+                                                          'CRITICALITY',
+                                                          'reject']},
                                       'retrieveUEInformation': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                'value': None},
+                                                                'value': ['INITIATING',
+                                                                          'MESSAGE',
+                                                                          'RetrieveUEInformation',
+                                                                          'PROCEDURE',
+                                                                          'CODE',
+                                                                          'id-RetrieveUEInformation',
+                                                                          'CRITICALITY',
+                                                                          'reject']},
                                       's1Setup': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                  'value': None},
+                                                  'value': ['INITIATING',
+                                                            'MESSAGE',
+                                                            'S1SetupRequest',
+                                                            'SUCCESSFUL',
+                                                            'OUTCOME',
+                                                            'S1SetupResponse',
+                                                            'UNSUCCESSFUL',
+                                                            'OUTCOME',
+                                                            'S1SetupFailure',
+                                                            'PROCEDURE',
+                                                            'CODE',
+                                                            'id-S1Setup',
+                                                            'CRITICALITY',
+                                                            'reject']},
                                       'traceFailureIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                 'value': None},
+                                                                 'value': ['INITIATING',
+                                                                           'MESSAGE',
+                                                                           'TraceFailureIndication',
+                                                                           'PROCEDURE',
+                                                                           'CODE',
+                                                                           'id-TraceFailureIndication',
+                                                                           'CRITICALITY',
+                                                                           'ignore']},
                                       'traceStart': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                     'value': None},
+                                                     'value': ['INITIATING',
+                                                               'MESSAGE',
+                                                               'TraceStart',
+                                                               'PROCEDURE',
+                                                               'CODE',
+                                                               'id-TraceStart',
+                                                               'CRITICALITY',
+                                                               'ignore']},
                                       'uECapabilityInfoIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                     'value': None},
+                                                                     'value': ['INITIATING',
+                                                                               'MESSAGE',
+                                                                               'UECapabilityInfoIndication',
+                                                                               'PROCEDURE',
+                                                                               'CODE',
+                                                                               'id-UECapabilityInfoIndication',
+                                                                               'CRITICALITY',
+                                                                               'ignore']},
                                       'uEContextModification': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                'value': None},
+                                                                'value': ['INITIATING',
+                                                                          'MESSAGE',
+                                                                          'UEContextModificationRequest',
+                                                                          'SUCCESSFUL',
+                                                                          'OUTCOME',
+                                                                          'UEContextModificationResponse',
+                                                                          'UNSUCCESSFUL',
+                                                                          'OUTCOME',
+                                                                          'UEContextModificationFailure',
+                                                                          'PROCEDURE',
+                                                                          'CODE',
+                                                                          'id-UEContextModification',
+                                                                          'CRITICALITY',
+                                                                          'reject']},
                                       'uEContextModificationIndication': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                          'value': None},
+                                                                          'value': ['INITIATING',
+                                                                                    'MESSAGE',
+                                                                                    'UEContextModificationIndication',
+                                                                                    'SUCCESSFUL',
+                                                                                    'OUTCOME',
+                                                                                    'UEContextModificationConfirm',
+                                                                                    'PROCEDURE',
+                                                                                    'CODE',
+                                                                                    'id-UEContextModificationIndication',
+                                                                                    'CRITICALITY',
+                                                                                    'reject']},
                                       'uEContextRelease': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                           'value': None},
+                                                           'value': ['INITIATING',
+                                                                     'MESSAGE',
+                                                                     'UEContextReleaseCommand',
+                                                                     'SUCCESSFUL',
+                                                                     'OUTCOME',
+                                                                     'UEContextReleaseComplete',
+                                                                     'PROCEDURE',
+                                                                     'CODE',
+                                                                     'id-UEContextRelease',
+                                                                     'CRITICALITY',
+                                                                     'reject']},
                                       'uEContextReleaseRequest': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                  'value': None},
+                                                                  'value': ['INITIATING',
+                                                                            'MESSAGE',
+                                                                            'UEContextReleaseRequest',
+                                                                            'PROCEDURE',
+                                                                            'CODE',
+                                                                            'id-UEContextReleaseRequest',
+                                                                            'CRITICALITY',
+                                                                            'ignore']},
                                       'uEContextResume': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                          'value': None},
+                                                          'value': ['INITIATING',
+                                                                    'MESSAGE',
+                                                                    'UEContextResumeRequest',
+                                                                    'SUCCESSFUL',
+                                                                    'OUTCOME',
+                                                                    'UEContextResumeResponse',
+                                                                    'UNSUCCESSFUL',
+                                                                    'OUTCOME',
+                                                                    'UEContextResumeFailure',
+                                                                    'PROCEDURE',
+                                                                    'CODE',
+                                                                    'id-UEContextResume',
+                                                                    'CRITICALITY',
+                                                                    'reject']},
                                       'uEContextSuspend': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                           'value': None},
+                                                           'value': ['INITIATING',
+                                                                     'MESSAGE',
+                                                                     'UEContextSuspendRequest',
+                                                                     'SUCCESSFUL',
+                                                                     'OUTCOME',
+                                                                     'UEContextSuspendResponse',
+                                                                     'PROCEDURE',
+                                                                     'CODE',
+                                                                     'id-UEContextSuspend',
+                                                                     'CRITICALITY',
+                                                                     'reject']},
                                       'uEInformationTransfer': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                'value': None},
+                                                                'value': ['INITIATING',
+                                                                          'MESSAGE',
+                                                                          'UEInformationTransfer',
+                                                                          'PROCEDURE',
+                                                                          'CODE',
+                                                                          'id-UEInformationTransfer',
+                                                                          'CRITICALITY',
+                                                                          'reject']},
                                       'uERadioCapabilityMatch': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                 'value': None},
+                                                                 'value': ['INITIATING',
+                                                                           'MESSAGE',
+                                                                           'UERadioCapabilityMatchRequest',
+                                                                           'SUCCESSFUL',
+                                                                           'OUTCOME',
+                                                                           'UERadioCapabilityMatchResponse',
+                                                                           'PROCEDURE',
+                                                                           'CODE',
+                                                                           'id-UERadioCapabilityMatch',
+                                                                           'CRITICALITY',
+                                                                           'reject']},
                                       'uplinkNASTransport': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                             'value': None},
+                                                             'value': ['INITIATING',
+                                                                       'MESSAGE',
+                                                                       'UplinkNASTransport',
+                                                                       'PROCEDURE',
+                                                                       'CODE',
+                                                                       'id-uplinkNASTransport',
+                                                                       'CRITICALITY',
+                                                                       'ignore']},
                                       'uplinkNonUEAssociatedLPPaTransport': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                             'value': None},
+                                                                             'value': ['INITIATING',
+                                                                                       'MESSAGE',
+                                                                                       'UplinkNonUEAssociatedLPPaTransport',
+                                                                                       'PROCEDURE',
+                                                                                       'CODE',
+                                                                                       'id-uplinkNonUEAssociatedLPPaTransport',
+                                                                                       'CRITICALITY',
+                                                                                       'ignore']},
                                       'uplinkS1cdma2000tunnelling': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                     'value': None},
+                                                                     'value': ['INITIATING',
+                                                                               'MESSAGE',
+                                                                               'UplinkS1cdma2000tunnelling',
+                                                                               'PROCEDURE',
+                                                                               'CODE',
+                                                                               'id-UplinkS1cdma2000tunnelling',
+                                                                               'CRITICALITY',
+                                                                               'ignore']},
                                       'uplinkUEAssociatedLPPaTransport': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                                          'value': None},
+                                                                          'value': ['INITIATING',
+                                                                                    'MESSAGE',
+                                                                                    'UplinkUEAssociatedLPPaTransport',
+                                                                                    'PROCEDURE',
+                                                                                    'CODE',
+                                                                                    'id-uplinkUEAssociatedLPPaTransport',
+                                                                                    'CRITICALITY',
+                                                                                    'ignore']},
                                       'writeReplaceWarning': {'type': 'S1AP-ELEMENTARY-PROCEDURE',
-                                                              'value': None}}}}
\ No newline at end of file
+                                                              'value': ['INITIATING',
+                                                                        'MESSAGE',
+                                                                        'WriteReplaceWarningRequest',
+                                                                        'SUCCESSFUL',
+                                                                        'OUTCOME',
+                                                                        'WriteReplaceWarningResponse',
+                                                                        'PROCEDURE',
+                                                                        'CODE',
+                                                                        'id-WriteReplaceWarning',
+                                                                        'CRITICALITY',
+                                                                        'reject']}}}}
\ No newline at end of file
@@ -4,17 +4,109 @@ EXPECTED = {'PKCS-1': {'extensibility-implied': False,
                                                                      'type': 'OBJECT '
                                                                              'IDENTIFIER'},
                                                                     {'name': '&Type',
-                                                                     'type': 'OpenType'}]}},
+                                                                     'type': 'OpenType'}],
+                                                        'with-syntax': ['OID',
+                                                                        '&id',
+                                                                        ['PARAMETERS',
+                                                                         '&Type']]}},
             'object-sets': {'OAEP-PSSDigestAlgorithms': {'class': 'ALGORITHM-IDENTIFIER',
-                                                         'members': []},
+                                                         'members': [['OID',
+                                                                      'id-sha1',
+                                                                      'PARAMETERS',
+                                                                      'NULL'],
+                                                                     ['OID',
+                                                                      'id-sha256',
+                                                                      'PARAMETERS',
+                                                                      'NULL'],
+                                                                     ['OID',
+                                                                      'id-sha384',
+                                                                      'PARAMETERS',
+                                                                      'NULL'],
+                                                                     ['OID',
+                                                                      'id-sha512',
+                                                                      'PARAMETERS',
+                                                                      'NULL'],
+                                                                     ',',
+                                                                     '.']},
                             'PKCS1-v1-5DigestAlgorithms': {'class': 'ALGORITHM-IDENTIFIER',
-                                                           'members': []},
+                                                           'members': [['OID',
+                                                                        'id-md2',
+                                                                        'PARAMETERS',
+                                                                        'NULL'],
+                                                                       ['OID',
+                                                                        'id-md5',
+                                                                        'PARAMETERS',
+                                                                        'NULL'],
+                                                                       ['OID',
+                                                                        'id-sha1',
+                                                                        'PARAMETERS',
+                                                                        'NULL'],
+                                                                       ['OID',
+                                                                        'id-sha256',
+                                                                        'PARAMETERS',
+                                                                        'NULL'],
+                                                                       ['OID',
+                                                                        'id-sha384',
+                                                                        'PARAMETERS',
+                                                                        'NULL'],
+                                                                       ['OID',
+                                                                        'id-sha512',
+                                                                        'PARAMETERS',
+                                                                        'NULL']]},
                             'PKCS1Algorithms': {'class': 'ALGORITHM-IDENTIFIER',
-                                                'members': []},
+                                                'members': [['OID',
+                                                             'rsaEncryption',
+                                                             'PARAMETERS',
+                                                             'NULL'],
+                                                            ['OID',
+                                                             'md2WithRSAEncryption',
+                                                             'PARAMETERS',
+                                                             'NULL'],
+                                                            ['OID',
+                                                             'md5WithRSAEncryption',
+                                                             'PARAMETERS',
+                                                             'NULL'],
+                                                            ['OID',
+                                                             'sha1WithRSAEncryption',
+                                                             'PARAMETERS',
+                                                             'NULL'],
+                                                            ['OID',
+                                                             'sha256WithRSAEncryption',
+                                                             'PARAMETERS',
+                                                             'NULL'],
+                                                            ['OID',
+                                                             'sha384WithRSAEncryption',
+                                                             'PARAMETERS',
+                                                             'NULL'],
+                                                            ['OID',
+                                                             'sha512WithRSAEncryption',
+                                                             'PARAMETERS',
+                                                             'NULL'],
+                                                            ['OID',
+                                                             'id-RSAES-OAEP',
+                                                             'PARAMETERS',
+                                                             'RSAES-OAEP-params'],
+                                                            'PKCS1PSourceAlgorithms',
+                                                            ['OID',
+                                                             'id-RSASSA-PSS',
+                                                             'PARAMETERS',
+                                                             'RSASSA-PSS-params'],
+                                                            ',',
+                                                            '.']},
                             'PKCS1MGFAlgorithms': {'class': 'ALGORITHM-IDENTIFIER',
-                                                   'members': []},
+                                                   'members': [['OID',
+                                                                'id-mgf1',
+                                                                'PARAMETERS',
+                                                                'HashAlgorithm'],
+                                                               ',',
+                                                               '.']},
                             'PKCS1PSourceAlgorithms': {'class': 'ALGORITHM-IDENTIFIER',
-                                                       'members': []}},
+                                                       'members': [['OID',
+                                                                    'id-pSpecified',
+                                                                    'PARAMETERS',
+                                                                    'EncodingParameters'],
+                                                                   ',',
+                                                                   '.']}},
             'tags': 'EXPLICIT',
             'types': {'AlgorithmIdentifier': {'members': [{'name': 'algorithm',
                                                            'table': 'InfoObjectSet',
@@ -24,8 +116,10 @@ EXPECTED = {'PKCS-1': {'extensibility-implied': False,
                                                            'table': ['InfoObjectSet',
                                                                      ['.algorithm']],
                                                            'type': 'ALGORITHM-IDENTIFIER.&Type'}],
+                                              'parameters': ['InfoObjectSet'],
                                               'type': 'SEQUENCE'},
-                      'DigestAlgorithm': {'type': 'AlgorithmIdentifier'},
+                      'DigestAlgorithm': {'actual-parameters': ['PKCS1-v1-5DigestAlgorithms'],
+                                          'type': 'AlgorithmIdentifier'},
                       'DigestInfo': {'members': [{'name': 'digestAlgorithm',
                                                   'type': 'DigestAlgorithm'},
                                                  {'name': 'digest',
@@ -33,8 +127,10 @@ EXPECTED = {'PKCS-1': {'extensibility-implied': False,
                                      'type': 'SEQUENCE'},
                       'EncodingParameters': {'size': [(0, 'MAX')],
                                              'type': 'OCTET STRING'},
-                      'HashAlgorithm': {'type': 'AlgorithmIdentifier'},
-                      'MaskGenAlgorithm': {'type': 'AlgorithmIdentifier'},
+                      'HashAlgorithm': {'actual-parameters': ['OAEP-PSSDigestAlgorithms'],
+                                        'type': 'AlgorithmIdentifier'},
+                      'MaskGenAlgorithm': {'actual-parameters': ['PKCS1MGFAlgorithms'],
+                                           'type': 'AlgorithmIdentifier'},
                       'OtherPrimeInfo': {'members': [{'name': 'prime',
                                                       'type': 'INTEGER'},
                                                      {'name': 'exponent',
@@ -45,8 +141,10 @@ EXPECTED = {'PKCS-1': {'extensibility-implied': False,
                       'OtherPrimeInfos': {'element': {'type': 'OtherPrimeInfo'},
                                           'size': [(1, 'MAX')],
                                           'type': 'SEQUENCE OF'},
-                      'PSourceAlgorithm': {'type': 'AlgorithmIdentifier'},
-                      'RSAES-AlgorithmIdentifier': {'type': 'AlgorithmIdentifier'},
+                      'PSourceAlgorithm': {'actual-parameters': ['PKCS1PSourceAlgorithms'],
+                                           'type': 'AlgorithmIdentifier'},
+                      'RSAES-AlgorithmIdentifier': {'actual-parameters': ['PKCS1Algorithms'],
+                                                    'type': 'AlgorithmIdentifier'},
                       'RSAES-OAEP-params': {'members': [{'default': 'sha1',
                                                          'name': 'hashAlgorithm',
                                                          'tag': {'number': 0},
@@ -87,7 +185,8 @@ EXPECTED = {'PKCS-1': {'extensibility-implied': False,
                                                    {'name': 'publicExponent',
                                                     'type': 'INTEGER'}],
                                        'type': 'SEQUENCE'},
-                      'RSASSA-AlgorithmIdentifier': {'type': 'AlgorithmIdentifier'},
+                      'RSASSA-AlgorithmIdentifier': {'actual-parameters': ['PKCS1Algorithms'],
+                                                     'type': 'AlgorithmIdentifier'},
                       'RSASSA-PSS-params': {'members': [{'default': 'sha1',
                                                          'name': 'hashAlgorithm',
                                                          'tag': {'number': 0},
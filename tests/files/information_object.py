@@ -13,7 +13,11 @@ EXPECTED = {'InformationObject': {'extensibility-implied': False,
                                           'GC': {'members': [{'name': '&id',
                                                               'type': 'INTEGER'},
                                                              {'name': '&Value',
-                                                              'type': 'OpenType'}]},
+                                                              'type': 'OpenType'}],
+                                                 'with-syntax': ['ID',
+                                                                 '&id',
+                                                                 'VALUE',
+                                                                 '&Value']},
                                           'INNER-ITEM': {'members': [{'name': '&type',
                                                                       'type': 'INTEGER'},
                                                                      {'name': '&Value',
@@ -34,7 +38,15 @@ EXPECTED = {'InformationObject': {'extensibility-implied': False,
                                                                 {'&Type': {'type': 'GeneralString'},
                                                                  '&category': 'B',
                                                                  '&code': 2}]},
-                                       'GCs': {'class': 'GC', 'members': []},
+                                       'GCs': {'class': 'GC',
+                                               'members': [['ID',
+                                                            '0',
+                                                            'VALUE',
+                                                            'INTEGER'],
+                                                           ['ID',
+                                                            '1',
+                                                            'VALUE',
+                                                            'BOOLEAN']]},
                                        'InnerItems': {'class': 'INNER-ITEM',
                                                       'members': ['innerItem0',
                                                                   {'&Value': {'type': 'IA5String'},
@@ -63,7 +75,8 @@ EXPECTED = {'InformationObject': {'extensibility-implied': False,
                                                     {'name': 'value',
                                                      'table': ['GCs', ['id']],
                                                      'type': 'GC.&Value'},
-                                                    {'name': 'a',
+                                                    {'actual-parameters': ['GCs'],
+                                                     'name': 'a',
                                                      'type': 'E1'}],
                                         'type': 'SEQUENCE'},
                                  'D2': {'members': [{'name': 'id',
@@ -81,6 +94,7 @@ EXPECTED = {'InformationObject': {'extensibility-implied': False,
                                                     {'name': 'value',
                                                      'table': ['Param', ['id']],
                                                      'type': 'GC.&Value'}],
+                                        'parameters': ['Param'],
                                         'type': 'SEQUENCE'},
                                  'ErrorReturn': {'members': [{'name': 'errorCategory',
                                                               'table': 'ErrorSet',
@@ -142,7 +156,8 @@ EXPECTED = {'InformationObject': {'extensibility-implied': False,
                                                      'type': 'GC.&Value'}],
                                         'type': 'SEQUENCE'}},
                        'values': {'innerItem0': {'type': 'INNER-ITEM',
-                                                 'value': None}}},
+                                                 'value': {'&Value': {'type': 'INTEGER'},
+                                                           '&type': 0}}}},
  'InformationObjectClass': {'extensibility-implied': False,
                             'imports': {},
                             'object-classes': {'ITEM': {'members': [{'name': '&id',
@@ -564,14 +564,41 @@ class Asn1ToolsBerTest(Asn1ToolsBaseTest):
                        b'\x30\x0b\xa0\x06\x80\x01\xff\x81\x01\xff\x81\x01\x64'),
             {'a': {'a': True}, 'b': 100})
 
-        # Decode S with end-of-contentes octet , which is not yet
-        # supported.
-        with self.assertRaises(NotImplementedError) as cm:
-            foo.decode('S', b'\x30\x80\x02\x01\x01\x00\x00')
+        # Decode with indefinite length.
+        datas = [
+            ('S',                          {'a': 1}, b'\x30\x80\x80\x01\x01\x00\x00'),
+            ('S',                                {}, b'\x30\x80\x00\x00'),
+            ('N',                       {'a': True}, b'\x30\x80\x00\x00'),
+            ('L',
+             {'a': True, 'b': False, 'c': True},
+             b'\x30\x80\x80\x01\xff\x81\x01\x00\x82\x01\xff\x00\x00'),
+            ('U',
+             {'a': [{'a': []}, {}]},
+             b'\x30\x80\xa0\x80\x30\x80\xa0\x80\x00\x00\x00\x00\x30\x00'
+             b'\x00\x00\x00\x00')
+        ]
 
+        for type_name, decoded, encoded in datas:
+            self.assertEqual(foo.decode(type_name, encoded), decoded)
+
+        # Decode R as Q with indefinite lengths. Extension addition
+        # "a.b" should be skipped.
         self.assertEqual(
-            str(cm.exception),
-            'Decode until an end-of-contents tag is not yet implemented.')
+            foo.decode('Q',
+                       b'\x30\x80\xa0\x80\x80\x01\xff\x81\x01\xff\x00\x00'
+                       b'\x81\x01\x64\x00\x00'),
+            {'a': {'a': True}, 'b': 100})
+
+        # An incomplete addition group is skipped.
+        self.assertEqual(
+            foo.decode('L', b'\x30\x80\x80\x01\xff\x81\x01\xff\x00\x00'),
+            {'a': True})
+
+        # Missing end-of-contents tag.
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            foo.decode('S', b'\x30\x80\x80\x01\x01')
+
+        self.assertEqual(str(cm.exception), 'out of data at offset 5')
 
         # Missing member.
         with self.assertRaises(asn1tools.EncodeError) as cm:
@@ -589,17 +616,23 @@ class Asn1ToolsBerTest(Asn1ToolsBaseTest):
             'ber')
 
         datas = [
+            ('A',                                [], b'\x30\x00'),
+            ('A',                            [1, 2], b'\x30\x06\x02\x01\x01\x02\x01\x02')
         ]
 
         for type_name, decoded, encoded in datas:
             self.assert_encode_decode(foo, type_name, decoded, encoded)
 
-        with self.assertRaises(NotImplementedError) as cm:
-            foo.decode('A', b'\x30\x80\x00\x00')
+        # Decode with indefinite length.
+        datas = [
+            ('A',                                [], b'\x30\x80\x00\x00'),
+            ('A',
+             [1, 2],
+             b'\x30\x80\x02\x01\x01\x02\x01\x02\x00\x00')
+        ]
 
-        self.assertEqual(
-            str(cm.exception),
-            'Decode until an end-of-contents tag is not yet implemented.')
+        for type_name, decoded, encoded in datas:
+            self.assertEqual(foo.decode(type_name, encoded), decoded)
 
     def test_set(self):
         foo = asn1tools.compile_string(
@@ -1008,7 +1041,8 @@ class Asn1ToolsBerTest(Asn1ToolsBaseTest):
             (b'\x30\x0d', 15),
             (b'\x30\x84\x00\x00\x00\xb8', 190),
             (b'\x9f\x1f\x00', 3),
-            (b'\x9f\x80\x80\x01\x02\xff', 7)
+            (b'\x9f\x80\x80\x01\x02\xff', 7),
+            (b'\x30\x80\x30\x80\x00\x00\x04\x01\x01\x00\x00', 11)
        ]
 
         for encoded, decoded_length in datas:
@@ -1019,7 +1053,9 @@ class Asn1ToolsBerTest(Asn1ToolsBaseTest):
         datas = [
             b'\x30',
             b'',
-            b'\x30\x84\x00\x00\x00'
+            b'\x30\x84\x00\x00\x00',
+            b'\x30\x80\x30\x80\x00\x00\x04\x01\x01\x00',
+            b'\x30\x80\x04\x05\x01'
         ]
 
         for encoded in datas:
@@ -2746,6 +2782,23 @@ class Asn1ToolsBerTest(Asn1ToolsBaseTest):
         testcase = asn1tools.compile_string(spec)
         self.assert_encode_decode(testcase, 'OUTER', decoded, encoded)
 
+        # Indefinite length.
+        encoded = (
+            b'\x6a\x80\x30\x80\xab\x80\x02\x01\x17\x00\x00\xac\x80\x74'
+            b'\x80\x30\x80\xb5\x80\x02\x01\x2a\x00\x00\x00\x00\x00\x00'
+            b'\x00\x00\x00\x00\x00\x00'
+        )
+
+        self.assertEqual(testcase.decode('OUTER', encoded), decoded)
+
+        # Missing end-of-contents tag.
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            testcase.decode('OUTER', encoded[:-2] + b'\x02\x01')
+
+        self.assertEqual(
+            str(cm.exception),
+            "Expected end-of-contents tag at offset 32, but got '0201'.")
+
     def test_zforce(self):
         """
 
@@ -3058,8 +3111,8 @@ class Asn1ToolsBerTest(Asn1ToolsBaseTest):
              b'\x00\x01',
              b'\x24\x80\x04\x01\x00\x24\x80\x04\x01\x01\x00\x00\x00\x00'),
             ('Utf8string',             'foo', b'\x2c\x80\x04\x02fo\x04\x01o\x00\x00'),
-            #('Sequence',                  {}, b'\x30\x80\x00\x00'),
-            #('Set',                       {}, b'\x31\x80\x00\x00'),
+            ('Sequence',                   {}, b'\x30\x80\x00\x00'),
+            ('Set',                        {}, b'\x31\x80\x00\x00'),
             ('Numericstring',          '123', b'\x32\x80\x04\x0212\x04\x013\x00\x00'),
             ('Printablestring',        'foo', b'\x33\x80\x04\x02fo\x04\x01o\x00\x00'),
             ('Ia5string',              'bar', b'\x36\x80\x04\x02ba\x04\x01r\x00\x00'),
@@ -3072,8 +3125,11 @@ class Asn1ToolsBerTest(Asn1ToolsBaseTest):
              'fie',
              b'\x3e\x80\x04\x02\x00\x66\x04\x04\x00\x69\x00\x65\x00\x00'),
             ('Teletexstring',          'fum', b'\x34\x80\x04\x01f\x04\x02um\x00\x00'),
-            #('SequenceOf',                [], b'\x30\x80\x00\x00'),
-            #('SetOf',                     [], b'\x31\x80\x00\x00')
+            ('SequenceOf',                 [], b'\x30\x80\x00\x00'),
+            ('SetOf',                      [], b'\x31\x80\x00\x00'),
+            ('Any',
+             b'\x30\x80\x24\x80\x04\x01\x00\x00\x00\x00\x00',
+             b'\x30\x80\x24\x80\x04\x01\x00\x00\x00\x00\x00')
         ]
 
         for type_name, decoded, encoded in datas:
@@ -3148,16 +3204,338 @@ class Asn1ToolsBerTest(Asn1ToolsBaseTest):
             "Foo DEFINITIONS IMPLICIT TAGS ::= BEGIN "
             "A ::= [31] INTEGER "
             "B ::= [500] INTEGER "
+            "C ::= CHOICE { a [2] INTEGER, b [500] INTEGER, c [501] OCTET STRING } "
+            "D ::= SEQUENCE { a [31] INTEGER OPTIONAL, b [32] INTEGER } "
             "END")
 
         datas = [
             ('A', 1, b'\x9f\x1f\x01\x01'),
-            ('B', 1, b'\x9f\x83\x74\x01\x01')
+            ('B', 1, b'\x9f\x83\x74\x01\x01'),
+            ('C', ('a', 1), b'\x82\x01\x01'),
+            ('C', ('b', 1), b'\x9f\x83\x74\x01\x01'),
+            ('C', ('c', b'\x05'), b'\x9f\x83\x75\x01\x05'),
+            ('D', {'b': 1}, b'\x30\x04\x9f\x20\x01\x01'),
+            ('D', {'a': 2, 'b': 1}, b'\x30\x08\x9f\x1f\x01\x02\x9f\x20\x01\x01')
         ]
 
         for type_name, decoded, encoded in datas:
             self.assert_encode_decode(foo, type_name, decoded, encoded)
 
+        # Constructed encoding of a long tag.
+        self.assertEqual(foo.decode('C', b'\xbf\x83\x75\x03\x04\x01\x05'),
+                         ('c', b'\x05'))
+
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            foo.decode('C', b'\x9f\x83\x76\x01\x01')
+
+        self.assertEqual(
+            str(cm.exception),
+            "Expected choice member tag '82', '9f8374', '9f8375' or 'bf8375', "
+            "but got '9f8376'.")
+
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            foo.decode('B', b'\x9f\x83\x75\x01\x01')
+
+        self.assertEqual(
+            str(cm.exception),
+            "Expected INTEGER with tag '9f8374' at offset 0, but got '9f8375'.")
+
+    def test_long_lengths(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= BEGIN "
+            "A ::= SEQUENCE { "
+            "  a SEQUENCE OF OCTET STRING, "
+            "  b [APPLICATION 1] EXPLICIT SEQUENCE { c OCTET STRING }, "
+            "  ..., "
+            "  [[ d INTEGER, e OCTET STRING ]] "
+            "} "
+            "END")
+
+        # Short, long and deferred lengths of nested contents.
+        datas = [
+            (
+                'A',
+                {'a': [b'\x01'], 'b': {'c': b''}},
+                b'\x30\x0b\x30\x03\x04\x01\x01\x61\x04\x30\x02\x80\x00'
+            ),
+            (
+                'A',
+                {'a': [200 * b'\x01'], 'b': {'c': b'\x02'}},
+                b'\x30\x81\xd5\x30\x81\xcb\x04\x81\xc8' + 200 * b'\x01'
+                + b'\x61\x05\x30\x03\x80\x01\x02'
+            ),
+            (
+                'A',
+                {'a': [5000 * b'\x01', b''], 'b': {'c': 300 * b'\x02'}},
+                b'\x30\x82\x14\xca\x30\x82\x13\x8e\x04\x82\x13\x88'
+                + 5000 * b'\x01' + b'\x04\x00\x61\x82\x01\x34'
+                b'\x30\x82\x01\x30\x80\x82\x01\x2c' + 300 * b'\x02'
+            ),
+            (
+                'A',
+                {'a': [], 'b': {'c': b''}, 'd': 1, 'e': 5000 * b'\x03'},
+                b'\x30\x82\x13\x97\x30\x00\x61\x04\x30\x02\x80\x00'
+                b'\x02\x01\x01\x04\x82\x13\x88' + 5000 * b'\x03'
+            )
+        ]
+
+        for type_name, decoded, encoded in datas:
+            self.assert_encode_decode(foo, type_name, decoded, encoded)
+
+        # An addition group with a missing member is not encoded.
+        encoded = foo.encode('A',
+                             {'a': [5000 * b'\x01'], 'b': {'c': b''}, 'd': 1})
+        self.assertEqual(encoded,
+                         b'\x30\x82\x13\x96\x30\x82\x13\x8c\x04\x82\x13\x88'
+                         + 5000 * b'\x01' + b'\x61\x04\x30\x02\x80\x00')
+
+    @unittest.skipIf(sys.version_info[0] < 3, 'Python 3 only.')
+    def test_zero_copy(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a OCTET STRING, "
+            "  b BIT STRING, "
+            "  c ANY, "
+            "  d UTF8String, "
+            "  e GeneralizedTime, "
+            "  f SEQUENCE OF OCTET STRING "
+            "} "
+            "END")
+
+        decoded = {
+            'a': b'\x01\x02',
+            'b': (b'\x80', 1),
+            'c': b'\x05\x00',
+            'd': u'åäö',
+            'e': datetime(2019, 1, 2, 3, 4, 5),
+            'f': [b'', b'\x03']
+        }
+        encoded = foo.encode('A', decoded)
+        data = bytearray(encoded)
+        values = foo.decode('A', data, zero_copy=True)
+        self.assertEqual(values, decoded)
+
+        # Values are slices of the decoded data, not copies.
+        self.assertIsInstance(values['a'], memoryview)
+        self.assertIsInstance(values['b'][0], memoryview)
+        self.assertIsInstance(values['c'], memoryview)
+        self.assertIsInstance(values['f'][1], memoryview)
+        data[encoded.index(b'\x01\x02')] = 0xff
+        self.assertEqual(values['a'], b'\xff\x02')
+
+        # Decoded values can be encoded again.
+        self.assertEqual(foo.encode('A', values), data)
+
+        # Any buffer protocol object may be decoded.
+        self.assertEqual(foo.decode('A', memoryview(encoded)[:], zero_copy=True),
+                         decoded)
+
+        # Segments are joined.
+        self.assertEqual(
+            foo.decode('A',
+                       b'\x30\x80\xa0\x80\x04\x01\x01\x04\x01\x02\x00\x00'
+                       b'\x81\x02\x07\x80\x05\x00\x83\x06\xc3\xa5'
+                       b'\xc3\xa4\xc3\xb6\x84\x0e20190102030405\xa5\x80\x04'
+                       b'\x00\x04\x01\x03\x00\x00\x00\x00',
+                       zero_copy=True),
+            decoded)
+
+    def test_lazy(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a INTEGER, "
+            "  b BOOLEAN DEFAULT TRUE, "
+            "  c IA5String OPTIONAL, "
+            "  d SEQUENCE OF B, "
+            "  e CHOICE { f B, g NULL }, "
+            "  ..., "
+            "  [[ "
+            "  h INTEGER, "
+            "  i INTEGER "
+            "  ]] "
+            "} "
+            "B ::= SEQUENCE { "
+            "  a [APPLICATION 5] EXPLICIT INTEGER, "
+            "  b B OPTIONAL "
+            "} "
+            "END")
+
+        decoded = {
+            'a': 1,
+            'b': True,
+            'd': [{'a': 2}, {'a': 3, 'b': {'a': 4}}],
+            'e': ('f', {'a': 5}),
+            'h': 6,
+            'i': 7
+        }
+        encoded = foo.encode('A', decoded)
+        lazy = foo.decode('A', encoded, lazy=True)
+
+        # Members are decoded on access and cached.
+        self.assertEqual(lazy['a'], 1)
+        self.assertEqual(lazy['d'][1]['b']['a'], 4)
+        self.assertIs(lazy['d'], lazy['d'])
+        self.assertEqual(lazy['d'][-1], {'a': 3, 'b': {'a': 4}})
+        self.assertEqual(lazy['d'][:1], [{'a': 2}])
+        self.assertEqual(lazy['e'][0], 'f')
+        self.assertEqual(sorted(lazy), ['a', 'b', 'd', 'e', 'h', 'i'])
+        self.assertNotIn('c', lazy)
+        self.assertEqual(lazy, decoded)
+        self.assertEqual(repr(lazy['d'][0]), "{'a': 2}")
+
+        with self.assertRaises(KeyError):
+            lazy['c']
+
+        with self.assertRaises(IndexError):
+            lazy['d'][2]
+
+        with self.assertRaises(TypeError):
+            lazy['a'] = 2
+
+        # Lazily decoded values can be encoded again.
+        self.assertEqual(foo.encode('A', lazy, check_constraints=True),
+                         encoded)
+
+        # Indefinite length.
+        lazy = foo.decode(
+            'A',
+            b'\x30\x80\x80\x01\x01\xa3\x80\x30\x80\x65\x03\x02\x01\x02'
+            b'\x00\x00\x00\x00\xa4\x80\x81\x00\x00\x00\x00\x00',
+            lazy=True)
+        self.assertEqual(lazy, {'a': 1, 'b': True, 'd': [{'a': 2}], 'e': ('g', None)})
+
+        # An incomplete addition group is skipped.
+        self.assertEqual(
+            foo.decode('A',
+                       b'\x30\x0c\x80\x01\x01\xa3\x00\xa4\x02\x81\x00\x85\x01'
+                       b'\x06',
+                       lazy=True),
+            {'a': 1, 'b': True, 'd': [], 'e': ('g', None)})
+
+        # Errors are raised when a member is accessed.
+        lazy = foo.decode('A',
+                          b'\x30\x0b\x80\x01\x01\xa3\x06\x30\x04\x65\x02\x02\x01',
+                          lazy=True)
+
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            lazy['a']
+
+        self.assertEqual(str(cm.exception), 'e: out of data at offset 13')
+
+        lazy = foo.decode('A',
+                          b'\x30\x0c\x80\x01\x01\xa3\x05\x30\x03\x66\x01\x00'
+                          b'\xa4\x00',
+                          lazy=True)
+
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            lazy['d'][0]['a']
+
+        self.assertEqual(
+            str(cm.exception),
+            "a: Expected ExplicitTag with tag '65' at offset 9, but got '66'.")
+
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            lazy['e']
+
+        self.assertEqual(str(cm.exception), 'e: out of data at offset 12')
+
+    def test_encoded(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a INTEGER, "
+            "  b [5] EXPLICIT B, "
+            "  c SEQUENCE OF B, "
+            "  d CHOICE { e B, f BOOLEAN }, "
+            "  g BOOLEAN DEFAULT TRUE "
+            "} "
+            "B ::= SEQUENCE { "
+            "  x INTEGER (0..255), "
+            "  y BOOLEAN "
+            "} "
+            "END")
+        b = {'x': 5, 'y': True}
+        encoded_b = foo.encode('B', b)
+        self.assertEqual(encoded_b, b'\x30\x06\x80\x01\x05\x81\x01\xff')
+        encoded = foo.encode('A',
+                             {'a': 1, 'b': b, 'c': [b, b], 'd': ('e', b), 'g': False})
+
+        # Already encoded values are inserted as is, including tag
+        # and length, and are not type checked.
+        decoded = {
+            'a': asn1tools.Encoded(b'\x02\x01\x01'),
+            'b': asn1tools.Encoded(b'\xa5\x08' + encoded_b),
+            'c': [b, b],
+            'd': ('e', asn1tools.Encoded(b'\xa0' + encoded_b[1:])),
+            'g': asn1tools.Encoded(b'\x01\x01\x00')
+        }
+        self.assertEqual(foo.encode('A', decoded, check_constraints=True),
+                         encoded)
+
+        # Long encoded values are given a long length.
+        decoded = {
+            'a': 1,
+            'b': b,
+            'c': 1000 * [asn1tools.Encoded(encoded_b)],
+            'd': ('f', True)
+        }
+        self.assertEqual(foo.decode('A', foo.encode('A', decoded)),
+                         {'a': 1, 'b': b, 'c': 1000 * [b], 'd': ('f', True), 'g': True})
+
+    def test_optional_members(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a SEQUENCE { x INTEGER } OPTIONAL, "
+            "  b INTEGER OPTIONAL, "
+            "  c INTEGER, "
+            "  ..., "
+            "  d INTEGER, "
+            "  [[ "
+            "  e INTEGER, "
+            "  f INTEGER OPTIONAL "
+            "  ]] "
+            "} "
+            "END")
+
+        datas = [
+            ({'c': 1},                    b'\x30\x03\x82\x01\x01'),
+            ({'a': {'x': 1}, 'c': 2},
+             b'\x30\x08\xa0\x03\x80\x01\x01\x82\x01\x02'),
+            ({'b': 3, 'c': 4, 'd': 5},
+             b'\x30\x09\x81\x01\x03\x82\x01\x04\x83\x01\x05'),
+            ({'c': 4, 'd': 5, 'e': 6, 'f': 7},
+             b'\x30\x0c\x82\x01\x04\x83\x01\x05\x84\x01\x06\x85\x01\x07')
+        ]
+
+        for decoded, encoded in datas:
+            self.assert_encode_decode(foo, 'A', decoded, encoded)
+
+        # Absent additions.
+        self.assertEqual(foo.decode('A', b'\x30\x06\x82\x01\x04\x83\x01\x05'),
+                         {'c': 4, 'd': 5})
+
+        # A present optional member that fails to decode is an error,
+        # as members are matched by tag.
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            foo.decode('A', b'\x30\x08\xa0\x03\x81\x01\x05\x82\x01\x0a')
+
+        self.assertEqual(
+            str(cm.exception),
+            "a: x: Expected INTEGER with tag '80' at offset 4, but got '81'.")
+
+        # A missing mandatory member.
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            foo.decode('A', b'\x30\x03\x81\x01\x03')
+
+        self.assertEqual(str(cm.exception), 'c: out of data at offset 5')
+
 
 if __name__ == '__main__':
     unittest.main()
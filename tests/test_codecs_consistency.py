@@ -140,6 +140,184 @@ class Asn1ToolsCodecsConsistencyTest(Asn1ToolsBaseTest):
             self.assertEqual(str(cm.exception),
                              "a: b: c: Sequence member 'd' not found in {}.")
 
+    def test_select(self):
+        spec = (
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a INTEGER, "
+            "  b SEQUENCE OF SEQUENCE { "
+            "    x INTEGER, "
+            "    y BOOLEAN OPTIONAL, "
+            "    z IA5String DEFAULT \"d\" "
+            "  }, "
+            "  c CHOICE { p INTEGER, q SEQUENCE { m INTEGER, n INTEGER } }, "
+            "  d [5] EXPLICIT SEQUENCE { e INTEGER, f INTEGER }, "
+            "  ..., "
+            "  g INTEGER OPTIONAL, "
+            "  [[ h INTEGER, i INTEGER ]] "
+            "} "
+            "END"
+        )
+        decoded = {
+            'a': 1,
+            'b': [{'x': 1, 'y': True}, {'x': 2, 'z': 'k'}],
+            'c': ('q', {'m': 3, 'n': 4}),
+            'd': {'e': 5, 'f': 6},
+            'g': 7,
+            'h': 8,
+            'i': 9
+        }
+
+        # Only selected members are decoded.
+        datas = [
+            (['a'],             {'a': 1}),
+            (['b.x', 'b.z'],    {'b': [{'x': 1, 'z': 'd'}, {'x': 2, 'z': 'k'}]}),
+            (['c.q.m'],         {'c': ('q', {'m': 3})}),
+            (['c.p'],           {'c': ('q', None)}),
+            (['d.f', 'g', 'i'], {'d': {'f': 6}, 'g': 7, 'i': 9}),
+            (['b', 'b.x'],
+             {'b': [{'x': 1, 'y': True, 'z': 'd'}, {'x': 2, 'z': 'k'}]}),
+            (['a', 'b', 'c', 'd', 'g', 'h', 'i'],
+             {
+                 'a': 1,
+                 'b': [{'x': 1, 'y': True, 'z': 'd'}, {'x': 2, 'z': 'k'}],
+                 'c': ('q', {'m': 3, 'n': 4}),
+                 'd': {'e': 5, 'f': 6},
+                 'g': 7,
+                 'h': 8,
+                 'i': 9
+             })
+        ]
+
+        for codec in CODECS:
+            foo = asn1tools.compile_string(spec, codec)
+            encoded = foo.encode('A', decoded)
+
+            for select, selected in datas:
+                self.assertEqual(foo.decode('A',
+                                            encoded,
+                                            check_constraints=True,
+                                            select=select),
+                                 selected)
+
+            # Unknown member.
+            with self.assertRaises(asn1tools.DecodeError) as cm:
+                foo.decode('A', encoded, select=['c.x'])
+
+            self.assertEqual(str(cm.exception),
+                             "Member 'x' of path 'c.x' not found.")
+
+    def test_encoded(self):
+        spec = (
+            "Foo DEFINITIONS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a B, "
+            "  b SEQUENCE OF B, "
+            "  c C "
+            "} "
+            "B ::= SEQUENCE { "
+            "  x INTEGER (0..255), "
+            "  y INTEGER (0..255) "
+            "} "
+            "C ::= CHOICE { "
+            "  d B, "
+            "  e BOOLEAN "
+            "} "
+            "END"
+        )
+        b = {'x': 5, 'y': 6}
+        c = ('d', b)
+        decoded = {'a': b, 'b': [b, b], 'c': c}
+
+        # Already encoded values are inserted as is by the binary
+        # codecs.
+        for codec in ['ber', 'der', 'oer', 'per', 'uper']:
+            foo = asn1tools.compile_string(spec, codec)
+            encoded = foo.encode('A', decoded)
+            encoded_b = foo.encode('B', b)
+            encoded_c = foo.encode('C', c)
+            datas = [
+                {'a': asn1tools.Encoded(encoded_b), 'b': [b, b], 'c': c},
+                {'a': b, 'b': [b, asn1tools.Encoded(encoded_b)], 'c': c},
+                {'a': b, 'b': [b, b], 'c': asn1tools.Encoded(encoded_c)}
+            ]
+
+            for data in datas:
+                self.assertEqual(foo.encode('A', data, check_constraints=True),
+                                 encoded)
+
+        # The other codecs raise an error.
+        datas = [
+            ({'a': asn1tools.Encoded(b'1'), 'b': [b], 'c': c}, 'a: '),
+            ({'a': b, 'b': [asn1tools.Encoded(b'1')], 'c': c}, 'b: '),
+            ({'a': b, 'b': [b], 'c': ('d', asn1tools.Encoded(b'1'))}, 'c: d: ')
+        ]
+
+        for codec in ['xer', 'jer', 'gser']:
+            foo = asn1tools.compile_string(spec, codec)
+
+            for data, location in datas:
+                with self.assertRaises(asn1tools.EncodeError) as cm:
+                    foo.encode('A', data)
+
+                self.assertEqual(
+                    str(cm.exception),
+                    location + 'Already encoded data cannot be inserted into '
+                    '{}.'.format(codec.upper()))
+
+    def test_select_skip(self):
+        spec = (
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a UTF8String, "
+            "  b SEQUENCE { c OCTET STRING }, "
+            "  d INTEGER "
+            "} "
+            "END"
+        )
+        datas = [
+            ('ber',
+             b'\x30\x0d\x80\x01\xff\xa1\x05\x80\x03\x01\x02\x03\x82\x01\x05',
+             b'\x30\x80\x80\x01\xff\xa1\x05\x80\x03\x01\x02',
+             'b: Expected at least 5 contents byte(s) at offset 7, but got 4.'),
+            ('der',
+             b'\x30\x0d\x80\x01\xff\xa1\x05\x80\x03\x01\x02\x03\x82\x01\x05',
+             b'\x30\x0d\x80\x01\xff\xa1\x0f\x80\x03\x01\x02\x03\x82\x01\x05',
+             'b: Expected at least 15 contents byte(s) at offset 7, but got 8.'),
+            ('oer',
+             b'\x01\xff\x03\x01\x02\x03\x01\x05',
+             b'\x01\xff\x03\x01',
+             'b: out of data at bit offset 24 (3.0 bytes)'),
+            ('per',
+             b'\x01\xff\x03\x01\x02\x03\x01\x05',
+             b'\x01\xff\x03\x01',
+             'b: out of data at bit offset 24 (3.0 bytes)'),
+            ('uper',
+             b'\x01\xff\x03\x01\x02\x03\x01\x05',
+             b'\x01\xff\x03\x01',
+             'b: out of data at bit offset 24 (3.0 bytes)')
+        ]
+
+        for codec, encoded, truncated, message in datas:
+            foo = asn1tools.compile_string(spec, codec)
+
+            # Unselected members are skipped, not decoded. The value
+            # of a is not valid UTF-8.
+            with self.assertRaises(UnicodeDecodeError):
+                foo.decode('A', encoded)
+
+            self.assertEqual(foo.decode('A', encoded, select=['d']),
+                             {'d': 5})
+
+            # Out of data in a skipped member.
+            with self.assertRaises(asn1tools.DecodeError) as cm:
+                foo.decode('A', truncated, select=['d'])
+
+            self.assertEqual(str(cm.exception), message)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,323 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from copy import deepcopy
+
+from .utils import Asn1ToolsBaseTest
+import asn1tools
+from asn1tools import codegen
+
+sys.path.append('tests/files/3gpp')
+
+from rrc_8_6_0 import EXPECTED as RRC_8_6_0
+
+
+class Asn1ToolsCodegenTest(Asn1ToolsBaseTest):
+
+    maxDiff = None
+
+    def assert_generated(self, specification, generated, datas):
+        """Generated encoding and decoding must give the same result as the
+        specification.
+
+        """
+
+        for type_name, decoded in datas:
+            encoded = specification.encode(type_name, decoded)
+            self.assert_encode_decode(generated, type_name, decoded, encoded)
+
+    def test_types(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= BOOLEAN "
+            "B ::= INTEGER (-5..1000) "
+            "C ::= INTEGER (0..7, ...) "
+            "D ::= INTEGER "
+            "E ::= ENUMERATED { a, b, c } "
+            "F ::= ENUMERATED { a, b, ..., c } "
+            "G ::= OCTET STRING (SIZE (0..5)) "
+            "H ::= BIT STRING (SIZE (3..9)) "
+            "I ::= SEQUENCE (SIZE (1..3)) OF B "
+            "J ::= SEQUENCE OF A "
+            "K ::= CHOICE { a NULL, b E, c C } "
+            "L ::= CHOICE { a NULL, ..., b BOOLEAN } "
+            "M ::= SEQUENCE { "
+            "  a A OPTIONAL, "
+            "  b B DEFAULT 5, "
+            "  c IA5String, "
+            "  d SEQUENCE (SIZE (0..2, ...)) OF K, "
+            "  ..., "
+            "  e F OPTIONAL "
+            "} "
+            "N ::= SEQUENCE { "
+            "  a M, "
+            "  b M OPTIONAL, "
+            "  c L "
+            "} "
+            "END",
+            'uper')
+        generated = codegen.generate(foo)
+
+        datas = [
+            ('A',                                 True),
+            ('B',                                   -5),
+            ('B',                                 1000),
+            ('C',                                    7),
+            ('C',                                  100),
+            ('D',                                 -300),
+            ('E',                                  'c'),
+            ('F',                                  'b'),
+            ('F',                                  'c'),
+            ('G',                                  b''),
+            ('G',                           b'\x01\x02'),
+            ('H',                      (b'\x80\x80', 9)),
+            ('I',                           [1, 2, 3]),
+            ('J',                        [True, False]),
+            ('K',                           ('a', None)),
+            ('K',                            ('b', 'b')),
+            ('L',                            ('b', True)),
+            ('M',                 {'b': 5, 'c': 'foo', 'd': []}),
+            ('M',
+             {'a': True, 'b': 5, 'c': '', 'd': [('c', 5), ('c', 9)], 'e': 'c'}),
+            ('N',
+             {
+                 'a': {'b': 7, 'c': 'bar', 'd': [('a', None)]},
+                 'b': {'a': False, 'b': 5, 'c': 'fie', 'd': []},
+                 'c': ('a', None)
+             })
+        ]
+
+        self.assert_generated(foo, generated, datas)
+        self.assertIn('from binascii import hexlify', generated.source)
+
+        # Default values are added when decoding.
+        self.assertEqual(generated.decode('M', b'\x00\x00'),
+                         {'b': 5, 'c': '', 'd': []})
+
+    def test_rrc_8_6_0(self):
+        rrc = asn1tools.compile_dict(deepcopy(RRC_8_6_0), 'uper')
+        generated = codegen.generate(rrc, ['PCCH-Message', 'BCCH-BCH-Message'])
+
+        decoded = {
+            'message': (
+                'c1',
+                (
+                    'paging',
+                    {
+                        'systemInfoModification': 'true',
+                        'nonCriticalExtension': {
+                        }
+                    }
+                )
+            )
+        }
+
+        self.assert_encode_decode(generated, 'PCCH-Message', decoded, b'\x28')
+
+        decoded = {
+            'message': {
+                'dl-Bandwidth': 'n6',
+                'phich-Config': {
+                    'phich-Duration': 'normal',
+                    'phich-Resource': 'half'
+                },
+                'systemFrameNumber': (b'\x12', 8),
+                'spare': (b'\x34\x40', 10)
+            }
+        }
+
+        self.assert_encode_decode(generated,
+                                  'BCCH-BCH-Message',
+                                  decoded,
+                                  b'\x04\x48\xd1')
+
+        # Types not generated are encoded and decoded by the
+        # specification.
+        decoded = {
+            'message': (
+                'c1',
+                (
+                    'rrcConnectionRelease',
+                    {
+                        'rrc-TransactionIdentifier': 1,
+                        'criticalExtensions': (
+                            'c1',
+                            (
+                                'rrcConnectionRelease-r8',
+                                {
+                                    'releaseCause': 'other'
+                                }
+                            )
+                        )
+                    }
+                )
+            )
+        }
+
+        self.assert_encode_decode(generated,
+                                  'DL-DCCH-Message',
+                                  decoded,
+                                  rrc.encode('DL-DCCH-Message', decoded))
+
+    def test_errors(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a INTEGER (0..255), "
+            "  b CHOICE { c BOOLEAN, d NULL } "
+            "} "
+            "END",
+            'uper')
+        generated = codegen.generate(foo)
+        self.assertNotIn('hexlify', generated.source)
+
+        # The same errors as raised by the specification.
+        with self.assertRaises(asn1tools.EncodeError) as cm:
+            generated.encode('A', {'a': 1}, check_types=False)
+
+        self.assertEqual(
+            str(cm.exception),
+            "Sequence member 'b' not found in {'a': 1}.")
+
+        with self.assertRaises(asn1tools.EncodeError) as cm:
+            generated.encode('A', {'a': 1, 'b': ('e', None)}, check_types=False)
+
+        self.assertEqual(str(cm.exception),
+                         "b: Expected choice 'c' or 'd', but got 'e'.")
+
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            generated.decode('A', b'\x01')
+
+        self.assertEqual(
+            str(cm.exception),
+            'b: out of data at bit offset 8 (1.0 bytes)')
+
+        with self.assertRaises(asn1tools.EncodeError) as cm:
+            generated.encode('B', None)
+
+        self.assertEqual(str(cm.exception),
+                         "Type 'B' not found in types dictionary.")
+
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            generated.decode('B', b'')
+
+        self.assertEqual(str(cm.exception),
+                         "Type 'B' not found in types dictionary.")
+
+        # Other errors, for example bugs in the generated code, are
+        # not hidden by the specification.
+        def raise_attribute_error(_data):
+            raise AttributeError('Bug.')
+
+        generated._encoders['A'] = raise_attribute_error
+        generated._decoders['A'] = raise_attribute_error
+
+        with self.assertRaises(AttributeError):
+            generated.encode('A', {'a': 1, 'b': ('d', None)})
+
+        with self.assertRaises(AttributeError):
+            generated.decode('A', b'\x01\x40')
+
+        # Only UPER is supported.
+        foo = asn1tools.compile_files('tests/files/foo.asn', 'ber')
+
+        with self.assertRaises(asn1tools.Error) as cm:
+            codegen.generate(foo)
+
+        self.assertEqual(
+            str(cm.exception),
+            "Code can only be generated for the 'uper' codec, but type "
+            "'Answer' is not a UPER type.")
+
+        foo = asn1tools.compile_files('tests/files/foo.asn', 'uper')
+
+        with self.assertRaises(asn1tools.Error) as cm:
+            codegen.generate(foo, ['Foo'])
+
+        self.assertEqual(str(cm.exception),
+                         "Type 'Foo' not found in types dictionary.")
+
+    def test_cache_dir(self):
+        cache_dir = tempfile.mkdtemp()
+        foo = asn1tools.compile_files('tests/files/foo.asn', 'uper')
+        decoded = {'id': 1, 'question': 'Is 1+1=3?'}
+        encoded = foo.encode('Question', decoded)
+
+        try:
+            for _ in range(2):
+                generated = codegen.generate(foo, cache_dir=cache_dir)
+                self.assert_encode_decode(generated,
+                                          'Question',
+                                          decoded,
+                                          encoded)
+
+            filenames = [
+                filename
+                for filename in os.listdir(cache_dir)
+                if filename.endswith('.py')
+            ]
+            self.assertEqual(len(filenames), 1)
+
+            with open(os.path.join(cache_dir, filenames[0])) as fin:
+                self.assertEqual(fin.read(), generated.source)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_encoded(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a BOOLEAN, "
+            "  b NULL, "
+            "  c SEQUENCE OF INTEGER (0..3) "
+            "} "
+            "END",
+            'uper')
+        generated = codegen.generate(foo)
+
+        # Already encoded values are encoded by the specification.
+        datas = [
+            {'a': asn1tools.Encoded(b'\x00', 1), 'b': None, 'c': [1, 2]},
+            {'a': True, 'b': asn1tools.Encoded(b'\xff', 3), 'c': [1, 2]},
+            {'a': True, 'b': None, 'c': [1, asn1tools.Encoded(b'\xc0', 2)]}
+        ]
+
+        for decoded in datas:
+            self.assertEqual(generated.encode('A', decoded),
+                             foo.encode('A', decoded))
+
+    def test_information_object(self):
+        information_object = asn1tools.compile_files(
+            'tests/files/information_object.asn', 'uper')
+        generated = codegen.generate(information_object,
+                                     ['ItemWithConstraints', 'C', 'D1'])
+
+        # Types with open types are encoded and decoded by the
+        # specification, which decodes the open types.
+        self.assertFalse(codegen.is_supported(
+            information_object.types['ItemWithConstraints'].type))
+
+        datas = [
+            (
+                'ItemWithConstraints',
+                {
+                    'id': 1,
+                    'value': {'myValue': 7, 'myType': 0},
+                    'comment': 'item 1',
+                    'extra': 5
+                }
+            ),
+            ('C', {'a': 0, 'b': {'a': 0, 'b': {'a': 0}}}),
+            ('D1', {'id': 1, 'value': True, 'a': {'id': 0, 'value': 5}})
+        ]
+
+        self.assert_generated(information_object, generated, datas)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,12 @@
+import os
 import sys
+import shutil
+import zlib
+import marshal
+import tempfile
 import unittest
 import asn1tools
+from asn1tools import serialization
 from copy import deepcopy
 
 sys.path.append('tests/files')
@@ -93,6 +99,21 @@ class Asn1ToolsCompileTest(unittest.TestCase):
 
         self.assertEqual(str(cm.exception), "Value 'a' not found in module 'A'.")
 
+    def test_missing_open_type_object_type(self):
+        for codec in ['per', 'uper']:
+            with self.assertRaises(asn1tools.CompileError) as cm:
+                asn1tools.compile_string(
+                    'A DEFINITIONS ::= BEGIN '
+                    'C ::= CLASS { &id INTEGER UNIQUE, &Value } '
+                    'S C ::= { { &id 0, &Value BOOLEAN } | '
+                    '          { &id 1, &Value B } } '
+                    'A ::= SEQUENCE { id C.&id ({S}), value C.&Value ({S}{@id}) } '
+                    'END',
+                    codec)
+
+            self.assertEqual(str(cm.exception),
+                             "Type 'B' not found in module 'A'.")
+
     def test_missing_import_type(self):
         with self.assertRaises(asn1tools.CompileError) as cm:
             asn1tools.compile_string(
@@ -143,6 +164,273 @@ class Asn1ToolsCompileTest(unittest.TestCase):
 
         self.assertEqual(spec.types, {})
 
+    def test_compile_files_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        filename = os.path.join(cache_dir, 'foo.asn')
+
+        try:
+            with open(filename, 'w') as fout:
+                fout.write('Foo DEFINITIONS ::= BEGIN A ::= INTEGER END')
+
+            foo = asn1tools.compile_files(filename, 'uper', cache_dir=cache_dir)
+            self.assertEqual(foo.encode('A', 1), b'\x01\x01')
+            cached = [name for name in os.listdir(cache_dir)
+                      if name.endswith('.pkl')]
+            self.assertEqual(len(cached), 1)
+
+            # Loaded from the cache.
+            foo = asn1tools.compile_files(filename, 'uper', cache_dir=cache_dir)
+            self.assertEqual(foo.encode('A', 1), b'\x01\x01')
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+            # A corrupt cache entry is replaced.
+            cached_filename = os.path.join(cache_dir, cached[0])
+
+            with open(cached_filename, 'rb') as fin:
+                data = fin.read()
+
+            with open(cached_filename, 'wb') as fout:
+                fout.write(data[:len(data) // 2])
+
+            foo = asn1tools.compile_files(filename, 'uper', cache_dir=cache_dir)
+            self.assertEqual(foo.encode('A', 1), b'\x01\x01')
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+            with open(cached_filename, 'rb') as fin:
+                self.assertEqual(fin.read(), data)
+
+            # Another codec gives another cache entry.
+            foo = asn1tools.compile_files(filename, 'ber', cache_dir=cache_dir)
+            self.assertEqual(foo.encode('A', 1), b'\x02\x01\x01')
+            self.assertEqual(len(os.listdir(cache_dir)), 3)
+
+            # Modified file contents invalidates the cache entry.
+            with open(filename, 'w') as fout:
+                fout.write('Foo DEFINITIONS ::= BEGIN A ::= BOOLEAN END')
+
+            foo = asn1tools.compile_files(filename, 'uper', cache_dir=cache_dir)
+            self.assertEqual(foo.encode('A', True), b'\x80')
+            self.assertEqual(len(os.listdir(cache_dir)), 4)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_compile_lazy(self):
+        foo = asn1tools.compile_string(
+            'Foo DEFINITIONS AUTOMATIC TAGS ::= BEGIN '
+            'A ::= SEQUENCE { a INTEGER, b A OPTIONAL } '
+            'B ::= SEQUENCE { a B2 } '
+            'B2 ::= INTEGER (0..1000000000000000000000) '
+            'C ::= INTEGER (MIN..MAX) '
+            'END ',
+            'uper',
+            lazy=True)
+
+        self.assertEqual(sorted(foo.types), ['A', 'B', 'B2', 'C'])
+        self.assertEqual(sorted(foo.modules['Foo']), ['A', 'B', 'B2', 'C'])
+        self.assertIn('B', foo.modules['Foo'])
+
+        # Compiled on first access.
+        decoded = {'a': 1, 'b': {'a': 2}}
+        encoded = foo.encode('A', decoded)
+        self.assertEqual(encoded, b'\x80\x80\x80\x40\x80')
+        self.assertEqual(foo.decode('A', encoded), decoded)
+        self.assertIs(foo.types['A'], foo.modules['Foo']['A'])
+
+        with self.assertRaises(asn1tools.ConstraintsError) as cm:
+            foo.encode('B', {'a': -1}, check_constraints=True)
+
+        self.assertEqual(
+            str(cm.exception),
+            'a: Expected an integer between 0 and '
+            '1000000000000000000000, but got -1.')
+
+        with self.assertRaises(KeyError):
+            foo.modules['Foo']['D']
+
+    def test_compile_lazy_error(self):
+        foo = asn1tools.compile_string(
+            'Foo DEFINITIONS AUTOMATIC TAGS ::= BEGIN '
+            'B ::= SEQUENCE { a Missing } '
+            'END '
+            'Bar DEFINITIONS AUTOMATIC TAGS ::= BEGIN '
+            'A ::= SEQUENCE { a B } '
+            'B ::= INTEGER '
+            'END ',
+            'uper',
+            lazy=True)
+
+        with self.assertRaises(asn1tools.CompileError) as cm:
+            foo.modules['Foo']['B']
+
+        self.assertEqual(str(cm.exception),
+                         "Type 'Missing' not found in module 'Foo'.")
+
+        # The failed type is not taken as recursive later.
+        self.assertEqual(repr(foo.modules['Bar']['A'].type),
+                         'Sequence(A, [Integer(a)])')
+        self.assertEqual(foo.modules['Bar']['A'].encode({'a': 1}),
+                         b'\x01\x01')
+
+    def test_compile_roots(self):
+        spec = (
+            'Foo DEFINITIONS AUTOMATIC TAGS ::= BEGIN '
+            'IMPORTS C, d FROM Bar; '
+            'A ::= SEQUENCE { a B, b C } '
+            'B ::= INTEGER (0..d) '
+            'E ::= BOOLEAN '
+            'e INTEGER ::= 5 '
+            'END '
+            'Bar DEFINITIONS AUTOMATIC TAGS ::= BEGIN '
+            'C ::= SEQUENCE OF F '
+            'F ::= OCTET STRING '
+            'G ::= REAL '
+            'd INTEGER ::= 3 '
+            'END ')
+
+        foo = asn1tools.compile_string(spec, 'uper', roots=['A'])
+        self.assertEqual(sorted(foo.modules['Foo']), ['A', 'B'])
+        self.assertEqual(sorted(foo.modules['Bar']), ['C', 'F'])
+        self.assertEqual(foo.encode('A', {'a': 3, 'b': [b'\x01']}),
+                         b'\xc0\x40\x40\x40')
+
+        foo = asn1tools.compile_string(spec, 'uper', roots=['E', 'G'])
+        self.assertEqual(sorted(foo.types), ['E', 'G'])
+
+        with self.assertRaises(asn1tools.CompileError) as cm:
+            asn1tools.compile_string(spec, 'uper', roots=['H'])
+
+        self.assertEqual(str(cm.exception), "Root type 'H' not found.")
+
+    def test_compile_codecs(self):
+        for lazy in [False, True]:
+            foo = asn1tools.compile_files('tests/files/foo.asn',
+                                          codecs=['uper', 'jer', 'ber'],
+                                          lazy=lazy)
+            self.assertEqual(sorted(foo), ['ber', 'jer', 'uper'])
+            decoded = {'id': 1, 'question': 'Is 1+1=3?'}
+
+            for codec, encoded in [
+                    ('uper', b'\x01\x01\x09\x93\xcd\x03\x15\x6c\x5e\xb3\x7e'),
+                    ('jer', b'{"id":1,"question":"Is 1+1=3?"}'),
+                    ('ber', b'0\x0e\x02\x01\x01\x16\x09Is 1+1=3?')
+            ]:
+                self.assertEqual(foo[codec].encode('Question', decoded), encoded)
+                self.assertEqual(foo[codec].decode('Question', encoded), decoded)
+
+            # Type and constraints checkers are shared by all codecs.
+            uper_question = foo['uper'].types['Question']
+            jer_question = foo['jer'].types['Question']
+            self.assertIs(uper_question.type_checker, jer_question.type_checker)
+            self.assertIs(uper_question.constraints_checker,
+                          jer_question.constraints_checker)
+
+        with self.assertRaises(asn1tools.CompileError) as cm:
+            asn1tools.compile_files('tests/files/foo.asn',
+                                    codecs=['uper', 'bad_codec'])
+
+        self.assertEqual(str(cm.exception), "Unsupported codec 'bad_codec'.")
+
+    def test_compile_shared_types(self):
+        foo = asn1tools.compile_string(
+            'Foo DEFINITIONS AUTOMATIC TAGS ::= BEGIN '
+            'A ::= SEQUENCE { a B, b B OPTIONAL, c SEQUENCE OF B } '
+            'B ::= SEQUENCE { x INTEGER } '
+            'END ',
+            'uper')
+
+        b = foo.types['B'].type
+        a, b_member, c = foo.types['A'].type.root_members
+
+        # The members are renamed copies of the compiled type B.
+        self.assertEqual(a.name, 'a')
+        self.assertFalse(a.optional)
+        self.assertEqual(b_member.name, 'b')
+        self.assertTrue(b_member.optional)
+        self.assertEqual(b.name, 'B')
+        self.assertFalse(b.optional)
+        self.assertIs(a.root_members, b.root_members)
+        self.assertIs(b_member.root_members, b.root_members)
+        self.assertIs(c.element_type.root_members, b.root_members)
+
+        decoded = {'a': {'x': 1}, 'b': {'x': 2}, 'c': [{'x': 3}]}
+        encoded = foo.encode('A', decoded)
+        self.assertEqual(encoded, b'\x80\x80\x80\x81\x00\x80\x81\x80')
+        self.assertEqual(foo.decode('A', encoded), decoded)
+
+    def test_dump_load_compiled(self):
+        filename = 'test_dump_load_compiled.compiled'
+        decoded = {'id': 1, 'question': 'Is 1+1=3?'}
+
+        for codec in ['ber', 'der', 'gser', 'jer', 'oer', 'per', 'uper', 'xer']:
+            foo = asn1tools.compile_files('tests/files/foo.asn', codec)
+            asn1tools.dump_compiled(foo, filename)
+            loaded = asn1tools.load_compiled(filename)
+            encoded = foo.encode('Question', decoded)
+            self.assertEqual(loaded.encode('Question', decoded), encoded)
+
+            if codec != 'gser':
+                self.assertEqual(loaded.decode('Question', encoded), decoded)
+
+            self.assertEqual(sorted(loaded.types), sorted(foo.types))
+
+        os.remove(filename)
+
+        # Recursive types.
+        foo = asn1tools.compile_string(
+            'Foo DEFINITIONS AUTOMATIC TAGS ::= BEGIN '
+            'A ::= SEQUENCE { a INTEGER, b A OPTIONAL } '
+            'END ',
+            'uper')
+        loaded = asn1tools.loads_compiled(asn1tools.dumps_compiled(foo))
+        decoded = {'a': 1, 'b': {'a': 2, 'b': {'a': 3}}}
+        encoded = foo.encode('A', decoded)
+        self.assertEqual(loaded.encode('A', decoded), encoded)
+        self.assertEqual(loaded.decode('A', encoded), decoded)
+
+    def test_load_compiled_errors(self):
+        foo = asn1tools.compile_files('tests/files/foo.asn', 'uper')
+        dumped = asn1tools.dumps_compiled(foo)
+
+        datas = [
+            (b'', 'Not a compiled specification.'),
+            (b'0' * len(dumped), 'Not a compiled specification.'),
+            (dumped[:-10], 'Corrupt compiled specification.'),
+            (dumped[:18] + b'\x00\x02' + dumped[20:],
+             'Expected compiled specification format version 1, but got 2.')
+        ]
+
+        for data, message in datas:
+            with self.assertRaises(asn1tools.Error) as cm:
+                asn1tools.loads_compiled(data)
+
+            self.assertEqual(str(cm.exception), message)
+
+        # Only classes defined in the asn1tools package may be loaded.
+        payload = serialization.Dumper().dump(foo)
+        payload['version'] = asn1tools.__version__
+        datas = [
+            ('subprocess', 'Popen'),
+            ('asn1tools.compiler', 'pickle'),
+            ('asn1tools.codecs.compiler', 'attrgetter'),
+            ('asn1tools.codecs.compiler', 'deepcopy'),
+            ('asn1tools.codecs.compiler', 'flatten')
+        ]
+
+        for module_name, name in datas:
+            payload['classes'][0] = [module_name, name]
+            data = (dumped[:20]
+                    + zlib.compress(
+                        marshal.dumps(payload, serialization.MARSHAL_VERSION)))
+
+            with self.assertRaises(asn1tools.Error) as cm:
+                asn1tools.loads_compiled(data)
+
+            self.assertEqual(
+                str(cm.exception),
+                "Cannot load class '{}' from module '{}'.".format(
+                    name,
+                    module_name))
+
 
 if __name__ == '__main__':
     unittest.main()
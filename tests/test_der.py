@@ -505,6 +505,37 @@ class Asn1ToolsDerTest(Asn1ToolsBaseTest):
 
         self.assert_encode_decode(rfc5280, 'Certificate', decoded, encoded)
 
+        # The signed part of the certificate and the issuer's
+        # attribute values as encoded.
+        values, spans = rfc5280.decode(
+            'Certificate',
+            encoded,
+            spans=['tbsCertificate', 'tbsCertificate.issuer.rdnSequence.value'])
+        self.assertEqual(values, decoded)
+        [(offset, length)] = spans['tbsCertificate']
+        self.assertEqual(encoded[offset:offset + length],
+                         rfc5280.encode('TBSCertificate',
+                                        decoded['tbsCertificate']))
+        self.assertEqual(
+            [encoded[offset:offset + length]
+             for offset, length in spans['tbsCertificate.issuer.rdnSequence.value']],
+            [
+                b'\x13\x02JP',
+                b'\x13\x05Tokyo',
+                b'\x13\x07Chuo-ku',
+                b'\x13\x08Frank4DD',
+                b'\x13\x0fWebCert Support',
+                b'\x13\x0fFrank4DD Web CA',
+                b'\x16\x14support@frank4dd.com'
+            ])
+
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            rfc5280.decode('Certificate', encoded, spans=['tbsCertificate.foo'])
+
+        self.assertEqual(
+            str(cm.exception),
+            "Member 'foo' of path 'tbsCertificate.foo' not found.")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -351,11 +351,33 @@ class Asn1ToolsJerTest(unittest.TestCase):
     def test_decode_length(self):
         foo = asn1tools.compile_files('tests/files/foo.asn', 'jer')
 
-        with self.assertRaises(asn1tools.DecodeError) as cm:
-            foo.decode_length(b'')
+        # The length can be decoded.
+        datas = [
+            (b'{"id":1,"question":"Is 1+1=3?"}', 31),
+            (b' {"id":1,"question":"}{\\""}{"id":2', 27),
+            (b'[1, [2], {"a": "]"}][', 20),
+            (b'"a\\"b" "c"', 6),
+            (b'12 13', 2),
+            (b'true,', 4)
+        ]
 
-        self.assertEqual(str(cm.exception),
-                         'Decode length is not supported for this codec.')
+        for encoded, decoded_length in datas:
+            self.assertEqual(foo.decode_length(encoded), decoded_length)
+            self.assertEqual(foo.decode_length(encoded, 'Question'),
+                             decoded_length)
+
+        # The length cannot be decoded.
+        datas = [
+            b'',
+            b'  ',
+            b'{"id":1,"question":"Is 1+1=3?"',
+            b'{"id":1,"question":"}',
+            b'"a\\"',
+            b'12'
+        ]
+
+        for encoded in datas:
+            self.assertIsNone(foo.decode_length(encoded))
 
     def test_rrc_8_6_0(self):
         rrc = asn1tools.compile_dict(deepcopy(RRC_8_6_0), 'jer')
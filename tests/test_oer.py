@@ -317,6 +317,11 @@ class Asn1ToolsOerTest(Asn1ToolsBaseTest):
             "  a E, "
             "  b INTEGER "
             "} "
+            "O ::= SEQUENCE { "
+            "  a SEQUENCE OF INTEGER, "
+            "  ..., "
+            "  b BOOLEAN OPTIONAL "
+            "} "
             "END",
             'oer')
 
@@ -346,7 +351,10 @@ class Asn1ToolsOerTest(Asn1ToolsBaseTest):
             ('L',                     {}, b'\x00'),
             ('N',
              {'a': {'a': True, 'b': True}, 'b': 5},
-             b'\x80\xff\x02\x07\x80\x01\xff\x01\x05')
+             b'\x80\xff\x02\x07\x80\x01\xff\x01\x05'),
+            ('O',
+             {'a': 300 * [5], 'b': True},
+             b'\x80\x02\x01\x2c' + 300 * b'\x01\x05' + b'\x02\x07\x80\x01\xff')
         ]
 
         for type_name, decoded, encoded in datas:
@@ -380,6 +388,66 @@ class Asn1ToolsOerTest(Asn1ToolsBaseTest):
         self.assertEqual(str(cm.exception),
                          'a: b: out of data at bit offset 48 (6.0 bytes)')
 
+    def test_sequence_extension_presence_bit_field(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a BOOLEAN, "
+            "  ..., "
+            "  b1 BOOLEAN OPTIONAL "
+            "} "
+            "B ::= SEQUENCE { "
+            "  a BOOLEAN, "
+            "  ..., "
+            "  b1 BOOLEAN OPTIONAL, b2 BOOLEAN OPTIONAL "
+            "} "
+            "C ::= SEQUENCE { "
+            "  a BOOLEAN, "
+            "  ..., "
+            "  b1 BOOLEAN OPTIONAL, b2 BOOLEAN OPTIONAL, "
+            "  b3 BOOLEAN OPTIONAL, b4 BOOLEAN OPTIONAL, "
+            "  b5 BOOLEAN OPTIONAL, b6 BOOLEAN OPTIONAL, "
+            "  b7 BOOLEAN OPTIONAL, b8 BOOLEAN OPTIONAL "
+            "} "
+            "D ::= SEQUENCE { "
+            "  a BOOLEAN, "
+            "  ..., "
+            "  b1 BOOLEAN OPTIONAL, b2 BOOLEAN OPTIONAL, "
+            "  b3 BOOLEAN OPTIONAL, b4 BOOLEAN OPTIONAL, "
+            "  b5 BOOLEAN OPTIONAL, b6 BOOLEAN OPTIONAL, "
+            "  b7 BOOLEAN OPTIONAL, b8 BOOLEAN OPTIONAL, "
+            "  b9 BOOLEAN OPTIONAL "
+            "} "
+            "END",
+            'oer')
+
+        # The length of the presence bit field is its number of bytes
+        # plus one for the number of unused bits.
+        datas = [
+            ('A',
+             {'a': True, 'b1': True},
+             b'\x80\xff\x02\x07\x80\x01\xff'),
+            ('B',
+             {'a': True, 'b1': True, 'b2': False},
+             b'\x80\xff\x02\x06\xc0\x01\xff\x01\x00'),
+            ('B',
+             {'a': True, 'b2': False},
+             b'\x80\xff\x02\x06\x40\x01\x00'),
+            ('C',
+             {'a': True, 'b1': True, 'b8': True},
+             b'\x80\xff\x02\x00\x81\x01\xff\x01\xff'),
+            ('D',
+             {'a': True, 'b1': True, 'b9': True},
+             b'\x80\xff\x03\x07\x80\x80\x01\xff\x01\xff'),
+            ('D',
+             {'a': True, 'b8': False},
+             b'\x80\xff\x03\x07\x01\x00\x01\x00')
+        ]
+
+        for type_name, decoded, encoded in datas:
+            self.assert_encode_decode(foo, type_name, decoded, encoded)
+
     def test_set(self):
         foo = asn1tools.compile_string(
             "Foo DEFINITIONS AUTOMATIC TAGS ::= "
@@ -814,6 +882,28 @@ class Asn1ToolsOerTest(Asn1ToolsBaseTest):
 
         self.assert_encode_decode(a1, 'PersonnelRecord', decoded, encoded)
 
+    def test_rfc1155_1157(self):
+        rfc1157 = asn1tools.compile_files([
+            'tests/files/ietf/rfc1155.asn',
+            'tests/files/ietf/rfc1157.asn'
+        ], 'oer')
+
+        datas = [
+            (
+                'NetworkAddress',
+                ('internet', b'\x01\x02\x03\x04'),
+                b'\x40\x01\x02\x03\x04'
+            ),
+            (
+                'ApplicationSyntax',
+                ('counter', 5),
+                b'\x41\x00\x00\x00\x05'
+            )
+        ]
+
+        for type_name, decoded, encoded in datas:
+            self.assert_encode_decode(rfc1157, type_name, decoded, encoded)
+
     def test_ieee1609_2(self):
         foo = asn1tools.compile_dict(deepcopy(IEEE1609_2), 'oer')
 
@@ -916,6 +1006,113 @@ class Asn1ToolsOerTest(Asn1ToolsBaseTest):
         self.assertEqual(str(cm.exception),
                          "out of data at bit offset 0 (0.0 bytes)")
 
+    def test_encoded(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a INTEGER (0..7), "
+            "  b B, "
+            "  c SEQUENCE OF B, "
+            "  d CHOICE { e B, f BOOLEAN }, "
+            "  g BOOLEAN DEFAULT TRUE "
+            "} "
+            "B ::= SEQUENCE { "
+            "  x INTEGER (0..255), "
+            "  y BOOLEAN "
+            "} "
+            "END",
+            'oer')
+        b = {'x': 5, 'y': True}
+        encoded_b = foo.encode('B', b)
+        self.assertEqual(encoded_b, b'\x05\xff')
+        encoded = foo.encode('A',
+                             {'a': 1, 'b': b, 'c': [b, b], 'd': ('e', b), 'g': False})
+        self.assertEqual(
+            encoded,
+            b'\x80\x01\x05\xff\x01\x02\x05\xff\x05\xff\x80\x05\xff\x00')
+
+        # The choice tag is added to already encoded values.
+        decoded = {
+            'a': 1,
+            'b': b,
+            'c': [b, b],
+            'd': ('e', asn1tools.Encoded(encoded_b)),
+            'g': asn1tools.Encoded(b'\x00')
+        }
+        self.assertEqual(foo.encode('A', decoded, check_constraints=True),
+                         encoded)
+
+    def test_decode_large_and_buffer(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE OF SEQUENCE { "
+            "  a INTEGER, "
+            "  b OCTET STRING "
+            "} "
+            "END",
+            'oer')
+        decoded = [{'a': i, 'b': b'\x01' * (i % 200)} for i in range(2000)]
+        encoded = foo.encode('A', decoded)
+
+        # bytes, bytearray and memoryview inputs.
+        self.assertEqual(foo.decode('A', encoded), decoded)
+        self.assertEqual(foo.decode('A', bytearray(encoded)), decoded)
+        self.assertEqual(foo.decode('A', memoryview(encoded)), decoded)
+
+        with self.assertRaises(asn1tools.DecodeError):
+            foo.decode('A', encoded[:-1])
+
+    def test_decode_length(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a INTEGER, "
+            "  b INTEGER (0..255) OPTIONAL, "
+            "  c SEQUENCE OF B, "
+            "  d CHOICE { e BOOLEAN, ..., f OCTET STRING }, "
+            "  ..., "
+            "  g ENUMERATED { x, y(1000) }, "
+            "  h BIT STRING "
+            "} "
+            "B ::= CHOICE { "
+            "  a UTF8String, "
+            "  b OBJECT IDENTIFIER, "
+            "  c REAL, "
+            "  d NULL "
+            "} "
+            "END",
+            'oer')
+        decoded = {
+            'a': 1000000,
+            'b': 5,
+            'c': [('a', u'hi'), ('b', '1.2.3'), ('c', 1.5), ('d', None)],
+            'd': ('f', b'\x01\x02'),
+            'g': 'y',
+            'h': (b'\x80', 1)
+        }
+        encoded = foo.encode('A', decoded)
+
+        # The length can be decoded.
+        self.assertEqual(foo.decode_length(encoded, 'A'), len(encoded))
+        self.assertEqual(foo.decode_length(encoded + encoded, 'A'),
+                         len(encoded))
+
+        # The length cannot be decoded.
+        for i in range(len(encoded)):
+            self.assertIsNone(foo.decode_length(encoded[:i], 'A'))
+
+        # The type name is required.
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            foo.decode_length(encoded)
+
+        self.assertEqual(
+            str(cm.exception),
+            'Decode length requires a type name for this codec, as the '
+            'length is not part of the encoding.')
+
 
 if __name__ == '__main__':
     unittest.main()
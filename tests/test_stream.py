@@ -0,0 +1,148 @@
+import sys
+import unittest
+from copy import deepcopy
+
+import asn1tools
+from asn1tools import stream
+
+sys.path.append('tests/files/ietf')
+
+from rfc4511 import EXPECTED as RFC4511
+
+
+class Asn1ToolsStreamTest(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_foo(self):
+        foo = asn1tools.compile_files('tests/files/foo.asn')
+        decoder = asn1tools.StreamDecoder(foo, 'Question')
+        question = {'id': 1, 'question': 'Is 1+1=3?'}
+        encoded = foo.encode('Question', question)
+
+        # Nothing is decoded until a PDU is complete.
+        self.assertEqual(list(decoder.feed(encoded[:2])), [])
+        self.assertEqual(list(decoder.feed(encoded[2:-1])), [])
+        self.assertEqual(list(decoder.feed(encoded[-1:])), [question])
+
+        # Several PDUs in one chunk.
+        self.assertEqual(list(decoder.feed(3 * encoded + encoded[:5])),
+                         3 * [question])
+        self.assertEqual(list(decoder.feed(encoded[5:])), [question])
+
+        # One byte at a time.
+        decoded = []
+
+        for i in range(len(encoded)):
+            decoded.extend(decoder.feed(encoded[i:i + 1]))
+
+        self.assertEqual(decoded, [question])
+
+        # PDUs not iterated over are returned by the next feed.
+        pdus = decoder.feed(2 * encoded)
+        self.assertEqual(next(pdus), question)
+        self.assertEqual(list(decoder.feed(b'')), [question])
+
+    def test_indefinite_length(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a INTEGER, "
+            "  b SEQUENCE OF OCTET STRING "
+            "} "
+            "END")
+        decoder = asn1tools.StreamDecoder(foo, 'A')
+        decoded = {'a': 5, 'b': [b'\x00\x00', b'\x01']}
+        encoded = (
+            b'\x30\x80\x80\x01\x05\xa1\x80\x04\x02\x00\x00\x24\x80\x04\x01'
+            b'\x01\x00\x00\x00\x00\x00\x00'
+        )
+        datas = []
+
+        for i in range(len(encoded)):
+            datas.extend(decoder.feed(encoded[i:i + 1]))
+
+        self.assertEqual(datas, [decoded])
+        self.assertEqual(list(decoder.feed(2 * encoded + b'\x30\x05')),
+                         2 * [decoded])
+        self.assertEqual(list(decoder.feed(b'\x80\x01\x07\xa1\x00')),
+                         [{'a': 7, 'b': []}])
+
+    def test_rfc4511(self):
+        rfc4511 = asn1tools.compile_dict(deepcopy(RFC4511))
+        decoder = asn1tools.StreamDecoder(rfc4511, 'LDAPMessage')
+        messages = [
+            {
+                'messageID': message_id,
+                'protocolOp': (
+                    'bindRequest',
+                    {
+                        'version': 3,
+                        'name': b'uid=tesla,dc=example,dc=com',
+                        'authentication': ('simple', message_id * b'x')
+                    }
+                )
+            }
+            for message_id in range(1, 200)
+        ]
+        encoded = b''.join([rfc4511.encode('LDAPMessage', message)
+                            for message in messages])
+        decoded = []
+
+        for i in range(0, len(encoded), 1000):
+            decoded.extend(decoder.feed(encoded[i:i + 1000]))
+
+        self.assertEqual(decoded, messages)
+
+        # Consumed data has been removed from the buffer.
+        self.assertLess(len(decoder._buffer), 2 * stream.COMPACT_MINIMUM + 1000)
+
+    def test_errors(self):
+        foo = asn1tools.compile_files('tests/files/foo.asn')
+        decoder = asn1tools.StreamDecoder(foo, 'Question')
+        question = {'id': 1, 'question': 'Is 1+1=3?'}
+        encoded = foo.encode('Question', question)
+
+        # A PDU that fails to decode is discarded.
+        pdus = decoder.feed(b'\x31\x00' + encoded)
+
+        with self.assertRaises(asn1tools.DecodeError) as cm:
+            next(pdus)
+
+        self.assertEqual(
+            str(cm.exception),
+            "Expected SEQUENCE with tag '30' at offset 0, but got '31'.")
+        self.assertEqual(list(decoder.feed(b'')), [question])
+
+        # Constraints.
+        bar = asn1tools.compile_string(
+            "Bar DEFINITIONS ::= BEGIN A ::= INTEGER (0..5) END")
+        decoder = asn1tools.StreamDecoder(bar, 'A', check_constraints=True)
+
+        with self.assertRaises(asn1tools.ConstraintsError) as cm:
+            list(decoder.feed(b'\x02\x01\x06'))
+
+        self.assertEqual(str(cm.exception),
+                         'Expected an integer between 0 and 5, but got 6.')
+
+        # Bad type name and codec.
+        with self.assertRaises(asn1tools.Error) as cm:
+            asn1tools.StreamDecoder(foo, 'Foo')
+
+        self.assertEqual(str(cm.exception),
+                         "Type 'Foo' not found in types dictionary.")
+
+        foo = asn1tools.compile_files('tests/files/foo.asn', 'uper')
+
+        with self.assertRaises(asn1tools.Error) as cm:
+            stream.StreamDecoder(foo, 'Question')
+
+        self.assertEqual(
+            str(cm.exception),
+            "Streams can only be decoded with the 'ber' and 'der' codecs, but "
+            "type 'Question' is not a BER or DER type.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -113,8 +113,8 @@ class Asn1ToolsEncodeTypeCheckerTest(unittest.TestCase):
     def test_sequence_of(self):
         self.assert_good_bad('SEQUENCE OF NULL',
                              'Expected data of type list',
-                             good_datas=[[None, None]],
-                             bad_datas=[{}, None])
+                             good_datas=[[None, None], (None, )],
+                             bad_datas=[{}, None, '', b''])
 
     def test_set(self):
         self.assert_good_bad('SET { a NULL }',
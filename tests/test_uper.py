@@ -1279,12 +1279,74 @@ class Asn1ToolsUPerTest(Asn1ToolsBaseTest):
 
     def test_decode_length(self):
         foo = asn1tools.compile_files('tests/files/foo.asn', 'uper')
+        encoded = b'\x01\x01\x09\x93\xcd\x03\x15\x6c\x5e\xb3\x7e'
 
+        # The length can be decoded.
+        self.assertEqual(foo.decode_length(encoded, 'Question'), len(encoded))
+        self.assertEqual(foo.decode_length(encoded + encoded, 'Question'),
+                         len(encoded))
+
+        # The length cannot be decoded.
+        for i in range(len(encoded)):
+            self.assertIsNone(foo.decode_length(encoded[:i], 'Question'))
+
+        # The type name is required.
         with self.assertRaises(asn1tools.DecodeError) as cm:
-            foo.decode_length(b'')
+            foo.decode_length(encoded)
 
-        self.assertEqual(str(cm.exception),
-                         "Decode length is not supported for this codec.")
+        self.assertEqual(
+            str(cm.exception),
+            'Decode length requires a type name for this codec, as the '
+            'length is not part of the encoding.')
+
+    def test_decode_length_skip(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a INTEGER, "
+            "  b INTEGER (0..100000) OPTIONAL, "
+            "  c SEQUENCE (SIZE (1..4)) OF B, "
+            "  d CHOICE { e BOOLEAN, ..., f OCTET STRING }, "
+            "  e IA5String (SIZE (1..10)), "
+            "  f BIT STRING (SIZE (1..20)), "
+            "  ..., "
+            "  g ENUMERATED { x, y, ... }, "
+            "  h OCTET STRING (SIZE (3)) "
+            "} "
+            "B ::= CHOICE { "
+            "  a UTF8String, "
+            "  b OBJECT IDENTIFIER, "
+            "  c NULL, "
+            "  d VisibleString, "
+            "  e BMPString "
+            "} "
+            "END",
+            'uper')
+        decoded = {
+            'a': 1000000,
+            'b': 5,
+            'c': [
+                ('a', u'hi'),
+                ('b', '1.2.3'),
+                ('c', None),
+                ('d', 'foo')
+            ],
+            'd': ('f', b'\x01\x02'),
+            'e': 'bar',
+            'f': (b'\x80\x40', 11),
+            'g': 'y',
+            'h': b'\x01\x02\x03'
+        }
+        encoded = foo.encode('A', decoded)
+
+        # The length is found without decoding.
+        self.assertEqual(foo.decode_length(encoded, 'A'), len(encoded))
+        self.assertEqual(foo.decode_length(encoded + encoded, 'A'),
+                         len(encoded))
+
+        for i in range(len(encoded)):
+            self.assertIsNone(foo.decode_length(encoded[:i], 'A'))
 
     def test_versions(self):
         foo = asn1tools.compile_files('tests/files/versions.asn', 'uper')
@@ -1332,6 +1394,68 @@ class Asn1ToolsUPerTest(Asn1ToolsBaseTest):
         self.assertEqual(foo.decode('V2', encoded_v3), decoded_v2)
         self.assertEqual(foo.decode('V3', encoded_v3), decoded_v3)
 
+    def test_information_object(self):
+        information_object = asn1tools.compile_files(
+            'tests/files/information_object.asn', 'uper')
+
+        datas = [
+            (
+                'ItemWithConstraints',
+                {'id': 0, 'value': True, 'comment': 'item 0', 'extra': 2},
+                b'\x01\x00\x01\x80\x06\xd3\xd3\x2e\xd4\x0c\x00\x40\x80'
+            ),
+            (
+                'ItemWithConstraints',
+                {
+                    'id': 1,
+                    'value': {'myValue': 7, 'myType': 0},
+                    'comment': 'item 1',
+                    'extra': 5
+                },
+                b'\x01\x01\x05\x02\x01\x07\x01\x00\x06\xd3\xd3\x2e\xd4\x0c'
+                b'\x40\x41\x40'
+            ),
+            (
+                'ItemWithConstraints',
+                {'id': 5, 'value': b'\x01\x02', 'comment': 'item 5', 'extra': 5},
+                b'\x01\x05\x02\x01\x02\x06\xd3\xd3\x2e\xd4\x0d\x40\x41\x40'
+            ),
+            (
+                'C',
+                {'a': 0, 'b': {'a': 0, 'b': {'a': 0}}},
+                b'\x80\x80\x03\xc0\x40\x00\xc0\x20\x00\x00\x00'
+            ),
+            (
+                'D1',
+                {'id': 1, 'value': True, 'a': {'id': 0, 'value': 5}},
+                b'\x01\x01\x01\x80\x01\x00\x02\x01\x05'
+            ),
+            (
+                'D2',
+                {'id': 1, 'value': True, 'a': {'id': 0, 'value': 5}},
+                b'\x01\x01\x01\x80\x01\x00\x02\x01\x05'
+            )
+        ]
+
+        for type_name, decoded, encoded in datas:
+            self.assert_encode_decode(information_object,
+                                      type_name,
+                                      decoded,
+                                      encoded)
+
+        # Open types are decoded on access if lazy.
+        decoded = information_object.decode('C', datas[3][2], lazy=True)
+        self.assertEqual(decoded['b'].data, b'\x80\x80\x01\x80\x40\x00\x00')
+        self.assertEqual(decoded['b'].value['b'].value, {'a': 0})
+        self.assertEqual(information_object.encode('C', decoded), datas[3][2])
+
+        # The member constraining a selected open type is decoded, but
+        # not returned.
+        self.assertEqual(information_object.decode('ItemWithConstraints',
+                                                   datas[1][2],
+                                                   select=['value']),
+                         {'value': {'myValue': 7, 'myType': 0}})
+
     def test_x691_a1(self):
         a1 = asn1tools.compile_files('tests/files/x691_a1.asn', 'uper')
 
@@ -2348,6 +2472,42 @@ class Asn1ToolsUPerTest(Asn1ToolsBaseTest):
 
             self.assertEqual(str(cm.exception), message)
 
+    def test_encoded(self):
+        foo = asn1tools.compile_string(
+            "Foo DEFINITIONS AUTOMATIC TAGS ::= "
+            "BEGIN "
+            "A ::= SEQUENCE { "
+            "  a INTEGER (0..7), "
+            "  b B, "
+            "  c SEQUENCE OF B, "
+            "  d CHOICE { e B, f BOOLEAN }, "
+            "  g BOOLEAN DEFAULT TRUE "
+            "} "
+            "B ::= SEQUENCE { "
+            "  x INTEGER (0..255), "
+            "  y BOOLEAN "
+            "} "
+            "END",
+            'uper')
+        b = {'x': 5, 'y': True}
+        encoded_b = foo.encode('B', b)
+        self.assertEqual(encoded_b, b'\x05\x80')
+        encoded = foo.encode('A',
+                             {'a': 1, 'b': b, 'c': [b, b], 'd': ('e', b), 'g': False})
+        self.assertEqual(encoded, b'\x90\x58\x10\x2c\x16\x05\x80')
+
+        # Already encoded values are inserted as is, at any bit
+        # offset.
+        decoded = {
+            'a': asn1tools.Encoded(b'\x20', 3),
+            'b': asn1tools.Encoded(encoded_b, 9),
+            'c': [asn1tools.Encoded(encoded_b, 9), b],
+            'd': ('e', asn1tools.Encoded(encoded_b, 9)),
+            'g': asn1tools.Encoded(b'\x00', 1)
+        }
+        self.assertEqual(foo.encode('A', decoded, check_constraints=True),
+                         encoded)
+
 
 if __name__ == '__main__':
     unittest.main()
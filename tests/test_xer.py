@@ -417,11 +417,31 @@ class Asn1ToolsXerTest(Asn1ToolsBaseTest):
     def test_decode_length(self):
         foo = asn1tools.compile_files('tests/files/foo.asn', 'xer')
 
-        with self.assertRaises(asn1tools.DecodeError) as cm:
-            foo.decode_length(b'')
+        # The length can be decoded.
+        datas = [
+            (b'<Question><id>1</id><question>Is 1+1=3?</question></Question>',
+             61),
+            (b'<Question><id>1</id><question /></Question><Answer>', 43),
+            (b'<?xml version="1.0"?>\n<!-- <a> --><A><b/></A>', 45),
+            (b'<A />', 5)
+        ]
 
-        self.assertEqual(str(cm.exception),
-                         'Decode length is not supported for this codec.')
+        for encoded, decoded_length in datas:
+            self.assertEqual(foo.decode_length(encoded), decoded_length)
+            self.assertEqual(foo.decode_length(encoded, 'Question'),
+                             decoded_length)
+
+        # The length cannot be decoded.
+        datas = [
+            b'',
+            b'<Question><id>1</id><question>Is 1+1=3?</question></Question',
+            b'<Question><id>1</id>',
+            b'<!-- <A/>',
+            b'<?xml'
+        ]
+
+        for encoded in datas:
+            self.assertIsNone(foo.decode_length(encoded))
 
     def test_rrc_8_6_0(self):
         rrc = asn1tools.compile_dict(deepcopy(RRC_8_6_0), 'xer')